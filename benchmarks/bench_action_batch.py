@@ -0,0 +1,89 @@
+"""
+Inserts the even elements of a partition into an in-memory SQLite table, once with an
+action that inserts one row per call and once with an action_batch that inserts a batch
+of rows with executemany, for a few batch sizes.
+
+    python benchmarks/bench_action_batch.py [num_elements]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll
+
+
+def connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE rows (id INTEGER, value TEXT)")
+    return connection
+
+
+class PerElement(DoAll):
+    def filter(self, chosen, connection) -> bool:
+        return chosen % 2 == 0
+
+    def action(self, chosen, connection):
+        connection.execute("INSERT INTO rows VALUES (?, ?)", (chosen, str(chosen)))
+
+
+class Batched(DoAll):
+    def filter(self, chosen, connection) -> bool:
+        return chosen % 2 == 0
+
+    def action_batch(self, chosen, connection):
+        connection.executemany(
+            "INSERT INTO rows VALUES (?, ?)",
+            [(element, str(element)) for element in chosen],
+        )
+
+
+class Batched64(DoAll):
+    batch_size = 64
+
+    def filter(self, chosen, connection) -> bool:
+        return chosen % 2 == 0
+
+    def action_batch(self, chosen, connection):
+        connection.executemany(
+            "INSERT INTO rows VALUES (?, ?)",
+            [(element, str(element)) for element in chosen],
+        )
+
+
+class Batched1024(DoAll):
+    batch_size = 1024
+
+    def filter(self, chosen, connection) -> bool:
+        return chosen % 2 == 0
+
+    def action_batch(self, chosen, connection):
+        connection.executemany(
+            "INSERT INTO rows VALUES (?, ?)",
+            [(element, str(element)) for element in chosen],
+        )
+
+
+def measure(label: str, controller, num_elements: int) -> None:
+    connection = connect()
+    start = time.perf_counter()
+    controller(range(num_elements), connection)
+    elapsed = time.perf_counter() - start
+    (count,) = connection.execute("SELECT COUNT(*) FROM rows").fetchone()
+    assert count == (num_elements + 1) // 2
+    print(f"  {label:<30} {elapsed * 1000:8.1f} ms {count / elapsed:12.0f} rows/s")
+
+
+def main(num_elements: int) -> None:
+    print(f"{num_elements} elements, {(num_elements + 1) // 2} rows inserted")
+    measure("action", PerElement(), num_elements)
+    measure("action_batch, batch_size 64", Batched64(), num_elements)
+    measure("action_batch, batch_size 1024", Batched1024(), num_elements)
+    measure("action_batch, one batch", Batched(), num_elements)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,88 @@
+"""
+Computes the mean of a score of the positive elements of a float partition with a
+DoAll, once with per-element filter and action methods (over a list, and over the numpy
+array, which boxes every element into an array scalar), and once with filter_batch and
+an action_batch that returns an array expression, whose fold reduces the array of
+results with numpy. Also compares returning the array of results with list_results.
+Requires numpy.
+
+    python benchmarks/bench_array_actions.py [num_elements]
+"""
+
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll
+
+
+class PerElement(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen > 0.0
+
+    def action(self, chosen):
+        return chosen * chosen + 1.0
+
+    def fold(self, results):
+        return sum(results) / len(results)
+
+
+class Vectorized(DoAll):
+    def filter_batch(self, chosen):
+        return chosen > 0.0
+
+    def action_batch(self, chosen):
+        return chosen * chosen + 1.0
+
+    def fold(self, results):
+        return results.mean()
+
+
+class Results(DoAll):
+    def filter_batch(self, chosen):
+        return chosen > 0.0
+
+    def action_batch(self, chosen):
+        return chosen * chosen + 1.0
+
+
+class ListResults(DoAll):
+    list_results = True
+
+    def filter_batch(self, chosen):
+        return chosen > 0.0
+
+    def action_batch(self, chosen):
+        return chosen * chosen + 1.0
+
+
+def measure(label: str, call):
+    start = time.perf_counter()
+    result = call()
+    print(f"  {label:<40} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(num_elements: int) -> None:
+    array = numpy.random.default_rng(0).standard_normal(num_elements)
+    values = array.tolist()
+    print(f"{num_elements} floats")
+
+    expected = measure("per element, list", lambda: PerElement()(values))
+    result = measure("per element, array", lambda: PerElement()(array))
+    assert numpy.isclose(result, expected)
+    result = measure("filter_batch, action_batch, fold", lambda: Vectorized()(array))
+    assert numpy.isclose(result, expected)
+
+    result = measure("array results, no fold", lambda: Results()(array))
+    assert numpy.isclose(result.mean(), expected)
+    result = measure("list_results, no fold", lambda: ListResults()(array))
+    assert numpy.isclose(sum(result) / len(result), expected)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
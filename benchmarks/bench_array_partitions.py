@@ -0,0 +1,103 @@
+"""
+Selects the k elements of a float partition closest to a target that are above a
+threshold, and sorts and finds the closest element of the same partition. Compares
+per-element filter and sort_key methods over a list with filter_batch and sort_key_batch
+over a numpy array partition, where the filter is a boolean mask and the selection is an
+argpartition (DoK), an argmin (DoOne) or a stable argsort (DoAll). Requires numpy.
+
+    python benchmarks/bench_array_partitions.py [num_elements] [k]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll, DoK, DoOne
+
+THRESHOLD = 0.1
+TARGET = 0.5
+
+
+class TopK(DoK):
+    def filter(self, chosen) -> bool:
+        return chosen > THRESHOLD
+
+    def sort_key(self, chosen):
+        return abs(chosen - TARGET)
+
+
+class ArrayTopK(DoK):
+    def filter_batch(self, chosen):
+        return chosen > THRESHOLD
+
+    def sort_key_batch(self, chosen):
+        return numpy.abs(chosen - TARGET)
+
+
+class Closest(DoOne):
+    def filter(self, chosen) -> bool:
+        return chosen > THRESHOLD
+
+    def sort_key(self, chosen):
+        return abs(chosen - TARGET)
+
+
+class ArrayClosest(DoOne):
+    def filter_batch(self, chosen):
+        return chosen > THRESHOLD
+
+    def sort_key_batch(self, chosen):
+        return numpy.abs(chosen - TARGET)
+
+
+class Sorted(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen > THRESHOLD
+
+    def sort_key(self, chosen):
+        return abs(chosen - TARGET)
+
+
+class ArraySorted(DoAll):
+    def filter_batch(self, chosen):
+        return chosen > THRESHOLD
+
+    def sort_key_batch(self, chosen):
+        return numpy.abs(chosen - TARGET)
+
+
+def measure(label: str, call):
+    start = time.perf_counter()
+    result = call()
+    print(f"  {label:<34} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(num_elements: int, k: int) -> None:
+    generator = random.Random(0)
+    values = [generator.random() for _ in range(num_elements)]
+    array = numpy.array(values)
+    print(f"{num_elements} floats, k = {k}")
+
+    expected = measure("DoK, list, per element", lambda: TopK()(k, values))
+    result = measure("DoK, array, argpartition", lambda: ArrayTopK()(k, array))
+    assert [float(value) for value in result] == expected
+
+    expected = measure("DoOne, list, per element", lambda: Closest()(values))
+    result = measure("DoOne, array, argmin", lambda: ArrayClosest()(array))
+    assert float(result) == expected
+
+    expected = measure("DoAll, list, per element", lambda: Sorted()(values))
+    result = measure("DoAll, array, stable argsort", lambda: ArraySorted()(array))
+    assert [float(value) for value in result] == expected
+
+
+if __name__ == "__main__":
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(num_elements, k)
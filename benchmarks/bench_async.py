@@ -0,0 +1,70 @@
+"""
+Measures the throughput of an AsyncDoAll whose actions call a local asyncio server that
+takes a fixed time to answer, at different max_concurrency values. max_concurrency = 1
+awaits the actions one after another.
+
+    python benchmarks/bench_async.py [num_requests] [server_delay_ms]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import AsyncDoAll
+
+
+async def handle(reader, writer):
+    line = await reader.readline()
+    await asyncio.sleep(DELAY)
+    writer.write(line)
+    await writer.drain()
+    writer.close()
+
+
+def make_controller(concurrency):
+    class Request(AsyncDoAll):
+        max_concurrency = concurrency
+
+        async def action(self, chosen, port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"{chosen}\n".encode())
+            await writer.drain()
+            answer = int(await reader.readline())
+            writer.close()
+            return answer
+
+        def fold(self, results):
+            return sum(results)
+
+    return Request()
+
+
+async def main(num_requests: int) -> None:
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=1024)
+    port = server.sockets[0].getsockname()[1]
+    print(f"{num_requests} requests, server delay {DELAY * 1000:.0f} ms")
+
+    expected = sum(range(num_requests))
+    baseline = None
+    for concurrency in (1, 4, 16, 64, None):
+        controller = make_controller(concurrency)
+        start = time.perf_counter()
+        assert await controller(range(num_requests), port) == expected
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"  max_concurrency={str(concurrency):<5} {elapsed * 1000:8.1f} ms"
+            f" {num_requests / elapsed:8.0f} req/s ({baseline / elapsed:.1f}x)"
+        )
+
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 5) / 1000
+    asyncio.run(main(num_requests))
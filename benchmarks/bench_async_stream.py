@@ -0,0 +1,91 @@
+"""
+Compares an async controller fed an async generator directly with the same controller
+fed a list collected from the generator first: the time to the result and the peak
+memory allocated while the partition is processed (tracemalloc).
+
+    python benchmarks/bench_async_stream.py [num_elements] [k]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import AsyncDoK, AsyncDoOne
+
+
+class Top(AsyncDoK):
+    reverse_sort = True
+
+    def sort_key(self, chosen):
+        return chosen[0]
+
+    def action(self, chosen):
+        return chosen[1]
+
+
+class FirstMatch(AsyncDoOne):
+    def filter(self, chosen) -> bool:
+        return chosen[0] == 7
+
+    def action(self, chosen):
+        return chosen[1]
+
+
+async def stream(num_elements: int):
+    for i in range(num_elements):
+        yield (i * 7919 % 10007, f"element {i}")
+        if i % 256 == 0:
+            await asyncio.sleep(0)
+
+
+async def collected(num_elements: int):
+    return [element async for element in stream(num_elements)]
+
+
+async def collect_then(controller, k, num_elements: int):
+    partition = await collected(num_elements)
+    if k is None:
+        return await controller(partition)
+    return await controller(k, partition)
+
+
+async def measure(label, call) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await call()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms {peak / 2**20:8.2f} MiB peak")
+    return result
+
+
+async def main(num_elements: int, k: int) -> None:
+    print(f"{num_elements} elements, k = {k}")
+    controller = Top()
+    streamed = await measure(
+        "AsyncDoK, async generator", lambda: controller(k, stream(num_elements))
+    )
+    listed = await measure(
+        "AsyncDoK, collected list", lambda: collect_then(controller, k, num_elements)
+    )
+    assert streamed == listed
+
+    first = FirstMatch()
+    streamed = await measure(
+        "AsyncDoOne, async generator", lambda: first(stream(num_elements))
+    )
+    listed = await measure(
+        "AsyncDoOne, collected list", lambda: collect_then(first, None, num_elements)
+    )
+    assert streamed == listed
+
+
+if __name__ == "__main__":
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(num_elements, k))
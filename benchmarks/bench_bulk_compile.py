@@ -0,0 +1,67 @@
+"""
+Compares per-class compilation against deferred bulk compilation for modules that define
+many controllers with distinct pipeline shapes.
+
+    python benchmarks/bench_bulk_compile.py
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers.internal.generation_cache import CODE_CACHE, GENERATION_CACHE
+
+CONTROLLER_TEMPLATE = """
+class Controller{index}(DoAll):
+    def filter(self, chosen, arg_{index}) -> bool:
+        return chosen > arg_{index}
+
+    def action(self, chosen, *, scale_{index}=2):
+        return chosen * scale_{index}
+"""
+
+
+def write_module(directory: str, count: int, deferred: bool) -> str:
+    lines = ["import metacontrollers", "from metacontrollers import DoAll", ""]
+    body = "".join(CONTROLLER_TEMPLATE.format(index=i) for i in range(count))
+    if deferred:
+        lines.append("with metacontrollers.deferred_compilation():")
+        body = "\n".join("    " + line if line else line for line in body.splitlines())
+    lines.append(body)
+    path = os.path.join(directory, f"controllers_{count}_{int(deferred)}.py")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def import_module(path: str, repeat: int = 5) -> float:
+    name = os.path.splitext(os.path.basename(path))[0]
+    timings = []
+    for _ in range(repeat):
+        CODE_CACHE.clear()
+        GENERATION_CACHE.clear()
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        start = time.perf_counter()
+        spec.loader.exec_module(module)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (100, 1000):
+            per_class = import_module(write_module(directory, count, deferred=False))
+            bulk = import_module(write_module(directory, count, deferred=True))
+            print(
+                f"{count:>5} controllers: per-class {per_class * 1000:8.1f} ms, "
+                f"bulk {bulk * 1000:8.1f} ms ({per_class / bulk:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares calling a controller in a loop over many small partitions with call_many and
+map_partitions.
+
+    python benchmarks/bench_call_many.py [num_partitions] [partition_size]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import metacontrollers
+from metacontrollers import DoAll, DoK, DoOne, map_partitions
+
+
+class Best(DoOne):
+    def pre_controller(self) -> None:
+        pass
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen >= minimum
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+
+class Top(DoK):
+    def sort_key(self, chosen):
+        return -chosen
+
+    def fold(self, results):
+        return sum(results)
+
+
+class Total(DoAll):
+    def filter(self, chosen, minimum) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+    def fold(self, results):
+        return sum(results)
+
+
+def measure(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    num_partitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    partition_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    partitions = [
+        [(index * 31 + offset * 17) % 100 for offset in range(partition_size)]
+        for index in range(num_partitions)
+    ]
+    print(f"{os.cpu_count()} cpus, {num_partitions} partitions of {partition_size}")
+
+    cases = (
+        (Best(), (10,), {"offset": 1}),
+        (Top(), (3,), {}),
+        (Total(), (10,), {"offset": 1}),
+    )
+    for controller, args, kwargs in cases:
+        if isinstance(controller, DoK):
+            loop = lambda: [controller(*args, p, **kwargs) for p in partitions]
+            many = lambda: controller.call_many(*args, partitions, **kwargs)
+            mapped = lambda: map_partitions(controller, *args, partitions, **kwargs)
+        else:
+            loop = lambda: [controller(p, *args, **kwargs) for p in partitions]
+            many = lambda: controller.call_many(partitions, *args, **kwargs)
+            mapped = lambda: map_partitions(controller, partitions, *args, **kwargs)
+        assert loop() == many() == mapped()
+
+        baseline = measure(loop)
+        print(f"  {type(controller).__name__}")
+        print(f"    loop            {baseline * 1000:8.1f} ms")
+        for name, fn in (("call_many", many), ("map_partitions", mapped)):
+            elapsed = measure(fn)
+            print(
+                f"    {name:<15} {elapsed * 1000:8.1f} ms ({baseline / elapsed:.2f}x)"
+            )
+    metacontrollers.shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Simulates a lookup service: many concurrent callers each call a DoOne with one small
+partition, and the chosen element is looked up with a backend whose cost is mostly a
+fixed round trip (sleep) plus a small cost per element, and which serves at most
+CONNECTIONS requests at once (a connection pool). Compares calling the controller
+directly with calling it through a Coalescer (threads) and an AsyncCoalescer (asyncio):
+throughput and the p50/p99 latency of a call.
+
+    python benchmarks/bench_coalescing.py [num_callers] [calls_per_caller]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import AsyncCoalescer, AsyncDoOne, Coalescer, DoOne
+
+ROUND_TRIP = 0.002
+PER_ELEMENT = 0.00002
+CONNECTIONS = 4
+
+connections = threading.BoundedSemaphore(CONNECTIONS)
+
+
+def lookup(keys):
+    with connections:
+        time.sleep(ROUND_TRIP + PER_ELEMENT * len(keys))
+    return [key * 2 for key in keys]
+
+
+async def async_lookup(keys, connections: asyncio.Semaphore):
+    async with connections:
+        await asyncio.sleep(ROUND_TRIP + PER_ELEMENT * len(keys))
+    return [key * 2 for key in keys]
+
+
+class Lookup(DoOne):
+    def filter(self, chosen) -> bool:
+        return chosen >= 0
+
+    def action_batch(self, chosen):
+        return lookup(chosen)
+
+
+class AsyncLookup(AsyncDoOne):
+    def __init__(self) -> None:
+        # created inside the running event loop
+        self.connections = asyncio.Semaphore(CONNECTIONS)
+
+    def filter(self, chosen) -> bool:
+        return chosen >= 0
+
+    async def action_batch(self, chosen):
+        return await async_lookup(chosen, self.connections)
+
+
+def report(label, elapsed, latencies) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"  {label:<24} {len(latencies) / elapsed:8.0f} calls/s"
+        f"  p50 {statistics.median(latencies) * 1000:6.2f} ms"
+        f"  p99 {p99 * 1000:6.2f} ms"
+    )
+
+
+def run_threads(call, num_callers: int, calls_per_caller: int):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(num_callers + 1)
+
+    def caller(index: int) -> None:
+        own = []
+        barrier.wait()
+        for i in range(calls_per_caller):
+            start = time.perf_counter()
+            assert call([-1, index + i]) == (index + i) * 2
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+
+    threads = [
+        threading.Thread(target=caller, args=(index,)) for index in range(num_callers)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+async def run_tasks(call, num_callers: int, calls_per_caller: int):
+    latencies = []
+
+    async def caller(index: int) -> None:
+        for i in range(calls_per_caller):
+            start = time.perf_counter()
+            assert await call([-1, index + i]) == (index + i) * 2
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(index) for index in range(num_callers)))
+    return time.perf_counter() - start, latencies
+
+
+async def main_async(num_callers: int, calls_per_caller: int) -> None:
+    controller = AsyncLookup()
+    report(
+        "AsyncDoOne, direct",
+        *await run_tasks(controller, num_callers, calls_per_caller),
+    )
+    report(
+        "AsyncCoalescer",
+        *await run_tasks(AsyncCoalescer(controller), num_callers, calls_per_caller),
+    )
+
+
+def main(num_callers: int, calls_per_caller: int) -> None:
+    print(
+        f"{num_callers} callers x {calls_per_caller} calls, "
+        f"round trip {ROUND_TRIP * 1000:.1f} ms, {CONNECTIONS} connections"
+    )
+    controller = Lookup()
+    report("DoOne, direct", *run_threads(controller, num_callers, calls_per_caller))
+    report(
+        "Coalescer",
+        *run_threads(Coalescer(controller), num_callers, calls_per_caller),
+    )
+    asyncio.run(main_async(num_callers, calls_per_caller))
+
+
+if __name__ == "__main__":
+    num_callers = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    calls_per_caller = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    main(num_callers, calls_per_caller)
@@ -0,0 +1,110 @@
+"""
+Selects the 10 cheapest in-stock records of a table stored column by column, and
+computes their label. Compares per-element filter and sort_key methods over rows built
+from the columns (as when a columnar store is iterated as Python objects) or over
+prebuilt rows, with filter_batch and sort_key_batch that declare the columns they read,
+over columns of array.array and of numpy arrays, where rows are only built for the
+chosen records.
+
+    python benchmarks/bench_columnar.py [num_records]
+"""
+
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoK
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+K = 10
+
+
+def iter_rows(columns):
+    names = list(columns)
+    return (dict(zip(names, values)) for values in zip(*columns.values()))
+
+
+class PerRow(DoK):
+    def filter(self, chosen) -> bool:
+        return chosen["stock"] > 0
+
+    def sort_key(self, chosen):
+        return chosen["price"] * (1.0 + chosen["tax"])
+
+    def action(self, chosen):
+        return f'{chosen["id"]}: {chosen["price"]:.2f}'
+
+
+class Columnar(DoK):
+    filter_columns = ("stock",)
+    sort_key_columns = ("price", "tax")
+
+    def filter_batch(self, chosen):
+        return [stock > 0 for stock in chosen["stock"]]
+
+    def sort_key_batch(self, chosen):
+        return [
+            price * (1.0 + tax) for price, tax in zip(chosen["price"], chosen["tax"])
+        ]
+
+    def action(self, chosen):
+        return f'{chosen["id"]}: {chosen["price"]:.2f}'
+
+
+class NumpyColumnar(DoK):
+    filter_columns = ("stock",)
+    sort_key_columns = ("price", "tax")
+
+    def filter_batch(self, chosen):
+        return chosen["stock"] > 0
+
+    def sort_key_batch(self, chosen):
+        return chosen["price"] * (1.0 + chosen["tax"])
+
+    def action(self, chosen):
+        return f'{chosen["id"]}: {chosen["price"]:.2f}'
+
+
+def measure(label: str, call):
+    start = time.perf_counter()
+    result = call()
+    print(f"  {label:<40} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(num_records: int) -> None:
+    generator = random.Random(0)
+    columns = {
+        "id": array("q", range(num_records)),
+        "price": array("d", (generator.uniform(1, 100) for _ in range(num_records))),
+        "tax": array(
+            "d", (generator.choice((0.0, 0.1, 0.2)) for _ in range(num_records))
+        ),
+        "stock": array("i", (generator.randrange(-5, 50) for _ in range(num_records))),
+    }
+    rows = list(iter_rows(columns))
+    print(f"{num_records} records, k = {K}")
+
+    expected = measure(
+        "per row, rows built from columns", lambda: PerRow()(K, iter_rows(columns))
+    )
+    assert measure("per row, prebuilt rows", lambda: PerRow()(K, rows)) == expected
+    assert measure("columnar, array.array", lambda: Columnar()(K, columns)) == expected
+    if numpy is not None:
+        numpy_columns = {
+            name: numpy.asarray(column) for name, column in columns.items()
+        }
+        result = measure("columnar, numpy", lambda: NumpyColumnar()(K, numpy_columns))
+        assert result == expected
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
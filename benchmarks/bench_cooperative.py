@@ -0,0 +1,94 @@
+"""
+Measures the event loop lag caused by a large synchronous DoAll called from inside an
+asyncio service, directly and through metacontrollers.cooperative at several time
+slices. A heartbeat task sleeps for 1 ms in a loop; its lag is how late each wake-up is.
+
+    python benchmarks/bench_cooperative.py [num_elements]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll, cooperative
+
+HEARTBEAT = 0.001
+
+
+class Score(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 3 != 0
+
+    def action(self, chosen):
+        return sum(range(chosen % 50))
+
+    def fold(self, results):
+        return sum(results)
+
+
+class SortedScore(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 3 != 0
+
+    def sort_key(self, chosen):
+        return (chosen * 7919) % 10007
+
+    def action(self, chosen):
+        return sum(range(chosen % 50))
+
+    def fold(self, results):
+        return results[:10]
+
+
+async def heartbeat(lags):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(max(0.0, time.perf_counter() - start - HEARTBEAT))
+
+
+async def measure(label, call) -> None:
+    lags = []
+    task = asyncio.ensure_future(heartbeat(lags))
+    await asyncio.sleep(0.01)
+    lags.clear()
+    start = time.perf_counter()
+    result = await call()
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)
+    task.cancel()
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"  {label:<26} call {elapsed * 1000:7.1f} ms"
+        f"  loop lag max {lags[-1] * 1000 if lags else 0:7.1f} ms"
+        f"  p99 {p99 * 1000:6.1f} ms  median {statistics.median(lags) * 1000 if lags else 0:5.2f} ms"
+    )
+    return result
+
+
+async def main(num_elements: int) -> None:
+    partition = list(range(num_elements))
+    print(f"{num_elements} elements, heartbeat every {HEARTBEAT * 1000:.0f} ms")
+    for controller in (Score(), SortedScore()):
+        print(type(controller).__name__)
+
+        async def blocking():
+            return controller(partition)
+
+        expected = await measure("direct call", blocking)
+        for time_slice in (0.001, 0.005, 0.02):
+            result = await measure(
+                f"cooperative, {time_slice * 1000:g} ms slice",
+                lambda: cooperative(controller, time_slice)(partition),
+            )
+            assert result == expected
+
+
+if __name__ == "__main__":
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    asyncio.run(main(num_elements))
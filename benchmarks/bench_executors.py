@@ -0,0 +1,81 @@
+"""
+Compares the executors on the same CPU bound DoAll: sequential, threads, processes and
+subinterpreters. On Pythons without subinterpreter pools, "interpreters" falls back to
+processes, which this benchmark reports.
+
+    python benchmarks/bench_executors.py [num_elements] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import metacontrollers
+from metacontrollers import DoAll
+from metacontrollers.internal.executors import get_worker_pool_type
+
+
+def expensive_action(chosen: int, rounds: int) -> int:
+    value = chosen
+    for _ in range(rounds):
+        value = (value * 1103515245 + 12345) % 2147483648
+    return value
+
+
+class Sequential(DoAll):
+    def action(self, chosen, rounds=500):
+        return expensive_action(chosen, rounds)
+
+
+def make_controller(executor: str, max_workers: int) -> type:
+    # workers import controllers from this module, so they must be module globals
+    name = f"{executor.capitalize()}{max_workers}"
+    cls = type(
+        name,
+        (DoAll,),
+        {
+            "__module__": __name__,
+            "__qualname__": name,
+            "executor": executor,
+            "max_workers": max_workers,
+            "action": Sequential.action,
+        },
+    )
+    globals()[name] = cls
+    return cls
+
+
+def measure(controller: DoAll, elements: list, repeat: int = 3) -> float:
+    controller(elements[:100])  # start the workers before timing
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        controller(elements)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    elements = list(range(num_elements))
+    expected = Sequential()(elements)
+    sequential = measure(Sequential(), elements)
+    print(f"{os.cpu_count()} cpus, {num_elements} elements, {max_workers} workers")
+    print(f"  sequential    {sequential * 1000:8.1f} ms")
+
+    for executor in ("threads", "processes", "interpreters"):
+        controller = make_controller(executor, max_workers)()
+        assert controller(elements) == expected
+        elapsed = measure(controller, elements)
+        print(
+            f"  {executor:<13} {elapsed * 1000:8.1f} ms ({sequential / elapsed:.2f}x) "
+            f"using {get_worker_pool_type(executor).__name__ if executor != 'threads' else 'ThreadPoolExecutor'}"
+        )
+        metacontrollers.shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Selects the top k (DoK) and sorts (DoAll) a partition of floats by a score, comparing
+filter and sort_key (one interpreted call per element) with filter_batch and
+sort_key_batch computing the masks and scores of a whole batch in one call, with list
+comprehensions and with numpy if it is installed.
+
+    python benchmarks/bench_filter_sort_batch.py [num_elements] [k]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll, DoK
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BATCH_SIZE = 8192
+
+
+class TopK(DoK):
+    def filter(self, chosen) -> bool:
+        return chosen > 0.1
+
+    def sort_key(self, chosen):
+        return math.exp(-((chosen - 0.5) ** 2) / 0.02) * math.sin(40 * chosen)
+
+
+class TopKBatch(DoK):
+    batch_size = BATCH_SIZE
+
+    def filter_batch(self, chosen):
+        return [element > 0.1 for element in chosen]
+
+    def sort_key_batch(self, chosen):
+        exp, sin = math.exp, math.sin
+        return [
+            exp(-((element - 0.5) ** 2) / 0.02) * sin(40 * element)
+            for element in chosen
+        ]
+
+
+class TopKNumpy(DoK):
+    batch_size = BATCH_SIZE
+
+    def filter_batch(self, chosen):
+        return numpy.asarray(chosen) > 0.1
+
+    def sort_key_batch(self, chosen):
+        chosen = numpy.asarray(chosen)
+        return numpy.exp(-((chosen - 0.5) ** 2) / 0.02) * numpy.sin(40 * chosen)
+
+
+class Sort(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen > 0.1
+
+    def sort_key(self, chosen):
+        return math.exp(-((chosen - 0.5) ** 2) / 0.02) * math.sin(40 * chosen)
+
+
+class SortNumpy(DoAll):
+    batch_size = BATCH_SIZE
+
+    def filter_batch(self, chosen):
+        return numpy.asarray(chosen) > 0.1
+
+    def sort_key_batch(self, chosen):
+        chosen = numpy.asarray(chosen)
+        return numpy.exp(-((chosen - 0.5) ** 2) / 0.02) * numpy.sin(40 * chosen)
+
+
+def measure(label: str, call):
+    start = time.perf_counter()
+    result = call()
+    print(f"  {label:<40} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main(num_elements: int, k: int) -> None:
+    random.seed(0)
+    partition = [random.random() for _ in range(num_elements)]
+    print(f"{num_elements} floats, k = {k}, batches of {BATCH_SIZE}")
+
+    expected = measure("DoK, filter + sort_key", lambda: TopK()(k, partition))
+    result = measure("DoK, batch methods", lambda: TopKBatch()(k, partition))
+    assert result == expected
+    if numpy is not None:
+        result = measure(
+            "DoK, batch methods (numpy)", lambda: TopKNumpy()(k, partition)
+        )
+        assert result == expected
+
+    expected = measure("DoAll, filter + sort_key", lambda: Sort()(partition))
+    if numpy is not None:
+        result = measure("DoAll, batch methods (numpy)", lambda: SortNumpy()(partition))
+        assert result == expected
+
+
+if __name__ == "__main__":
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(num_elements, k)
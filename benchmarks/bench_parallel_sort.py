@@ -0,0 +1,80 @@
+"""
+Measures how a DoAll with parallel_sort and an expensive sort_key scales with the
+number of worker processes, compared to a sequential sorted over the whole partition.
+
+    python benchmarks/bench_parallel_sort.py [num_elements]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import metacontrollers
+from metacontrollers import DoAll
+
+
+def expensive_key(chosen: int, rounds: int) -> int:
+    value = chosen
+    for _ in range(rounds):
+        value = (value * 1103515245 + 12345) % 2147483648
+    return value % 1000  # plenty of ties
+
+
+class SequentialSort(DoAll):
+    def sort_key(self, chosen, rounds=200):
+        return expensive_key(chosen, rounds)
+
+
+def make_process_sort(workers: int) -> type:
+    # worker processes import controllers from this module, so they must be module globals
+    name = f"ProcessSort{workers}"
+    cls = type(
+        name,
+        (DoAll,),
+        {
+            "__module__": __name__,
+            "__qualname__": name,
+            "executor": "processes",
+            "max_workers": workers,
+            "parallel_sort": True,
+            "sort_key": SequentialSort.sort_key,
+        },
+    )
+    globals()[name] = cls
+    return cls
+
+
+def measure(controller: DoAll, elements: list, repeat: int = 3) -> float:
+    controller(elements[:100])  # start the workers before timing
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        controller(elements)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    elements = list(range(num_elements))
+    expected = SequentialSort()(elements)
+    sequential = measure(SequentialSort(), elements)
+    print(f"{os.cpu_count()} cpus, {num_elements} elements")
+    print(f"  sequential    {sequential * 1000:8.1f} ms")
+
+    workers = 1
+    while workers <= max(16, os.cpu_count() or 1):
+        controller = make_process_sort(workers)()
+        assert controller(elements) == expected
+        elapsed = measure(controller, elements)
+        print(
+            f"  {workers:>2} processes  {elapsed * 1000:8.1f} ms ({sequential / elapsed:.2f}x)"
+        )
+        metacontrollers.shutdown_executors()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures how a DoK with an expensive sort_key scales with the number of worker
+processes, compared to a sequential nsmallest over the whole partition.
+
+    python benchmarks/bench_parallel_top_k.py [num_elements] [k]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import metacontrollers
+from metacontrollers import DoK
+
+
+def expensive_key(chosen: int, rounds: int) -> int:
+    value = chosen
+    for _ in range(rounds):
+        value = (value * 1103515245 + 12345) % 2147483648
+    return value % 1000  # plenty of ties
+
+
+class SequentialTopK(DoK):
+    def sort_key(self, chosen, rounds=200):
+        return expensive_key(chosen, rounds)
+
+
+def make_process_top_k(workers: int) -> type:
+    # worker processes import controllers from this module, so they must be module globals
+    name = f"ProcessTopK{workers}"
+    cls = type(
+        name,
+        (DoK,),
+        {
+            "__module__": __name__,
+            "__qualname__": name,
+            "executor": "processes",
+            "max_workers": workers,
+            "sort_key": SequentialTopK.sort_key,
+        },
+    )
+    globals()[name] = cls
+    return cls
+
+
+def measure(controller: DoK, k: int, elements: list, repeat: int = 3) -> float:
+    controller(k, elements[:100])  # start the workers before timing
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        controller(k, elements)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    elements = list(range(num_elements))
+    expected = SequentialTopK()(k, elements)
+    sequential = measure(SequentialTopK(), k, elements)
+    print(f"{os.cpu_count()} cpus, {num_elements} elements, k={k}")
+    print(f"  sequential    {sequential * 1000:8.1f} ms")
+
+    workers = 1
+    while workers <= max(16, os.cpu_count() or 1):
+        controller = make_process_top_k(workers)()
+        assert controller(k, elements) == expected
+        elapsed = measure(controller, k, elements)
+        print(
+            f"  {workers:>2} processes  {elapsed * 1000:8.1f} ms ({sequential / elapsed:.2f}x)"
+        )
+        metacontrollers.shutdown_executors()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
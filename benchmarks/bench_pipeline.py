@@ -0,0 +1,114 @@
+"""
+Runs a DoAll over a partition read in blocks with simulated I/O (a sleep per block, as
+when pulling records from disk or a socket), with a CPU bound action. Compares a
+regular call, where reading, filtering and the actions take turns, with pipelined calls
+where they overlap, and prints the stage metrics of the pipelined call.
+
+    python benchmarks/bench_pipeline.py [num_elements] [block_io_ms]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll, pipeline_metrics
+
+BLOCK_SIZE = 256
+
+
+def read_records(num_elements: int, block_io: float):
+    for start in range(0, num_elements, BLOCK_SIZE):
+        time.sleep(block_io)
+        yield from range(start, min(start + BLOCK_SIZE, num_elements))
+
+
+def work(chosen: int) -> int:
+    total = 0
+    for i in range(200):
+        total += (chosen * i) % 7
+    return total
+
+
+class Sequential(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 4 != 0
+
+    def action(self, chosen):
+        return work(chosen)
+
+    def fold(self, results):
+        return sum(results)
+
+
+class Pipelined(DoAll):
+    pipeline = True
+    chunk_size = 256
+    fold_associative = True
+
+    def filter(self, chosen) -> bool:
+        return chosen % 4 != 0
+
+    def action(self, chosen):
+        return work(chosen)
+
+    def fold(self, results):
+        return sum(results)
+
+
+class PipelinedProcesses(DoAll):
+    pipeline = True
+    executor = "processes"
+    chunk_size = 256
+    fold_associative = True
+
+    def filter(self, chosen) -> bool:
+        return chosen % 4 != 0
+
+    def action(self, chosen):
+        return work(chosen)
+
+    def fold(self, results):
+        return sum(results)
+
+
+def measure(label, controller, num_elements: int, block_io: float):
+    start = time.perf_counter()
+    result = controller(read_records(num_elements, block_io))
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main(num_elements: int, block_io: float) -> None:
+    print(
+        f"{num_elements} elements in blocks of {BLOCK_SIZE}, "
+        f"{block_io * 1000:.1f} ms of I/O per block, {os.cpu_count()} CPUs"
+    )
+    expected = measure("regular call", Sequential(), num_elements, block_io)
+    assert measure("pipeline", Pipelined(), num_elements, block_io) == expected
+    controller = PipelinedProcesses()
+    controller([])  # start the worker processes
+    result = measure("pipeline, processes", controller, num_elements, block_io)
+    assert result == expected
+
+    snapshot = pipeline_metrics(Pipelined).snapshot()
+    print("pipeline stages:")
+    for name, stage in snapshot["stages"].items():
+        print(
+            f"  {name:<8} {stage['items']:8} items"
+            f"  busy {stage['busy_time'] * 1000:7.1f} ms"
+            f"  blocked {stage['blocked_time'] * 1000:7.1f} ms"
+            f"  {stage['throughput']:10.0f} items/s"
+        )
+    for name, queue in snapshot["queues"].items():
+        print(
+            f"  queue {name:<9} mean occupancy {queue['mean_occupancy']:4.1f}"
+            f" / {queue['capacity']}, max {queue['max_occupancy']}"
+        )
+
+
+if __name__ == "__main__":
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    block_io = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    main(num_elements, block_io)
@@ -0,0 +1,85 @@
+"""
+Measures how a CPU bound scoring DoAll scales with the number of worker processes,
+compared to running it sequentially.
+
+    python benchmarks/bench_process_pool.py [num_elements]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import metacontrollers
+from metacontrollers import DoAll
+
+
+def score(chosen: int, rounds: int) -> int:
+    value = chosen
+    for _ in range(rounds):
+        value = (value * 1103515245 + 12345) % 2147483648
+    return value
+
+
+class SequentialScore(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 3 != 0
+
+    def action(self, chosen, rounds=2000):
+        return score(chosen, rounds)
+
+    def fold(self, results):
+        return max(results)
+
+
+def make_process_score(workers: int) -> type:
+    # worker processes import controllers from this module, so they must be module globals
+    name = f"ProcessScore{workers}"
+    cls = type(
+        name,
+        (DoAll,),
+        {
+            "__module__": __name__,
+            "__qualname__": name,
+            "executor": "processes",
+            "max_workers": workers,
+            "filter": SequentialScore.filter,
+            "action": SequentialScore.action,
+            "fold": SequentialScore.fold,
+        },
+    )
+    globals()[name] = cls
+    return cls
+
+
+def measure(controller: DoAll, elements: list, repeat: int = 3) -> float:
+    controller(elements[:100])  # start the workers before timing
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        controller(elements)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    num_elements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    elements = list(range(num_elements))
+    sequential = measure(SequentialScore(), elements)
+    print(f"{os.cpu_count()} cpus, {num_elements} elements")
+    print(f"  sequential    {sequential * 1000:8.1f} ms")
+
+    workers = 1
+    while workers <= max(16, os.cpu_count() or 1):
+        controller = make_process_score(workers)()
+        elapsed = measure(controller, elements)
+        print(
+            f"  {workers:>2} processes  {elapsed * 1000:8.1f} ms ({sequential / elapsed:.2f}x)"
+        )
+        metacontrollers.shutdown_executors()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
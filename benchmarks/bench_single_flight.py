@@ -0,0 +1,145 @@
+"""
+Simulates a cache miss stampede: waves of concurrent callers all call a DoAll on the
+same partition, whose actions query a slow backend (sleep) that serves at most
+CONNECTIONS requests at once. Compares calling the controller directly with calling it
+through SingleFlight (threads) and AsyncSingleFlight (asyncio): wall time, number of
+backend queries and the p50/p99 latency of a call.
+
+    python benchmarks/bench_single_flight.py [num_callers] [num_waves]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import AsyncDoAll, AsyncSingleFlight, DoAll, SingleFlight
+
+QUERY_TIME = 0.002
+CONNECTIONS = 4
+PARTITION = list(range(8))
+
+
+class Report(DoAll):
+    def __init__(self) -> None:
+        self.queries = 0
+        self.connections = threading.BoundedSemaphore(CONNECTIONS)
+
+    def action(self, chosen):
+        with self.connections:
+            self.queries += 1
+            time.sleep(QUERY_TIME)
+        return chosen * 2
+
+    def fold(self, results):
+        return sum(results)
+
+
+class AsyncReport(AsyncDoAll):
+    def __init__(self) -> None:
+        self.queries = 0
+        # created inside the running event loop
+        self.connections = asyncio.Semaphore(CONNECTIONS)
+
+    async def action(self, chosen):
+        async with self.connections:
+            self.queries += 1
+            await asyncio.sleep(QUERY_TIME)
+        return chosen * 2
+
+    def fold(self, results):
+        return sum(results)
+
+
+def report(label, controller, elapsed, latencies) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"  {label:<24} {elapsed * 1000:8.1f} ms {controller.queries:6} queries"
+        f"  p50 {statistics.median(latencies) * 1000:7.2f} ms"
+        f"  p99 {p99 * 1000:7.2f} ms"
+    )
+
+
+def run_threads(call, num_callers: int, num_waves: int):
+    latencies = []
+    lock = threading.Lock()
+    expected = sum(PARTITION) * 2
+
+    def caller(barrier) -> None:
+        barrier.wait()
+        start = time.perf_counter()
+        assert call(PARTITION) == expected
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(num_waves):
+        barrier = threading.Barrier(num_callers)
+        threads = [
+            threading.Thread(target=caller, args=(barrier,)) for _ in range(num_callers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return time.perf_counter() - start, latencies
+
+
+async def run_tasks(call, num_callers: int, num_waves: int):
+    latencies = []
+    expected = sum(PARTITION) * 2
+
+    async def caller() -> None:
+        start = time.perf_counter()
+        assert await call(PARTITION) == expected
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(num_waves):
+        await asyncio.gather(*(caller() for _ in range(num_callers)))
+    return time.perf_counter() - start, latencies
+
+
+async def main_async(num_callers: int, num_waves: int) -> None:
+    controller = AsyncReport()
+    report(
+        "AsyncDoAll, direct",
+        controller,
+        *await run_tasks(controller, num_callers, num_waves),
+    )
+    controller = AsyncReport()
+    report(
+        "AsyncSingleFlight",
+        controller,
+        *await run_tasks(AsyncSingleFlight(controller), num_callers, num_waves),
+    )
+
+
+def main(num_callers: int, num_waves: int) -> None:
+    print(
+        f"{num_waves} waves of {num_callers} identical calls, "
+        f"{len(PARTITION)} queries of {QUERY_TIME * 1000:.1f} ms per call, "
+        f"{CONNECTIONS} connections"
+    )
+    controller = Report()
+    report(
+        "DoAll, direct", controller, *run_threads(controller, num_callers, num_waves)
+    )
+    controller = Report()
+    report(
+        "SingleFlight",
+        controller,
+        *run_threads(SingleFlight(controller), num_callers, num_waves),
+    )
+    asyncio.run(main_async(num_callers, num_waves))
+
+
+if __name__ == "__main__":
+    num_callers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    num_waves = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(num_callers, num_waves)
@@ -0,0 +1,86 @@
+"""
+Measures the throughput of concurrent calls to shared DoOne and DoAll instances at 1 to
+32 threads. With the GIL, throughput stays flat as threads are added. Run it on a
+free-threaded build (python3.13t and later) to see how calls scale there.
+
+    python benchmarks/bench_thread_scaling.py [calls_per_thread] [partition_size]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metacontrollers import DoAll, DoOne
+
+
+class Pick(DoOne):
+    def filter(self, chosen, parity) -> bool:
+        return chosen % 2 == parity
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+
+class Scale(DoAll):
+    def filter(self, chosen, parity) -> bool:
+        return chosen % 2 == parity
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+    def fold(self, results):
+        return sum(results)
+
+
+def measure(
+    controller, elements: list, num_threads: int, calls_per_thread: int
+) -> float:
+    barrier = threading.Barrier(num_threads + 1)
+
+    def run() -> None:
+        barrier.wait()
+        for index in range(calls_per_thread):
+            controller(elements, index % 2, offset=index)
+
+    threads = [threading.Thread(target=run) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return num_threads * calls_per_thread / (time.perf_counter() - start)
+
+
+def main() -> None:
+    calls_per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    partition_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    elements = list(range(partition_size))
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"{os.cpu_count()} cpus, GIL {'enabled' if is_gil_enabled else 'disabled'}, "
+        f"{calls_per_thread} calls per thread, {partition_size} elements"
+    )
+
+    for controller in (Pick(), Scale()):
+        print(f"  {type(controller).__name__}")
+        baseline = None
+        for num_threads in (1, 2, 4, 8, 16, 32):
+            throughput = measure(controller, elements, num_threads, calls_per_thread)
+            baseline = baseline or throughput
+            print(
+                f"    {num_threads:>2} threads  {throughput:10.0f} calls/s ({throughput / baseline:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
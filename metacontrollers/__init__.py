@@ -1,4 +1,7 @@
 from .internal.interface import (
+    AsyncDoAll,
+    AsyncDoK,
+    AsyncDoOne,
     Do,
     DoAll,
     DoK,
@@ -7,3 +10,10 @@ from .internal.interface import (
     TChosen,
     TFoldReturn,
 )
+from .internal.bulk_compile import compile_all, deferred_compilation
+from .internal.coalescing import AsyncCoalescer, Coalescer
+from .internal.cooperative import cooperative
+from .internal.executors import shutdown_executors
+from .internal.map_partitions import map_partitions
+from .internal.pipeline_metrics import pipeline_metrics
+from .internal.single_flight import AsyncSingleFlight, SingleFlight
@@ -0,0 +1,168 @@
+"""
+Freezes the generated call methods of every controller in a module into a static Python
+module, so later imports can attach them without inspecting, parsing or compiling anything.
+
+    python -m metacontrollers.freeze mypkg.controllers [-o mypkg/_controllers_frozen.py]
+
+MetaController looks for the frozen module next to the original one (mypkg.controllers is
+frozen into mypkg._controllers_frozen). Frozen call methods are fingerprinted with the
+bytecode of the controlled methods; stale ones are reported and regenerated at import time.
+"""
+
+import argparse
+import ast
+import copy
+import importlib
+import inspect
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from metacontrollers.internal.frozen import (
+    FROZEN_FORMAT_VERSION,
+    FROZEN_MODULE_ATTRIBUTE,
+    get_fingerprint,
+    get_frozen_module_name,
+)
+from metacontrollers.internal.generation_cache import GENERATION_CACHE
+from metacontrollers.internal.interface import (
+    AsyncDoAll,
+    AsyncDoK,
+    AsyncDoOne,
+    Do,
+    DoAll,
+    DoK,
+    DoOne,
+    MetaController,
+)
+
+
+def get_controllers(module) -> List[type]:
+    """
+    Returns the controller classes defined at the top level of a module.
+    """
+    return [
+        value
+        for value in vars(module).values()
+        if isinstance(value, MetaController)
+        and value not in (Do, DoOne, DoK, DoAll, AsyncDoOne, AsyncDoK, AsyncDoAll)
+        and value.__module__ == module.__name__
+    ]
+
+
+def render_helper_imports(helpers: Dict[str, object]) -> List[str]:
+    lines = []
+    for name, value in sorted(helpers.items()):
+        module_name = getattr(value, "__module__", None)
+        qualname = getattr(value, "__qualname__", None)
+        if (
+            module_name is None
+            or qualname is None
+            or getattr(importlib.import_module(module_name), qualname, None)
+            is not value
+        ):
+            raise ValueError(f'Unable to freeze helper "{name}"; it is not importable.')
+        alias = "" if name == qualname else f" as {name}"
+        lines.append(f"from {module_name} import {qualname}{alias}")
+    return lines
+
+
+def freeze_controller(cls: type, function_name: str) -> Tuple[str, ast.stmt, dict]:
+    """
+    Runs code generation for a controller class and returns its fingerprint, the renamed
+    call method definition and the helper globals it needs.
+    """
+    implementation = MetaController.get_implementation(cls.__bases__)
+    attrs = dict(vars(cls))
+    key = GENERATION_CACHE.get_key(implementation, cls, attrs)
+    if key is None:
+        raise ValueError(
+            f'Controller "{cls.__qualname__}" cannot be frozen because one of its controlled methods is not a plain function.'
+        )
+
+    controller = implementation(
+        cls, cls.__name__, cls.__bases__, attrs, inspect.currentframe()
+    )
+    controller.validate()
+    controller.generate_call_method()
+
+    call_fn = copy.deepcopy(controller.call_method_module.body[0])
+    call_fn.name = function_name
+    # argument defaults are re-collected from the controller class when the frozen call
+    # method is attached, so the frozen source only needs placeholders
+    call_fn.args.defaults = [ast.Constant(value=None) for _ in call_fn.args.defaults]
+    call_fn.args.kw_defaults = [
+        ast.Constant(value=None) for _ in call_fn.args.kw_defaults
+    ]
+    return get_fingerprint(key), call_fn, controller.call_method_globals
+
+
+def freeze_module(module_name: str) -> str:
+    """
+    Imports a module and renders the frozen module source for every controller in it.
+
+    Args:
+        module_name (str): importable name of the module to freeze.
+
+    Returns:
+        str: source of the frozen module.
+    """
+    if not hasattr(ast, "unparse"):
+        raise RuntimeError("Freezing controllers requires Python 3.9 or newer.")
+
+    module = importlib.import_module(module_name)
+    helpers = {}
+    functions = []
+    entries = []
+    for index, cls in enumerate(get_controllers(module)):
+        fingerprint, call_fn, call_helpers = freeze_controller(
+            cls, f"__ctrl_call_{index}__"
+        )
+        helpers.update(call_helpers)
+        functions.append(ast.unparse(ast.fix_missing_locations(call_fn)))
+        entries.append(f"    {cls.__qualname__!r}: ({fingerprint!r}, {call_fn.name}),")
+
+    lines = [
+        f"# Generated by `python -m metacontrollers.freeze {module_name}`. Do not edit.",
+        *render_helper_imports(helpers),
+        "",
+        f"FROZEN_FORMAT_VERSION = {FROZEN_FORMAT_VERSION}",
+        f"SOURCE_MODULE = {module_name!r}",
+        "",
+    ]
+    for function in functions:
+        lines.extend(["", function, ""])
+    lines.extend(["", f"{FROZEN_MODULE_ATTRIBUTE} = {{", *entries, "}", ""])
+    return "\n".join(lines)
+
+
+def get_default_output(module_name: str) -> str:
+    module = importlib.import_module(module_name)
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    leaf = get_frozen_module_name(module_name).rpartition(".")[2]
+    return os.path.join(directory, f"{leaf}.py")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m metacontrollers.freeze",
+        description="Freeze the generated call methods of the controllers in a module.",
+    )
+    parser.add_argument("module", help="importable name of the module to freeze")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="path of the frozen module (defaults to _<module>_frozen.py next to the module)",
+    )
+    args = parser.parse_args(argv)
+
+    source = freeze_module(args.module)
+    output = args.output or get_default_output(args.module)
+    with open(output, "w") as f:
+        f.write(source)
+    print(f"Froze {args.module} into {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
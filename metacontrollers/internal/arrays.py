@@ -0,0 +1,173 @@
+import sys
+from typing import Any, Callable, List, Union
+
+from metacontrollers.internal.exceptions import InvalidReturnError
+from metacontrollers.internal.namespace import (
+    ACTION_BATCH_METHOD_NAME,
+    FILTER_BATCH_METHOD_NAME,
+    SORT_KEY_BATCH_METHOD_NAME,
+)
+
+# numpy is an optional dependency that is never imported by the library itself: a
+# partition can only be a numpy array if numpy was already imported by whoever created
+# it, so array partitions are recognized through sys.modules, and the helpers below that
+# run on array partitions only import the module that is already loaded.
+
+
+def is_array(elements: Any) -> bool:
+    """
+    Returns whether elements is a numpy array, without importing numpy.
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(elements, numpy.ndarray)
+
+
+def get_array_values(values: Any, num_items: int, method_name: str) -> Any:
+    """
+    Checks the mask or keys that filter_batch or sort_key_batch returned for a slice of
+    an array partition: a one dimensional array with one value per element.
+    """
+    import numpy
+
+    values = numpy.asarray(values)
+    if values.ndim != 1 or len(values) != num_items:
+        raise InvalidReturnError(
+            f'"{method_name}" returned {values.size} values for a batch of {num_items} elements.'
+        )
+    return values
+
+
+def get_array_results(results: Any, num_items: int) -> Any:
+    """
+    Checks the results of action_batch for a view of an array partition: an array with
+    one result (or one row of results) per element, or None if action_batch does not
+    return anything.
+    """
+    import numpy
+
+    if results is None:
+        return numpy.full(num_items, None, dtype=object)
+    results = numpy.asarray(results)
+    if not results.ndim or len(results) != num_items:
+        raise InvalidReturnError(
+            f'"{ACTION_BATCH_METHOD_NAME}" returned {results.size} results for a batch of {num_items} elements.'
+        )
+    return results
+
+
+def join_array_results(results: List[Any], array: Any) -> Any:
+    """
+    Joins the result arrays of every view of an array partition into one array, without
+    a copy if there is a single view. Without any view, the result is an empty array.
+    """
+    import numpy
+
+    if not results:
+        return array[:0]
+    return results[0] if len(results) == 1 else numpy.concatenate(results)
+
+
+def get_array_keys(
+    fn: Callable[[Any], Any], array: Any, batch_size: Union[int, None]
+) -> Any:
+    """
+    Computes the sort keys of a non-empty array partition with fn, called on the whole
+    array or on views of batch_size elements, as one array.
+    """
+    import numpy
+
+    if batch_size is None or batch_size >= len(array):
+        return get_array_values(fn(array), len(array), SORT_KEY_BATCH_METHOD_NAME)
+    keys = []
+    for start in range(0, len(array), batch_size):
+        batch = array[start : start + batch_size]
+        keys.append(get_array_values(fn(batch), len(batch), SORT_KEY_BATCH_METHOD_NAME))
+    return numpy.concatenate(keys)
+
+
+def get_stable_order(keys: Any, reverse: bool) -> Any:
+    """
+    Returns the indices that sort keys like sorted(..., reverse=reverse): elements with
+    equal keys keep their order, also in reverse. A reverse stable sort is a stable sort of
+    the reversed keys, read backwards.
+    """
+    if not reverse:
+        return keys.argsort(kind="stable")
+    return (len(keys) - 1 - keys[::-1].argsort(kind="stable"))[::-1]
+
+
+def filter_array(
+    fn: Callable[[Any], Any],
+    array: Any,
+    batch_size: Union[int, None],
+    limit: Union[int, None] = None,
+) -> Any:
+    """
+    Filters an array partition with the boolean masks fn returns for the whole array, or
+    for views of batch_size elements. If limit is given, no more views are filtered once
+    limit elements were kept. Returns the array of kept elements.
+    """
+    import numpy
+
+    if not len(array) or (limit is not None and limit <= 0):
+        return array[:0]
+    step = batch_size or len(array)
+    indices = []
+    num_kept = 0
+    for start in range(0, len(array), step):
+        batch = array[start : start + step]
+        mask = get_array_values(fn(batch), len(batch), FILTER_BATCH_METHOD_NAME)
+        kept = numpy.flatnonzero(mask)
+        indices.append(kept + start if start else kept)
+        num_kept += len(kept)
+        if limit is not None and num_kept >= limit:
+            break
+    indices = indices[0] if len(indices) == 1 else numpy.concatenate(indices)
+    return array[indices[:limit]]
+
+
+def sort_array(
+    fn: Callable[[Any], Any],
+    array: Any,
+    batch_size: Union[int, None],
+    reverse: bool,
+) -> Any:
+    """
+    Sorts an array partition by the keys fn computes, with a stable argsort.
+    """
+    if not len(array):
+        return array
+    keys = get_array_keys(fn, array, batch_size)
+    return array[get_stable_order(keys, reverse)]
+
+
+def select_array(
+    fn: Callable[[Any], Any],
+    k: int,
+    array: Any,
+    batch_size: Union[int, None],
+    reverse: bool,
+) -> Any:
+    """
+    Selects the k smallest (or largest if reverse) elements of an array partition by the
+    keys fn computes, in order, like heapq.nsmallest(k, elements, key=...). A single
+    element is found with argmin or argmax. Otherwise argpartition finds the k-th key, so
+    only the elements up to it are sorted; of the elements whose key equals the k-th key,
+    the first ones are chosen, as heapq would.
+    """
+    import numpy
+
+    if k <= 0 or not len(array):
+        return array[:0]
+    keys = get_array_keys(fn, array, batch_size)
+    if k == 1:
+        return array[[keys.argmax() if reverse else keys.argmin()]]
+    if k >= len(array):
+        return array[get_stable_order(keys, reverse)]
+
+    position = len(keys) - k if reverse else k - 1
+    kth_key = keys[keys.argpartition(position)[position]]
+    chosen = numpy.flatnonzero(keys > kth_key if reverse else keys < kth_key)
+    ties = numpy.flatnonzero(keys == kth_key)[: k - len(chosen)]
+    chosen = numpy.sort(numpy.concatenate((chosen, ties)))
+    return array[chosen[get_stable_order(keys[chosen], reverse)]]
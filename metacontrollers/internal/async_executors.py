@@ -0,0 +1,420 @@
+import asyncio
+from heapq import merge, nlargest, nsmallest
+from itertools import chain, count, islice
+from math import log2
+from time import perf_counter
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Union,
+)
+
+# elements buffered from an async partition between top k selections
+STREAM_SELECT_CHUNK_SIZE = 1024
+# elements sorted at once by a cooperative sort before the sorted runs are merged
+COOPERATIVE_SORT_CHUNK_SIZE = 4096
+
+
+async def gather_tasks(coroutines: Iterable[Awaitable[Any]]) -> List[Any]:
+    """
+    Runs coroutines as concurrent tasks and returns their results in order. If one of
+    them raises, the others are cancelled and waited for before the exception is raised
+    again, so no task outlives the call.
+    """
+    tasks = []
+    try:
+        for coroutine in coroutines:
+            tasks.append(asyncio.ensure_future(coroutine))
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def async_map(
+    fn: Callable[[Any], Awaitable[Any]],
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    max_concurrency: Union[int, None],
+) -> List[Any]:
+    """
+    Awaits fn on every element concurrently, with at most max_concurrency calls in flight
+    at a time. Results are returned in the order of elements, whatever order the calls
+    finish in.
+
+    Instead of one task per element waiting on a semaphore, max_concurrency worker tasks
+    pull elements from the shared iterator, so a large partition never creates more than
+    max_concurrency tasks and is consumed lazily.
+
+    Args:
+        fn (Callable[[Any], Awaitable[Any]]): coroutine function to call with each element.
+        elements (Union[Iterable[Any], AsyncIterable[Any]]): elements to map over.
+        max_concurrency (Union[int, None]): maximum number of calls awaited at once, or
+        None to await every call at once.
+
+    Returns:
+        List[Any]: the result of each call, in the order of elements.
+    """
+    if hasattr(elements, "__aiter__"):
+        return await async_map_stream(fn, elements, max_concurrency)
+    if max_concurrency is None:
+        return await gather_tasks(map(fn, elements))
+    if max_concurrency == 1:
+        return [await fn(element) for element in elements]
+
+    results: Dict[int, Any] = {}
+    indexed = enumerate(elements)
+
+    async def worker() -> None:
+        # next() on the shared iterator never awaits, so workers cannot interleave in it
+        for index, element in indexed:
+            results[index] = await fn(element)
+
+    await gather_tasks(worker() for _ in range(max_concurrency))
+    return [results[index] for index in range(len(results))]
+
+
+async def async_map_stream(
+    fn: Callable[[Any], Awaitable[Any]],
+    elements: AsyncIterable[Any],
+    max_concurrency: Union[int, None],
+) -> List[Any]:
+    """
+    async_map for an async iterable. Each call starts as soon as its element arrives
+    (and a worker is free), without waiting for the rest of the stream.
+    """
+    iterator = elements.__aiter__()
+    if max_concurrency == 1:
+        return [await fn(element) async for element in iterator]
+
+    if max_concurrency is None:
+        tasks = []
+        try:
+            async for element in iterator:
+                tasks.append(asyncio.ensure_future(fn(element)))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return await gather_tasks(tasks)
+
+    results: Dict[int, Any] = {}
+    lock = asyncio.Lock()
+    indexes = count()
+
+    async def worker() -> None:
+        while True:
+            # an async iterator cannot be advanced by two tasks at once
+            async with lock:
+                try:
+                    element = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                index = next(indexes)
+            results[index] = await fn(element)
+
+    await gather_tasks(worker() for _ in range(max_concurrency))
+    return [results[index] for index in range(len(results))]
+
+
+def filter_async(
+    fn: Callable[[Any], Any],
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    awaits: bool,
+) -> Union[Iterable[Any], AsyncIterator[Any]]:
+    """
+    filter() for async controllers. Regular iterables filtered with a plain function
+    use the builtin filter; otherwise the elements are filtered lazily by an async
+    generator, awaiting fn for each element if it is a coroutine function.
+
+    Args:
+        fn (Callable[[Any], Any]): filter function.
+        elements (Union[Iterable[Any], AsyncIterable[Any]]): elements to filter.
+        awaits (bool): if True, fn returns a coroutine that is awaited.
+
+    Returns:
+        Union[Iterable[Any], AsyncIterator[Any]]: the elements that pass the filter.
+    """
+    if not awaits and not hasattr(elements, "__aiter__"):
+        return filter(fn, elements)
+    return filter_stream(fn, elements, awaits)
+
+
+async def filter_stream(
+    fn: Callable[[Any], Any],
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    awaits: bool,
+) -> AsyncIterator[Any]:
+    if hasattr(elements, "__aiter__"):
+        async for element in elements:
+            keep = fn(element)
+            if (await keep) if awaits else keep:
+                yield element
+    else:
+        for element in elements:
+            keep = fn(element)
+            if (await keep) if awaits else keep:
+                yield element
+
+
+async def collect_async(
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+) -> Iterable[Any]:
+    """
+    Collects an async iterable into a list. Regular iterables are returned as they are.
+    """
+    if hasattr(elements, "__aiter__"):
+        return [element async for element in elements]
+    return elements
+
+
+async def sorted_async(
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    key: Callable[[Any], Any],
+    reverse: bool,
+) -> List[Any]:
+    """
+    sorted() for async controllers. A sort needs every element, so an async iterable is
+    collected first.
+    """
+    return sorted(await collect_async(elements), key=key, reverse=reverse)
+
+
+async def select_stream(
+    select: Callable[..., List[Any]],
+    k: int,
+    elements: AsyncIterable[Any],
+    key: Callable[[Any], Any],
+) -> List[Any]:
+    """
+    Selects the top k elements of an async iterable with select (heapq.nsmallest or
+    heapq.nlargest), holding at most k selected elements and one chunk of the stream in
+    memory. The previous selection is placed before each new chunk, so ties are broken
+    by stream order exactly as in a single select over the whole stream.
+    """
+    if k <= 0:
+        return []
+    chunk_size = max(k, STREAM_SELECT_CHUNK_SIZE)
+    selected: List[Any] = []
+    chunk: List[Any] = []
+    async for element in elements:
+        chunk.append(element)
+        if len(chunk) >= chunk_size:
+            selected = select(k, selected + chunk, key=key)
+            chunk = []
+    if chunk:
+        selected = select(k, selected + chunk, key=key)
+    return selected
+
+
+async def nsmallest_async(
+    k: int,
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    key: Callable[[Any], Any],
+) -> List[Any]:
+    """
+    heapq.nsmallest for async controllers, selecting from async iterables as they stream.
+    """
+    if hasattr(elements, "__aiter__"):
+        return await select_stream(nsmallest, k, elements, key)
+    return nsmallest(k, elements, key=key)
+
+
+async def nlargest_async(
+    k: int,
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    key: Callable[[Any], Any],
+) -> List[Any]:
+    """
+    heapq.nlargest for async controllers, selecting from async iterables as they stream.
+    """
+    if hasattr(elements, "__aiter__"):
+        return await select_stream(nlargest, k, elements, key)
+    return nlargest(k, elements, key=key)
+
+
+async def take_async(
+    elements: Union[Iterable[Any], AsyncIterable[Any]], k: int
+) -> List[Any]:
+    """
+    Returns the first k elements as a list. An async iterable is not consumed any further
+    once k elements have been taken.
+    """
+    if not hasattr(elements, "__aiter__"):
+        return list(islice(elements, k))
+    taken: List[Any] = []
+    if k <= 0:
+        return taken
+    async for element in elements:
+        taken.append(element)
+        if len(taken) >= k:
+            break
+    return taken
+
+
+class TimeSlicer:
+    """
+    Tracks the time slice of one cooperative call. Every stage of the call shares it, so
+    the event loop gets control back about every time_slice seconds, whichever stages the
+    time was spent in.
+    """
+
+    __slots__ = ("time_slice", "deadline")
+
+    def __init__(self, time_slice: float) -> None:
+        self.time_slice = time_slice
+        self.deadline = perf_counter() + time_slice
+
+    async def tick(self) -> None:
+        """
+        Yields to the event loop if the slice is over.
+        """
+        if perf_counter() >= self.deadline:
+            await self.pause()
+
+    async def pause(self) -> None:
+        """
+        Yields to the event loop and starts a new slice.
+        """
+        # a task woken by a timer or I/O during the slice takes two loop iterations to run
+        # (the callback, then the task wake-up), so keep yielding until it has run;
+        # otherwise it waits for the next slice as well
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.deadline = perf_counter() + self.time_slice
+
+
+async def cooperative_batches(
+    elements: Union[Iterable[Any], AsyncIterable[Any]], slicer: TimeSlicer
+) -> AsyncIterator[List[Any]]:
+    """
+    Yields elements in lists, pausing for the event loop whenever the slice is over. The
+    time includes whatever the consumer does with each batch, and the batch size adapts
+    to it: batches that take less than an eighth of a slice double in size, and batches
+    that take more than half a slice are halved. Async iterables are checked after every
+    element.
+    """
+    if hasattr(elements, "__aiter__"):
+        async for element in elements:
+            yield [element]
+            await slicer.tick()
+        return
+
+    iterator = iter(elements)
+    batch_size = 1
+    time_slice = slicer.time_slice
+    while True:
+        start = perf_counter()
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+        now = perf_counter()
+        if now - start < time_slice / 8:
+            batch_size *= 2
+        elif now - start > time_slice / 2 and batch_size > 1:
+            batch_size //= 2
+        if now >= slicer.deadline:
+            await slicer.pause()
+
+
+async def cooperative_map(
+    fn: Callable[[Any], Any],
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    slicer: TimeSlicer,
+) -> List[Any]:
+    """
+    list(map(fn, elements)) that yields to the event loop about every time slice.
+
+    Args:
+        fn (Callable[[Any], Any]): function to call with each element.
+        elements (Union[Iterable[Any], AsyncIterable[Any]]): elements to map over.
+        slicer (TimeSlicer): time slice of the call.
+
+    Returns:
+        List[Any]: the result of each call, in the order of elements.
+    """
+    results: List[Any] = []
+    async for batch in cooperative_batches(elements, slicer):
+        results.extend(map(fn, batch))
+    return results
+
+
+async def cooperative_each(
+    fn: Callable[[Any], Any],
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    slicer: TimeSlicer,
+) -> None:
+    """
+    cooperative_map for actions whose results are discarded.
+    """
+    async for batch in cooperative_batches(elements, slicer):
+        for element in batch:
+            fn(element)
+
+
+async def cooperative_collect(
+    elements: Union[Iterable[Any], AsyncIterable[Any]], slicer: TimeSlicer
+) -> List[Any]:
+    """
+    Collects elements (typically a lazy filter over the partition) into a list, yielding
+    to the event loop about every time slice.
+    """
+    collected: List[Any] = []
+    async for batch in cooperative_batches(elements, slicer):
+        collected.extend(batch)
+    return collected
+
+
+async def cooperative_sorted(
+    elements: Union[Iterable[Any], AsyncIterable[Any]],
+    key: Callable[[Any], Any],
+    reverse: bool,
+    slicer: TimeSlicer,
+) -> List[Any]:
+    """
+    sorted() that yields to the event loop about every time slice. The keys are computed
+    first, then runs of COOPERATIVE_SORT_CHUNK_SIZE positions are sorted by key and
+    merged. sorted() and heapq.merge are both stable, so the result is the same as
+    sorted(elements, key=key, reverse=reverse).
+
+    Merging the runs with heapq.merge can be sliced but is several times slower than
+    sorting, so the runs are merged with a single sorted() call over their concatenation
+    (which timsort merges run by run) whenever the time that takes, estimated from the
+    time taken to sort the runs, fits in a slice.
+    """
+    elements = await cooperative_collect(elements, slicer)
+    keys = await cooperative_map(key, elements, slicer)
+    get_key = keys.__getitem__
+    num_elements = len(elements)
+    if num_elements <= COOPERATIVE_SORT_CHUNK_SIZE:
+        order = sorted(range(num_elements), key=get_key, reverse=reverse)
+        return [elements[index] for index in order]
+
+    runs = []
+    elapsed = 0.0
+    for start in range(0, num_elements, COOPERATIVE_SORT_CHUNK_SIZE):
+        stop = min(start + COOPERATIVE_SORT_CHUNK_SIZE, num_elements)
+        run_start = perf_counter()
+        runs.append(sorted(range(start, stop), key=get_key, reverse=reverse))
+        elapsed += perf_counter() - run_start
+        await slicer.tick()
+
+    # measured with CPython's sort: merging the runs takes up to about a quarter of the
+    # time sorting them took, per doubling of the number of runs
+    merge_estimate = elapsed * log2(len(runs)) / 4
+    if merge_estimate <= slicer.time_slice:
+        await slicer.pause()
+        order = sorted(chain.from_iterable(runs), key=get_key, reverse=reverse)
+    else:
+        order = merge(*runs, key=get_key, reverse=reverse)
+    return await cooperative_map(elements.__getitem__, order, slicer)
@@ -0,0 +1,256 @@
+from heapq import nlargest, nsmallest
+from itertools import compress, islice
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Union
+
+from metacontrollers.internal.arrays import (
+    filter_array,
+    get_array_results,
+    is_array,
+    join_array_results,
+    select_array,
+    sort_array,
+)
+from metacontrollers.internal.columnar import Columns
+from metacontrollers.internal.exceptions import InvalidReturnError
+from metacontrollers.internal.namespace import (
+    ACTION_BATCH_METHOD_NAME,
+    FILTER_BATCH_METHOD_NAME,
+    SORT_KEY_BATCH_METHOD_NAME,
+)
+
+
+def get_batch_results(results: Any, num_items: int) -> List[Any]:
+    """
+    Checks the results of action_batch: one result per chosen element, in order, or None
+    if action_batch does not return anything.
+    """
+    if results is None:
+        return [None] * num_items
+    if not isinstance(results, list):
+        results = list(results)
+    if len(results) != num_items:
+        raise InvalidReturnError(
+            f'"{ACTION_BATCH_METHOD_NAME}" returned {len(results)} results for a batch of {num_items} elements.'
+        )
+    return results
+
+
+def get_batch_values(values: Any, num_items: int, method_name: str) -> List[Any]:
+    """
+    Checks the mask or keys that filter_batch or sort_key_batch returned for a batch: one
+    value per element, in order. Arrays (anything with a tolist method, such as numpy
+    arrays) are converted with a single tolist() call instead of being iterated element
+    by element, which would box every value into an array scalar.
+    """
+    tolist = getattr(values, "tolist", None)
+    if tolist is not None:
+        values = tolist()
+    if not isinstance(values, list):
+        values = list(values)
+    if len(values) != num_items:
+        raise InvalidReturnError(
+            f'"{method_name}" returned {len(values)} values for a batch of {num_items} elements.'
+        )
+    return values
+
+
+def iter_batches(
+    elements: Iterable[Any], batch_size: Union[int, None]
+) -> Iterator[List[Any]]:
+    """
+    Groups elements into lists of batch_size elements (the last one may be shorter), or
+    into a single list if batch_size is None. Never yields an empty batch. The batches of
+    a numpy array partition are views of the array instead of lists.
+    """
+    sliceable = isinstance(elements, list) or is_array(elements)
+    if batch_size is None:
+        batch = elements if sliceable else list(elements)
+        if len(batch):
+            yield batch
+        return
+
+    if sliceable:
+        for start in range(0, len(elements), batch_size):
+            yield elements[start : start + batch_size]
+        return
+
+    iterator = iter(elements)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def map_batches(
+    fn: Callable[[List[Any]], Any],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+) -> List[Any]:
+    """
+    Calls fn once per batch of elements and returns the results of every batch as one
+    flat list, in the order of the elements. The results for a numpy array partition
+    are joined into an array instead, so they are never unpacked into Python objects.
+    """
+    if is_array(elements):
+        return join_array_results(
+            [
+                get_array_results(fn(batch), len(batch))
+                for batch in iter_batches(elements, batch_size)
+            ],
+            elements,
+        )
+    results = []
+    for batch in iter_batches(elements, batch_size):
+        results.extend(get_batch_results(fn(batch), len(batch)))
+    return results
+
+
+def each_batch(
+    fn: Callable[[List[Any]], Any],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+) -> None:
+    """
+    Calls fn once per batch of elements, discarding what it returns.
+    """
+    for batch in iter_batches(elements, batch_size):
+        fn(batch)
+
+
+async def async_map_batches(
+    fn: Callable[[List[Any]], Awaitable[Any]],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+) -> List[Any]:
+    """
+    Awaits the coroutine function fn once per batch of elements, one batch after
+    another, and returns the results of every batch as one flat list (or array, for a
+    numpy array partition).
+    """
+    if is_array(elements):
+        return join_array_results(
+            [
+                get_array_results(await fn(batch), len(batch))
+                for batch in iter_batches(elements, batch_size)
+            ],
+            elements,
+        )
+    results = []
+    for batch in iter_batches(elements, batch_size):
+        results.extend(get_batch_results(await fn(batch), len(batch)))
+    return results
+
+
+async def async_each_batch(
+    fn: Callable[[List[Any]], Awaitable[Any]],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+) -> None:
+    """
+    Awaits the coroutine function fn once per batch of elements, discarding the results.
+    """
+    for batch in iter_batches(elements, batch_size):
+        await fn(batch)
+
+
+def filter_batches(
+    fn: Callable[[List[Any]], Any],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+    limit: Union[int, None] = None,
+) -> List[Any]:
+    """
+    Filters elements a batch at a time: fn returns a mask for each batch, which selects
+    the kept elements with itertools.compress. If limit is given, no more batches are
+    filtered once limit elements were kept. A numpy array partition is filtered with
+    boolean masks instead, into an array of the kept elements, and the rows of a columnar
+    partition are filtered by their positions, into the kept rows.
+    """
+    if is_array(elements):
+        return filter_array(fn, elements, batch_size, limit)
+    if isinstance(elements, Columns):
+        positions = elements.get_positions()
+        fn = elements.get_batch_fn(fn)
+        return elements.select(filter_batches(fn, positions, batch_size, limit))
+    kept = []
+    if limit is not None and limit <= 0:
+        return kept
+    for batch in iter_batches(elements, batch_size):
+        mask = get_batch_values(fn(batch), len(batch), FILTER_BATCH_METHOD_NAME)
+        kept.extend(compress(batch, mask))
+        if limit is not None and len(kept) >= limit:
+            del kept[limit:]
+            break
+    return kept
+
+
+def get_batch_keys(
+    fn: Callable[[List[Any]], Any], elements: List[Any], batch_size: Union[int, None]
+) -> List[Any]:
+    """
+    Computes the sort keys of elements a batch at a time with fn.
+    """
+    keys = []
+    for batch in iter_batches(elements, batch_size):
+        keys.extend(get_batch_values(fn(batch), len(batch), SORT_KEY_BATCH_METHOD_NAME))
+    return keys
+
+
+def sort_batches(
+    fn: Callable[[List[Any]], Any],
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+    reverse: bool,
+) -> List[Any]:
+    """
+    Sorts elements by the keys fn computes a batch at a time, like
+    sorted(elements, key=..., reverse=reverse). A numpy array partition is sorted with a
+    stable argsort instead, and the rows of a columnar partition by their positions.
+    """
+    if is_array(elements):
+        return sort_array(fn, elements, batch_size, reverse)
+    if isinstance(elements, Columns):
+        positions = elements.get_positions()
+        fn = elements.get_batch_fn(fn)
+        return elements.select(sort_batches(fn, positions, batch_size, reverse))
+    elements = elements if isinstance(elements, list) else list(elements)
+    keys = get_batch_keys(fn, elements, batch_size)
+    # positions are ordered by their keys, so no key function relies on being called
+    # once per element in order
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    return [elements[i] for i in order]
+
+
+def select_batches(
+    fn: Callable[[List[Any]], Any],
+    k: int,
+    elements: Iterable[Any],
+    batch_size: Union[int, None],
+    reverse: bool,
+) -> List[Any]:
+    """
+    Selects the k smallest (or largest if reverse) elements by the keys fn computes a
+    batch at a time, in order, like heapq.nsmallest(k, elements, key=...). A numpy array
+    partition is selected with argpartition instead, and the rows of a columnar partition
+    by their positions.
+    """
+    if is_array(elements):
+        return select_array(fn, k, elements, batch_size, reverse)
+    if isinstance(elements, Columns):
+        positions = elements.get_positions()
+        fn = elements.get_batch_fn(fn)
+        return elements.select(select_batches(fn, k, positions, batch_size, reverse))
+    elements = elements if isinstance(elements, list) else list(elements)
+    keys = get_batch_keys(fn, elements, batch_size)
+    select = nlargest if reverse else nsmallest
+    order = select(k, range(len(keys)), key=keys.__getitem__)
+    return [elements[i] for i in order]
+
+
+def to_list(elements: Any) -> List[Any]:
+    """
+    Converts an array that the batch methods produced from a numpy array partition to a
+    list with a single tolist() call. Lists are returned as they are.
+    """
+    return elements if isinstance(elements, list) else elements.tolist()
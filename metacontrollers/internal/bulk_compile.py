@@ -0,0 +1,199 @@
+import ast
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Union
+
+from metacontrollers.internal.generation_cache import (
+    CODE_CACHE,
+    instantiate_call_method,
+)
+
+
+class PendingCallMethod:
+    """
+    A generated call method that has not been compiled yet.
+    """
+
+    __slots__ = (
+        "cls",
+        "module",
+        "globals",
+        "defaults",
+        "kwdefaults",
+        "callbacks",
+        "call_method",
+    )
+
+    def __init__(
+        self,
+        cls: type,
+        module: ast.Module,
+        _globals: dict,
+        defaults: tuple,
+        kwdefaults: dict,
+    ) -> None:
+        self.cls = cls
+        self.module = module
+        self.globals = _globals
+        self.defaults = defaults
+        self.kwdefaults = kwdefaults
+        self.callbacks: List[Callable[[Callable[..., Any]], None]] = []
+        self.call_method: Union[Callable[..., Any], None] = None
+
+
+class DeferredCompilation:
+    """
+    Collects the generated call methods of controllers created while deferral is active,
+    so they can all be compiled with a single compile() call instead of one per class.
+
+    Until they are compiled, deferred controllers have a placeholder call method that
+    compiles every pending controller the first time any of them is called.
+
+    Deferral is per thread: controllers created by other threads while one thread is
+    inside a deferred block are compiled immediately.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.RLock()
+        self.__local = threading.local()
+        self.__pending: List[PendingCallMethod] = []
+
+    @property
+    def active(self) -> bool:
+        return getattr(self.__local, "depth", 0) > 0
+
+    @property
+    def num_pending(self) -> int:
+        return len(self.__pending)
+
+    def defer(
+        self,
+        cls: type,
+        module: ast.Module,
+        _globals: dict,
+        defaults: tuple,
+        kwdefaults: dict,
+    ) -> Callable[..., Any]:
+        """
+        Registers a generated call method for bulk compilation.
+
+        Returns:
+            Callable[..., Any]: placeholder call method for the controller.
+        """
+        pending = PendingCallMethod(cls, module, _globals, defaults, kwdefaults)
+
+        def __ctrl_call__(self, *args, **kwargs):
+            compile_all()
+            return cls.__call__(self, *args, **kwargs)
+
+        __ctrl_call__.__ctrl_pending__ = pending
+        with self.__lock:
+            self.__pending.append(pending)
+        return __ctrl_call__
+
+    def on_compiled(
+        self,
+        call_method: Callable[..., Any],
+        callback: Callable[[Callable[..., Any]], None],
+    ) -> bool:
+        """
+        Registers a callback that receives the compiled call method once a deferred call
+        method has been compiled.
+
+        Returns:
+            bool: False if `call_method` is not a pending placeholder (the callback is not
+            registered).
+        """
+        pending: Union[PendingCallMethod, None] = getattr(
+            call_method, "__ctrl_pending__", None
+        )
+        if pending is None:
+            return False
+        with self.__lock:
+            compiled = pending.call_method
+            if compiled is None:
+                pending.callbacks.append(callback)
+        if compiled is not None:
+            # another thread compiled it in the meantime
+            callback(compiled)
+        return True
+
+    def compile_all(self) -> int:
+        """
+        Compiles every pending call method with a single compile() call and attaches the
+        results to their controller classes.
+
+        Returns:
+            int: number of controllers that were compiled.
+        """
+        with self.__lock:
+            pending, self.__pending = self.__pending, []
+            if not pending:
+                return 0
+
+            codes = CODE_CACHE.compile_many(
+                [item.module for item in pending], pending[0].module.body[0].name
+            )
+            for item, code in zip(pending, codes):
+                call_method = instantiate_call_method(
+                    code, item.globals, item.defaults, item.kwdefaults
+                )
+                item.cls.__call__ = call_method
+                item.call_method = call_method
+                for callback in item.callbacks:
+                    callback(call_method)
+            return len(pending)
+
+    @contextmanager
+    def deferred(self) -> Iterator["DeferredCompilation"]:
+        self.__local.depth = getattr(self.__local, "depth", 0) + 1
+        try:
+            yield self
+        finally:
+            self.__local.depth -= 1
+            if self.__local.depth == 0:
+                self.compile_all()
+
+    @contextmanager
+    def suspended(self) -> Iterator["DeferredCompilation"]:
+        """
+        Compiles immediately inside the block, even within a deferred block. Used for
+        generated methods that are not the __call__ of their class, which compile_all()
+        must not attach.
+        """
+        depth = getattr(self.__local, "depth", 0)
+        self.__local.depth = 0
+        try:
+            yield self
+        finally:
+            self.__local.depth = depth
+
+
+# shared by every controller implementation
+DEFERRED_COMPILATION = DeferredCompilation()
+
+
+def deferred_compilation():
+    """
+    Context manager that defers compiling the call methods of controllers defined inside it.
+    On exit, all of them are compiled together with one compile() call. This is useful for
+    modules that define many controllers:
+
+        with metacontrollers.deferred_compilation():
+            class A(DoAll): ...
+            class B(DoK): ...
+
+    Deferred controllers can be used inside the block; the first call compiles every
+    pending controller.
+    """
+    return DEFERRED_COMPILATION.deferred()
+
+
+def compile_all() -> int:
+    """
+    Compiles every controller whose compilation has been deferred.
+
+    Returns:
+        int: number of controllers that were compiled.
+    """
+    return DEFERRED_COMPILATION.compile_all()
@@ -0,0 +1,142 @@
+import ast
+import copy
+import inspect
+import threading
+from typing import Any, Callable, Dict
+
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.generation_cache import (
+    CODE_CACHE,
+    instantiate_call_method,
+)
+from metacontrollers.internal.namespace import (
+    CLASS_ARG_NAME,
+    CONTROLLED_METHOD_NAMES,
+    GENERATED_ITER_MANY_METHOD_NAME,
+    HOISTED_METHOD_NAME_FORMAT,
+    ITER_MANY_METHOD_NAME,
+    PARTITION_ARG_NAME,
+    PARTITIONS_ARG_NAME,
+)
+
+
+class HoistControlledMethods(ast.NodeTransformer):
+    """
+    Replaces every self.<controlled method> lookup with a local variable, recording which
+    methods were used so they can be bound once before the loop.
+    """
+
+    def __init__(self) -> None:
+        self.hoisted: Dict[str, str] = {}
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        self.generic_visit(node)
+        if (
+            isinstance(node.value, ast.Name)
+            and node.value.id == CLASS_ARG_NAME
+            and node.attr in CONTROLLED_METHOD_NAMES
+            and isinstance(node.ctx, ast.Load)
+        ):
+            name = HOISTED_METHOD_NAME_FORMAT.format(node.attr)
+            self.hoisted[node.attr] = name
+            return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+        return node
+
+
+def generate_iter_many_module(module: ast.Module) -> ast.Module:
+    """
+    Turns a generated call method into a generator that runs the same body once per
+    partition, and yields what the call method would have returned for each. The bound
+    controlled methods are looked up once, before the loop.
+
+    Args:
+        module (ast.Module): module which contains the generated call method.
+
+    Returns:
+        ast.Module: module which contains the generated iter_many method.
+    """
+    call_fn: ast.FunctionDef = copy.deepcopy(module.body[0])
+    call_fn.name = GENERATED_ITER_MANY_METHOD_NAME
+    for arg in call_fn.args.posonlyargs:
+        if arg.arg == PARTITION_ARG_NAME:
+            arg.arg = PARTITIONS_ARG_NAME
+
+    # the generated call method only ever returns as its last statement
+    body = call_fn.body
+    if body and isinstance(body[-1], ast.Return):
+        result = body.pop().value or ast.Constant(value=None)
+    else:
+        result = ast.Constant(value=None)
+    body.append(ast.Expr(value=ast.Yield(value=result)))
+
+    hoist = HoistControlledMethods()
+    body = [hoist.visit(statement) for statement in body]
+    call_fn.body = [
+        ast.Assign(
+            targets=[ast.Name(id=local_name, ctx=ast.Store())],
+            value=ast.Attribute(
+                value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                attr=method_name,
+                ctx=ast.Load(),
+            ),
+        )
+        for method_name, local_name in hoist.hoisted.items()
+    ]
+    call_fn.body.append(
+        ast.For(
+            target=ast.Name(id=PARTITION_ARG_NAME, ctx=ast.Store()),
+            iter=ast.Name(id=PARTITIONS_ARG_NAME, ctx=ast.Load()),
+            body=body,
+            orelse=[],
+        )
+    )
+    return ast.fix_missing_locations(ast.Module(body=[call_fn], type_ignores=[]))
+
+
+_lock = threading.Lock()
+
+
+def get_iter_many_method(cls: type, implementation: type) -> Callable[..., Any]:
+    """
+    Returns the generated iter_many method of a controller class, generating it the first
+    time and attaching it to the class so later calls go to it directly. It is bound to the
+    same globals and argument defaults as the class's call method.
+
+    Args:
+        cls (type): controller class.
+        implementation (type): implementation class of the controller.
+
+    Returns:
+        Callable[..., Any]: generated iter_many method.
+    """
+    iter_many = vars(cls).get(ITER_MANY_METHOD_NAME)
+    if iter_many is not None:
+        return iter_many
+
+    with _lock:
+        iter_many = vars(cls).get(ITER_MANY_METHOD_NAME)
+        if iter_many is not None:
+            return iter_many
+
+        call_method = cls.__call__
+        if hasattr(call_method, "__ctrl_pending__"):
+            DEFERRED_COMPILATION.compile_all()
+            call_method = cls.__call__
+
+        controller = implementation(
+            cls, cls.__name__, cls.__bases__, dict(vars(cls)), inspect.currentframe()
+        )
+        controller.validate()
+        with DEFERRED_COMPILATION.suspended():
+            controller.generate_call_method()
+        module = generate_iter_many_module(controller.call_method_module)
+
+        code = CODE_CACHE.get_or_compile(module, GENERATED_ITER_MANY_METHOD_NAME)
+        iter_many = instantiate_call_method(
+            code,
+            call_method.__globals__,
+            call_method.__defaults__ or (),
+            call_method.__kwdefaults__,
+        )
+        setattr(cls, ITER_MANY_METHOD_NAME, iter_many)
+        return iter_many
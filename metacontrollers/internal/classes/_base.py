@@ -1,29 +1,91 @@
 import ast
 from abc import ABC, abstractmethod
+from heapq import nlargest, nsmallest
 from textwrap import dedent
 from typing import Any, Callable, Dict, List, Tuple, Union
 
 from metacontrollers.internal.exceptions import (
     ArgumentError,
     InvalidControllerMethodError,
+    InvalidControllerOptionError,
+)
+from metacontrollers.internal.async_executors import (
+    TimeSlicer,
+    async_map,
+    collect_async,
+    cooperative_collect,
+    cooperative_each,
+    cooperative_map,
+    cooperative_sorted,
+    filter_async,
+    nlargest_async,
+    nsmallest_async,
+    sorted_async,
+    take_async,
+)
+from metacontrollers.internal.batching import (
+    async_each_batch,
+    async_map_batches,
+    each_batch,
+    filter_batches,
+    map_batches,
+    select_batches,
+    sort_batches,
+    to_list,
+)
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.columnar import ColumnReader, to_columns, to_rows
+from metacontrollers.internal.distributed import distributed_map, parse_address
+from metacontrollers.internal.executors import process_map, thread_map
+from metacontrollers.internal.generation_cache import (
+    CODE_CACHE,
+    NAMESPACE_CACHE,
+    instantiate_call_method,
 )
 from metacontrollers.internal.method_inspector import MethodInspector
+from metacontrollers.internal.method_invocation import MethodInvocation
 from metacontrollers.internal.namespace import (
+    ACTION_BATCH_METHOD_NAME,
     ACTION_METHOD_NAME,
+    BATCH_SIZE_OPTION_NAME,
+    CHUNK_SIZE_OPTION_NAME,
     CLASS_ARG_NAME,
+    DISTRIBUTED_EXECUTOR_NAME,
+    EXECUTOR_OPTION_NAME,
+    FILTER_BATCH_METHOD_NAME,
+    FILTER_COLUMNS_OPTION_NAME,
     FILTER_METHOD_NAME,
+    FOLD_ASSOCIATIVE_OPTION_NAME,
+    FOLD_COMBINE_METHOD_NAME,
     FOLD_METHOD_NAME,
     GENERATED_CALL_METHOD_NAME,
+    INTERPRETER_EXECUTOR_NAME,
     K_ARG_NAME,
+    LIST_RESULTS_OPTION_NAME,
+    MAX_CONCURRENCY_OPTION_NAME,
+    MAX_WORKERS_OPTION_NAME,
+    ORDERED_OPTION_NAME,
     PARTITION_ARG_NAME,
     POST_CONTROLLER_METHOD_NAME,
     PRE_CONTROLLER_METHOD_NAME,
+    PROCESS_EXECUTOR_NAME,
     SORT_CMP_METHOD_NAME,
+    SORT_KEY_BATCH_METHOD_NAME,
+    SORT_KEY_COLUMNS_OPTION_NAME,
     SORT_KEY_METHOD_NAME,
+    THREAD_EXECUTOR_NAME,
+    TIME_SLICER_ASSIGNMENT_NAME,
+    WORKERS_OPTION_NAME,
 )
 
 
 class BaseControllerImplementation(ABC):
+    # async implementations generate an async def call method that awaits coroutine methods
+    is_async = False
+    # cooperative implementations run a synchronous controller as an async def call method
+    # that yields to the event loop after running for time_slice seconds
+    time_slice: Union[float, None] = None
+
     def __init__(
         self,
         cls,
@@ -33,10 +95,14 @@ class BaseControllerImplementation(ABC):
         stack_frame,
         pre_controller_enabled: bool = True,
         filter_enabled: bool = True,
+        filter_batch_enabled: bool = True,
         sort_key_enabled: bool = True,
+        sort_key_batch_enabled: bool = True,
         sort_cmp_enabled: bool = True,
         action_enabled: bool = True,
+        action_batch_enabled: bool = True,
         fold_enabled: bool = True,
+        fold_combine_enabled: bool = True,
         post_controller_enabled: bool = True,
     ) -> None:
         super().__init__()
@@ -45,6 +111,8 @@ class BaseControllerImplementation(ABC):
         self.bases = bases
         self.attrs = attrs
         self.stack_frame = stack_frame
+        self.__call_method_globals = {}
+        self.__call_method_module = None
 
         self.__pre_controller = (
             MethodInspector(self.attrs[PRE_CONTROLLER_METHOD_NAME])
@@ -58,12 +126,24 @@ class BaseControllerImplementation(ABC):
             else None
         )
 
+        self.__filter_batch = (
+            MethodInspector(self.attrs[FILTER_BATCH_METHOD_NAME])
+            if FILTER_BATCH_METHOD_NAME in self.attrs and filter_batch_enabled
+            else None
+        )
+
         self.__sort_key = (
             MethodInspector(self.attrs[SORT_KEY_METHOD_NAME])
             if SORT_KEY_METHOD_NAME in self.attrs and sort_key_enabled
             else None
         )
 
+        self.__sort_key_batch = (
+            MethodInspector(self.attrs[SORT_KEY_BATCH_METHOD_NAME])
+            if SORT_KEY_BATCH_METHOD_NAME in self.attrs and sort_key_batch_enabled
+            else None
+        )
+
         self.__sort_cmp = (
             MethodInspector(self.attrs[SORT_CMP_METHOD_NAME])
             if SORT_CMP_METHOD_NAME in self.attrs and sort_cmp_enabled
@@ -76,12 +156,24 @@ class BaseControllerImplementation(ABC):
             else None
         )
 
+        self.__action_batch = (
+            MethodInspector(self.attrs[ACTION_BATCH_METHOD_NAME])
+            if ACTION_BATCH_METHOD_NAME in self.attrs and action_batch_enabled
+            else None
+        )
+
         self.__fold = (
             MethodInspector(self.attrs[FOLD_METHOD_NAME])
             if FOLD_METHOD_NAME in self.attrs and fold_enabled
             else None
         )
 
+        self.__fold_combine = (
+            MethodInspector(self.attrs[FOLD_COMBINE_METHOD_NAME])
+            if FOLD_COMBINE_METHOD_NAME in self.attrs and fold_combine_enabled
+            else None
+        )
+
         self.__post_controller = (
             MethodInspector(self.attrs[POST_CONTROLLER_METHOD_NAME])
             if POST_CONTROLLER_METHOD_NAME in self.attrs and post_controller_enabled
@@ -102,9 +194,12 @@ class BaseControllerImplementation(ABC):
         if (
             not self.has_pre_controller
             and not self.has_filter
+            and not self.has_filter_batch
             and not self.has_sort_key
+            and not self.has_sort_key_batch
             and not self.has_sort_cmp
             and not self.has_action
+            and not self.has_action_batch
             and not self.has_fold
             and not self.has_post_controller
         ):
@@ -112,6 +207,14 @@ class BaseControllerImplementation(ABC):
                 f'"{self.name}" must have at least one controlled method to be valid.'
             )
 
+        if (
+            not self.is_async
+            and getattr(self.cls, MAX_CONCURRENCY_OPTION_NAME, None) is not None
+        ):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {MAX_CONCURRENCY_OPTION_NAME}, which is only used by async controllers.'
+            )
+
     @abstractmethod
     def generate_call_method(self) -> Callable[..., Any]:
         """
@@ -151,6 +254,22 @@ class BaseControllerImplementation(ABC):
     def sort_key(self) -> Union[MethodInspector, None]:
         return self.__sort_key
 
+    @property
+    def has_filter_batch(self) -> bool:
+        return self.__filter_batch is not None
+
+    @property
+    def filter_batch(self) -> Union[MethodInspector, None]:
+        return self.__filter_batch
+
+    @property
+    def has_sort_key_batch(self) -> bool:
+        return self.__sort_key_batch is not None
+
+    @property
+    def sort_key_batch(self) -> Union[MethodInspector, None]:
+        return self.__sort_key_batch
+
     @property
     def has_sort_cmp(self) -> bool:
         return self.__sort_cmp is not None
@@ -167,6 +286,22 @@ class BaseControllerImplementation(ABC):
     def action(self) -> Union[MethodInspector, None]:
         return self.__action
 
+    @property
+    def has_action_batch(self) -> bool:
+        return self.__action_batch is not None
+
+    @property
+    def action_batch(self) -> Union[MethodInspector, None]:
+        return self.__action_batch
+
+    @property
+    def chosen_action(self) -> Union[MethodInspector, None]:
+        """
+        The controlled method that acts on the chosen elements: action, or action_batch if
+        only it is defined.
+        """
+        return self.__action if self.__action is not None else self.__action_batch
+
     @property
     def has_fold(self) -> bool:
         return self.__fold is not None
@@ -175,6 +310,14 @@ class BaseControllerImplementation(ABC):
     def fold(self) -> Union[MethodInspector, None]:
         return self.__fold
 
+    @property
+    def has_fold_combine(self) -> bool:
+        return self.__fold_combine is not None
+
+    @property
+    def fold_combine(self) -> Union[MethodInspector, None]:
+        return self.__fold_combine
+
     @property
     def has_post_controller(self) -> bool:
         return self.__post_controller is not None
@@ -183,14 +326,910 @@ class BaseControllerImplementation(ABC):
     def post_controller(self) -> Union[MethodInspector, None]:
         return self.__post_controller
 
+    @property
+    def call_method_globals(self) -> dict:
+        """
+        The helper globals (excluding saved argument defaults) that the call method was
+        compiled with. Empty until compile_call_method has been run.
+        """
+        return self.__call_method_globals
+
+    @property
+    def call_method_module(self) -> Union[ast.Module, None]:
+        """
+        The generated module that contains the call method. None until compile_call_method
+        has been run.
+        """
+        return self.__call_method_module
+
+    @property
+    def executor(self) -> Union[str, None]:
+        return getattr(self.cls, EXECUTOR_OPTION_NAME, None)
+
+    @property
+    def uses_executor(self) -> bool:
+        return self.executor is not None
+
+    @property
+    def uses_threads(self) -> bool:
+        return self.executor == THREAD_EXECUTOR_NAME
+
+    @property
+    def uses_processes(self) -> bool:
+        # subinterpreters and remote workers run the same worker functions as processes
+        return self.executor in (
+            PROCESS_EXECUTOR_NAME,
+            INTERPRETER_EXECUTOR_NAME,
+            DISTRIBUTED_EXECUTOR_NAME,
+        )
+
+    @property
+    def uses_distributed(self) -> bool:
+        return self.executor == DISTRIBUTED_EXECUTOR_NAME
+
+    @property
+    def uses_pipeline(self) -> bool:
+        # only DoAll can run its stages as a pipeline
+        return False
+
+    @property
+    def uses_partial_folds(self) -> bool:
+        """
+        True when the fold can be computed per chunk (by the executor workers, or by the
+        fold stage of a pipeline), and the partial results combined afterwards.
+        """
+        return (
+            (self.uses_executor or self.uses_pipeline)
+            and self.has_fold
+            and self.has_action
+            and self.action.returns_a_value
+            and (
+                self.has_fold_combine
+                or getattr(self.cls, FOLD_ASSOCIATIVE_OPTION_NAME, False)
+            )
+        )
+
+    @property
+    def uses_list_results(self) -> bool:
+        """
+        True when the arrays that the batch methods produce from numpy array partitions
+        (the selected elements, or the results of action_batch) are converted to lists.
+        """
+        return bool(getattr(self.cls, LIST_RESULTS_OPTION_NAME, False))
+
+    @property
+    def uses_columns(self) -> bool:
+        """
+        True when filter_batch or sort_key_batch declare the columns they read, so the
+        partition can be columnar.
+        """
+        return (
+            getattr(self.cls, FILTER_COLUMNS_OPTION_NAME, None) is not None
+            or getattr(self.cls, SORT_KEY_COLUMNS_OPTION_NAME, None) is not None
+        )
+
+    @property
+    def uses_async_actions(self) -> bool:
+        """
+        True when the actions are coroutines that the generated call method awaits
+        concurrently.
+        """
+        return self.has_action and self.awaits(self.action)
+
+    @property
+    def is_cooperative(self) -> bool:
+        return self.time_slice is not None
+
     ####
     # Common helpers
 
+    def validate_async_options(self) -> None:
+        """
+        Validates the methods and class options of an async controller. Sort methods and
+        filter_batch cannot be coroutines since they are called by sorted(), heapq and the
+        batching helpers, which cannot await.
+        """
+        for method in (
+            self.filter_batch,
+            self.sort_key,
+            self.sort_key_batch,
+            self.sort_cmp,
+            self.fold_combine,
+        ):
+            if method is not None and method.is_coroutine_function:
+                raise InvalidControllerMethodError(
+                    f'"{method.name}" of async controller "{self.name}" cannot be a coroutine function. Only "{PRE_CONTROLLER_METHOD_NAME}", "{FILTER_METHOD_NAME}", "{ACTION_METHOD_NAME}", "{ACTION_BATCH_METHOD_NAME}", "{FOLD_METHOD_NAME}" and "{POST_CONTROLLER_METHOD_NAME}" are awaited.'
+                )
+
+        if self.uses_executor:
+            raise InvalidControllerOptionError(
+                f'Async controller "{self.name}" cannot use an {EXECUTOR_OPTION_NAME}; coroutine actions run concurrently on the event loop (see {MAX_CONCURRENCY_OPTION_NAME}).'
+            )
+
+        max_concurrency = getattr(self.cls, MAX_CONCURRENCY_OPTION_NAME, None)
+        if max_concurrency is not None and (
+            not isinstance(max_concurrency, int)
+            or isinstance(max_concurrency, bool)
+            or max_concurrency < 1
+        ):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {MAX_CONCURRENCY_OPTION_NAME} must be None or a positive integer, but {max_concurrency!r} was given.'
+            )
+
+    def awaits(self, method: MethodInspector) -> bool:
+        """
+        True if the generated call method awaits what method returns: it is a coroutine
+        function of an async controller. Cooperative call methods run synchronous
+        controllers, so they never await the controlled methods.
+        """
+        return (
+            self.is_async and not self.is_cooperative and method.is_coroutine_function
+        )
+
+    def await_if_coroutine(self, method: MethodInspector, call: ast.expr) -> ast.expr:
+        """
+        Wraps the call of a controlled method in an await if this is an async controller
+        and the method is a coroutine function.
+        """
+        if self.awaits(method):
+            return ast.Await(value=call)
+        return call
+
+    def get_async_map_call(
+        self, fn: ast.expr, elements: ast.expr, additional_globals: dict
+    ) -> ast.Await:
+        """
+        Generates an awaited call that runs the coroutine function fn over elements
+        concurrently, with the controller's max_concurrency baked in as a constant.
+
+        Args:
+            fn (ast.expr): coroutine function to map.
+            elements (ast.expr): elements to map over.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Await: awaited call that evaluates to the list of results, in partition order.
+        """
+        additional_globals["async_map"] = async_map
+        return ast.Await(
+            value=ast.Call(
+                func=ast.Name(id="async_map", ctx=ast.Load()),
+                args=[
+                    fn,
+                    elements,
+                    ast.Constant(
+                        value=getattr(self.cls, MAX_CONCURRENCY_OPTION_NAME, None)
+                    ),
+                ],
+                keywords=[],
+            )
+        )
+
+    def get_filter_call(
+        self, filter_fn: ast.expr, elements: ast.expr, additional_globals: dict
+    ) -> ast.Call:
+        """
+        Generates the call that filters elements: the builtin filter, or for async
+        controllers filter_async, which also filters async iterables and awaits coroutine
+        filters.
+        """
+        if not self.is_async:
+            return ast.Call(
+                func=ast.Name(id="filter", ctx=ast.Load()),
+                args=[filter_fn, elements],
+                keywords=[],
+            )
+        additional_globals["filter_async"] = filter_async
+        return ast.Call(
+            func=ast.Name(id="filter_async", ctx=ast.Load()),
+            args=[
+                filter_fn,
+                elements,
+                ast.Constant(value=self.awaits(self.filter)),
+            ],
+            keywords=[],
+        )
+
+    def get_sorted_call(
+        self, elements: ast.expr, key_fn: ast.expr, additional_globals: dict
+    ) -> ast.expr:
+        """
+        Generates the call that sorts elements by key_fn (in reverse if reverse_sort is
+        set). Async controllers await sorted_async, which collects async iterables first.
+        """
+        if self.is_cooperative:
+            additional_globals["cooperative_sorted"] = cooperative_sorted
+            return ast.Await(
+                value=ast.Call(
+                    func=ast.Name(id="cooperative_sorted", ctx=ast.Load()),
+                    args=[
+                        elements,
+                        key_fn,
+                        ast.Constant(value=bool(self.cls.reverse_sort)),
+                        ast.Name(id=TIME_SLICER_ASSIGNMENT_NAME, ctx=ast.Load()),
+                    ],
+                    keywords=[],
+                )
+            )
+
+        if self.is_async:
+            additional_globals["sorted_async"] = sorted_async
+            return ast.Await(
+                value=ast.Call(
+                    func=ast.Name(id="sorted_async", ctx=ast.Load()),
+                    args=[
+                        elements,
+                        key_fn,
+                        ast.Constant(value=bool(self.cls.reverse_sort)),
+                    ],
+                    keywords=[],
+                )
+            )
+
+        sort_keywords = [ast.keyword(arg="key", value=key_fn)]
+        if self.cls.reverse_sort:
+            sort_keywords.append(
+                ast.keyword(arg="reverse", value=ast.Constant(value=True, type="bool"))
+            )
+        return ast.Call(
+            func=ast.Name(id="sorted", ctx=ast.Load()),
+            args=[elements],
+            keywords=sort_keywords,
+        )
+
+    def get_top_k_call(
+        self,
+        k: ast.expr,
+        elements: ast.expr,
+        key_fn: ast.expr,
+        additional_globals: dict,
+    ) -> ast.expr:
+        """
+        Generates the call that selects the k smallest elements by key_fn (the largest if
+        reverse_sort is set) with heapq. Async controllers await a version that selects
+        from async iterables as they stream.
+        """
+        if self.is_async:
+            if self.cls.reverse_sort:
+                select_name, select_fn = "nlargest_async", nlargest_async
+            else:
+                select_name, select_fn = "nsmallest_async", nsmallest_async
+            additional_globals[select_name] = select_fn
+            return ast.Await(
+                value=ast.Call(
+                    func=ast.Name(id=select_name, ctx=ast.Load()),
+                    args=[k, elements, key_fn],
+                    keywords=[],
+                )
+            )
+
+        if self.cls.reverse_sort:
+            select_name, select_fn = "nlargest", nlargest
+        else:
+            select_name, select_fn = "nsmallest", nsmallest
+        additional_globals[select_name] = select_fn
+        return ast.Call(
+            func=ast.Name(id=select_name, ctx=ast.Load()),
+            args=[k, elements],
+            keywords=[ast.keyword(arg="key", value=key_fn)],
+        )
+
+    def get_take_call(
+        self, elements: ast.expr, k: ast.expr, additional_globals: dict
+    ) -> ast.Await:
+        """
+        Generates the awaited call that takes the first k elements of a partition as a
+        list, for async controllers. Async iterables are not consumed any further.
+        """
+        additional_globals["take_async"] = take_async
+        return ast.Await(
+            value=ast.Call(
+                func=ast.Name(id="take_async", ctx=ast.Load()),
+                args=[elements, k],
+                keywords=[],
+            )
+        )
+
+    def get_collect_call(
+        self, elements: ast.expr, additional_globals: dict
+    ) -> ast.Await:
+        """
+        Generates the awaited call that collects an async iterable partition into a list,
+        for async controllers whose elements are consumed by synchronous code.
+        """
+        if self.is_cooperative:
+            additional_globals["cooperative_collect"] = cooperative_collect
+            return ast.Await(
+                value=ast.Call(
+                    func=ast.Name(id="cooperative_collect", ctx=ast.Load()),
+                    args=[
+                        elements,
+                        ast.Name(id=TIME_SLICER_ASSIGNMENT_NAME, ctx=ast.Load()),
+                    ],
+                    keywords=[],
+                )
+            )
+        additional_globals["collect_async"] = collect_async
+        return ast.Await(
+            value=ast.Call(
+                func=ast.Name(id="collect_async", ctx=ast.Load()),
+                args=[elements],
+                keywords=[],
+            )
+        )
+
+    def get_time_slicer_assignment(self, additional_globals: dict) -> ast.Assign:
+        """
+        Generates the assignment that starts the time slice of a cooperative call method.
+        Every cooperative stage of the call shares it.
+        """
+        additional_globals["TimeSlicer"] = TimeSlicer
+        return ast.Assign(
+            targets=[ast.Name(id=TIME_SLICER_ASSIGNMENT_NAME, ctx=ast.Store())],
+            value=ast.Call(
+                func=ast.Name(id="TimeSlicer", ctx=ast.Load()),
+                args=[ast.Constant(value=self.time_slice)],
+                keywords=[],
+            ),
+        )
+
+    def get_cooperative_map_call(
+        self,
+        fn: ast.expr,
+        elements: ast.expr,
+        additional_globals: dict,
+        keep_results: bool = True,
+    ) -> ast.Await:
+        """
+        Generates the awaited call that maps fn over elements in a cooperative call method,
+        yielding to the event loop about every time slice.
+
+        Args:
+            fn (ast.expr): function to map.
+            elements (ast.expr): elements to map over.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+            keep_results (bool, optional): if False, the results are discarded and the call evaluates to None. Defaults to True.
+
+        Returns:
+            ast.Await: awaited call that evaluates to the list of results, in partition order.
+        """
+        if keep_results:
+            name, helper = "cooperative_map", cooperative_map
+        else:
+            name, helper = "cooperative_each", cooperative_each
+        additional_globals[name] = helper
+        return ast.Await(
+            value=ast.Call(
+                func=ast.Name(id=name, ctx=ast.Load()),
+                args=[
+                    fn,
+                    elements,
+                    ast.Name(id=TIME_SLICER_ASSIGNMENT_NAME, ctx=ast.Load()),
+                ],
+                keywords=[],
+            )
+        )
+
+    def get_call_function_def(
+        self, args: ast.arguments, body: List[ast.stmt]
+    ) -> ast.stmt:
+        """
+        Generates the definition of the call method, an async def for async controllers.
+        """
+        function_def = ast.AsyncFunctionDef if self.is_async else ast.FunctionDef
+        return function_def(
+            name=GENERATED_CALL_METHOD_NAME,
+            args=args,
+            body=body,
+            decorator_list=[],
+            type_params=[],
+        )
+
+    def validate_executor_options(self) -> None:
+        """
+        Validates the executor class options (executor, max_workers, chunk_size and ordered).
+        """
+        executor = self.executor
+        if executor not in (
+            None,
+            THREAD_EXECUTOR_NAME,
+            PROCESS_EXECUTOR_NAME,
+            INTERPRETER_EXECUTOR_NAME,
+            DISTRIBUTED_EXECUTOR_NAME,
+        ):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" has an unknown {EXECUTOR_OPTION_NAME} "{executor}"; expected None, "{THREAD_EXECUTOR_NAME}", "{PROCESS_EXECUTOR_NAME}", "{INTERPRETER_EXECUTOR_NAME}" or "{DISTRIBUTED_EXECUTOR_NAME}".'
+            )
+
+        if self.uses_processes and "<locals>" in self.cls.__qualname__:
+            # workers rebuild the controller class by importing it from its module
+            raise InvalidControllerOptionError(
+                f'"{self.cls.__qualname__}" uses the "{executor}" {EXECUTOR_OPTION_NAME}, but it is defined inside a function. '
+                "Controllers that use processes, subinterpreters or distributed workers must be defined at the top level of a module so that workers can import them."
+            )
+
+        workers = getattr(self.cls, WORKERS_OPTION_NAME, None)
+        if workers is not None:
+            if not self.uses_distributed:
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" sets {WORKERS_OPTION_NAME}, which is only used by the "{DISTRIBUTED_EXECUTOR_NAME}" {EXECUTOR_OPTION_NAME}.'
+                )
+            if (
+                not isinstance(workers, tuple)
+                or not workers
+                or not all(isinstance(address, str) for address in workers)
+            ):
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" {WORKERS_OPTION_NAME} must be None or a non-empty tuple of "host:port" strings, but {workers!r} was given.'
+                )
+            for address in workers:
+                try:
+                    parse_address(address)
+                except ValueError as err:
+                    raise InvalidControllerOptionError(f'"{self.name}" {err}') from err
+
+        max_workers = getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)
+        if max_workers is not None and (
+            not isinstance(max_workers, int)
+            or isinstance(max_workers, bool)
+            or max_workers < 1
+        ):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {MAX_WORKERS_OPTION_NAME} must be None or a positive integer, but {max_workers!r} was given.'
+            )
+
+        chunk_size = getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None)
+        if chunk_size is not None and (
+            not isinstance(chunk_size, int)
+            or isinstance(chunk_size, bool)
+            or chunk_size < 1
+        ):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {CHUNK_SIZE_OPTION_NAME} must be None or a positive integer, but {chunk_size!r} was given.'
+            )
+
+        ordered = getattr(self.cls, ORDERED_OPTION_NAME, True)
+        if not isinstance(ordered, bool):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {ORDERED_OPTION_NAME} must be a bool, but {ordered!r} was given.'
+            )
+
+        fold_associative = getattr(self.cls, FOLD_ASSOCIATIVE_OPTION_NAME, False)
+        if not isinstance(fold_associative, bool):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {FOLD_ASSOCIATIVE_OPTION_NAME} must be a bool, but {fold_associative!r} was given.'
+            )
+
+        if self.has_fold_combine:
+            if not self.has_fold:
+                raise InvalidControllerMethodError(
+                    f'"{FOLD_COMBINE_METHOD_NAME}" was defined in "{self.name}", but "{FOLD_METHOD_NAME}" is not.'
+                )
+            if self.fold_combine.num_call_parameters != 2:
+                raise AttributeError(
+                    f'"{FOLD_COMBINE_METHOD_NAME}" should be defined with exactly 2 non-class arguments (a, b), but {self.fold_combine.num_call_parameters} were given.'
+                )
+
+    def validate_batch_options(self) -> None:
+        """
+        Validates the batch methods (filter_batch, sort_key_batch and action_batch) and the
+        batch_size, list_results and column class options of controllers that run them
+        (DoAll and DoK).
+        """
+        batch_methods = [
+            method
+            for method in (self.filter_batch, self.sort_key_batch, self.action_batch)
+            if method is not None
+        ]
+
+        batch_size = getattr(self.cls, BATCH_SIZE_OPTION_NAME, None)
+        if batch_size is not None:
+            if (
+                not isinstance(batch_size, int)
+                or isinstance(batch_size, bool)
+                or batch_size < 1
+            ):
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" {BATCH_SIZE_OPTION_NAME} must be None or a positive integer, but {batch_size!r} was given.'
+                )
+            if not batch_methods:
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" sets {BATCH_SIZE_OPTION_NAME}, which is only used by "{FILTER_BATCH_METHOD_NAME}", "{SORT_KEY_BATCH_METHOD_NAME}" and "{ACTION_BATCH_METHOD_NAME}".'
+                )
+
+        if self.uses_list_results and not batch_methods:
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {LIST_RESULTS_OPTION_NAME}, which is only used by "{FILTER_BATCH_METHOD_NAME}", "{SORT_KEY_BATCH_METHOD_NAME}" and "{ACTION_BATCH_METHOD_NAME}".'
+            )
+
+        if self.has_filter and self.has_filter_batch:
+            raise InvalidControllerMethodError(
+                f'"{self.name}" is invalid because both "{FILTER_METHOD_NAME}" and "{FILTER_BATCH_METHOD_NAME}" are defined. You must define only one.'
+            )
+        if self.has_sort_key_batch and (self.has_sort_key or self.has_sort_cmp):
+            raise InvalidControllerMethodError(
+                f'"{self.name}" is invalid because "{SORT_KEY_BATCH_METHOD_NAME}" is defined together with "{SORT_KEY_METHOD_NAME}" or "{SORT_CMP_METHOD_NAME}". You must define only one sort method.'
+            )
+        if self.has_action and self.has_action_batch:
+            raise InvalidControllerMethodError(
+                f'"{self.name}" is invalid because both "{ACTION_METHOD_NAME}" and "{ACTION_BATCH_METHOD_NAME}" are defined. You must define only one.'
+            )
+
+        self.validate_column_options()
+
+        for method in batch_methods:
+            if len(method.call_args) < 1:
+                raise AttributeError(
+                    f'"{method.name}" should be defined with at least 1 non-class argument (the list of chosen elements), but 0 were given.'
+                )
+            if self.uses_executor or self.uses_pipeline:
+                # each batch is already a single call, so it runs in the calling thread
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" defines "{method.name}", which cannot be used with an {EXECUTOR_OPTION_NAME} or a pipeline.'
+                )
+            if self.is_cooperative:
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" defines "{method.name}", which is not supported by cooperative calls.'
+                )
+
+    def validate_column_options(self) -> None:
+        """
+        Validates the filter_columns and sort_key_columns class options, which declare the
+        columns that filter_batch and sort_key_batch read from a columnar partition.
+        """
+        for option_name, method, method_name in (
+            (FILTER_COLUMNS_OPTION_NAME, self.filter_batch, FILTER_BATCH_METHOD_NAME),
+            (
+                SORT_KEY_COLUMNS_OPTION_NAME,
+                self.sort_key_batch,
+                SORT_KEY_BATCH_METHOD_NAME,
+            ),
+        ):
+            columns = getattr(self.cls, option_name, None)
+            if columns is None:
+                continue
+            if (
+                not isinstance(columns, (tuple, list))
+                or not columns
+                or not all(isinstance(column, str) for column in columns)
+            ):
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" {option_name} must be None or a non-empty tuple of column names, but {columns!r} was given.'
+                )
+            if method is None:
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" sets {option_name}, which is only used by "{method_name}".'
+                )
+
+    def get_batch_method_fn(self, method: MethodInspector) -> ast.expr:
+        """
+        Generates the function that a batching helper calls with each batch: the bound
+        method, or a lambda that passes the method its additional arguments.
+        """
+        if method.num_call_parameters != 1:
+            return MethodInvocation(method).to_lambda(
+                [method.call_args[0]], name=method.name
+            )
+        return ast.Attribute(
+            value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+            attr=method.name,
+            ctx=ast.Load(),
+        )
+
+    def get_columns_batch_method_fn(
+        self, method: MethodInspector, option_name: str, additional_globals: dict
+    ) -> ast.expr:
+        """
+        Generates the function that a batching helper calls with each batch: the same as
+        get_batch_method_fn, wrapped in a ColumnReader if the controller declares the
+        columns that the method reads with option_name.
+        """
+        fn = self.get_batch_method_fn(method)
+        columns = getattr(self.cls, option_name, None)
+        if columns is None:
+            return fn
+        additional_globals["ColumnReader"] = ColumnReader
+        return ast.Call(
+            func=ast.Name(id="ColumnReader", ctx=ast.Load()),
+            args=[fn, ast.Constant(value=tuple(columns))],
+            keywords=[],
+        )
+
+    def get_partition(self, additional_globals: dict) -> ast.expr:
+        """
+        Generates the partition that the call method reads: the partition argument, which
+        is converted to a columnar partition when it is one and the controller declares
+        the columns its batch methods read.
+        """
+        partition = ast.Name(id=PARTITION_ARG_NAME, ctx=ast.Load())
+        if not self.uses_columns:
+            return partition
+        additional_globals["to_columns"] = to_columns
+        return ast.Call(
+            func=ast.Name(id="to_columns", ctx=ast.Load()),
+            args=[partition],
+            keywords=[],
+        )
+
+    def get_selected_rows_call(
+        self, elements: ast.expr, additional_globals: dict
+    ) -> ast.Call:
+        """
+        Generates the call that builds the rows that the batch methods selected from a
+        columnar partition, for controllers without an action.
+        """
+        additional_globals["to_rows"] = to_rows
+        return ast.Call(
+            func=ast.Name(id="to_rows", ctx=ast.Load()),
+            args=[elements],
+            keywords=[],
+        )
+
+    def get_filter_batch_call(
+        self,
+        elements: ast.expr,
+        additional_globals: dict,
+        limit: Union[ast.expr, None] = None,
+    ) -> ast.Call:
+        """
+        Generates a call that filters elements with the masks filter_batch returns for each
+        batch of the controller's batch_size. Async controllers collect the elements first.
+
+        Args:
+            elements (ast.expr): elements to filter.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+            limit (Union[ast.expr, None], optional): stop filtering once this many elements were kept. Defaults to None.
+
+        Returns:
+            ast.Call: call that evaluates to the list of kept elements.
+        """
+        if self.is_async:
+            elements = self.get_collect_call(elements, additional_globals)
+        additional_globals["filter_batches"] = filter_batches
+        return ast.Call(
+            func=ast.Name(id="filter_batches", ctx=ast.Load()),
+            args=[
+                self.get_columns_batch_method_fn(
+                    self.filter_batch, FILTER_COLUMNS_OPTION_NAME, additional_globals
+                ),
+                elements,
+                ast.Constant(value=getattr(self.cls, BATCH_SIZE_OPTION_NAME, None)),
+                limit or ast.Constant(value=None),
+            ],
+            keywords=[],
+        )
+
+    def get_sort_key_batch_call(
+        self,
+        elements: ast.expr,
+        additional_globals: dict,
+        k: Union[ast.expr, None] = None,
+    ) -> ast.Call:
+        """
+        Generates a call that sorts elements (or selects the k first of them) by the keys
+        sort_key_batch returns for each batch of the controller's batch_size, in reverse if
+        reverse_sort is set. Async controllers collect the elements first.
+
+        Args:
+            elements (ast.expr): elements to sort.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+            k (Union[ast.expr, None], optional): number of elements to select, or None to sort them all. Defaults to None.
+
+        Returns:
+            ast.Call: call that evaluates to the sorted (or selected) list of elements.
+        """
+        if self.is_async:
+            elements = self.get_collect_call(elements, additional_globals)
+        args = [
+            self.get_columns_batch_method_fn(
+                self.sort_key_batch, SORT_KEY_COLUMNS_OPTION_NAME, additional_globals
+            ),
+            elements,
+            ast.Constant(value=getattr(self.cls, BATCH_SIZE_OPTION_NAME, None)),
+            ast.Constant(value=bool(self.cls.reverse_sort)),
+        ]
+        if k is None:
+            name, helper = "sort_batches", sort_batches
+        else:
+            name, helper = "select_batches", select_batches
+            args.insert(1, k)
+        additional_globals[name] = helper
+        return ast.Call(
+            func=ast.Name(id=name, ctx=ast.Load()),
+            args=args,
+            keywords=[],
+        )
+
+    def get_list_results_call(
+        self, elements: ast.expr, additional_globals: dict
+    ) -> ast.Call:
+        """
+        Generates the call that converts what the batch methods produce from a numpy array
+        partition (the selected elements, or the results of action_batch) to a list, for
+        controllers that set list_results.
+        """
+        additional_globals["to_list"] = to_list
+        return ast.Call(
+            func=ast.Name(id="to_list", ctx=ast.Load()),
+            args=[elements],
+            keywords=[],
+        )
+
+    def get_action_batch_call(
+        self, elements: ast.expr, additional_globals: dict
+    ) -> ast.expr:
+        """
+        Generates a call that groups elements into batches of the controller's batch_size
+        and calls action_batch once per batch. A coroutine action_batch is awaited, one
+        batch after another.
+
+        Args:
+            elements (ast.expr): chosen elements to act on.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.expr: call that evaluates to the flat list of results, in the order of the
+            elements (an array for numpy array partitions, unless list_results is set), or
+            to None if action_batch does not return anything.
+        """
+        awaits = self.awaits(self.action_batch)
+        if self.action_batch.returns_a_value:
+            name, helper = (
+                ("async_map_batches", async_map_batches)
+                if awaits
+                else ("map_batches", map_batches)
+            )
+        else:
+            name, helper = (
+                ("async_each_batch", async_each_batch)
+                if awaits
+                else ("each_batch", each_batch)
+            )
+        additional_globals[name] = helper
+        call = ast.Call(
+            func=ast.Name(id=name, ctx=ast.Load()),
+            args=[
+                self.get_batch_method_fn(self.action_batch),
+                elements,
+                ast.Constant(value=getattr(self.cls, BATCH_SIZE_OPTION_NAME, None)),
+            ],
+            keywords=[],
+        )
+        call = ast.Await(value=call) if awaits else call
+        if self.action_batch.returns_a_value and self.uses_list_results:
+            call = self.get_list_results_call(call, additional_globals)
+        return call
+
+    def get_thread_map_call(
+        self, fn: ast.expr, elements: ast.expr, additional_globals: dict
+    ) -> ast.Call:
+        """
+        Generates a call that maps fn over elements with the controller's executor. The
+        executor options are baked into the call as constants. If the fold can be computed
+        in parts, the call also folds each chunk and evaluates to the combined fold result.
+
+        Args:
+            fn (ast.expr): function to map.
+            elements (ast.expr): elements to map over.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Call: call that evaluates to the list of results (or the fold result).
+        """
+        additional_globals["thread_map"] = thread_map
+        args = [
+            fn,
+            elements,
+            ast.Constant(value=getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, ORDERED_OPTION_NAME, True)),
+        ]
+        if self.uses_partial_folds:
+            args.extend(
+                [
+                    ast.Attribute(
+                        value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                        attr=FOLD_METHOD_NAME,
+                        ctx=ast.Load(),
+                    ),
+                    MethodInvocation(self.fold).to_call_arguments(),
+                    (
+                        ast.Attribute(
+                            value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                            attr=FOLD_COMBINE_METHOD_NAME,
+                            ctx=ast.Load(),
+                        )
+                        if self.has_fold_combine
+                        else ast.Constant(value=None)
+                    ),
+                ]
+            )
+        return ast.Call(
+            func=ast.Name(id="thread_map", ctx=ast.Load()),
+            args=args,
+            keywords=[],
+        )
+
+    def get_process_map_call(
+        self,
+        elements: ast.expr,
+        filter_call: Union[ast.expr, None],
+        action_call: Union[ast.expr, None],
+        additional_globals: dict,
+    ) -> ast.Call:
+        """
+        Generates a call that runs the filter and/or action of this controller over elements
+        in worker processes (or on distributed workers). The executor options are baked into
+        the call as constants.
+
+        Args:
+            elements (ast.expr): elements to run over.
+            filter_call (Union[ast.expr, None]): (args, kwargs) tuple for filter, or None to not filter.
+            action_call (Union[ast.expr, None]): (args, kwargs) tuple for action, or None to not run an action.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Call: call that evaluates to the list of action results (or filtered elements),
+            or to the fold result if the fold can be computed in parts.
+        """
+        if self.uses_distributed:
+            map_name = "distributed_map"
+            additional_globals[map_name] = distributed_map
+            workers = getattr(self.cls, WORKERS_OPTION_NAME, None)
+        else:
+            map_name = "process_map"
+            additional_globals[map_name] = process_map
+            workers = getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)
+        args = [
+            ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+            elements,
+            filter_call or ast.Constant(value=None),
+            action_call or ast.Constant(value=None),
+            ast.Constant(value=workers),
+            ast.Constant(value=getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, ORDERED_OPTION_NAME, True)),
+        ]
+        if action_call is not None and self.uses_partial_folds:
+            args.extend(
+                [
+                    MethodInvocation(self.fold).to_call_arguments(),
+                    ast.Constant(value=self.has_fold_combine),
+                ]
+            )
+        return ast.Call(
+            func=ast.Name(id=map_name, ctx=ast.Load()),
+            args=args,
+            keywords=[],
+        )
+
+    @staticmethod
+    def get_call_method_globals(stack_frame, additional_globals: dict = None) -> dict:
+        """
+        Builds the globals namespace that a generated call method is bound to. Only the
+        builtins and module name of the defining frame are used; nothing else from the
+        caller's globals or locals is captured. Equal namespaces are shared between
+        controllers.
+
+        Args:
+            stack_frame (frame): frame in which the controller class was defined.
+            additional_globals (dict, optional): additional global values to include. Defaults to None.
+
+        Returns:
+            dict: globals for the generated call method.
+        """
+        return NAMESPACE_CACHE.get(
+            stack_frame.f_globals.get("__name__"),
+            stack_frame.f_builtins,
+            additional_globals or {},
+        )
+
     def compile_call_method(
         self, module: ast.Module, additional_globals: dict = None
     ) -> Callable[..., Any]:
         """
         Compiles the call method from within the passed in module for this controller.
+        Structurally equal call methods share a single compiled code object, which is
+        instantiated against this controller's own globals and argument defaults.
 
         Args:
             module (ast.Module): module which contains the call function.
@@ -199,18 +1238,37 @@ class BaseControllerImplementation(ABC):
         Returns:
             Callable[..., Any]: generated call method for this controller.
         """
-        _globals = self.stack_frame.f_globals
-        _globals.update(self.stack_frame.f_locals)
-        if additional_globals is not None:
-            _globals.update(additional_globals)
+        additional_globals = additional_globals or {}
+        call_fn: ast.FunctionDef = module.body[0]
+        self.__call_method_module = module
+
+        # saved argument defaults are bound to the function itself, so keep them out of its globals
+        default_names = {
+            default.id for default in call_fn.args.defaults + call_fn.args.kw_defaults
+        }
+        self.__call_method_globals = {
+            name: value
+            for name, value in additional_globals.items()
+            if name not in default_names
+        }
+        _globals = self.get_call_method_globals(
+            self.stack_frame, self.__call_method_globals
+        )
 
-        _locals = {}
-        eval(
-            compile(module, filename="<ast>", mode="exec"),
-            _globals,
-            _locals,
+        defaults = tuple(
+            additional_globals[default.id] for default in call_fn.args.defaults
         )
-        return _locals[GENERATED_CALL_METHOD_NAME]
+        kwdefaults = {
+            arg.arg: additional_globals[default.id]
+            for arg, default in zip(call_fn.args.kwonlyargs, call_fn.args.kw_defaults)
+        }
+        if DEFERRED_COMPILATION.active:
+            return DEFERRED_COMPILATION.defer(
+                self.cls, module, _globals, defaults, kwdefaults
+            )
+
+        code = CODE_CACHE.get_or_compile(module, call_fn.name)
+        return instantiate_call_method(code, _globals, defaults, kwdefaults)
 
     def get_call_args(
         self,
@@ -219,9 +1277,12 @@ class BaseControllerImplementation(ABC):
         use_partition_arg: bool = True,
         required_pre_controller_args: int = 0,
         required_filter_args: int = 1,
+        required_filter_batch_args: int = 1,
         required_sort_key_args: int = 1,
+        required_sort_key_batch_args: int = 1,
         required_sort_cmp_args: int = 2,
         required_action_args: int = 1,
+        required_action_batch_args: int = 1,
         requried_fold_args: int = 1,
         required_post_controller_args: int = 0,
     ) -> Tuple[ast.arguments, dict]:
@@ -292,12 +1353,28 @@ class BaseControllerImplementation(ABC):
             arg_start_index += required_filter_args
             filter_args = self.filter.get_non_defaulted_args()[arg_start_index:]
 
+        filter_batch_args = []
+        if self.has_filter_batch:
+            arg_start_index = 0 if self.filter_batch.is_staticmethod else 1
+            arg_start_index += required_filter_batch_args
+            filter_batch_args = self.filter_batch.get_non_defaulted_args()[
+                arg_start_index:
+            ]
+
         sort_key_args = []
         if self.has_sort_key:
             arg_start_index = 0 if self.sort_key.is_staticmethod else 1
             arg_start_index += required_sort_key_args
             sort_key_args = self.sort_key.get_non_defaulted_args()[arg_start_index:]
 
+        sort_key_batch_args = []
+        if self.has_sort_key_batch:
+            arg_start_index = 0 if self.sort_key_batch.is_staticmethod else 1
+            arg_start_index += required_sort_key_batch_args
+            sort_key_batch_args = self.sort_key_batch.get_non_defaulted_args()[
+                arg_start_index:
+            ]
+
         sort_cmp_args = []
         if self.has_sort_cmp:
             arg_start_index = 0 if self.sort_cmp.is_staticmethod else 1
@@ -310,6 +1387,14 @@ class BaseControllerImplementation(ABC):
             arg_start_index += required_action_args
             action_args = self.action.get_non_defaulted_args()[arg_start_index:]
 
+        action_batch_args = []
+        if self.has_action_batch:
+            arg_start_index = 0 if self.action_batch.is_staticmethod else 1
+            arg_start_index += required_action_batch_args
+            action_batch_args = self.action_batch.get_non_defaulted_args()[
+                arg_start_index:
+            ]
+
         fold_args = []
         if self.has_fold:
             arg_start_index = 0 if self.fold.is_staticmethod else 1
@@ -327,9 +1412,12 @@ class BaseControllerImplementation(ABC):
         max_args = max(
             len(pre_controller_args),
             len(filter_args),
+            len(filter_batch_args),
             len(sort_key_args),
+            len(sort_key_batch_args),
             len(sort_cmp_args),
             len(action_args),
+            len(action_batch_args),
             len(fold_args),
             len(post_controller_args),
         )
@@ -349,6 +1437,14 @@ class BaseControllerImplementation(ABC):
                     msg += shared_msg
                     raise ArgumentError(msg)
 
+            if len(filter_batch_args) > index:
+                if current_arg is None:
+                    current_arg = filter_batch_args[index]
+                elif current_arg != filter_batch_args[index]:
+                    msg = f'{FILTER_BATCH_METHOD_NAME} argument {index} "{filter_batch_args[index]}" is positionally shared with "{current_arg}"; choose one name for this argument. '
+                    msg += shared_msg
+                    raise ArgumentError(msg)
+
             if len(sort_key_args) > index:
                 if current_arg is None:
                     current_arg = sort_key_args[index]
@@ -357,6 +1453,14 @@ class BaseControllerImplementation(ABC):
                     msg += shared_msg
                     raise ArgumentError(msg)
 
+            if len(sort_key_batch_args) > index:
+                if current_arg is None:
+                    current_arg = sort_key_batch_args[index]
+                elif current_arg != sort_key_batch_args[index]:
+                    msg = f'{SORT_KEY_BATCH_METHOD_NAME} argument {index} "{sort_key_batch_args[index]}" is positionally shared with "{current_arg}"; choose one name for this argument. '
+                    msg += shared_msg
+                    raise ArgumentError(msg)
+
             if len(sort_cmp_args) > index:
                 if current_arg is None:
                     current_arg = sort_cmp_args[index]
@@ -373,6 +1477,14 @@ class BaseControllerImplementation(ABC):
                     msg += shared_msg
                     raise ArgumentError(msg)
 
+            if len(action_batch_args) > index:
+                if current_arg is None:
+                    current_arg = action_batch_args[index]
+                elif current_arg != action_batch_args[index]:
+                    msg = f'{ACTION_BATCH_METHOD_NAME} argument {index} "{action_batch_args[index]}" is positionally shared with "{current_arg}"; choose one name for this argument. '
+                    msg += shared_msg
+                    raise ArgumentError(msg)
+
             if len(fold_args) > index:
                 if current_arg is None:
                     current_arg = fold_args[index]
@@ -461,6 +1573,14 @@ class BaseControllerImplementation(ABC):
                 self.filter.get_keyword_only_args(), kwonlyargs, kw_defaults
             )
 
+        if self.has_filter_batch:
+            add_non_conflicting_parameters(
+                self.filter_batch.get_defaulted_args(), args, defaults
+            )
+            add_non_conflicting_parameters(
+                self.filter_batch.get_keyword_only_args(), kwonlyargs, kw_defaults
+            )
+
         if self.has_sort_key:
             add_non_conflicting_parameters(
                 self.sort_key.get_defaulted_args(), args, defaults
@@ -471,6 +1591,14 @@ class BaseControllerImplementation(ABC):
                 kw_defaults,
             )
 
+        if self.has_sort_key_batch:
+            add_non_conflicting_parameters(
+                self.sort_key_batch.get_defaulted_args(), args, defaults
+            )
+            add_non_conflicting_parameters(
+                self.sort_key_batch.get_keyword_only_args(), kwonlyargs, kw_defaults
+            )
+
         if self.has_sort_cmp:
             add_non_conflicting_parameters(
                 self.sort_cmp.get_defaulted_args(), args, defaults
@@ -489,6 +1617,14 @@ class BaseControllerImplementation(ABC):
                 self.action.get_keyword_only_args(), kwonlyargs, kw_defaults
             )
 
+        if self.has_action_batch:
+            add_non_conflicting_parameters(
+                self.action_batch.get_defaulted_args(), args, defaults
+            )
+            add_non_conflicting_parameters(
+                self.action_batch.get_keyword_only_args(), kwonlyargs, kw_defaults
+            )
+
         if self.has_fold:
             add_non_conflicting_parameters(
                 self.fold.get_defaulted_args(), args, defaults
@@ -520,6 +1656,20 @@ class BaseControllerImplementation(ABC):
                     The argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_filter_batch:
+            if arg_unpack_name is None:
+                arg_unpack_name = self.filter_batch.varargs
+            elif (
+                self.filter_batch.has_arg_unpack
+                and self.filter_batch.varargs != arg_unpack_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{FILTER_BATCH_METHOD_NAME} controlled action uses "{self.filter_batch.varargs}" as the argument unpack variable name, \
+                    but it was previously defined as "{arg_unpack_name}". \
+                    The argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_sort_key:
             if arg_unpack_name is None:
                 arg_unpack_name = self.sort_key.varargs
@@ -534,6 +1684,20 @@ class BaseControllerImplementation(ABC):
                     The argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_sort_key_batch:
+            if arg_unpack_name is None:
+                arg_unpack_name = self.sort_key_batch.varargs
+            elif (
+                self.sort_key_batch.has_arg_unpack
+                and self.sort_key_batch.varargs != arg_unpack_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{SORT_KEY_BATCH_METHOD_NAME} controlled action uses "{self.sort_key_batch.varargs}" as the argument unpack variable name, \
+                    but it was previously defined as "{arg_unpack_name}". \
+                    The argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_sort_cmp:
             if arg_unpack_name is None:
                 arg_unpack_name = self.sort_cmp.varargs
@@ -559,6 +1723,20 @@ class BaseControllerImplementation(ABC):
                     The argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_action_batch:
+            if arg_unpack_name is None:
+                arg_unpack_name = self.action_batch.varargs
+            elif (
+                self.action_batch.has_arg_unpack
+                and self.action_batch.varargs != arg_unpack_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{ACTION_BATCH_METHOD_NAME} controlled action uses "{self.action_batch.varargs}" as the argument unpack variable name, \
+                    but it was previously defined as "{arg_unpack_name}". \
+                    The argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_fold:
             if arg_unpack_name is None:
                 arg_unpack_name = self.fold.varargs
@@ -603,6 +1781,20 @@ class BaseControllerImplementation(ABC):
                     The keyword argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_filter_batch:
+            if kwarg_name is None:
+                kwarg_name = self.filter_batch.varkw
+            elif (
+                self.filter_batch.has_kwarg_unpack
+                and self.filter_batch.varkw != kwarg_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{FILTER_BATCH_METHOD_NAME} controlled action uses "{self.filter_batch.varkw}" as the keyword argument unpack variable name, \
+                    but it was previously defined as "{kwarg_name}". \
+                    The keyword argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_sort_key:
             if kwarg_name is None:
                 kwarg_name = self.sort_key.varkw
@@ -614,6 +1806,20 @@ class BaseControllerImplementation(ABC):
                     The keyword argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_sort_key_batch:
+            if kwarg_name is None:
+                kwarg_name = self.sort_key_batch.varkw
+            elif (
+                self.sort_key_batch.has_kwarg_unpack
+                and self.sort_key_batch.varkw != kwarg_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{SORT_KEY_BATCH_METHOD_NAME} controlled action uses "{self.sort_key_batch.varkw}" as the keyword argument unpack variable name, \
+                    but it was previously defined as "{kwarg_name}". \
+                    The keyword argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_sort_cmp:
             if kwarg_name is None:
                 kwarg_name = self.sort_cmp.varkw
@@ -636,6 +1842,20 @@ class BaseControllerImplementation(ABC):
                     The keyword argument unpack variable must be the same name across all controlled methods that use it.'
                     )
                 )
+        if self.has_action_batch:
+            if kwarg_name is None:
+                kwarg_name = self.action_batch.varkw
+            elif (
+                self.action_batch.has_kwarg_unpack
+                and self.action_batch.varkw != kwarg_name
+            ):
+                raise ArgumentError(
+                    dedent(
+                        f'{ACTION_BATCH_METHOD_NAME} controlled action uses "{self.action_batch.varkw}" as the keyword argument unpack variable name, \
+                    but it was previously defined as "{kwarg_name}". \
+                    The keyword argument unpack variable must be the same name across all controlled methods that use it.'
+                    )
+                )
         if self.has_fold:
             if kwarg_name is None:
                 kwarg_name = self.fold.varkw
@@ -0,0 +1,51 @@
+from metacontrollers.internal.exceptions import InvalidControllerOptionError
+from metacontrollers.internal.namespace import EXECUTOR_OPTION_NAME
+
+from .do_all import DoAllImplementation
+from .do_k import DoKImplementation
+from .do_one import DoOneImplementation
+
+
+class AsyncDoOneImplementation(DoOneImplementation):
+    is_async = True
+
+    def validate(self) -> None:
+        self.validate_async_options()
+        super().validate()
+
+
+class AsyncDoKImplementation(DoKImplementation):
+    is_async = True
+
+    def validate(self) -> None:
+        self.validate_async_options()
+        super().validate()
+
+
+class AsyncDoAllImplementation(DoAllImplementation):
+    is_async = True
+
+    def validate(self) -> None:
+        self.validate_async_options()
+        super().validate()
+
+
+class CooperativeDoAllImplementation(DoAllImplementation):
+    """
+    Generates an async def call method for a synchronous DoAll controller, which runs the
+    same stages as its regular call method but yields to the event loop between slices of
+    the partition.
+    """
+
+    is_async = True
+
+    def __init__(self, cls, name, bases, attrs, stack_frame, time_slice: float) -> None:
+        super().__init__(cls, name, bases, attrs, stack_frame)
+        self.time_slice = time_slice
+
+    def validate(self) -> None:
+        super().validate()
+        if self.uses_executor:
+            raise InvalidControllerOptionError(
+                f'"{self.name}" uses an {EXECUTOR_OPTION_NAME}, so it cannot be run cooperatively on the event loop.'
+            )
@@ -0,0 +1,25 @@
+from .async_do import AsyncDoOneImplementation
+from .do_one import DoOneImplementation
+
+
+class CoalescedDoOneImplementation(DoOneImplementation):
+    """
+    Generates the call method a coalescer runs for a DoOne controller: pre_controller,
+    filter, sort and post_controller run in the call as usual, but the chosen element is
+    handed to the pending batch, which runs action_batch once for the whole batch.
+    """
+
+    coalesced = True
+
+    def __init__(self, cls, name, bases, attrs, stack_frame, is_async: bool) -> None:
+        super().__init__(cls, name, bases, attrs, stack_frame)
+        # an asyncio coalescer awaits the batch, even for a synchronous controller
+        self.is_async = is_async
+
+
+class AsyncCoalescedDoOneImplementation(AsyncDoOneImplementation):
+    """
+    CoalescedDoOneImplementation for AsyncDoOne controllers.
+    """
+
+    coalesced = True
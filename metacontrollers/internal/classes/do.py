@@ -6,7 +6,6 @@ from metacontrollers.internal.method_invocation import MethodInvocation
 from metacontrollers.internal.namespace import (
     ACTION_METHOD_NAME,
     ACTION_RESULT_ASSIGNMENT_NAME,
-    GENERATED_CALL_METHOD_NAME,
     POST_CONTROLLER_METHOD_NAME,
     PRE_CONTROLLER_METHOD_NAME,
 )
@@ -23,9 +22,13 @@ class DoImplementation(BaseControllerImplementation):
             attrs,
             stack_frame,
             filter_enabled=False,
+            filter_batch_enabled=False,
             sort_key_enabled=False,
+            sort_key_batch_enabled=False,
             sort_cmp_enabled=False,
+            action_batch_enabled=False,
             fold_enabled=False,
+            fold_combine_enabled=False,
         )
 
     def validate(self) -> None:
@@ -82,13 +85,7 @@ class DoImplementation(BaseControllerImplementation):
             use_partition_arg=False,
             required_action_args=0,
         )
-        call_fn = ast.FunctionDef(
-            name=GENERATED_CALL_METHOD_NAME,
-            args=args,
-            body=body,
-            decorator_list=[],
-            type_params=[],
-        )
+        call_fn = self.get_call_function_def(args, body)
 
         module = ast.fix_missing_locations(ast.Module(body=[call_fn], type_ignores=[]))
         return self.compile_call_method(module, saved_defaults)
@@ -1,22 +1,31 @@
 import ast
 from functools import cmp_to_key
-from typing import Any, Callable
+from typing import Any, Callable, Union
 
 from metacontrollers.internal.exceptions import (
     InvalidControllerMethodError,
+    InvalidControllerOptionError,
     InvalidReturnError,
 )
+from metacontrollers.internal.executors import process_sort, thread_sort
 from metacontrollers.internal.method_invocation import MethodInvocation
+from metacontrollers.internal.pipeline import pipeline_map
 from metacontrollers.internal.namespace import (
     ACTION_METHOD_NAME,
     ACTION_RESULT_ASSIGNMENT_NAME,
+    CHUNK_SIZE_OPTION_NAME,
     CLASS_ARG_NAME,
+    DISTRIBUTED_EXECUTOR_NAME,
+    EXECUTOR_OPTION_NAME,
     FILTER_METHOD_NAME,
     FOLD_METHOD_NAME,
-    GENERATED_CALL_METHOD_NAME,
-    PARTITION_ARG_NAME,
+    MAX_WORKERS_OPTION_NAME,
+    PARALLEL_SORT_OPTION_NAME,
+    ORDERED_OPTION_NAME,
+    PIPELINE_OPTION_NAME,
     POST_CONTROLLER_METHOD_NAME,
     PRE_CONTROLLER_METHOD_NAME,
+    QUEUE_SIZE_OPTION_NAME,
     SORT_CMP_METHOD_NAME,
     SORT_KEY_METHOD_NAME,
 )
@@ -28,13 +37,34 @@ class DoAllImplementation(BaseControllerImplementation):
     def __init__(self, cls, name, bases, attrs, stack_frame) -> None:
         super().__init__(cls, name, bases, attrs, stack_frame)
 
+    @property
+    def uses_pipeline(self) -> bool:
+        return getattr(self.cls, PIPELINE_OPTION_NAME, False) is True
+
     def validate(self) -> None:
         super().validate()
+        self.validate_executor_options()
+        self.validate_pipeline_options()
+        self.validate_batch_options()
         if self.has_sort_key and self.has_sort_cmp:
             err = f'DoAll controller "{self.name}" is invalid because both sort methods ("{SORT_KEY_METHOD_NAME}" and "{SORT_CMP_METHOD_NAME}") are defined.'
             err += f' You must define only one. Note that "{SORT_KEY_METHOD_NAME}" is more performant.'
             raise InvalidControllerMethodError(err)
 
+        parallel_sort = getattr(self.cls, PARALLEL_SORT_OPTION_NAME, False)
+        if not isinstance(parallel_sort, bool):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {PARALLEL_SORT_OPTION_NAME} must be a bool, but {parallel_sort!r} was given.'
+            )
+        if parallel_sort and (not self.uses_executor or not self.has_sort_key):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {PARALLEL_SORT_OPTION_NAME}, which requires an executor and a "{SORT_KEY_METHOD_NAME}" method.'
+            )
+        if parallel_sort and self.uses_distributed:
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {PARALLEL_SORT_OPTION_NAME}, which is not supported by the "{DISTRIBUTED_EXECUTOR_NAME}" {EXECUTOR_OPTION_NAME}.'
+            )
+
         if self.has_filter:
             if len(self.filter.call_args) < 1:
                 raise AttributeError(
@@ -65,23 +95,202 @@ class DoAllImplementation(BaseControllerImplementation):
                     f'"{FOLD_METHOD_NAME}" should be defined with at least 1 non-class argument (list of action results), but 0 were given.'
                 )
 
-            if self.has_action and not self.action.returns_a_value:
+            if (
+                self.chosen_action is not None
+                and not self.chosen_action.returns_a_value
+            ):
                 raise InvalidReturnError(
-                    f'"{FOLD_METHOD_NAME}" was defined, but "{ACTION_METHOD_NAME}" does not return anything.'
+                    f'"{FOLD_METHOD_NAME}" was defined, but "{self.chosen_action.name}" does not return anything.'
+                )
+
+    def validate_pipeline_options(self) -> None:
+        """
+        Validates the pipeline class options (pipeline and queue_size).
+        """
+        pipeline = getattr(self.cls, PIPELINE_OPTION_NAME, False)
+        if not isinstance(pipeline, bool):
+            raise InvalidControllerOptionError(
+                f'"{self.name}" {PIPELINE_OPTION_NAME} must be a bool, but {pipeline!r} was given.'
+            )
+
+        queue_size = getattr(self.cls, QUEUE_SIZE_OPTION_NAME, None)
+        if queue_size is not None:
+            if (
+                not isinstance(queue_size, int)
+                or isinstance(queue_size, bool)
+                or queue_size < 1
+            ):
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" {QUEUE_SIZE_OPTION_NAME} must be None or a positive integer, but {queue_size!r} was given.'
+                )
+            if not pipeline:
+                raise InvalidControllerOptionError(
+                    f'"{self.name}" sets {QUEUE_SIZE_OPTION_NAME}, which is only used with {PIPELINE_OPTION_NAME} = True.'
                 )
 
+        if not pipeline:
+            return
+        if self.is_async:
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {PIPELINE_OPTION_NAME}, which is not supported by async or cooperative calls.'
+            )
+        if self.has_sort_key or self.has_sort_cmp:
+            # sorting needs every element before the first action can run
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {PIPELINE_OPTION_NAME}, which cannot be used with a sort method.'
+            )
+        if self.uses_distributed:
+            raise InvalidControllerOptionError(
+                f'"{self.name}" sets {PIPELINE_OPTION_NAME}, which is not supported by the "{DISTRIBUTED_EXECUTOR_NAME}" {EXECUTOR_OPTION_NAME}.'
+            )
+
+    def get_pipeline_call(
+        self,
+        elements: ast.expr,
+        filter_fn: Union[ast.expr, None],
+        action_fn: Union[ast.expr, None],
+        additional_globals: dict,
+    ) -> ast.Call:
+        """
+        Generates a call that runs filter, action and fold over elements as pipelined
+        stages. The executor and pipeline options are baked into the call as constants.
+
+        Args:
+            elements (ast.expr): elements to run over.
+            filter_fn (Union[ast.expr, None]): filter function, or None to not filter.
+            action_fn (Union[ast.expr, None]): action function, or None to not run an action.
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Call: call that evaluates to the list of action results (or filtered
+            elements), or to the fold result if the fold can be computed in parts.
+        """
+        additional_globals["pipeline_map"] = pipeline_map
+        args = [
+            ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+            elements,
+            filter_fn or ast.Constant(value=None),
+            action_fn or ast.Constant(value=None),
+            (
+                MethodInvocation(self.action).to_call_arguments()
+                if self.has_action and self.uses_processes
+                else ast.Constant(value=None)
+            ),
+            ast.Constant(value=not self.has_action or self.action.returns_a_value),
+            ast.Constant(value=self.executor),
+            ast.Constant(value=getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, QUEUE_SIZE_OPTION_NAME, None)),
+            ast.Constant(value=getattr(self.cls, ORDERED_OPTION_NAME, True)),
+        ]
+        if self.uses_partial_folds:
+            args.extend(
+                [
+                    MethodInvocation(self.fold).to_call_arguments(),
+                    ast.Constant(value=self.has_fold_combine),
+                ]
+            )
+        return ast.Call(
+            func=ast.Name(id="pipeline_map", ctx=ast.Load()),
+            args=args,
+            keywords=[],
+        )
+
+    def get_sort_call(
+        self,
+        elements: ast.expr,
+        filter_fn: Union[ast.expr, None],
+        key_fn: ast.expr,
+        additional_globals: dict,
+    ) -> ast.Call:
+        """
+        Generates a call that filters and sorts elements with the controller's executor.
+
+        Args:
+            elements (ast.expr): elements to sort.
+            filter_fn (Union[ast.expr, None]): filter function, or None to not filter.
+            key_fn (ast.expr): sort key function (used by the thread executor).
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Call: call that evaluates to the sorted list of elements.
+        """
+        max_workers = ast.Constant(
+            value=getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)
+        )
+        chunk_size = ast.Constant(value=getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None))
+        reverse = ast.Constant(value=bool(self.cls.reverse_sort))
+
+        if self.uses_processes:
+            additional_globals["process_sort"] = process_sort
+            return ast.Call(
+                func=ast.Name(id="process_sort", ctx=ast.Load()),
+                args=[
+                    ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                    elements,
+                    (
+                        MethodInvocation(self.filter).to_call_arguments()
+                        if self.has_filter
+                        else ast.Constant(value=None)
+                    ),
+                    MethodInvocation(self.sort_key).to_call_arguments(),
+                    reverse,
+                    max_workers,
+                    chunk_size,
+                ],
+                keywords=[],
+            )
+
+        additional_globals["thread_sort"] = thread_sort
+        return ast.Call(
+            func=ast.Name(id="thread_sort", ctx=ast.Load()),
+            args=[
+                elements,
+                filter_fn or ast.Constant(value=None),
+                key_fn,
+                reverse,
+                max_workers,
+                chunk_size,
+            ],
+            keywords=[],
+        )
+
     def generate_call_method(self) -> Callable[..., Any]:
         body = []
         additional_globals = {}
-        get_elements = ast.Name(id=PARTITION_ARG_NAME, ctx=ast.Load())
+        get_elements = self.get_partition(additional_globals)
+
+        if self.is_cooperative:
+            body.append(self.get_time_slicer_assignment(additional_globals))
 
         if self.has_pre_controller:
             pre_controller_call = MethodInvocation(
                 self.pre_controller
             ).to_function_call(name=PRE_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=pre_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.pre_controller, pre_controller_call
+                    )
+                )
+            )
 
-        if self.has_filter:
+        # with parallel_sort, workers filter, compute keys and sort each chunk
+        parallel_sort = getattr(self.cls, PARALLEL_SORT_OPTION_NAME, False)
+
+        filter_call = None
+        filter_fn = None
+        if (
+            self.has_filter
+            and self.uses_processes
+            and not self.uses_pipeline
+            and not self.has_sort_key
+            and not self.has_sort_cmp
+        ):
+            # nothing needs to be ordered first, so filter in the worker processes together with the action
+            filter_call = MethodInvocation(self.filter).to_call_arguments()
+
+        elif self.has_filter:
             if self.filter.num_call_parameters != 1:
                 filter_fn = MethodInvocation(self.filter).to_lambda(
                     [self.filter.call_args[0]], name=FILTER_METHOD_NAME
@@ -92,11 +301,13 @@ class DoAllImplementation(BaseControllerImplementation):
                     attr=FILTER_METHOD_NAME,
                     ctx=ast.Load(),
                 )
-            get_elements = ast.Call(
-                func=ast.Name(id="filter", ctx=ast.Load()),
-                args=[filter_fn, get_elements],
-                keywords=[],
-            )
+            if not parallel_sort and not self.uses_pipeline:
+                get_elements = self.get_filter_call(
+                    filter_fn, get_elements, additional_globals
+                )
+
+        if self.has_filter_batch:
+            get_elements = self.get_filter_batch_call(get_elements, additional_globals)
 
         if self.has_sort_key:
             if self.sort_key.num_call_parameters != 1:
@@ -110,18 +321,14 @@ class DoAllImplementation(BaseControllerImplementation):
                     ctx=ast.Load(),
                 )
 
-            sort_keywords = [ast.keyword(arg="key", value=sort_fn)]
-            if self.cls.reverse_sort:
-                sort_keywords.append(
-                    ast.keyword(
-                        arg="reverse", value=ast.Constant(value=True, type="bool")
-                    )
+            if parallel_sort:
+                get_elements = self.get_sort_call(
+                    get_elements, filter_fn, sort_fn, additional_globals
+                )
+            else:
+                get_elements = self.get_sorted_call(
+                    get_elements, sort_fn, additional_globals
                 )
-            get_elements = ast.Call(
-                func=ast.Name(id="sorted", ctx=ast.Load()),
-                args=[get_elements],
-                keywords=sort_keywords,
-            )
 
         if self.has_sort_cmp:
             if self.sort_cmp.num_call_parameters != 2:
@@ -135,30 +342,81 @@ class DoAllImplementation(BaseControllerImplementation):
                     ctx=ast.Load(),
                 )
 
-            sort_keywords = [
-                ast.keyword(
-                    arg="key",
-                    value=ast.Call(
-                        func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
-                        args=[sort_fn],
-                        keywords=[],
-                    ),
-                )
-            ]
-            if self.cls.reverse_sort:
-                sort_keywords.append(
-                    ast.keyword(
-                        arg="reverse", value=ast.Constant(value=True, type="bool")
-                    )
-                )
-            get_elements = ast.Call(
-                func=ast.Name(id="sorted", ctx=ast.Load()),
-                args=[get_elements],
-                keywords=sort_keywords,
+            get_elements = self.get_sorted_call(
+                get_elements,
+                ast.Call(
+                    func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
+                    args=[sort_fn],
+                    keywords=[],
+                ),
+                additional_globals,
             )
             additional_globals["cmp_to_key"] = cmp_to_key
 
-        if self.has_action:
+        if self.has_sort_key_batch:
+            get_elements = self.get_sort_key_batch_call(
+                get_elements, additional_globals
+            )
+
+        if self.chosen_action is None and self.uses_columns:
+            get_elements = self.get_selected_rows_call(get_elements, additional_globals)
+
+        if (
+            self.chosen_action is None
+            and self.uses_list_results
+            and (self.has_filter_batch or self.has_sort_key_batch)
+        ):
+            get_elements = self.get_list_results_call(get_elements, additional_globals)
+
+        if (
+            self.is_async
+            and not self.uses_async_actions
+            and not (self.is_cooperative and self.has_action)
+            and not self.has_sort_key
+            and not self.has_sort_cmp
+            and not self.has_filter_batch
+            and not self.has_sort_key_batch
+        ):
+            # only the async and cooperative maps iterate an async partition themselves;
+            # sorting and the batch methods already collected it
+            get_elements = self.get_collect_call(get_elements, additional_globals)
+
+        if filter_call is not None and not self.has_action:
+            get_elements = self.get_process_map_call(
+                get_elements, filter_call, None, additional_globals
+            )
+
+        if self.uses_pipeline:
+            action_fn = None
+            if self.has_action:
+                if self.action.num_call_parameters != 1:
+                    action_fn = MethodInvocation(self.action).to_lambda(
+                        [self.action.call_args[0]], name=ACTION_METHOD_NAME
+                    )
+                else:
+                    action_fn = ast.Attribute(
+                        value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                        attr=ACTION_METHOD_NAME,
+                        ctx=ast.Load(),
+                    )
+            pipeline_call = self.get_pipeline_call(
+                get_elements, filter_fn, action_fn, additional_globals
+            )
+            if not self.has_action:
+                get_elements = pipeline_call
+            elif self.action.returns_a_value:
+                body.append(
+                    ast.Assign(
+                        targets=[
+                            ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
+                        ],
+                        value=pipeline_call,
+                    )
+                )
+            else:
+                body.append(ast.Expr(value=pipeline_call))
+
+        elif self.has_action:
             action_invoke = MethodInvocation(self.action)
             action_args, action_keywords = action_invoke.get_call_args_and_keywords()
 
@@ -177,17 +435,37 @@ class DoAllImplementation(BaseControllerImplementation):
                         ctx=ast.Load(),
                     )
 
-                action_call = ast.Call(
-                    func=ast.Name(id="list", ctx=ast.Load()),
-                    args=[
-                        ast.Call(
-                            func=ast.Name(id="map", ctx=ast.Load()),
-                            args=[action_fn, get_elements],
-                            keywords=[],
-                        )
-                    ],
-                    keywords=[],
-                )
+                if self.uses_async_actions:
+                    action_call = self.get_async_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.is_cooperative:
+                    action_call = self.get_cooperative_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.uses_threads:
+                    action_call = self.get_thread_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.uses_processes:
+                    action_call = self.get_process_map_call(
+                        get_elements,
+                        filter_call,
+                        action_invoke.to_call_arguments(),
+                        additional_globals,
+                    )
+                else:
+                    action_call = ast.Call(
+                        func=ast.Name(id="list", ctx=ast.Load()),
+                        args=[
+                            ast.Call(
+                                func=ast.Name(id="map", ctx=ast.Load()),
+                                args=[action_fn, get_elements],
+                                keywords=[],
+                            )
+                        ],
+                        keywords=[],
+                    )
                 action = ast.Assign(
                     targets=[
                         ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
@@ -196,6 +474,45 @@ class DoAllImplementation(BaseControllerImplementation):
                 )
                 body.append(action)
 
+            elif self.uses_processes:
+                # the results are discarded, but still wait for every action to finish
+                action = ast.Expr(
+                    value=self.get_process_map_call(
+                        get_elements,
+                        filter_call,
+                        action_invoke.to_call_arguments(),
+                        additional_globals,
+                    )
+                )
+                body.append(action)
+
+            elif self.uses_threads or self.uses_async_actions or self.is_cooperative:
+                # the results are discarded, but still wait for every action to finish
+                if self.action.num_call_parameters != 1:
+                    action_fn = action_invoke.to_lambda(
+                        [action_args[0].id], name=ACTION_METHOD_NAME
+                    )
+                else:
+                    action_fn = ast.Attribute(
+                        value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                        attr=ACTION_METHOD_NAME,
+                        ctx=ast.Load(),
+                    )
+                if self.uses_async_actions:
+                    action_call = self.get_async_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.is_cooperative:
+                    action_call = self.get_cooperative_map_call(
+                        action_fn, get_elements, additional_globals, keep_results=False
+                    )
+                else:
+                    action_call = self.get_thread_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                action = ast.Expr(value=action_call)
+                body.append(action)
+
             else:
                 # no need to capture the result from the action, so use a basic for loop
                 action = ast.For(
@@ -212,12 +529,31 @@ class DoAllImplementation(BaseControllerImplementation):
                 )
                 body.append(action)
 
-        if self.has_fold:
+        elif self.has_action_batch:
+            action_batch_call = self.get_action_batch_call(
+                get_elements, additional_globals
+            )
+            if self.action_batch.returns_a_value:
+                body.append(
+                    ast.Assign(
+                        targets=[
+                            ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
+                        ],
+                        value=action_batch_call,
+                    )
+                )
+            else:
+                body.append(ast.Expr(value=action_batch_call))
+
+        if self.uses_partial_folds:
+            pass  # the executor already folded each chunk and combined the results
+
+        elif self.has_fold:
             fold_invoke = MethodInvocation(self.fold)
             fold_args, fold_keywords = fold_invoke.get_call_args_and_keywords()
             fold_args.pop(0)
 
-            if self.has_action:
+            if self.chosen_action is not None:
                 fold_args.insert(
                     0, ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Load())
                 )
@@ -226,15 +562,25 @@ class DoAllImplementation(BaseControllerImplementation):
 
             fold_assignment = ast.Assign(
                 targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
-                value=fold_invoke.to_function_call(
-                    fold_args, fold_keywords, name=FOLD_METHOD_NAME
+                value=self.await_if_coroutine(
+                    self.fold,
+                    fold_invoke.to_function_call(
+                        fold_args, fold_keywords, name=FOLD_METHOD_NAME
+                    ),
                 ),
             )
             body.append(fold_assignment)
 
-        elif not self.has_action:
+        elif self.chosen_action is None:
             # does not have an action, return whatever is get_elements
-            if not self.has_sort_cmp and not self.has_sort_key:
+            if (
+                not self.has_sort_cmp
+                and not self.has_sort_key
+                and not self.has_filter_batch
+                and not self.has_sort_key_batch
+                and filter_call is None
+                and not self.uses_pipeline
+            ):
                 # we need to convert the filter object to a list before we return
                 get_elements = ast.Call(
                     func=ast.Name(id="list", ctx=ast.Load()),
@@ -251,9 +597,17 @@ class DoAllImplementation(BaseControllerImplementation):
             post_controller_call = MethodInvocation(
                 self.post_controller
             ).to_function_call(name=POST_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=post_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.post_controller, post_controller_call
+                    )
+                )
+            )
 
-        if not self.has_fold and (self.has_action and not self.action.returns_a_value):
+        if not self.has_fold and (
+            self.chosen_action is not None and not self.chosen_action.returns_a_value
+        ):
             pass  # do nothing since we explicitly do not need a return value here
         else:
             body.append(
@@ -268,13 +622,7 @@ class DoAllImplementation(BaseControllerImplementation):
             use_partition_arg=True,
         )
         additional_globals.update(saved_defaults)
-        call_fn = ast.FunctionDef(
-            name=GENERATED_CALL_METHOD_NAME,
-            args=args,
-            body=body,
-            decorator_list=[],
-            type_params=[],
-        )
+        call_fn = self.get_call_function_def(args, body)
 
         module = ast.fix_missing_locations(ast.Module(body=[call_fn], type_ignores=[]))
         return self.compile_call_method(module, additional_globals)
@@ -1,23 +1,26 @@
 import ast
 from functools import cmp_to_key
-from heapq import nlargest, nsmallest
 from itertools import islice
-from typing import Any, Callable
+from typing import Any, Callable, Union
 
 from metacontrollers.internal.exceptions import (
     InvalidControllerMethodError,
+    InvalidControllerOptionError,
     InvalidReturnError,
 )
+from metacontrollers.internal.executors import process_select, thread_select
 from metacontrollers.internal.method_invocation import MethodInvocation
 from metacontrollers.internal.namespace import (
     ACTION_METHOD_NAME,
     ACTION_RESULT_ASSIGNMENT_NAME,
+    CHUNK_SIZE_OPTION_NAME,
     CLASS_ARG_NAME,
+    DISTRIBUTED_EXECUTOR_NAME,
+    EXECUTOR_OPTION_NAME,
     FILTER_METHOD_NAME,
     FOLD_METHOD_NAME,
-    GENERATED_CALL_METHOD_NAME,
     K_ARG_NAME,
-    PARTITION_ARG_NAME,
+    MAX_WORKERS_OPTION_NAME,
     POST_CONTROLLER_METHOD_NAME,
     PRE_CONTROLLER_METHOD_NAME,
     SORT_CMP_METHOD_NAME,
@@ -33,6 +36,12 @@ class DoKImplementation(BaseControllerImplementation):
 
     def validate(self) -> None:
         super().validate()
+        self.validate_executor_options()
+        self.validate_batch_options()
+        if self.uses_distributed:
+            raise InvalidControllerOptionError(
+                f'DoK controller "{self.name}" is invalid because the "{DISTRIBUTED_EXECUTOR_NAME}" {EXECUTOR_OPTION_NAME} is only supported by DoAll.'
+            )
         if self.has_sort_key and self.has_sort_cmp:
             err = f'DoK controller "{self.name}" is invalid because both sort methods ("{SORT_KEY_METHOD_NAME}" and "{SORT_CMP_METHOD_NAME}") are defined.'
             err += f' You must define only one. Note that "{SORT_KEY_METHOD_NAME}" is more performant.'
@@ -68,22 +77,110 @@ class DoKImplementation(BaseControllerImplementation):
                     f'"{FOLD_METHOD_NAME}" should be defined with at least 1 non-class argument (list of action results), but 0 were given.'
                 )
 
-            if self.has_action and not self.action.returns_a_value:
+            if (
+                self.chosen_action is not None
+                and not self.chosen_action.returns_a_value
+            ):
                 raise InvalidReturnError(
-                    f'"{FOLD_METHOD_NAME}" was defined, but "{ACTION_METHOD_NAME}" does not return anything.'
+                    f'"{FOLD_METHOD_NAME}" was defined, but "{self.chosen_action.name}" does not return anything.'
                 )
 
+    def get_select_call(
+        self,
+        elements: ast.expr,
+        filter_fn: Union[ast.expr, None],
+        key_fn: ast.expr,
+        additional_globals: dict,
+    ) -> ast.Call:
+        """
+        Generates a call that filters elements and selects the K smallest (or largest) of
+        them with the controller's executor.
+
+        Args:
+            elements (ast.expr): elements to select from.
+            filter_fn (Union[ast.expr, None]): filter function, or None to not filter.
+            key_fn (ast.expr): key function to select by (used by the thread executor).
+            additional_globals (dict): globals of the call method, updated with the helper used.
+
+        Returns:
+            ast.Call: call that evaluates to the list of selected elements.
+        """
+        max_workers = ast.Constant(
+            value=getattr(self.cls, MAX_WORKERS_OPTION_NAME, None)
+        )
+        chunk_size = ast.Constant(value=getattr(self.cls, CHUNK_SIZE_OPTION_NAME, None))
+        reverse = ast.Constant(value=bool(self.cls.reverse_sort))
+        k = ast.Name(id=K_ARG_NAME, ctx=ast.Load())
+
+        if self.uses_processes:
+            additional_globals["process_select"] = process_select
+            return ast.Call(
+                func=ast.Name(id="process_select", ctx=ast.Load()),
+                args=[
+                    ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                    k,
+                    elements,
+                    (
+                        MethodInvocation(self.filter).to_call_arguments()
+                        if self.has_filter
+                        else ast.Constant(value=None)
+                    ),
+                    (
+                        MethodInvocation(self.sort_key).to_call_arguments()
+                        if self.has_sort_key
+                        else ast.Constant(value=None)
+                    ),
+                    (
+                        MethodInvocation(self.sort_cmp).to_call_arguments(2)
+                        if self.has_sort_cmp
+                        else ast.Constant(value=None)
+                    ),
+                    reverse,
+                    max_workers,
+                    chunk_size,
+                ],
+                keywords=[],
+            )
+
+        additional_globals["thread_select"] = thread_select
+        return ast.Call(
+            func=ast.Name(id="thread_select", ctx=ast.Load()),
+            args=[
+                k,
+                elements,
+                filter_fn or ast.Constant(value=None),
+                key_fn,
+                ast.Constant(value=self.has_sort_key),
+                reverse,
+                max_workers,
+                chunk_size,
+            ],
+            keywords=[],
+        )
+
     def generate_call_method(self) -> Callable[..., Any]:
         body = []
         additional_globals = {}
-        get_elements = ast.Name(id=PARTITION_ARG_NAME, ctx=ast.Load())
+        get_elements = self.get_partition(additional_globals)
 
         if self.has_pre_controller:
             pre_controller_call = MethodInvocation(
                 self.pre_controller
             ).to_function_call(name=PRE_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=pre_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.pre_controller, pre_controller_call
+                    )
+                )
+            )
 
+        # with an executor, workers filter, compute keys and select a local top k per chunk
+        parallel_select = self.uses_executor and (
+            self.has_sort_key or self.has_sort_cmp
+        )
+
+        filter_fn = None
         if self.has_filter:
             if self.filter.num_call_parameters != 1:
                 filter_fn = MethodInvocation(self.filter).to_lambda(
@@ -95,10 +192,22 @@ class DoKImplementation(BaseControllerImplementation):
                     attr=FILTER_METHOD_NAME,
                     ctx=ast.Load(),
                 )
-            get_elements = ast.Call(
-                func=ast.Name(id="filter", ctx=ast.Load()),
-                args=[filter_fn, get_elements],
-                keywords=[],
+            if not parallel_select:
+                get_elements = self.get_filter_call(
+                    filter_fn, get_elements, additional_globals
+                )
+
+        if self.has_filter_batch:
+            limit = None
+            if (
+                not self.has_sort_key
+                and not self.has_sort_cmp
+                and not self.has_sort_key_batch
+            ):
+                # without a sort, the first k kept elements are chosen, so stop there
+                limit = ast.Name(id=K_ARG_NAME, ctx=ast.Load())
+            get_elements = self.get_filter_batch_call(
+                get_elements, additional_globals, limit
             )
 
         if self.has_sort_key:
@@ -113,18 +222,17 @@ class DoKImplementation(BaseControllerImplementation):
                     ctx=ast.Load(),
                 )
 
-            if self.cls.reverse_sort:
-                sort_fn = ast.Name(id="nlargest", ctx=ast.Load())
-                additional_globals["nlargest"] = nlargest
+            if parallel_select:
+                get_elements = self.get_select_call(
+                    get_elements, filter_fn, sort_fn_key, additional_globals
+                )
             else:
-                sort_fn = ast.Name(id="nsmallest", ctx=ast.Load())
-                additional_globals["nsmallest"] = nsmallest
-
-            get_elements = ast.Call(
-                func=sort_fn,
-                args=[ast.Name(id=K_ARG_NAME, ctx=ast.Load()), get_elements],
-                keywords=[ast.keyword(arg="key", value=sort_fn_key)],
-            )
+                get_elements = self.get_top_k_call(
+                    ast.Name(id=K_ARG_NAME, ctx=ast.Load()),
+                    get_elements,
+                    sort_fn_key,
+                    additional_globals,
+                )
 
         if self.has_sort_cmp:
             if self.sort_cmp.num_call_parameters != 2:
@@ -137,44 +245,70 @@ class DoKImplementation(BaseControllerImplementation):
                     attr=SORT_CMP_METHOD_NAME,
                     ctx=ast.Load(),
                 )
+            sort_fn_key = ast.Call(
+                func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
+                args=[sort_fn_key],
+                keywords=[],
+            )
+            additional_globals["cmp_to_key"] = cmp_to_key
 
-            if self.cls.reverse_sort:
-                sort_fn = ast.Name(id="nlargest", ctx=ast.Load())
-                additional_globals["nlargest"] = nlargest
+            if parallel_select:
+                get_elements = self.get_select_call(
+                    get_elements, filter_fn, sort_fn_key, additional_globals
+                )
             else:
-                sort_fn = ast.Name(id="nsmallest", ctx=ast.Load())
-                additional_globals["nsmallest"] = nsmallest
+                get_elements = self.get_top_k_call(
+                    ast.Name(id=K_ARG_NAME, ctx=ast.Load()),
+                    get_elements,
+                    sort_fn_key,
+                    additional_globals,
+                )
 
-            get_elements = ast.Call(
-                func=sort_fn,
-                args=[ast.Name(id=K_ARG_NAME, ctx=ast.Load()), get_elements],
-                keywords=[
-                    ast.keyword(
-                        arg="key",
-                        value=ast.Call(
-                            func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
-                            args=[sort_fn_key],
-                            keywords=[],
-                        ),
-                    )
-                ],
+        if self.has_sort_key_batch:
+            get_elements = self.get_sort_key_batch_call(
+                get_elements,
+                additional_globals,
+                k=ast.Name(id=K_ARG_NAME, ctx=ast.Load()),
+            )
+
+        elif self.has_filter_batch and not self.has_sort_key and not self.has_sort_cmp:
+            pass  # filter_batch already stopped at the first k kept elements
+
+        elif not self.has_sort_key and not self.has_sort_cmp and self.is_async:
+            # stop reading an async partition as soon as k elements are found
+            get_elements = self.get_take_call(
+                get_elements,
+                ast.Name(id=K_ARG_NAME, ctx=ast.Load()),
+                additional_globals,
             )
-            additional_globals["cmp_to_key"] = cmp_to_key
 
-        if not self.has_sort_key and not self.has_sort_cmp:
+        elif not self.has_sort_key and not self.has_sort_cmp:
             get_elements = ast.Call(
                 func=ast.Name(id="islice", ctx=ast.Load()),
                 args=[get_elements, ast.Name(id=K_ARG_NAME, ctx=ast.Load())],
                 keywords=[],
             )
             additional_globals["islice"] = islice
-            if not self.has_action:
+            if self.chosen_action is None:
                 get_elements = ast.Call(
                     func=ast.Name(id="list", ctx=ast.Load()),
                     args=[get_elements],
                     keywords=[],
                 )
 
+        if self.chosen_action is None and self.uses_columns:
+            get_elements = self.get_selected_rows_call(get_elements, additional_globals)
+
+        if (
+            self.chosen_action is None
+            and self.uses_list_results
+            and (self.has_filter_batch or self.has_sort_key_batch)
+        ):
+            get_elements = self.get_list_results_call(get_elements, additional_globals)
+
+        # the chosen elements are selected in this process, so only actions run in worker processes
+        filter_call = None
+
         if self.has_action:
             action_invoke = MethodInvocation(self.action)
             action_args, action_keywords = action_invoke.get_call_args_and_keywords()
@@ -194,17 +328,33 @@ class DoKImplementation(BaseControllerImplementation):
                         ctx=ast.Load(),
                     )
 
-                action_call = ast.Call(
-                    func=ast.Name(id="list", ctx=ast.Load()),
-                    args=[
-                        ast.Call(
-                            func=ast.Name(id="map", ctx=ast.Load()),
-                            args=[action_fn, get_elements],
-                            keywords=[],
-                        )
-                    ],
-                    keywords=[],
-                )
+                if self.uses_async_actions:
+                    action_call = self.get_async_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.uses_threads:
+                    action_call = self.get_thread_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                elif self.uses_processes:
+                    action_call = self.get_process_map_call(
+                        get_elements,
+                        filter_call,
+                        action_invoke.to_call_arguments(),
+                        additional_globals,
+                    )
+                else:
+                    action_call = ast.Call(
+                        func=ast.Name(id="list", ctx=ast.Load()),
+                        args=[
+                            ast.Call(
+                                func=ast.Name(id="map", ctx=ast.Load()),
+                                args=[action_fn, get_elements],
+                                keywords=[],
+                            )
+                        ],
+                        keywords=[],
+                    )
                 action = ast.Assign(
                     targets=[
                         ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
@@ -212,6 +362,39 @@ class DoKImplementation(BaseControllerImplementation):
                     value=action_call,
                 )
 
+            elif self.uses_processes:
+                # the results are discarded, but still wait for every action to finish
+                action = ast.Expr(
+                    value=self.get_process_map_call(
+                        get_elements,
+                        filter_call,
+                        action_invoke.to_call_arguments(),
+                        additional_globals,
+                    )
+                )
+
+            elif self.uses_threads or self.uses_async_actions:
+                # the results are discarded, but still wait for every action to finish
+                if self.action.num_call_parameters != 1:
+                    action_fn = action_invoke.to_lambda(
+                        [action_args[0].id], name=ACTION_METHOD_NAME
+                    )
+                else:
+                    action_fn = ast.Attribute(
+                        value=ast.Name(id=CLASS_ARG_NAME, ctx=ast.Load()),
+                        attr=ACTION_METHOD_NAME,
+                        ctx=ast.Load(),
+                    )
+                if self.uses_async_actions:
+                    action_call = self.get_async_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                else:
+                    action_call = self.get_thread_map_call(
+                        action_fn, get_elements, additional_globals
+                    )
+                action = ast.Expr(value=action_call)
+
             else:
                 # no need to capture the result from the action, so use a basic for loop
                 action = ast.For(
@@ -229,12 +412,31 @@ class DoKImplementation(BaseControllerImplementation):
 
             body.append(action)
 
-        if self.has_fold:
+        elif self.has_action_batch:
+            action_batch_call = self.get_action_batch_call(
+                get_elements, additional_globals
+            )
+            if self.action_batch.returns_a_value:
+                body.append(
+                    ast.Assign(
+                        targets=[
+                            ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
+                        ],
+                        value=action_batch_call,
+                    )
+                )
+            else:
+                body.append(ast.Expr(value=action_batch_call))
+
+        if self.uses_partial_folds:
+            pass  # the executor already folded each chunk and combined the results
+
+        elif self.has_fold:
             fold_invoke = MethodInvocation(self.fold)
             fold_args, fold_keywords = fold_invoke.get_call_args_and_keywords()
             fold_args.pop(0)
 
-            if self.has_action:
+            if self.chosen_action is not None:
                 fold_args.insert(
                     0, ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Load())
                 )
@@ -243,13 +445,16 @@ class DoKImplementation(BaseControllerImplementation):
 
             fold_assignment = ast.Assign(
                 targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
-                value=fold_invoke.to_function_call(
-                    fold_args, fold_keywords, name=FOLD_METHOD_NAME
+                value=self.await_if_coroutine(
+                    self.fold,
+                    fold_invoke.to_function_call(
+                        fold_args, fold_keywords, name=FOLD_METHOD_NAME
+                    ),
                 ),
             )
             body.append(fold_assignment)
 
-        elif not self.has_action:
+        elif self.chosen_action is None:
             # does not have an action, return whatever is get_elements
             get_elements_result = ast.Assign(
                 targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
@@ -261,9 +466,17 @@ class DoKImplementation(BaseControllerImplementation):
             post_controller_call = MethodInvocation(
                 self.post_controller
             ).to_function_call(name=POST_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=post_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.post_controller, post_controller_call
+                    )
+                )
+            )
 
-        if not self.has_fold and (self.has_action and not self.action.returns_a_value):
+        if not self.has_fold and (
+            self.chosen_action is not None and not self.chosen_action.returns_a_value
+        ):
             pass  # do nothing since we explicitly do not need a return value here
         else:
             body.append(
@@ -278,13 +491,7 @@ class DoKImplementation(BaseControllerImplementation):
             use_partition_arg=True,
         )
         additional_globals.update(saved_defaults)
-        call_fn = ast.FunctionDef(
-            name=GENERATED_CALL_METHOD_NAME,
-            args=args,
-            body=body,
-            decorator_list=[],
-            type_params=[],
-        )
+        call_fn = self.get_call_function_def(args, body)
 
         module = ast.fix_missing_locations(ast.Module(body=[call_fn], type_ignores=[]))
         return self.compile_call_method(module, additional_globals)
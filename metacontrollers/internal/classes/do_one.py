@@ -1,24 +1,25 @@
 import ast
 import warnings
 from functools import cmp_to_key
-from heapq import nlargest, nsmallest
 from itertools import islice
 from typing import Any, Callable
 
 from metacontrollers.internal.exceptions import InvalidControllerMethodError
 from metacontrollers.internal.method_invocation import MethodInvocation
 from metacontrollers.internal.namespace import (
+    ACTION_BATCH_METHOD_NAME,
     ACTION_METHOD_NAME,
     ACTION_RESULT_ASSIGNMENT_NAME,
+    BATCH_SUBMIT_NAME,
     CHOSEN_ARG_NAME,
     CLASS_ARG_NAME,
+    FILTER_BATCH_METHOD_NAME,
     FILTER_METHOD_NAME,
     FOLD_METHOD_NAME,
-    GENERATED_CALL_METHOD_NAME,
-    PARTITION_ARG_NAME,
     POST_CONTROLLER_METHOD_NAME,
     PRE_CONTROLLER_METHOD_NAME,
     SORT_CMP_METHOD_NAME,
+    SORT_KEY_BATCH_METHOD_NAME,
     SORT_KEY_METHOD_NAME,
 )
 
@@ -26,8 +27,19 @@ from ._base import BaseControllerImplementation
 
 
 class DoOneImplementation(BaseControllerImplementation):
+    # coalesced implementations hand the chosen element to a shared action_batch call
+    coalesced = False
+
     def __init__(self, cls, name, bases, attrs, stack_frame) -> None:
-        super().__init__(cls, name, bases, attrs, stack_frame, fold_enabled=False)
+        super().__init__(
+            cls,
+            name,
+            bases,
+            attrs,
+            stack_frame,
+            fold_enabled=False,
+            fold_combine_enabled=False,
+        )
 
     def validate(self) -> None:
         super().validate()
@@ -47,6 +59,24 @@ class DoOneImplementation(BaseControllerImplementation):
                     f'"{FILTER_METHOD_NAME}" should be defined with at least 1 non-class argument (chosen), but 0 were given.'
                 )
 
+        if self.has_filter and self.has_filter_batch:
+            raise InvalidControllerMethodError(
+                f'DoOne controller "{self.name}" is invalid because both "{FILTER_METHOD_NAME}" and "{FILTER_BATCH_METHOD_NAME}" are defined. You must define only one.'
+            )
+
+        if self.has_sort_key_batch and (self.has_sort_key or self.has_sort_cmp):
+            raise InvalidControllerMethodError(
+                f'DoOne controller "{self.name}" is invalid because "{SORT_KEY_BATCH_METHOD_NAME}" is defined together with "{SORT_KEY_METHOD_NAME}" or "{SORT_CMP_METHOD_NAME}". You must define only one sort method.'
+            )
+
+        for method in (self.filter_batch, self.sort_key_batch):
+            if method is not None and len(method.call_args) < 1:
+                raise AttributeError(
+                    f'"{method.name}" should be defined with at least 1 non-class argument (the partition), but 0 were given.'
+                )
+
+        self.validate_column_options()
+
         if self.has_sort_key:
             if len(self.sort_key.call_args) < 1:
                 raise AttributeError(
@@ -65,16 +95,28 @@ class DoOneImplementation(BaseControllerImplementation):
                     f'"{ACTION_METHOD_NAME}" should be defined with at least 1 non-class argument (chosen), but 0 were given.'
                 )
 
+        if self.has_action_batch:
+            if len(self.action_batch.call_args) < 1:
+                raise AttributeError(
+                    f'"{ACTION_BATCH_METHOD_NAME}" should be defined with at least 1 non-class argument (the list of chosen elements), but 0 were given.'
+                )
+
     def generate_call_method(self) -> Callable[..., Any]:
         body = []
         additional_globals = {}
-        get_elements = ast.Name(id=PARTITION_ARG_NAME, ctx=ast.Load())
+        get_elements = self.get_partition(additional_globals)
 
         if self.has_pre_controller:
             pre_controller_call = MethodInvocation(
                 self.pre_controller
             ).to_function_call(name=PRE_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=pre_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.pre_controller, pre_controller_call
+                    )
+                )
+            )
 
         if self.has_filter:
             if self.filter.num_call_parameters != 1:
@@ -87,10 +129,21 @@ class DoOneImplementation(BaseControllerImplementation):
                     attr=FILTER_METHOD_NAME,
                     ctx=ast.Load(),
                 )
-            get_elements = ast.Call(
-                func=ast.Name(id="filter", ctx=ast.Load()),
-                args=[filter_fn, get_elements],
-                keywords=[],
+            get_elements = self.get_filter_call(
+                filter_fn, get_elements, additional_globals
+            )
+
+        if self.has_filter_batch:
+            limit = None
+            if (
+                not self.has_sort_key
+                and not self.has_sort_cmp
+                and not self.has_sort_key_batch
+            ):
+                # without a sort, the first kept element is chosen, so stop there
+                limit = ast.Constant(value=1, kind="int")
+            get_elements = self.get_filter_batch_call(
+                get_elements, additional_globals, limit
             )
 
         if self.has_sort_key:
@@ -105,17 +158,11 @@ class DoOneImplementation(BaseControllerImplementation):
                     ctx=ast.Load(),
                 )
 
-            if self.cls.reverse_sort:
-                sort_fn = ast.Name(id="nlargest", ctx=ast.Load())
-                additional_globals["nlargest"] = nlargest
-            else:
-                sort_fn = ast.Name(id="nsmallest", ctx=ast.Load())
-                additional_globals["nsmallest"] = nsmallest
-
-            get_elements = ast.Call(
-                func=sort_fn,
-                args=[ast.Constant(value=1, kind="int"), get_elements],
-                keywords=[ast.keyword(arg="key", value=sort_fn_key)],
+            get_elements = self.get_top_k_call(
+                ast.Constant(value=1, kind="int"),
+                get_elements,
+                sort_fn_key,
+                additional_globals,
             )
 
         if self.has_sort_cmp:
@@ -130,30 +177,34 @@ class DoOneImplementation(BaseControllerImplementation):
                     ctx=ast.Load(),
                 )
 
-            if self.cls.reverse_sort:
-                sort_fn = ast.Name(id="nlargest", ctx=ast.Load())
-                additional_globals["nlargest"] = nlargest
-            else:
-                sort_fn = ast.Name(id="nsmallest", ctx=ast.Load())
-                additional_globals["nsmallest"] = nsmallest
-
-            get_elements = ast.Call(
-                func=sort_fn,
-                args=[ast.Constant(value=1, kind="int"), get_elements],
-                keywords=[
-                    ast.keyword(
-                        arg="key",
-                        value=ast.Call(
-                            func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
-                            args=[sort_fn_key],
-                            keywords=[],
-                        ),
-                    )
-                ],
+            get_elements = self.get_top_k_call(
+                ast.Constant(value=1, kind="int"),
+                get_elements,
+                ast.Call(
+                    func=ast.Name(id="cmp_to_key", ctx=ast.Load()),
+                    args=[sort_fn_key],
+                    keywords=[],
+                ),
+                additional_globals,
             )
             additional_globals["cmp_to_key"] = cmp_to_key
 
-        if not self.has_sort_key and not self.has_sort_cmp:
+        if self.has_sort_key_batch:
+            # a single element, which numpy array partitions select with argmin/argmax
+            get_elements = self.get_sort_key_batch_call(
+                get_elements, additional_globals, k=ast.Constant(value=1, kind="int")
+            )
+
+        elif self.has_filter_batch and not self.has_sort_key and not self.has_sort_cmp:
+            pass  # filter_batch already stopped at the first kept element
+
+        elif not self.has_sort_key and not self.has_sort_cmp and self.is_async:
+            # stop reading an async partition as soon as the first element is found
+            get_elements = self.get_take_call(
+                get_elements, ast.Constant(value=1, kind="int"), additional_globals
+            )
+
+        elif not self.has_sort_key and not self.has_sort_cmp:
             get_elements = ast.Call(
                 func=ast.Name(id="islice", ctx=ast.Load()),
                 args=[get_elements, ast.Constant(value=1, kind="int")],
@@ -173,7 +224,24 @@ class DoOneImplementation(BaseControllerImplementation):
         )
         body.append(chosen_element)
 
-        if self.has_action:
+        if self.coalesced:
+            # the batch runs action_batch with the chosen elements of several calls
+            submit_call = ast.Call(
+                func=ast.Name(id=BATCH_SUBMIT_NAME, ctx=ast.Load()),
+                args=[
+                    ast.Subscript(
+                        value=ast.Name(id=CHOSEN_ARG_NAME, ctx=ast.Load()),
+                        slice=ast.Index(value=ast.Constant(value=0)),
+                        ctx=ast.Load(),
+                    )
+                ],
+                keywords=[],
+            )
+            action_result = ast.Assign(
+                targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
+                value=ast.Await(value=submit_call) if self.is_async else submit_call,
+            )
+        elif self.has_action:
             action_invoke = MethodInvocation(self.action)
             action_args, action_keywords = action_invoke.get_call_args_and_keywords()
 
@@ -189,10 +257,50 @@ class DoOneImplementation(BaseControllerImplementation):
             )
             action_result = ast.Assign(
                 targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
-                value=MethodInvocation(self.action).to_function_call(
-                    action_args, action_keywords, name=ACTION_METHOD_NAME
+                value=self.await_if_coroutine(
+                    self.action,
+                    MethodInvocation(self.action).to_function_call(
+                        action_args, action_keywords, name=ACTION_METHOD_NAME
+                    ),
+                ),
+            )
+        elif self.has_action_batch:
+            # a batch of one element
+            action_batch_invoke = MethodInvocation(self.action_batch)
+            action_batch_args, action_batch_keywords = (
+                action_batch_invoke.get_call_args_and_keywords()
+            )
+            action_batch_args[0] = ast.List(
+                elts=[
+                    ast.Subscript(
+                        value=ast.Name(id=CHOSEN_ARG_NAME, ctx=ast.Load()),
+                        slice=ast.Index(value=ast.Constant(value=0)),
+                        ctx=ast.Load(),
+                    )
+                ],
+                ctx=ast.Load(),
+            )
+            action_batch_call = self.await_if_coroutine(
+                self.action_batch,
+                action_batch_invoke.to_function_call(
+                    action_batch_args,
+                    action_batch_keywords,
+                    name=ACTION_BATCH_METHOD_NAME,
                 ),
             )
+            if self.action_batch.returns_a_value:
+                action_result = ast.Assign(
+                    targets=[
+                        ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())
+                    ],
+                    value=ast.Subscript(
+                        value=action_batch_call,
+                        slice=ast.Index(value=ast.Constant(value=0)),
+                        ctx=ast.Load(),
+                    ),
+                )
+            else:
+                action_result = ast.Expr(value=action_batch_call)
         else:
             action_result = ast.Assign(
                 targets=[ast.Name(id=ACTION_RESULT_ASSIGNMENT_NAME, ctx=ast.Store())],
@@ -229,7 +337,13 @@ class DoOneImplementation(BaseControllerImplementation):
             post_controller_call = MethodInvocation(
                 self.post_controller
             ).to_function_call(name=POST_CONTROLLER_METHOD_NAME)
-            body.append(ast.Expr(value=post_controller_call))
+            body.append(
+                ast.Expr(
+                    value=self.await_if_coroutine(
+                        self.post_controller, post_controller_call
+                    )
+                )
+            )
 
         if self.has_action:
             body.append(
@@ -251,13 +365,7 @@ class DoOneImplementation(BaseControllerImplementation):
         )
 
         additional_globals.update(saved_defaults)
-        call_fn = ast.FunctionDef(
-            name=GENERATED_CALL_METHOD_NAME,
-            args=args,
-            body=body,
-            decorator_list=[],
-            type_params=[],
-        )
+        call_fn = self.get_call_function_def(args, body)
 
         module = ast.fix_missing_locations(ast.Module(body=[call_fn], type_ignores=[]))
         return self.compile_call_method(module, additional_globals)
@@ -0,0 +1,383 @@
+import asyncio
+import inspect
+import threading
+from numbers import Real
+from types import CodeType, MethodType
+from typing import Any, List, Tuple, Union
+
+from metacontrollers.internal.batching import get_batch_results
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.classes.coalesced import (
+    AsyncCoalescedDoOneImplementation,
+    CoalescedDoOneImplementation,
+)
+from metacontrollers.internal.exceptions import InvalidControllerMethodError
+from metacontrollers.internal.generation_cache import (
+    CODE_CACHE,
+    NAMESPACE_CACHE,
+    instantiate_call_method,
+)
+from metacontrollers.internal.interface import AsyncDoOne, DoOne
+from metacontrollers.internal.method_inspector import MethodInspector
+from metacontrollers.internal.namespace import (
+    ACTION_BATCH_METHOD_NAME,
+    BATCH_SUBMIT_NAME,
+    COALESCED_METHODS_NAME,
+    GENERATED_CALL_METHOD_NAME,
+)
+
+# (code, globals, defaults, kwdefaults) of a coalesced call method, without the batch
+CoalescedMethod = Tuple[CodeType, dict, tuple, Union[dict, None]]
+
+_lock = threading.Lock()
+
+
+def get_coalesced_method(cls: type, is_async: bool) -> CoalescedMethod:
+    """
+    Returns the compiled coalesced call method of a DoOne or AsyncDoOne controller class,
+    generating it the first time. Each coalescer instantiates it against its own globals,
+    where the submit function of its batches is defined.
+
+    Args:
+        cls (type): controller class, which defines action_batch.
+        is_async (bool): if True, the call method is an async def that awaits the batch.
+
+    Returns:
+        CoalescedMethod: code, globals, argument defaults and keyword argument defaults.
+    """
+    methods = vars(cls).get(COALESCED_METHODS_NAME)
+    if methods is not None and is_async in methods:
+        return methods[is_async]
+
+    with _lock:
+        methods = vars(cls).get(COALESCED_METHODS_NAME)
+        if methods is None:
+            methods = {}
+            setattr(cls, COALESCED_METHODS_NAME, methods)
+        elif is_async in methods:
+            return methods[is_async]
+
+        call_method = cls.__call__
+        if hasattr(call_method, "__ctrl_pending__"):
+            DEFERRED_COMPILATION.compile_all()
+            call_method = cls.__call__
+
+        args = (
+            cls,
+            cls.__name__,
+            cls.__bases__,
+            dict(vars(cls)),
+            inspect.currentframe(),
+        )
+        if issubclass(cls, AsyncDoOne):
+            controller = AsyncCoalescedDoOneImplementation(*args)
+        else:
+            controller = CoalescedDoOneImplementation(*args, is_async)
+        controller.validate()
+        with DEFERRED_COMPILATION.suspended():
+            controller.generate_call_method()
+
+        methods[is_async] = (
+            CODE_CACHE.get_or_compile(
+                controller.call_method_module, GENERATED_CALL_METHOD_NAME
+            ),
+            NAMESPACE_CACHE.get(
+                call_method.__globals__.get("__name__"),
+                call_method.__globals__["__builtins__"],
+                controller.call_method_globals,
+            ),
+            call_method.__defaults__ or (),
+            call_method.__kwdefaults__,
+        )
+        return methods[is_async]
+
+
+def batches_chosen_elements(cls: type) -> bool:
+    """
+    True if the calls of a batch can share one action_batch call: the controller defines
+    action_batch, and it takes nothing but the list of chosen elements, since the other
+    arguments may differ from call to call.
+    """
+    action_batch = vars(cls).get(ACTION_BATCH_METHOD_NAME)
+    return (
+        action_batch is not None
+        and MethodInspector(action_batch).num_call_parameters == 1
+    )
+
+
+def validate_coalescing_options(max_batch_size: int, max_delay: float) -> None:
+    if (
+        not isinstance(max_batch_size, int)
+        or isinstance(max_batch_size, bool)
+        or max_batch_size < 1
+    ):
+        raise ValueError(
+            f"max_batch_size must be a positive integer, but {max_batch_size!r} was given."
+        )
+    if not isinstance(max_delay, Real) or isinstance(max_delay, bool) or max_delay < 0:
+        raise ValueError(
+            f"max_delay must be a number of seconds >= 0, but {max_delay!r} was given."
+        )
+
+
+def run_calls(
+    controller: DoOne, items: List[Tuple[Any, tuple, dict]]
+) -> Tuple[List[Any], List[Union[BaseException, None]]]:
+    """
+    Runs a batch of whole controller calls, (partition, args, kwargs) each. When every
+    call passes the same argument objects, the batch runs through iter_many, which binds
+    the controlled methods once for the whole batch; otherwise the calls are made one by
+    one. A call that raises only fails its own caller.
+
+    Returns:
+        Tuple[List[Any], List[Union[BaseException, None]]]: result and exception of each call.
+    """
+    results: List[Any] = [None] * len(items)
+    errors: List[Union[BaseException, None]] = [None] * len(items)
+    _, first_args, first_kwargs = items[0]
+    index = 0
+    if all(
+        len(args) == len(first_args)
+        and all(arg is first_arg for arg, first_arg in zip(args, first_args))
+        and kwargs.keys() == first_kwargs.keys()
+        and all(kwargs[name] is first_kwargs[name] for name in kwargs)
+        for _, args, kwargs in items
+    ):
+        try:
+            for result in controller.iter_many(
+                [partition for partition, _, _ in items], *first_args, **first_kwargs
+            ):
+                results[index] = result
+                index += 1
+        except BaseException as error:
+            errors[index] = error
+            index += 1
+
+    for index in range(index, len(items)):
+        partition, args, kwargs = items[index]
+        try:
+            results[index] = controller(partition, *args, **kwargs)
+        except BaseException as error:
+            errors[index] = error
+    return results, errors
+
+
+class _Batch:
+    __slots__ = ("items", "results", "errors", "full", "done")
+
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+        self.results: List[Any] = []
+        self.errors: List[Union[BaseException, None]] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class Coalescer:
+    """
+    Coalesces concurrent calls of a DoOne controller from many threads into batches:
+
+        coalesced = Coalescer(controller, max_batch_size=64, max_delay=0.001)
+        result = coalesced(partition, *args)  # from any thread
+
+    The first call of a batch waits for up to max_delay seconds, or until max_batch_size
+    calls have joined, then runs the batch on its own thread and hands every caller its
+    result (or exception).
+
+    If the controller defines an action_batch that only takes the list of chosen elements,
+    each caller still runs pre_controller, filter, sort and post_controller itself, and
+    only the chosen elements are batched: one action_batch call receives the chosen
+    element of every call in the batch. Otherwise whole calls are batched and run one
+    after another (through iter_many when they pass the same arguments).
+
+    Args:
+        controller (DoOne): controller instance.
+        max_batch_size (int, optional): calls per batch. Defaults to 64.
+        max_delay (float, optional): seconds the first call of a batch waits for others. Defaults to 0.001.
+    """
+
+    def __init__(
+        self, controller: DoOne, /, max_batch_size: int = 64, max_delay: float = 0.001
+    ) -> None:
+        if not isinstance(controller, DoOne):
+            raise TypeError(
+                f"Coalescer takes a DoOne controller, but {type(controller).__name__} was given."
+            )
+        validate_coalescing_options(max_batch_size, max_delay)
+        self.controller = controller
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.__lock = threading.Lock()
+        self.__pending: Union[_Batch, None] = None
+
+        cls = type(controller)
+        if batches_chosen_elements(cls):
+            code, _globals, defaults, kwdefaults = get_coalesced_method(cls, False)
+            call_method = instantiate_call_method(
+                code,
+                {**_globals, BATCH_SUBMIT_NAME: self.__submit},
+                defaults,
+                kwdefaults,
+            )
+            self.__call = MethodType(call_method, controller)
+            self.__run = self.__run_action_batch
+        else:
+            self.__call = None
+            self.__run = self.__run_calls
+
+    def __call__(self, partition: Any, /, *args: Any, **kwargs: Any) -> Any:
+        if self.__call is not None:
+            return self.__call(partition, *args, **kwargs)
+        return self.__submit((partition, args, kwargs))
+
+    def __submit(self, item: Any) -> Any:
+        with self.__lock:
+            batch = self.__pending
+            leader = batch is None
+            if leader:
+                batch = self.__pending = _Batch()
+            index = len(batch.items)
+            batch.items.append(item)
+            if index + 1 >= self.max_batch_size:
+                self.__pending = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_delay)
+            with self.__lock:
+                if self.__pending is batch:
+                    self.__pending = None
+            try:
+                self.__run(batch)
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        error = batch.errors[index]
+        if error is not None:
+            raise error
+        return batch.results[index]
+
+    def __run_action_batch(self, batch: _Batch) -> None:
+        try:
+            batch.results = get_batch_results(
+                self.controller.action_batch(batch.items), len(batch.items)
+            )
+            batch.errors = [None] * len(batch.items)
+        except BaseException as error:
+            batch.errors = [error] * len(batch.items)
+
+    def __run_calls(self, batch: _Batch) -> None:
+        batch.results, batch.errors = run_calls(self.controller, batch.items)
+
+
+class _AsyncBatch:
+    __slots__ = ("items", "results", "errors", "done", "timer")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.items: List[Any] = []
+        self.results: List[Any] = []
+        self.errors: List[Union[BaseException, None]] = []
+        self.done = loop.create_future()
+        self.timer: Union[asyncio.TimerHandle, None] = None
+
+
+class AsyncCoalescer:
+    """
+    Coalescer for coroutines on one event loop, for DoOne and AsyncDoOne controllers:
+
+        coalesced = AsyncCoalescer(controller, max_batch_size=64, max_delay=0.001)
+        result = await coalesced(partition, *args)
+
+    A batch runs max_delay seconds after its first call, or as soon as max_batch_size
+    calls have joined. A coroutine action_batch is awaited. AsyncDoOne controllers must
+    define an action_batch that only takes the list of chosen elements, since their calls
+    cannot be run one after another in a batch without losing their concurrency.
+
+    Args:
+        controller (Union[DoOne, AsyncDoOne]): controller instance.
+        max_batch_size (int, optional): calls per batch. Defaults to 64.
+        max_delay (float, optional): seconds the first call of a batch waits for others. Defaults to 0.001.
+    """
+
+    def __init__(
+        self,
+        controller: Union[DoOne, AsyncDoOne],
+        /,
+        max_batch_size: int = 64,
+        max_delay: float = 0.001,
+    ) -> None:
+        if not isinstance(controller, (DoOne, AsyncDoOne)):
+            raise TypeError(
+                f"AsyncCoalescer takes a DoOne or AsyncDoOne controller, but {type(controller).__name__} was given."
+            )
+        validate_coalescing_options(max_batch_size, max_delay)
+        cls = type(controller)
+        has_action_batch = batches_chosen_elements(cls)
+        if isinstance(controller, AsyncDoOne) and not has_action_batch:
+            raise InvalidControllerMethodError(
+                f'AsyncCoalescer needs "{cls.__name__}" to define "{ACTION_BATCH_METHOD_NAME}" with only 1 non-class argument (the list of chosen elements).'
+            )
+        self.controller = controller
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.__pending: Union[_AsyncBatch, None] = None
+
+        if has_action_batch:
+            code, _globals, defaults, kwdefaults = get_coalesced_method(cls, True)
+            call_method = instantiate_call_method(
+                code,
+                {**_globals, BATCH_SUBMIT_NAME: self.__submit},
+                defaults,
+                kwdefaults,
+            )
+            self.__call = MethodType(call_method, controller)
+            self.__run = self.__run_action_batch
+        else:
+            self.__call = None
+            self.__run = self.__run_calls
+
+    async def __call__(self, partition: Any, /, *args: Any, **kwargs: Any) -> Any:
+        if self.__call is not None:
+            return await self.__call(partition, *args, **kwargs)
+        return await self.__submit((partition, args, kwargs))
+
+    async def __submit(self, item: Any) -> Any:
+        batch = self.__pending
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self.__pending = _AsyncBatch(loop)
+            batch.timer = loop.call_later(self.max_delay, self.__flush, batch)
+        index = len(batch.items)
+        batch.items.append(item)
+        if index + 1 >= self.max_batch_size:
+            batch.timer.cancel()
+            self.__flush(batch)
+
+        # a cancelled caller must not cancel the batch of the others
+        await asyncio.shield(batch.done)
+        error = batch.errors[index]
+        if error is not None:
+            raise error
+        return batch.results[index]
+
+    def __flush(self, batch: _AsyncBatch) -> None:
+        if self.__pending is batch:
+            self.__pending = None
+        asyncio.ensure_future(self.__run(batch))
+
+    async def __run_action_batch(self, batch: _AsyncBatch) -> None:
+        try:
+            results = self.controller.action_batch(batch.items)
+            if inspect.isawaitable(results):
+                results = await results
+            batch.results = get_batch_results(results, len(batch.items))
+            batch.errors = [None] * len(batch.items)
+        except BaseException as error:
+            batch.errors = [error] * len(batch.items)
+        batch.done.set_result(None)
+
+    async def __run_calls(self, batch: _AsyncBatch) -> None:
+        batch.results, batch.errors = run_calls(self.controller, batch.items)
+        batch.done.set_result(None)
@@ -0,0 +1,148 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Union
+
+from metacontrollers.internal.arrays import is_array
+
+
+def take(column: Any, rows: Sequence[int]) -> Any:
+    """
+    Returns the values of a column at the given rows: an array for a numpy column, a
+    list otherwise.
+    """
+    if is_array(column):
+        return column[rows]
+    return list(map(column.__getitem__, rows))
+
+
+class Columns:
+    """
+    A columnar partition: a mapping of column names to columns of the same length (lists,
+    array.array or numpy arrays) or a numpy structured array, together with the rows of it
+    that were selected so far (all of them if rows is None). Its elements are rows, which
+    are only built when they are read: dicts of column names to values, or the records of
+    a structured array.
+    """
+
+    __slots__ = ("source", "rows", "num_rows")
+
+    def __init__(self, source: Any, rows: Union[List[int], None] = None) -> None:
+        self.source = source
+        self.rows = rows
+        if rows is not None:
+            self.num_rows = len(rows)
+        elif is_array(source):
+            self.num_rows = len(source)
+        else:
+            lengths = {len(column) for column in source.values()}
+            if len(lengths) > 1:
+                raise ValueError(
+                    f"The columns of a columnar partition must have the same length, but columns of lengths {sorted(lengths)} were given."
+                )
+            self.num_rows = lengths.pop() if lengths else 0
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, position: int) -> Any:
+        row = position if self.rows is None else self.rows[position]
+        if is_array(self.source):
+            return self.source[row]
+        return {name: column[row] for name, column in self.source.items()}
+
+    def __iter__(self) -> Iterator[Any]:
+        if is_array(self.source):
+            return iter(self.source if self.rows is None else self.source[self.rows])
+        names = list(self.source)
+        if self.rows is None:
+            columns = [self.source[name] for name in names]
+        else:
+            columns = [take(self.source[name], self.rows) for name in names]
+        return (dict(zip(names, values)) for values in zip(*columns))
+
+    def get_columns(
+        self, names: Sequence[str], start: int, stop: int
+    ) -> Dict[str, Any]:
+        """
+        Returns the named columns of the selected rows from position start to stop:
+        slices of the columns (views for numpy columns) if no rows were selected yet.
+        """
+        if self.rows is None:
+            return {name: self.source[name][start:stop] for name in names}
+        rows = self.rows[start:stop]
+        return {name: take(self.source[name], rows) for name in names}
+
+    def get_positions(self) -> Any:
+        """
+        Returns the positions of the selected rows, which the batching helpers filter, sort
+        and select in place of the rows: a numpy array if every column is a numpy array,
+        so they are selected with numpy too, and a list otherwise.
+        """
+        if is_array(self.source):
+            columns = [self.source]
+        else:
+            columns = list(self.source.values())
+        if columns and all(map(is_array, columns)):
+            import numpy
+
+            return numpy.arange(self.num_rows)
+        return list(range(self.num_rows))
+
+    def select(self, positions: Any) -> "Columns":
+        """
+        Returns the selected rows at the given positions, in the order of positions.
+        """
+        if self.rows is not None:
+            if is_array(positions):
+                positions = self.rows[positions]
+            else:
+                positions = list(map(self.rows.__getitem__, positions))
+        return Columns(self.source, positions)
+
+    def get_batch_fn(self, fn: Callable[[Any], Any]) -> Callable[[List[int]], Any]:
+        """
+        Returns the function that the batching helpers call with each batch of
+        consecutive positions of the selected rows: it passes fn the columns it declares
+        (see ColumnReader), or the rows themselves.
+        """
+        if isinstance(fn, ColumnReader):
+            return lambda positions: fn.fn(
+                self.get_columns(fn.names, positions[0], positions[-1] + 1)
+            )
+        return lambda positions: fn(list(map(self.__getitem__, positions)))
+
+
+class ColumnReader:
+    """
+    Calls filter_batch or sort_key_batch with the columns it declares, as a dict of
+    column names to column vectors, instead of a batch of rows. Batches of rows of a
+    partition that is not columnar are transposed into those columns.
+    """
+
+    __slots__ = ("fn", "names")
+
+    def __init__(self, fn: Callable[[Dict[str, Any]], Any], names: Sequence[str]):
+        self.fn = fn
+        self.names = names
+
+    def __call__(self, rows: List[Any]) -> Any:
+        return self.fn({name: [row[name] for row in rows] for name in self.names})
+
+
+def to_columns(partition: Any) -> Any:
+    """
+    Returns a mapping of columns or a numpy structured array as a columnar partition, and
+    any other partition as it is.
+    """
+    if isinstance(partition, Mapping) or (
+        is_array(partition) and partition.dtype.names is not None
+    ):
+        return Columns(partition)
+    return partition
+
+
+def to_rows(elements: Any) -> Any:
+    """
+    Returns the selected rows of a columnar partition as a list, and any other selection
+    as it is.
+    """
+    return list(elements) if isinstance(elements, Columns) else elements
@@ -0,0 +1,121 @@
+import inspect
+import threading
+from numbers import Real
+from types import MethodType
+from typing import Any, Awaitable, Callable
+
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.classes.async_do import CooperativeDoAllImplementation
+from metacontrollers.internal.generation_cache import (
+    CODE_CACHE,
+    NAMESPACE_CACHE,
+    instantiate_call_method,
+)
+from metacontrollers.internal.interface import DoAll
+from metacontrollers.internal.namespace import (
+    COOPERATIVE_METHODS_NAME,
+    GENERATED_CALL_METHOD_NAME,
+)
+
+# seconds a cooperative call runs before yielding to the event loop
+DEFAULT_TIME_SLICE = 0.005
+
+_lock = threading.Lock()
+
+
+def cooperative(
+    controller: DoAll, /, time_slice: float = DEFAULT_TIME_SLICE
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Wraps a synchronous DoAll controller for use inside an asyncio event loop. The returned
+    coroutine function takes the same arguments as the controller and returns the same
+    result, but yields to the event loop with asyncio.sleep(0) whenever it has run for
+    time_slice seconds, instead of blocking the loop for the whole partition:
+
+        results = await cooperative(controller)(partition, minimum)
+
+    pre_controller, filter, sort, action, fold and post_controller run in the same order
+    as a regular call. Filtering, computing sort keys, sorting and the actions are sliced;
+    a single call of a controlled method (such as fold) is never interrupted.
+
+    Args:
+        controller (DoAll): controller instance. It cannot use an executor.
+        time_slice (float, optional): seconds to run before yielding. Defaults to 0.005.
+
+    Returns:
+        Callable[..., Awaitable[Any]]: cooperative call method bound to the controller.
+    """
+    if not isinstance(controller, DoAll):
+        raise TypeError(
+            f"cooperative() takes a DoAll controller, but {type(controller).__name__} was given."
+        )
+    if (
+        not isinstance(time_slice, Real)
+        or isinstance(time_slice, bool)
+        or time_slice <= 0
+    ):
+        raise ValueError(
+            f"cooperative() time_slice must be a positive number of seconds, but {time_slice!r} was given."
+        )
+    return MethodType(
+        get_cooperative_method(type(controller), float(time_slice)), controller
+    )
+
+
+def get_cooperative_method(cls: type, time_slice: float) -> Callable[..., Any]:
+    """
+    Returns the cooperative call method of a controller class for a time slice, generating
+    it the first time. It is bound to the same builtins, module name and argument defaults
+    as the class's call method.
+
+    Args:
+        cls (type): DoAll controller class.
+        time_slice (float): seconds to run before yielding to the event loop.
+
+    Returns:
+        Callable[..., Any]: generated async call method.
+    """
+    methods = vars(cls).get(COOPERATIVE_METHODS_NAME)
+    if methods is not None and time_slice in methods:
+        return methods[time_slice]
+
+    with _lock:
+        methods = vars(cls).get(COOPERATIVE_METHODS_NAME)
+        if methods is None:
+            methods = {}
+            setattr(cls, COOPERATIVE_METHODS_NAME, methods)
+        elif time_slice in methods:
+            return methods[time_slice]
+
+        call_method = cls.__call__
+        if hasattr(call_method, "__ctrl_pending__"):
+            DEFERRED_COMPILATION.compile_all()
+            call_method = cls.__call__
+
+        controller = CooperativeDoAllImplementation(
+            cls,
+            cls.__name__,
+            cls.__bases__,
+            dict(vars(cls)),
+            inspect.currentframe(),
+            time_slice,
+        )
+        controller.validate()
+        with DEFERRED_COMPILATION.suspended():
+            controller.generate_call_method()
+
+        code = CODE_CACHE.get_or_compile(
+            controller.call_method_module, GENERATED_CALL_METHOD_NAME
+        )
+        method = instantiate_call_method(
+            code,
+            NAMESPACE_CACHE.get(
+                call_method.__globals__.get("__name__"),
+                call_method.__globals__["__builtins__"],
+                controller.call_method_globals,
+            ),
+            call_method.__defaults__ or (),
+            call_method.__kwdefaults__,
+        )
+        methods[time_slice] = method
+        return method
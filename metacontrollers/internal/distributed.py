@@ -0,0 +1,381 @@
+import os
+import pickle
+import sys
+import threading
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Deque, Dict, Iterable, List, Tuple, Union
+
+from metacontrollers.internal.exceptions import WorkerUnavailableError
+from metacontrollers.internal.executors import (
+    DEFAULT_PROCESS_CHUNK_SIZE,
+    MethodCall,
+    SHARED_EXECUTORS,
+    combine_partial_folds,
+    iter_chunks,
+    pickle_controller,
+    run_controller_chunk,
+)
+from metacontrollers.internal.namespace import (
+    FOLD_COMBINE_METHOD_NAME,
+    FOLD_METHOD_NAME,
+)
+
+# environment variables shared by the worker servers and the controllers that use them
+AUTHKEY_ENV_NAME = "METACONTROLLERS_AUTHKEY"
+WORKERS_ENV_NAME = "METACONTROLLERS_WORKERS"
+
+# chunks sent to a worker before waiting for its first result, so it is never idle
+PENDING_CHUNKS_PER_WORKER = 2
+
+# messages sent between controllers and worker servers
+CONTROLLER_MESSAGE = "controller"
+CHUNK_MESSAGE = "chunk"
+CLOSE_MESSAGE = "close"
+RESULT_MESSAGE = "result"
+ERROR_MESSAGE = "error"
+
+Address = Tuple[str, int]
+
+
+def parse_address(address: str) -> Address:
+    """
+    Parses a "host:port" worker address.
+    """
+    host, separator, port = address.rpartition(":")
+    if not separator or not host or not port.isdigit():
+        raise ValueError(f'Invalid worker address "{address}"; expected "host:port".')
+    return host, int(port)
+
+
+def get_authkey(authkey: Union[str, bytes, None] = None) -> bytes:
+    """
+    Returns the key that controllers and worker servers authenticate each other with,
+    read from the METACONTROLLERS_AUTHKEY environment variable if not given. Worker
+    servers unpickle what they receive, so they are never run without one.
+    """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV_NAME)
+    if not authkey:
+        raise ValueError(
+            f"Distributed workers require an authentication key; set the {AUTHKEY_ENV_NAME} environment variable."
+        )
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def get_worker_addresses(workers: Union[Tuple[str, ...], None]) -> List[Address]:
+    """
+    Returns the addresses of the worker servers of a controller, read from the
+    comma separated METACONTROLLERS_WORKERS environment variable if the controller does
+    not set its workers option.
+    """
+    if workers is None:
+        workers = [
+            address.strip()
+            for address in os.environ.get(WORKERS_ENV_NAME, "").split(",")
+            if address.strip()
+        ]
+    if not workers:
+        raise WorkerUnavailableError(
+            f"No distributed workers were given; set the workers option or the {WORKERS_ENV_NAME} environment variable."
+        )
+    return [parse_address(address) for address in workers]
+
+
+class DistributedRun:
+    """
+    Shards one partition across worker servers. Each worker gets its own connection and
+    thread that keeps a few chunks in flight, so workers pull chunks as fast as they
+    finish them. The chunks of a worker that fails are retried on the remaining workers.
+    """
+
+    def __init__(self, elements: Iterable[Any], chunk_size: int, ordered: bool) -> None:
+        self.__condition = threading.Condition()
+        self.__chunks = enumerate(iter_chunks(elements, chunk_size))
+        self.__exhausted = False
+        self.__retries: Deque[Tuple[int, List[Any]]] = deque()
+        self.__num_in_flight = 0
+        self.__num_alive = 0
+        self.__ordered = ordered
+        self.__results: Dict[int, Any] = {}
+        self.__completed: List[Any] = []
+        self.__errors: List[BaseException] = []
+
+    @property
+    def done(self) -> bool:
+        return bool(self.__errors) or (
+            self.__exhausted and not self.__retries and not self.__num_in_flight
+        )
+
+    def run(
+        self, addresses: List[Address], authkey: bytes, *messages: Any
+    ) -> List[Any]:
+        """
+        Sends every chunk to the workers and returns their results, in chunk order if
+        ordered. Remote exceptions are raised again here.
+        """
+        self.__num_alive = len(addresses)
+        threads = [
+            threading.Thread(
+                target=self.serve_worker,
+                args=(address, authkey, messages),
+                name=f"metacontrollers-{address[0]}:{address[1]}",
+                daemon=True,
+            )
+            for address in addresses
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self.__errors:
+            raise self.__errors[0]
+        if not self.__ordered:
+            return self.__completed
+        return [self.__results[index] for index in range(len(self.__results))]
+
+    def serve_worker(self, address: Address, authkey: bytes, messages: tuple) -> None:
+        in_flight: Deque[Tuple[int, List[Any]]] = deque()
+        try:
+            connection = Client(address, authkey=authkey)
+        except (OSError, EOFError, AuthenticationError) as err:
+            self.__fail_worker(address, err, in_flight)
+            return
+
+        try:
+            payload, *calls = messages
+            connection.send((CONTROLLER_MESSAGE, payload))
+            while True:
+                while len(in_flight) < PENDING_CHUNKS_PER_WORKER:
+                    item = self.__next_chunk()
+                    if item is None:
+                        break
+                    in_flight.append(item)
+                    connection.send((CHUNK_MESSAGE, item[0], item[1], *calls))
+
+                if not in_flight:
+                    if not self.__wait_for_chunks():
+                        break
+                    continue
+
+                # workers answer their chunks in the order they were sent
+                kind, index, value = connection.recv()
+                in_flight.popleft()
+                if kind == ERROR_MESSAGE:
+                    self.__fail(value)
+                    break
+                self.__complete(index, value)
+        except (OSError, EOFError) as err:
+            self.__fail_worker(address, err, in_flight)
+        except Exception as err:  # for example an element that cannot be pickled
+            self.__fail(err)
+        finally:
+            try:
+                connection.send((CLOSE_MESSAGE,))
+            except (OSError, EOFError):
+                pass
+            connection.close()
+
+    def __next_chunk(self) -> Union[Tuple[int, List[Any]], None]:
+        with self.__condition:
+            if self.__errors:
+                return None
+            if self.__retries:
+                item = self.__retries.popleft()
+            elif self.__exhausted:
+                return None
+            else:
+                try:
+                    item = next(self.__chunks, None)
+                except Exception as err:  # raised by the partition itself
+                    self.__fail(err)
+                    return None
+                if item is None:
+                    self.__exhausted = True
+                    return None
+            self.__num_in_flight += 1
+            return item
+
+    def __wait_for_chunks(self) -> bool:
+        """
+        Waits until a failed worker's chunks can be retried. Returns False once every
+        chunk is done.
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.done or bool(self.__retries))
+            return not self.done
+
+    def __complete(self, index: int, result: Any) -> None:
+        with self.__condition:
+            if self.__ordered:
+                self.__results[index] = result
+            else:
+                self.__completed.append(result)
+            self.__num_in_flight -= 1
+            self.__condition.notify_all()
+
+    def __fail(self, err: BaseException) -> None:
+        with self.__condition:
+            self.__errors.append(err)
+            self.__condition.notify_all()
+
+    def __fail_worker(
+        self,
+        address: Address,
+        err: BaseException,
+        in_flight: Deque[Tuple[int, List[Any]]],
+    ) -> None:
+        with self.__condition:
+            self.__num_alive -= 1
+            self.__num_in_flight -= len(in_flight)
+            self.__retries.extend(in_flight)
+            in_flight.clear()
+            if not self.__num_alive and not self.done:
+                self.__errors.append(
+                    WorkerUnavailableError(
+                        f"Every distributed worker failed; the last one was {address[0]}:{address[1]} ({err!r})."
+                    )
+                )
+            self.__condition.notify_all()
+
+
+def distributed_map(
+    controller: Any,
+    elements: Iterable[Any],
+    filter_call: MethodCall,
+    action_call: MethodCall,
+    workers: Union[Tuple[str, ...], None],
+    chunk_size: Union[int, None],
+    ordered: bool,
+    fold_call: MethodCall = None,
+    fold_combine: bool = False,
+) -> Any:
+    """
+    Runs the filter and action of a controller over elements on remote worker servers
+    (see metacontrollers.worker). Each worker receives a pickled copy of the controller
+    for this call, imports the controller's module by name, and streams back the results
+    of each chunk. If fold_call is given, each worker folds its chunks and only the
+    partial folds are sent back, to be combined here. Chunks of a worker that fails or
+    cannot be reached are retried on the other workers.
+
+    Args:
+        controller (Any): controller instance.
+        elements (Iterable[Any]): elements to run over.
+        filter_call (MethodCall): (args, kwargs) to call filter with, or None to not filter.
+        action_call (MethodCall): (args, kwargs) to call action with, or None to return the filtered elements.
+        workers (Union[Tuple[str, ...], None]): "host:port" addresses of the worker servers, or None to read them from METACONTROLLERS_WORKERS.
+        chunk_size (Union[int, None]): number of elements sent to a worker at a time, or None for the default.
+        ordered (bool): if True, results are returned in the order of elements, otherwise
+        in the order chunks complete.
+        fold_call (MethodCall, optional): (args, kwargs) to call fold with per chunk, or None to not fold. Defaults to None.
+        fold_combine (bool, optional): if True, partial folds are combined with the
+        controller's fold_combine, otherwise fold is called on them. Defaults to False.
+
+    Returns:
+        Any: fold result if there is a fold call, else the action results, or the
+        filtered elements if there is no action call.
+    """
+    if SHARED_EXECUTORS.in_worker:
+        return run_controller_chunk(
+            controller, list(elements), filter_call, action_call, fold_call
+        )
+
+    addresses = get_worker_addresses(workers)
+    results = DistributedRun(
+        elements, chunk_size or DEFAULT_PROCESS_CHUNK_SIZE, ordered
+    ).run(
+        addresses,
+        get_authkey(),
+        pickle_controller(controller),
+        filter_call,
+        action_call,
+        fold_call,
+    )
+    if fold_call is None:
+        return [result for chunk_results in results for result in chunk_results]
+    return combine_partial_folds(
+        results,
+        getattr(controller, FOLD_METHOD_NAME),
+        fold_call,
+        getattr(controller, FOLD_COMBINE_METHOD_NAME) if fold_combine else None,
+    )
+
+
+def serve_connection(connection: Connection) -> None:
+    """
+    Runs the chunks sent by one controller call, answering each chunk in order.
+    """
+    controller = None
+    load_error = None
+    with connection:
+        while True:
+            try:
+                message = connection.recv()
+            except (OSError, EOFError):
+                return
+            kind = message[0]
+            if kind == CLOSE_MESSAGE:
+                return
+            if kind == CONTROLLER_MESSAGE:
+                try:
+                    controller = pickle.loads(message[1])
+                except Exception as err:
+                    load_error = err
+                continue
+
+            _, index, chunk, filter_call, action_call, fold_call = message
+            try:
+                if load_error is not None:
+                    raise load_error
+                reply = (
+                    RESULT_MESSAGE,
+                    index,
+                    run_controller_chunk(
+                        controller, chunk, filter_call, action_call, fold_call
+                    ),
+                )
+            except Exception as err:
+                reply = (ERROR_MESSAGE, index, err)
+            try:
+                connection.send(reply)
+            except (OSError, EOFError):
+                return
+            except Exception as err:  # the reply could not be pickled
+                error = RuntimeError(
+                    f"The result of a chunk could not be sent back from the worker: {err!r}"
+                )
+                try:
+                    connection.send((ERROR_MESSAGE, index, error))
+                except (OSError, EOFError):
+                    return
+
+
+def serve(
+    address: Address,
+    authkey: bytes,
+    on_ready: Union[Callable[[Address], None], None] = None,
+) -> None:
+    """
+    Runs a worker server until interrupted. Every connection is served by its own thread,
+    so one server can work for several controller calls at a time.
+
+    Args:
+        address (Address): host and port to listen on; port 0 picks a free port.
+        authkey (bytes): key that connecting controllers must authenticate with.
+        on_ready (Union[Callable[[Address], None], None], optional): called with the
+        address the server listens on once it accepts connections. Defaults to None.
+    """
+    with Listener(address, authkey=authkey) as listener:
+        if on_ready is not None:
+            on_ready(listener.address)
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as err:
+                print(f"Rejected connection: {err!r}", file=sys.stderr, flush=True)
+                continue
+            threading.Thread(
+                target=serve_connection, args=(connection,), daemon=True
+            ).start()
@@ -5,3 +5,9 @@ class ArgumentError(Exception): ...
 
 
 class InvalidReturnError(Exception): ...
+
+
+class InvalidControllerOptionError(Exception): ...
+
+
+class WorkerUnavailableError(Exception): ...
@@ -0,0 +1,973 @@
+import math
+import os
+import pickle
+import sys
+import threading
+import weakref
+from array import array
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import cmp_to_key, partial
+from heapq import nlargest, nsmallest
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from metacontrollers.internal.namespace import (
+    ACTION_METHOD_NAME,
+    EXECUTOR_OPTION_NAME,
+    FILTER_METHOD_NAME,
+    FOLD_COMBINE_METHOD_NAME,
+    FOLD_METHOD_NAME,
+    INTERPRETER_EXECUTOR_NAME,
+    PROCESS_EXECUTOR_NAME,
+    SORT_CMP_METHOD_NAME,
+    SORT_KEY_METHOD_NAME,
+    THREAD_EXECUTOR_NAME,
+)
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:  # subinterpreter pools need Python 3.14+
+    InterpreterPoolExecutor = None
+
+# (args, kwargs) that a controlled method is called with after its per element arguments
+MethodCall = Union[Tuple[tuple, dict], None]
+
+# number of chunks each process worker gets when the partition size is known
+PROCESS_CHUNKS_PER_WORKER = 4
+# chunk size for process workers when the partition size is unknown
+DEFAULT_PROCESS_CHUNK_SIZE = 256
+
+
+def get_default_max_workers() -> int:
+    """
+    Same default as ThreadPoolExecutor: enough threads for I/O bound work without
+    oversubscribing small machines.
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def get_default_max_processes() -> int:
+    return os.cpu_count() or 1
+
+
+def get_worker_pool_type(executor: Union[str, None]) -> type:
+    """
+    Pool class that runs the workers of a controller with the "processes" or
+    "interpreters" executor. Both run the same worker functions; subinterpreters are used
+    when this Python has an InterpreterPoolExecutor, and processes otherwise.
+    """
+    if executor == INTERPRETER_EXECUTOR_NAME and InterpreterPoolExecutor is not None:
+        return InterpreterPoolExecutor
+    return ProcessPoolExecutor
+
+
+def get_process_chunk_size(elements: Iterable[Any], max_workers: int) -> int:
+    """
+    Picks a chunk size that gives each worker a few chunks, so that the per chunk
+    pickling overhead stays small while work is still balanced between workers.
+    """
+    try:
+        num_elements = len(elements)
+    except TypeError:
+        return DEFAULT_PROCESS_CHUNK_SIZE
+    return max(1, math.ceil(num_elements / (max_workers * PROCESS_CHUNKS_PER_WORKER)))
+
+
+def iter_chunks(elements: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    iterator = iter(elements)
+    return iter(lambda: list(islice(iterator, chunk_size)), [])
+
+
+def map_chunk(chunk: List[Any], fn: Callable[[Any], Any]) -> List[Any]:
+    return list(map(fn, chunk))
+
+
+def fold_chunk(
+    chunk: List[Any],
+    fn: Callable[[Any], Any],
+    fold: Callable[..., Any],
+    fold_call: Tuple[tuple, dict],
+) -> Any:
+    args, kwargs = fold_call
+    return fold(list(map(fn, chunk)), *args, **kwargs)
+
+
+def tree_reduce(combine: Callable[[Any, Any], Any], values: List[Any]) -> Any:
+    """
+    Combines neighbouring values pairwise until one is left. The order of the values is
+    kept, so combine only needs to be associative.
+    """
+    while len(values) > 1:
+        paired = [combine(a, b) for a, b in zip(values[::2], values[1::2])]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+    return values[0]
+
+
+def combine_partial_folds(
+    partials: List[Any],
+    fold: Callable[..., Any],
+    fold_call: Tuple[tuple, dict],
+    fold_combine: Union[Callable[[Any, Any], Any], None],
+) -> Any:
+    """
+    Combines the fold results of each chunk into the fold result of the whole partition.
+    Without fold_combine, the fold must accept a list of its own results.
+    """
+    args, kwargs = fold_call
+    if not partials:
+        return fold([], *args, **kwargs)
+    if fold_combine is None:
+        return fold(partials, *args, **kwargs)
+    return tree_reduce(fold_combine, partials)
+
+
+def run_controller_chunk(
+    controller: Any,
+    chunk: List[Any],
+    filter_call: MethodCall,
+    action_call: MethodCall,
+    fold_call: MethodCall = None,
+) -> Any:
+    """
+    Runs the filter, action and (partial) fold of a controller over a chunk of elements.
+
+    Returns:
+        Any: fold result if there is a fold call, else the action results, or the filtered
+        elements if there is no action call.
+    """
+    if filter_call is not None:
+        args, kwargs = filter_call
+        filter_fn = getattr(controller, FILTER_METHOD_NAME)
+        chunk = [chosen for chosen in chunk if filter_fn(chosen, *args, **kwargs)]
+    if action_call is not None:
+        args, kwargs = action_call
+        action_fn = getattr(controller, ACTION_METHOD_NAME)
+        chunk = [action_fn(chosen, *args, **kwargs) for chosen in chunk]
+    if fold_call is not None:
+        args, kwargs = fold_call
+        return getattr(controller, FOLD_METHOD_NAME)(chunk, *args, **kwargs)
+    return chunk
+
+
+def select_chunk(
+    chunk: List[Any],
+    k: int,
+    filter_fn: Union[Callable[[Any], bool], None],
+    key_fn: Callable[[Any], Any],
+    keyed: bool,
+    reverse: bool,
+) -> List[Any]:
+    """
+    Selects the k smallest (or largest) elements of a chunk. With keyed, each element's
+    key is computed once and (key, element) pairs are returned so that the keys do not
+    have to be computed again when candidates are merged.
+    """
+    if filter_fn is not None:
+        chunk = [chosen for chosen in chunk if filter_fn(chosen)]
+    select = nlargest if reverse else nsmallest
+    if keyed:
+        return select(
+            k, [(key_fn(chosen), chosen) for chosen in chunk], key=itemgetter(0)
+        )
+    return select(k, chunk, key=key_fn)
+
+
+def merge_selections(
+    candidates: List[Any],
+    k: int,
+    key_fn: Callable[[Any], Any],
+    keyed: bool,
+    reverse: bool,
+) -> List[Any]:
+    """
+    Selects the final k elements from the concatenated selections of each chunk.
+    nsmallest and nlargest are stable, and the candidates are in chunk order, so equal
+    keys are resolved by partition position exactly as a sequential selection would.
+    """
+    select = nlargest if reverse else nsmallest
+    if keyed:
+        return [chosen for _, chosen in select(k, candidates, key=itemgetter(0))]
+    return select(k, candidates, key=key_fn)
+
+
+def get_selection_chunk_size(elements: Iterable[Any], max_workers: int, k: int) -> int:
+    # chunks no larger than k would send every element back as a candidate
+    return max(get_process_chunk_size(elements, max_workers), 4 * k)
+
+
+def compact_keys(keys: List[Any]) -> Union[array, List[Any]]:
+    """
+    Packs sort keys into an array when they are all ints (that fit in 64 bits) or all
+    floats, which is much cheaper to send between processes than a list of objects.
+    """
+    if keys and all(type(key) is int for key in keys):
+        try:
+            return array("q", keys)
+        except OverflowError:
+            return keys
+    if keys and all(type(key) is float for key in keys):
+        return array("d", keys)
+    return keys
+
+
+def sort_chunk(
+    chunk: List[Any],
+    filter_fn: Union[Callable[[Any], bool], None],
+    key_fn: Callable[[Any], Any],
+    reverse: bool,
+) -> Tuple[Union[array, List[Any]], array]:
+    """
+    Filters and stably sorts a chunk by key. Only the sorted keys and the positions of
+    the elements within the chunk are returned, not the elements themselves.
+    """
+    if filter_fn is not None:
+        positions = [index for index, chosen in enumerate(chunk) if filter_fn(chosen)]
+        keys = [key_fn(chunk[index]) for index in positions]
+    else:
+        positions = range(len(chunk))
+        keys = [key_fn(chosen) for chosen in chunk]
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    return (
+        compact_keys([keys[index] for index in order]),
+        array("q", [positions[index] for index in order]),
+    )
+
+
+def merge_sorted_runs(
+    runs: List[Tuple[Union[array, List[Any]], array]], chunk_size: int, reverse: bool
+) -> List[int]:
+    """
+    Merges the sorted runs of each chunk into the partition positions of the elements in
+    sorted order. The runs are concatenated in chunk order and sorted again; Timsort
+    detects the presorted runs and merges them, which is faster than a heap based k-way
+    merge in Python. Sorting is stable and ties within and between runs are in partition
+    order, so the result is identical to a sequential sorted().
+    """
+    keys = []
+    positions = []
+    for index, (run_keys, run_positions) in enumerate(runs):
+        offset = index * chunk_size
+        keys.extend(run_keys)
+        positions.extend([position + offset for position in run_positions])
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    return [positions[index] for index in order]
+
+
+def bind_method_call(
+    controller: Any, name: str, call: MethodCall, num_leading_args: int = 1
+) -> Union[Callable[..., Any], None]:
+    """
+    Returns a function that calls a controlled method with its per element arguments
+    followed by the (args, kwargs) of call, or None if call is None.
+    """
+    if call is None:
+        return None
+    method = getattr(controller, name)
+    args, kwargs = call
+    if not args and not kwargs:
+        return method
+    if num_leading_args == 2:
+        return lambda a, b: method(a, b, *args, **kwargs)
+    return lambda chosen: method(chosen, *args, **kwargs)
+
+
+def select_controller_chunk(
+    controller: Any,
+    chunk: List[Any],
+    k: int,
+    filter_call: MethodCall,
+    sort_key_call: MethodCall,
+    sort_cmp_call: MethodCall,
+    reverse: bool,
+) -> List[Any]:
+    filter_fn = bind_method_call(controller, FILTER_METHOD_NAME, filter_call)
+    if sort_key_call is not None:
+        key_fn = bind_method_call(controller, SORT_KEY_METHOD_NAME, sort_key_call)
+        return select_chunk(chunk, k, filter_fn, key_fn, True, reverse)
+    key_fn = cmp_to_key(
+        bind_method_call(controller, SORT_CMP_METHOD_NAME, sort_cmp_call, 2)
+    )
+    return select_chunk(chunk, k, filter_fn, key_fn, False, reverse)
+
+
+####
+# Process workers
+
+# the controller instance that a process worker was started for
+_worker_controller = None
+
+
+def initialize_process_worker(payload: bytes) -> None:
+    """
+    Pool initializer that unpickles the controller instance once per worker process.
+    Unpickling imports the module that defines the controller class, which rebuilds the
+    class and its generated call method in the worker.
+    """
+    global _worker_controller
+    _worker_controller = pickle.loads(payload)
+
+
+def run_worker_chunk(
+    chunk: List[Any],
+    filter_call: MethodCall,
+    action_call: MethodCall,
+    fold_call: MethodCall,
+) -> Any:
+    return run_controller_chunk(
+        _worker_controller, chunk, filter_call, action_call, fold_call
+    )
+
+
+def sort_worker_chunk(
+    chunk: List[Any],
+    filter_call: MethodCall,
+    sort_key_call: MethodCall,
+    reverse: bool,
+) -> Tuple[Union[array, List[Any]], array]:
+    return sort_chunk(
+        chunk,
+        bind_method_call(_worker_controller, FILTER_METHOD_NAME, filter_call),
+        bind_method_call(_worker_controller, SORT_KEY_METHOD_NAME, sort_key_call),
+        reverse,
+    )
+
+
+def select_worker_chunk(
+    chunk: List[Any],
+    k: int,
+    filter_call: MethodCall,
+    sort_key_call: MethodCall,
+    sort_cmp_call: MethodCall,
+    reverse: bool,
+) -> List[Any]:
+    return select_controller_chunk(
+        _worker_controller, chunk, k, filter_call, sort_key_call, sort_cmp_call, reverse
+    )
+
+
+def call_many_chunk(
+    chunk: List[Any], controller: Any, leading_args: tuple, args: tuple, kwargs: dict
+) -> List[Any]:
+    return controller.call_many(*leading_args, chunk, *args, **kwargs)
+
+
+def call_many_worker_chunk(
+    chunk: List[Any], leading_args: tuple, args: tuple, kwargs: dict
+) -> List[Any]:
+    return call_many_chunk(chunk, _worker_controller, leading_args, args, kwargs)
+
+
+def pickle_controller(controller: Any) -> bytes:
+    try:
+        return pickle.dumps(controller)
+    except Exception as err:
+        raise pickle.PicklingError(
+            f'Controller "{type(controller).__qualname__}" could not be sent to worker processes. '
+            f"Controllers that use processes must be picklable and defined at the top level of an importable module. Error: {err}"
+        ) from err
+
+
+class SharedExecutors:
+    """
+    Lazily created executor pools. Thread pools are shared by every controller with the
+    same max_workers, so controllers do not pay for starting threads on each call.
+    Process (and subinterpreter) pools belong to a single controller instance, which is
+    sent to each worker once when the pool starts.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__thread_pools: Dict[int, ThreadPoolExecutor] = {}
+        self.__process_pools: Dict[int, Tuple[Any, Executor]] = {}
+        self.__local = threading.local()
+
+    @property
+    def in_worker(self) -> bool:
+        """
+        True when called from one of the shared pool threads or from a process worker.
+        Controllers invoked from inside an action run sequentially, since waiting on the
+        pool from one of its own workers could deadlock it.
+        """
+        return _worker_controller is not None or getattr(
+            self.__local, "in_worker", False
+        )
+
+    def __mark_worker(self) -> None:
+        self.__local.in_worker = True
+
+    def get_thread_pool(self, max_workers: int) -> ThreadPoolExecutor:
+        pool = self.__thread_pools.get(max_workers)
+        if pool is None:
+            with self.__lock:
+                pool = self.__thread_pools.get(max_workers)
+                if pool is None:
+                    pool = ThreadPoolExecutor(
+                        max_workers=max_workers,
+                        thread_name_prefix="metacontrollers",
+                        initializer=self.__mark_worker,
+                    )
+                    self.__thread_pools[max_workers] = pool
+        return pool
+
+    def get_process_pool(self, controller: Any, max_workers: int) -> Executor:
+        """
+        Returns the process pool of a controller instance, starting it on first use. For
+        the "interpreters" executor this is a pool of subinterpreters if they are
+        supported. The pool is shut down when the instance is garbage collected (if it
+        supports weak references) or when shutdown() is called. Changes made to the instance after its
+        pool started are not seen by the workers.
+        """
+        key = id(controller)
+        entry = self.__process_pools.get(key)
+        if entry is None:
+            payload = pickle_controller(controller)
+            with self.__lock:
+                entry = self.__process_pools.get(key)
+                if entry is None:
+                    pool_type = get_worker_pool_type(
+                        getattr(controller, EXECUTOR_OPTION_NAME, None)
+                    )
+                    pool = pool_type(
+                        max_workers=max_workers,
+                        initializer=initialize_process_worker,
+                        initargs=(payload,),
+                    )
+                    try:
+                        weakref.finalize(controller, self.__release_process_pool, key)
+                        entry = (None, pool)
+                    except TypeError:
+                        # keep the instance alive so that its id is not reused
+                        entry = (controller, pool)
+                    self.__process_pools[key] = entry
+        return entry[1]
+
+    def __release_process_pool(self, key: int) -> None:
+        with self.__lock:
+            entry = self.__process_pools.pop(key, None)
+        if entry is not None:
+            if sys.version_info < (3, 9):
+                # shutdown(wait=False) closes the wakeup pipe of a process pool while
+                # its management thread may still use it before Python 3.9, which
+                # breaks that thread and hangs at exit: wait for it in another thread
+                threading.Thread(
+                    target=entry[1].shutdown, name="metacontrollers-shutdown"
+                ).start()
+            else:
+                entry[1].shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down every pool. Pools are recreated the next time they are needed.
+        """
+        with self.__lock:
+            pools: List[Executor] = list(self.__thread_pools.values())
+            pools.extend(pool for _, pool in self.__process_pools.values())
+            self.__thread_pools = {}
+            self.__process_pools = {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+# shared by every controller class
+SHARED_EXECUTORS = SharedExecutors()
+
+
+def iter_dispatched(
+    pool: Executor,
+    fn: Callable[..., Any],
+    chunks: Iterable[List[Any]],
+    ordered: bool,
+    max_pending: int,
+    *args: Any,
+) -> Iterator[Any]:
+    """
+    Submits fn(chunk, *args) to a pool for each chunk and yields what each call returns.
+    Chunks are consumed lazily, with at most max_pending of them in flight at a time;
+    the chunks still pending are cancelled if the generator is closed early.
+    """
+    if ordered:
+        pending: deque = deque()
+        try:
+            for chunk in chunks:
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+                pending.append(pool.submit(fn, chunk, *args))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+        return
+
+    pending_set: "set[Future]" = set()
+    try:
+        for chunk in chunks:
+            if len(pending_set) >= max_pending:
+                done, pending_set = wait(pending_set, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending_set.add(pool.submit(fn, chunk, *args))
+        while pending_set:
+            done, pending_set = wait(pending_set, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending_set:
+            future.cancel()
+
+
+def dispatch_chunks(
+    pool: Executor,
+    fn: Callable[..., List[Any]],
+    elements: Iterable[Any],
+    chunk_size: int,
+    ordered: bool,
+    max_pending: int,
+    *args: Any,
+    concatenate: bool = True,
+) -> List[Any]:
+    """
+    Submits fn(chunk, *args) to a pool for each chunk of elements and concatenates the
+    returned lists (or collects the returned values if concatenate is False). Elements
+    are consumed lazily from the calling thread, with at most max_pending chunks in
+    flight at a time.
+    """
+    results = []
+    collect = results.extend if concatenate else results.append
+    dispatched = iter_dispatched(
+        pool, fn, iter_chunks(elements, chunk_size), ordered, max_pending, *args
+    )
+    try:
+        for result in dispatched:
+            collect(result)
+    finally:
+        dispatched.close()
+    return results
+
+
+def thread_map(
+    fn: Callable[[Any], Any],
+    elements: Iterable[Any],
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+    ordered: bool,
+    fold: Union[Callable[..., Any], None] = None,
+    fold_call: MethodCall = None,
+    fold_combine: Union[Callable[[Any, Any], Any], None] = None,
+) -> Any:
+    """
+    Maps fn over elements on the shared thread pool, with at most two chunks per worker
+    in flight at a time. If fold is given, each chunk's results are folded by the thread
+    that computed them and the partial folds are combined afterwards.
+
+    Args:
+        fn (Callable[[Any], Any]): function to call on each element.
+        elements (Iterable[Any]): elements to map over.
+        max_workers (Union[int, None]): number of pool threads, or None for the default.
+        chunk_size (Union[int, None]): number of elements handed to a thread at a time, or None for 1.
+        ordered (bool): if True, results are returned in the order of elements, otherwise
+        in the order chunks complete.
+        fold (Union[Callable[..., Any], None], optional): fold to compute per chunk. Defaults to None.
+        fold_call (MethodCall, optional): (args, kwargs) to call fold with. Defaults to None.
+        fold_combine (Union[Callable[[Any, Any], Any], None], optional): combines two
+        partial folds; if None, fold is called on the list of partial folds. Defaults to None.
+
+    Returns:
+        Any: results of fn, or the fold result if fold is given.
+    """
+    if SHARED_EXECUTORS.in_worker:
+        results = list(map(fn, elements))
+        if fold is None:
+            return results
+        args, kwargs = fold_call
+        return fold(results, *args, **kwargs)
+
+    max_workers = max_workers or get_default_max_workers()
+    pool = SHARED_EXECUTORS.get_thread_pool(max_workers)
+    if fold is None:
+        return dispatch_chunks(
+            pool, map_chunk, elements, chunk_size or 1, ordered, max_workers * 2, fn
+        )
+
+    partials = dispatch_chunks(
+        pool,
+        fold_chunk,
+        elements,
+        chunk_size or 1,
+        ordered,
+        max_workers * 2,
+        fn,
+        fold,
+        fold_call,
+        concatenate=False,
+    )
+    return combine_partial_folds(partials, fold, fold_call, fold_combine)
+
+
+def process_map(
+    controller: Any,
+    elements: Iterable[Any],
+    filter_call: MethodCall,
+    action_call: MethodCall,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+    ordered: bool,
+    fold_call: MethodCall = None,
+    fold_combine: bool = False,
+) -> Any:
+    """
+    Runs the filter and action of a controller over elements on the controller's process
+    pool. Each worker holds its own copy of the controller, so only the chunks, the call
+    arguments and the results are sent between processes. If fold_call is given, each
+    worker folds its chunk and only the partial folds are sent back, to be combined in
+    this process.
+
+    Args:
+        controller (Any): controller instance.
+        elements (Iterable[Any]): elements to run over.
+        filter_call (MethodCall): (args, kwargs) to call filter with, or None to not filter.
+        action_call (MethodCall): (args, kwargs) to call action with, or None to return the filtered elements.
+        max_workers (Union[int, None]): number of worker processes, or None for the number of CPUs.
+        chunk_size (Union[int, None]): number of elements sent to a worker at a time, or None to pick one.
+        ordered (bool): if True, results are returned in the order of elements, otherwise
+        in the order chunks complete.
+        fold_call (MethodCall, optional): (args, kwargs) to call fold with per chunk, or None to not fold. Defaults to None.
+        fold_combine (bool, optional): if True, partial folds are combined with the
+        controller's fold_combine, otherwise fold is called on them. Defaults to False.
+
+    Returns:
+        Any: fold result if there is a fold call, else the action results, or the
+        filtered elements if there is no action call.
+    """
+    if SHARED_EXECUTORS.in_worker:
+        return run_controller_chunk(
+            controller, list(elements), filter_call, action_call, fold_call
+        )
+
+    max_workers = max_workers or get_default_max_processes()
+    chunk_size = chunk_size or get_process_chunk_size(elements, max_workers)
+    pool = SHARED_EXECUTORS.get_process_pool(controller, max_workers)
+    results = dispatch_chunks(
+        pool,
+        run_worker_chunk,
+        elements,
+        chunk_size,
+        ordered,
+        max_workers * 2,
+        filter_call,
+        action_call,
+        fold_call,
+        concatenate=fold_call is None,
+    )
+    if fold_call is None:
+        return results
+    return combine_partial_folds(
+        results,
+        getattr(controller, FOLD_METHOD_NAME),
+        fold_call,
+        getattr(controller, FOLD_COMBINE_METHOD_NAME) if fold_combine else None,
+    )
+
+
+def thread_select(
+    k: int,
+    elements: Iterable[Any],
+    filter_fn: Union[Callable[[Any], bool], None],
+    key_fn: Callable[[Any], Any],
+    keyed: bool,
+    reverse: bool,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+) -> List[Any]:
+    """
+    Selects the k smallest (or largest) elements on the shared thread pool. Each thread
+    filters a chunk, computes its keys and selects a local top k; the candidates are then
+    merged in this thread. The result is the same as a sequential nsmallest/nlargest,
+    including how ties are broken.
+
+    Args:
+        k (int): number of elements to select.
+        elements (Iterable[Any]): elements to select from.
+        filter_fn (Union[Callable[[Any], bool], None]): filter to apply first, or None.
+        key_fn (Callable[[Any], Any]): key function to select by.
+        keyed (bool): True if key_fn is a sort key that is worth computing only once per
+        element (as opposed to a cmp_to_key wrapper).
+        reverse (bool): select the largest elements instead of the smallest.
+        max_workers (Union[int, None]): number of pool threads, or None for the default.
+        chunk_size (Union[int, None]): number of elements handed to a thread at a time, or None to pick one.
+
+    Returns:
+        List[Any]: selected elements, in sorted order.
+    """
+    if SHARED_EXECUTORS.in_worker:
+        candidates = select_chunk(list(elements), k, filter_fn, key_fn, keyed, reverse)
+        return merge_selections(candidates, k, key_fn, keyed, reverse)
+
+    max_workers = max_workers or get_default_max_workers()
+    chunk_size = chunk_size or get_selection_chunk_size(elements, max_workers, k)
+    pool = SHARED_EXECUTORS.get_thread_pool(max_workers)
+    candidates = dispatch_chunks(
+        pool,
+        select_chunk,
+        elements,
+        chunk_size,
+        True,
+        max_workers * 2,
+        k,
+        filter_fn,
+        key_fn,
+        keyed,
+        reverse,
+    )
+    return merge_selections(candidates, k, key_fn, keyed, reverse)
+
+
+def process_select(
+    controller: Any,
+    k: int,
+    elements: Iterable[Any],
+    filter_call: MethodCall,
+    sort_key_call: MethodCall,
+    sort_cmp_call: MethodCall,
+    reverse: bool,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+) -> List[Any]:
+    """
+    Selects the k smallest (or largest) elements on the controller's process pool. Workers
+    send back only their local top k (with the sort keys, when sorting by sort_key). The
+    result is the same as a sequential nsmallest/nlargest, including how ties are broken.
+
+    Args:
+        controller (Any): controller instance.
+        k (int): number of elements to select.
+        elements (Iterable[Any]): elements to select from.
+        filter_call (MethodCall): (args, kwargs) to call filter with, or None to not filter.
+        sort_key_call (MethodCall): (args, kwargs) to call sort_key with, or None to use sort_cmp.
+        sort_cmp_call (MethodCall): (args, kwargs) to call sort_cmp with, or None to use sort_key.
+        reverse (bool): select the largest elements instead of the smallest.
+        max_workers (Union[int, None]): number of worker processes, or None for the number of CPUs.
+        chunk_size (Union[int, None]): number of elements sent to a worker at a time, or None to pick one.
+
+    Returns:
+        List[Any]: selected elements, in sorted order.
+    """
+    keyed = sort_key_call is not None
+    if keyed:
+        key_fn = itemgetter(0)
+    else:
+        key_fn = cmp_to_key(
+            bind_method_call(controller, SORT_CMP_METHOD_NAME, sort_cmp_call, 2)
+        )
+
+    if SHARED_EXECUTORS.in_worker:
+        candidates = select_controller_chunk(
+            controller,
+            list(elements),
+            k,
+            filter_call,
+            sort_key_call,
+            sort_cmp_call,
+            reverse,
+        )
+        return merge_selections(candidates, k, key_fn, keyed, reverse)
+
+    max_workers = max_workers or get_default_max_processes()
+    chunk_size = chunk_size or get_selection_chunk_size(elements, max_workers, k)
+    pool = SHARED_EXECUTORS.get_process_pool(controller, max_workers)
+    candidates = dispatch_chunks(
+        pool,
+        select_worker_chunk,
+        elements,
+        chunk_size,
+        True,
+        max_workers * 2,
+        k,
+        filter_call,
+        sort_key_call,
+        sort_cmp_call,
+        reverse,
+    )
+    return merge_selections(candidates, k, key_fn, keyed, reverse)
+
+
+def thread_sort(
+    elements: Iterable[Any],
+    filter_fn: Union[Callable[[Any], bool], None],
+    key_fn: Callable[[Any], Any],
+    reverse: bool,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+) -> List[Any]:
+    """
+    Filters and sorts elements on the shared thread pool. Each thread computes the keys
+    of a chunk and sorts it; the sorted runs are then merged in this thread. The result is
+    identical to a sequential sorted(filter(...), key=..., reverse=...).
+
+    Args:
+        elements (Iterable[Any]): elements to sort.
+        filter_fn (Union[Callable[[Any], bool], None]): filter to apply first, or None.
+        key_fn (Callable[[Any], Any]): sort key function.
+        reverse (bool): sort in descending order.
+        max_workers (Union[int, None]): number of pool threads, or None for the default.
+        chunk_size (Union[int, None]): number of elements handed to a thread at a time, or None to pick one.
+
+    Returns:
+        List[Any]: filtered elements, in sorted order.
+    """
+    if not isinstance(elements, list):
+        elements = list(elements)
+    if SHARED_EXECUTORS.in_worker:
+        if filter_fn is not None:
+            elements = [chosen for chosen in elements if filter_fn(chosen)]
+        return sorted(elements, key=key_fn, reverse=reverse)
+
+    max_workers = max_workers or get_default_max_workers()
+    chunk_size = chunk_size or get_process_chunk_size(elements, max_workers)
+    pool = SHARED_EXECUTORS.get_thread_pool(max_workers)
+    runs = dispatch_chunks(
+        pool,
+        sort_chunk,
+        elements,
+        chunk_size,
+        True,
+        max_workers * 2,
+        filter_fn,
+        key_fn,
+        reverse,
+        concatenate=False,
+    )
+    return [elements[index] for index in merge_sorted_runs(runs, chunk_size, reverse)]
+
+
+def process_sort(
+    controller: Any,
+    elements: Iterable[Any],
+    filter_call: MethodCall,
+    sort_key_call: MethodCall,
+    reverse: bool,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+) -> List[Any]:
+    """
+    Filters and sorts elements on the controller's process pool. Workers compute the keys
+    of a chunk and sort it, and send back only the sorted keys (packed into arrays when
+    they are numeric) and the positions of the elements; the elements themselves are not
+    sent back. The result is identical to a sequential sorted(filter(...), key=..., reverse=...).
+
+    Args:
+        controller (Any): controller instance.
+        elements (Iterable[Any]): elements to sort.
+        filter_call (MethodCall): (args, kwargs) to call filter with, or None to not filter.
+        sort_key_call (MethodCall): (args, kwargs) to call sort_key with.
+        reverse (bool): sort in descending order.
+        max_workers (Union[int, None]): number of worker processes, or None for the number of CPUs.
+        chunk_size (Union[int, None]): number of elements sent to a worker at a time, or None to pick one.
+
+    Returns:
+        List[Any]: filtered elements, in sorted order.
+    """
+    if not isinstance(elements, list):
+        elements = list(elements)
+    if SHARED_EXECUTORS.in_worker:
+        filter_fn = bind_method_call(controller, FILTER_METHOD_NAME, filter_call)
+        if filter_fn is not None:
+            elements = [chosen for chosen in elements if filter_fn(chosen)]
+        key_fn = bind_method_call(controller, SORT_KEY_METHOD_NAME, sort_key_call)
+        return sorted(elements, key=key_fn, reverse=reverse)
+
+    max_workers = max_workers or get_default_max_processes()
+    chunk_size = chunk_size or get_process_chunk_size(elements, max_workers)
+    pool = SHARED_EXECUTORS.get_process_pool(controller, max_workers)
+    runs = dispatch_chunks(
+        pool,
+        sort_worker_chunk,
+        elements,
+        chunk_size,
+        True,
+        max_workers * 2,
+        filter_call,
+        sort_key_call,
+        reverse,
+        concatenate=False,
+    )
+    return [elements[index] for index in merge_sorted_runs(runs, chunk_size, reverse)]
+
+
+def partitions_map(
+    controller: Any,
+    partitions: Iterable[Iterable[Any]],
+    leading_args: tuple,
+    args: tuple,
+    kwargs: dict,
+    executor: str,
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+    ordered: bool,
+) -> List[Any]:
+    """
+    Calls a controller on each partition, splitting the partitions into chunks across the
+    shared thread pool or the controller's process pool. Each chunk is run with the
+    controller's call_many, so the controller runs sequentially within a worker.
+
+    Args:
+        controller (Any): controller instance.
+        partitions (Iterable[Iterable[Any]]): partitions to call the controller on.
+        leading_args (tuple): arguments that go before the partition (k for DoK).
+        args (tuple): positional arguments that go after the partition.
+        kwargs (dict): keyword arguments of each call.
+        executor (str): "threads" or "processes".
+        max_workers (Union[int, None]): number of workers, or None for the default.
+        chunk_size (Union[int, None]): number of partitions handed to a worker at a time, or None to pick one.
+        ordered (bool): if True, results are returned in the order of partitions,
+        otherwise in the order chunks complete.
+
+    Returns:
+        List[Any]: result of the controller for each partition.
+    """
+    if executor == THREAD_EXECUTOR_NAME:
+        max_workers = max_workers or get_default_max_workers()
+        get_pool = SHARED_EXECUTORS.get_thread_pool
+        fn, fn_args = call_many_chunk, (controller, leading_args, args, kwargs)
+    elif executor == PROCESS_EXECUTOR_NAME:
+        max_workers = max_workers or get_default_max_processes()
+        get_pool = partial(SHARED_EXECUTORS.get_process_pool, controller)
+        fn, fn_args = call_many_worker_chunk, (leading_args, args, kwargs)
+    else:
+        raise ValueError(
+            f'Unknown executor "{executor}"; expected "{THREAD_EXECUTOR_NAME}" or "{PROCESS_EXECUTOR_NAME}".'
+        )
+
+    if SHARED_EXECUTORS.in_worker:
+        return controller.call_many(*leading_args, partitions, *args, **kwargs)
+
+    return dispatch_chunks(
+        get_pool(max_workers),
+        fn,
+        partitions,
+        chunk_size or get_process_chunk_size(partitions, max_workers),
+        ordered,
+        max_workers * 2,
+        *fn_args,
+    )
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """
+    Shuts down the thread and process pools used by controllers with an executor. They
+    are started again the next time a controller needs them. Process pools hold a copy of
+    the controller instance taken on its first call, so this is also how to make workers
+    see changes to an instance.
+    """
+    SHARED_EXECUTORS.shutdown(wait=wait)
@@ -0,0 +1,167 @@
+import hashlib
+import importlib
+import importlib.util
+import sys
+import types
+import warnings
+from typing import Any, Callable, Dict, Union
+
+from metacontrollers.internal.generation_cache import (
+    GenerationCache,
+    instantiate_call_method,
+)
+
+# bump whenever the layout of frozen modules or the generated code changes
+FROZEN_FORMAT_VERSION = 1
+FROZEN_MODULE_ATTRIBUTE = "CONTROLLERS"
+
+
+def get_frozen_module_name(module_name: str) -> str:
+    """
+    Name of the frozen module for a module, e.g. "mypkg.controllers" is frozen into
+    "mypkg._controllers_frozen".
+    """
+    package, _, leaf = module_name.rpartition(".")
+    frozen_leaf = f"_{leaf}_frozen"
+    return f"{package}.{frozen_leaf}" if package else frozen_leaf
+
+
+def get_fingerprint(key: tuple) -> str:
+    """
+    Stable digest of a generation cache key. The key holds the code objects of the
+    controlled methods, so any change to a controlled method's body, signature or the
+    controller's options changes the fingerprint. Line numbers are not part of it, and it
+    does not need the source files to be present.
+
+    Args:
+        key (tuple): key from GenerationCache.get_key.
+
+    Returns:
+        str: hex digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{FROZEN_FORMAT_VERSION}:{sys.implementation.cache_tag}".encode())
+    _update_fingerprint(digest, key)
+    return digest.hexdigest()
+
+
+def _update_fingerprint(digest: "hashlib._Hash", value: Any) -> None:
+    if isinstance(value, tuple):
+        digest.update(b"(")
+        for item in value:
+            _update_fingerprint(digest, item)
+        digest.update(b")")
+    elif isinstance(value, frozenset):
+        digest.update(b"{")
+        for item in sorted(value, key=repr):
+            _update_fingerprint(digest, item)
+        digest.update(b"}")
+    elif isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        _update_fingerprint(
+            digest,
+            (
+                value.co_name,
+                value.co_argcount,
+                value.co_posonlyargcount,
+                value.co_kwonlyargcount,
+                value.co_flags,
+                value.co_names,
+                value.co_varnames,
+                value.co_freevars,
+                value.co_cellvars,
+                value.co_consts,
+            ),
+        )
+    elif isinstance(value, type):
+        digest.update(f"<{value.__module__}.{value.__qualname__}>".encode())
+    else:
+        digest.update(repr(value).encode())
+        digest.update(b",")
+
+
+class FrozenControllers:
+    """
+    Attaches prebuilt call methods from frozen modules (see metacontrollers.freeze) to
+    controller classes, so that importing frozen controllers skips inspection, AST
+    generation and compilation. Frozen call methods whose fingerprint no longer matches
+    the controller are reported as stale and ignored.
+    """
+
+    def __init__(self) -> None:
+        self.__modules: Dict[str, Union[dict, None]] = {}
+
+    def clear(self) -> None:
+        self.__modules.clear()
+
+    def get_frozen_controllers(self, module_name: str) -> Union[dict, None]:
+        """
+        Returns the frozen controllers of a module, importing its frozen module the first
+        time. Returns None if the module has not been frozen.
+        """
+        if module_name in self.__modules:
+            return self.__modules[module_name]
+
+        frozen = None
+        frozen_module_name = get_frozen_module_name(module_name)
+        try:
+            spec = importlib.util.find_spec(frozen_module_name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None:
+            module = importlib.import_module(frozen_module_name)
+            if getattr(module, "FROZEN_FORMAT_VERSION", None) == FROZEN_FORMAT_VERSION:
+                frozen = getattr(module, FROZEN_MODULE_ATTRIBUTE, None)
+            else:
+                warnings.warn(
+                    f'Frozen module "{frozen_module_name}" was created by a different version of metacontrollers and will be ignored.'
+                )
+        return self.__modules.setdefault(module_name, frozen)
+
+    def load(
+        self, cls: type, key: Union[tuple, None], attrs: dict
+    ) -> Union[Callable[..., Any], None]:
+        """
+        Returns the frozen call method for a controller class, or None if there is no
+        up-to-date frozen call method for it.
+        """
+        module_name = getattr(cls, "__module__", None)
+        if key is None or module_name is None or module_name == "__main__":
+            return None
+        if "<locals>" in cls.__qualname__:
+            return None
+
+        frozen = self.get_frozen_controllers(module_name)
+        if frozen is None or cls.__qualname__ not in frozen:
+            return None
+
+        fingerprint, frozen_call_method = frozen[cls.__qualname__]
+        if fingerprint != get_fingerprint(key):
+            warnings.warn(
+                f'Frozen call method for "{module_name}.{cls.__qualname__}" is stale and will be regenerated. '
+                f"Run `python -m metacontrollers.freeze {module_name}` to update it."
+            )
+            return None
+
+        code = frozen_call_method.__code__
+        num_defaults = len(frozen_call_method.__defaults__ or ())
+        positional_defaults = code.co_varnames[
+            code.co_argcount - num_defaults : code.co_argcount
+        ]
+        keyword_defaults = tuple((frozen_call_method.__kwdefaults__ or {}).keys())
+        saved_defaults = GenerationCache.get_saved_defaults(
+            attrs, positional_defaults + keyword_defaults
+        )
+        if saved_defaults is None:
+            return None
+
+        return instantiate_call_method(
+            code,
+            frozen_call_method.__globals__,
+            tuple(saved_defaults[name] for name in positional_defaults),
+            {name: saved_defaults[name] for name in keyword_defaults},
+        )
+
+
+# shared by every controller class
+FROZEN_CONTROLLERS = FrozenControllers()
@@ -0,0 +1,394 @@
+import ast
+import copy
+import hashlib
+import pickle
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from metacontrollers.internal.namespace import (
+    CONTROLLED_METHOD_NAMES,
+    CONTROLLER_OPTION_NAMES,
+)
+
+
+def instantiate_call_method(
+    code: types.CodeType,
+    _globals: dict,
+    defaults: tuple = (),
+    kwdefaults: Union[dict, None] = None,
+) -> Callable[..., Any]:
+    """
+    Creates a call method from a (possibly shared) code object, binding it to the given
+    globals and argument defaults.
+
+    Returns:
+        Callable[..., Any]: the call method.
+    """
+    call_method = types.FunctionType(
+        code, _globals, code.co_name, tuple(defaults) or None
+    )
+    if kwdefaults:
+        call_method.__kwdefaults__ = dict(kwdefaults)
+    return call_method
+
+
+class LRUCache:
+    """
+    Mapping that keeps at most max_size entries, dropping the least recently used one
+    when a new entry would exceed it.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def get(self, key: Any) -> Any:
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is not None:
+                self.__entries.move_to_end(key)
+        return value
+
+    def setdefault(self, key: Any, value: Any) -> Any:
+        """
+        Returns the entry for key, adding value if there is none.
+        """
+        with self.__lock:
+            value = self.__entries.setdefault(key, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+        return value
+
+
+class CachedCallMethod:
+    """
+    Result of analysing and compiling one controller layout. Holds everything needed to
+    re-create the call method for a new class with the same layout without inspecting,
+    parsing or compiling anything again.
+    """
+
+    __slots__ = ("code", "helpers", "positional_defaults", "keyword_defaults")
+
+    def __init__(self, call_method: Callable[..., Any], helpers: dict) -> None:
+        code = call_method.__code__
+        num_defaults = len(call_method.__defaults__ or ())
+        self.code = code
+        self.helpers = helpers
+        self.positional_defaults = code.co_varnames[
+            code.co_argcount - num_defaults : code.co_argcount
+        ]
+        self.keyword_defaults = tuple((call_method.__kwdefaults__ or {}).keys())
+
+
+class GenerationCache:
+    """
+    Memoizes controller call method generation. Classes that are created repeatedly (for
+    example inside factory functions) share the code objects of their controlled methods,
+    so their analysis and generated call method can be reused. Only the globals and the
+    argument defaults are re-bound for each new class. At most max_size layouts are kept.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.__entries = LRUCache(max_size)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    def get_key(
+        self, implementation: type, cls: type, attrs: dict
+    ) -> Union[tuple, None]:
+        """
+        Builds the cache key for a controller class. The key is made up of the implementation,
+        the code objects (and signature shape) of each controlled method, and every class
+        option that changes the generated call method.
+
+        Returns:
+            Union[tuple, None]: the key, or None if this controller cannot be cached (for
+            example when a controlled method is not a plain function).
+        """
+        methods = []
+        for name in CONTROLLED_METHOD_NAMES:
+            if name not in attrs:
+                methods.append(None)
+                continue
+
+            codes = []
+            fn = attrs[name]
+            while fn is not None:
+                if isinstance(fn, staticmethod):
+                    codes.append(staticmethod)
+                    fn = fn.__func__
+                    continue
+                code = getattr(fn, "__code__", None)
+                if code is None:
+                    return None
+                codes.append(code)
+                fn = getattr(fn, "__wrapped__", None)
+
+            spec_fn = self.get_spec_function(attrs[name])
+            methods.append(
+                (
+                    tuple(codes),
+                    len(spec_fn.__defaults__ or ()),
+                    tuple(spec_fn.__kwdefaults__ or ()),
+                )
+            )
+
+        try:
+            options = tuple(
+                getattr(cls, option, None) for option in CONTROLLER_OPTION_NAMES
+            )
+            key = (implementation, tuple(methods), options)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def store(
+        self,
+        key: Union[tuple, None],
+        call_method: Callable[..., Any],
+        helpers: dict,
+    ) -> None:
+        if key is None:
+            return
+        # classes with the same layout may be created concurrently; keep the first entry
+        self.__entries.setdefault(key, CachedCallMethod(call_method, helpers))
+
+    def load(
+        self,
+        key: Union[tuple, None],
+        attrs: dict,
+        globals_factory: Callable[[dict], dict],
+    ) -> Union[Callable[..., Any], None]:
+        """
+        Re-creates a previously generated call method for a new class.
+
+        Args:
+            key (Union[tuple, None]): key from get_key.
+            attrs (dict): class attributes of the new controller.
+            globals_factory (Callable[[dict], dict]): builds the globals of the new call
+            method from the cached helper globals.
+
+        Returns:
+            Union[Callable[..., Any], None]: the call method, or None on a cache miss.
+        """
+        if key is None:
+            return None
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+
+        saved_defaults = self.get_saved_defaults(
+            attrs, entry.positional_defaults + entry.keyword_defaults
+        )
+        if saved_defaults is None:
+            # conflicting defaults; let the full generation path report it
+            return None
+
+        return instantiate_call_method(
+            entry.code,
+            globals_factory(entry.helpers),
+            tuple(saved_defaults[name] for name in entry.positional_defaults),
+            {name: saved_defaults[name] for name in entry.keyword_defaults},
+        )
+
+    @staticmethod
+    def get_spec_function(fn: Any) -> Callable[..., Any]:
+        """
+        Returns the function whose signature describes the controlled method. This mirrors how
+        MethodInspector chooses the function it builds its argument spec from.
+        """
+        if not callable(fn):
+            fn = fn.__func__
+        return fn.__wrapped__ if hasattr(fn, "__wrapped__") else fn
+
+    @classmethod
+    def get_saved_defaults(
+        cls, attrs: dict, names: Tuple[str, ...]
+    ) -> Union[Dict[str, Any], None]:
+        """
+        Collects the default values for the given argument names from the controlled methods,
+        in the same order get_call_args resolves them.
+
+        Returns:
+            Union[Dict[str, Any], None]: argument name to default value, or None if two
+            controlled methods disagree on a default.
+        """
+        wanted = set(names)
+        saved_defaults = {}
+        for name in CONTROLLED_METHOD_NAMES:
+            if name not in attrs:
+                continue
+            fn = cls.get_spec_function(attrs[name])
+            code = fn.__code__
+            defaults = fn.__defaults__ or ()
+            arg_names = code.co_varnames[: code.co_argcount]
+            values = list(zip(arg_names[len(arg_names) - len(defaults) :], defaults))
+            values.extend((fn.__kwdefaults__ or {}).items())
+
+            for arg_name, value in values:
+                if arg_name not in wanted:
+                    continue
+                if arg_name in saved_defaults:
+                    try:
+                        if not bool(saved_defaults[arg_name] == value):
+                            return None
+                    except Exception:
+                        return None
+                else:
+                    saved_defaults[arg_name] = value
+
+        if len(saved_defaults) != len(wanted):
+            return None
+        return saved_defaults
+
+
+class CodeCache:
+    """
+    Deduplicates compiled call methods by pipeline shape. Call methods only reference
+    controlled methods through the class argument (self.filter, self.action, ...), so
+    controllers that differ only in their method bodies generate identical modules and
+    can share one code object. At most max_size shapes are kept.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.__codes = LRUCache(max_size)
+
+    def __len__(self) -> int:
+        return len(self.__codes)
+
+    def clear(self) -> None:
+        self.__codes.clear()
+
+    @staticmethod
+    def get_shape(module: ast.Module) -> bytes:
+        """
+        Structural key of a generated module: a digest of its pickle, which is cheaper to
+        build than ast.dump. Equal pickles always mean equal trees, and the digest keeps
+        the key small.
+        """
+        return hashlib.sha256(
+            pickle.dumps(module, protocol=pickle.HIGHEST_PROTOCOL)
+        ).digest()
+
+    def get_or_compile(self, module: ast.Module, name: str) -> types.CodeType:
+        """
+        Returns the code object of the function named `name` defined in `module`, compiling
+        the module only if no structurally equal module has been compiled before.
+
+        Args:
+            module (ast.Module): module which contains the function definition.
+            name (str): name of the function to extract.
+
+        Returns:
+            types.CodeType: code object of the function.
+        """
+        shape = self.get_shape(module)
+        code = self.__codes.get(shape)
+        if code is None:
+            module_code = compile(module, filename="<ast>", mode="exec")
+            code = next(
+                const
+                for const in module_code.co_consts
+                if isinstance(const, types.CodeType) and const.co_name == name
+            )
+            code = self.__codes.setdefault(shape, code)
+        return code
+
+    def compile_many(
+        self, modules: List[ast.Module], name: str
+    ) -> List[types.CodeType]:
+        """
+        Bulk version of get_or_compile. The functions of every module that has not been
+        compiled before are collected into a single module and compiled with one compile()
+        call.
+
+        Args:
+            modules (List[ast.Module]): modules which each contain one function definition.
+            name (str): name of the function defined in each module.
+
+        Returns:
+            List[types.CodeType]: code object of the function in each module, in order.
+        """
+        shapes = [self.get_shape(module) for module in modules]
+        found: Dict[bytes, types.CodeType] = {}
+        missing = {}
+        for shape, module in zip(shapes, modules):
+            if shape in found or shape in missing:
+                continue
+            code = self.__codes.get(shape)
+            if code is not None:
+                found[shape] = code
+            else:
+                function_def = copy.copy(module.body[0])
+                function_def.name = f"__ctrl_bulk_{len(missing)}__"
+                missing[shape] = function_def
+
+        if missing:
+            bulk_module = ast.Module(body=list(missing.values()), type_ignores=[])
+            module_code = compile(bulk_module, filename="<ast>", mode="exec")
+            codes = {
+                const.co_name: const
+                for const in module_code.co_consts
+                if isinstance(const, types.CodeType)
+            }
+            for shape, function_def in missing.items():
+                code = codes[function_def.name]
+                code = code.replace(co_name=name)
+                if hasattr(code, "co_qualname"):
+                    code = code.replace(co_qualname=name)
+                found[shape] = self.__codes.setdefault(shape, code)
+
+        return [found[shape] for shape in shapes]
+
+
+# shared by every controller class and implementation
+GENERATION_CACHE = GenerationCache()
+CODE_CACHE = CodeCache()
+
+
+class NamespaceCache:
+    """
+    Interns the globals that generated call methods are bound to. A call method only needs
+    builtins, its module name and a handful of helpers (nsmallest, islice, ...), so
+    controllers defined in the same module usually share one small namespace. At most
+    max_size namespaces are kept.
+    """
+
+    def __init__(self, max_size: int = 64) -> None:
+        self.__namespaces = LRUCache(max_size)
+
+    def __len__(self) -> int:
+        return len(self.__namespaces)
+
+    def clear(self) -> None:
+        self.__namespaces.clear()
+
+    def get(self, module_name: Union[str, None], builtins: dict, helpers: dict) -> dict:
+        namespace = {"__builtins__": builtins, "__name__": module_name}
+        namespace.update(helpers)
+        try:
+            key = (module_name, id(builtins), tuple(sorted(helpers.items())))
+            hash(key)
+        except TypeError:
+            return namespace
+        return self.__namespaces.setdefault(key, namespace)
+
+
+# shared by every controller implementation
+NAMESPACE_CACHE = NamespaceCache()
@@ -1,12 +1,36 @@
 import inspect
-from typing import Any, Generic, Iterable, List, Protocol, TypeVar, Union, _ProtocolMeta
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterable,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    _ProtocolMeta,
+)
 
+from .classes.async_do import (
+    AsyncDoAllImplementation,
+    AsyncDoKImplementation,
+    AsyncDoOneImplementation,
+)
 from .classes.do import DoImplementation
 from .classes.do_all import DoAllImplementation
 from .classes.do_k import DoKImplementation
 from .classes.do_one import DoOneImplementation
+from .bulk_compile import DEFERRED_COMPILATION
+from .call_many import get_iter_many_method
+from .frozen import FROZEN_CONTROLLERS
+from .generation_cache import GENERATION_CACHE
 
 TChosen = TypeVar("TChosen")
+AnyIterable = Union[Iterable[TChosen], AsyncIterable[TChosen]]
 TActionReturn = TypeVar("TActionReturn")
 TFoldReturn = TypeVar("TFoldReturn")
 TSupportsRichComparison = TypeVar(
@@ -23,10 +47,50 @@ class MetaController(_ProtocolMeta):
 
     def __init__(cls, name, bases, attrs):
         super().__init__(name, bases, attrs)
-        if name in ["Do", "DoOne", "DoK", "DoAll"]:
+        if name in [
+            "Do",
+            "DoOne",
+            "DoK",
+            "DoAll",
+            "AsyncDoOne",
+            "AsyncDoK",
+            "AsyncDoAll",
+        ]:
             return
 
-        _base_classes = [base for base in bases if base in [Do, DoOne, DoK, DoAll]]
+        implementation = MetaController.get_implementation(bases)
+        stack_frame = inspect.currentframe().f_back
+        key = GENERATION_CACHE.get_key(implementation, cls, attrs)
+        call_method = FROZEN_CONTROLLERS.load(cls, key, attrs)
+        if call_method is None:
+            call_method = GENERATION_CACHE.load(
+                key,
+                attrs,
+                lambda helpers: implementation.get_call_method_globals(
+                    stack_frame, helpers
+                ),
+            )
+        if call_method is None:
+            controller = implementation(cls, name, bases, attrs, stack_frame)
+            controller.validate()
+            call_method = controller.generate_call_method()
+            store = partial(
+                GENERATION_CACHE.store, key, helpers=controller.call_method_globals
+            )
+            if not DEFERRED_COMPILATION.on_compiled(call_method, store):
+                store(call_method)
+        cls.__call__ = call_method
+
+    @staticmethod
+    def get_implementation(bases: tuple) -> type:
+        """
+        Returns the implementation class for a controller with the given bases.
+        """
+        _base_classes = [
+            base
+            for base in bases
+            if base in [Do, DoOne, DoK, DoAll, AsyncDoOne, AsyncDoK, AsyncDoAll]
+        ]
         if len(_base_classes) > 1:
             raise TypeError("Controller multiple inheritance is not allowed.")
         _base_class = _base_classes[0]
@@ -39,14 +103,15 @@ class MetaController(_ProtocolMeta):
             implementation = DoKImplementation
         elif _base_class is DoAll:
             implementation = DoAllImplementation
+        elif _base_class is AsyncDoOne:
+            implementation = AsyncDoOneImplementation
+        elif _base_class is AsyncDoK:
+            implementation = AsyncDoKImplementation
+        elif _base_class is AsyncDoAll:
+            implementation = AsyncDoAllImplementation
         else:
             raise NotImplementedError("Unkown base class.")  # should not get here
-
-        controller = implementation(
-            cls, name, bases, attrs, inspect.currentframe().f_back
-        )
-        controller.validate()
-        cls.__call__ = controller.generate_call_method()
+        return implementation
 
 
 class Do(Generic[TActionReturn], metaclass=MetaController):
@@ -84,6 +149,8 @@ class Do(Generic[TActionReturn], metaclass=MetaController):
 class DoOne(Generic[TChosen, TActionReturn], metaclass=MetaController):
     optimize: bool = False
     reverse_sort: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
 
     ###
     # Valid User Defined Methods:
@@ -93,12 +160,20 @@ class DoOne(Generic[TChosen, TActionReturn], metaclass=MetaController):
 
     def filter(self, chosen: TChosen) -> bool: ...
 
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
     def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
 
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
     def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
 
     def action(self, chosen: TChosen) -> TActionReturn: ...
 
+    def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
     def post_controller(self) -> None: ...
 
     ###
@@ -123,6 +198,29 @@ class DoOne(Generic[TChosen, TActionReturn], metaclass=MetaController):
         """
         ...
 
+    def iter_many(
+        self, partitions: Iterable[Iterable[TChosen]], /, *args: Any, **kwargs: Any
+    ) -> Iterator[Union[TActionReturn, None]]:
+        """Calls this controller on each partition, lazily yielding each result. The
+        remaining arguments are passed to every call. This is faster than calling the
+        controller in a loop, since the loop is part of a generated method.
+
+        Args:
+            partitions (Iterable[Iterable[TChosen]]): partitions to call the controller on.
+
+        Returns:
+            Iterator[Union[TActionReturn, None]]: the result of each call.
+        """
+        return get_iter_many_method(type(self), DoOneImplementation)(
+            self, partitions, *args, **kwargs
+        )
+
+    def call_many(
+        self, partitions: Iterable[Iterable[TChosen]], /, *args: Any, **kwargs: Any
+    ) -> List[Union[TActionReturn, None]]:
+        """Same as iter_many, but returns a list of the results."""
+        return list(self.iter_many(partitions, *args, **kwargs))
+
     def update_to(
         self,
         cls: Union[
@@ -135,6 +233,15 @@ class DoOne(Generic[TChosen, TActionReturn], metaclass=MetaController):
 class DoK(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController):
     optimize: bool = False
     reverse_sort: bool = False
+    executor: Union[str, None] = None
+    max_workers: Union[int, None] = None
+    chunk_size: Union[int, None] = None
+    ordered: bool = True
+    fold_associative: bool = False
+    batch_size: Union[int, None] = None
+    list_results: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
 
     ###
     # Valid User Defined Methods:
@@ -144,16 +251,26 @@ class DoK(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController
 
     def filter(self, chosen: TChosen) -> bool: ...
 
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
     def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
 
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
     def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
 
     def action(self, chosen: TChosen) -> TActionReturn: ...
 
+    def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
     def post_controller(self) -> None: ...
 
     def fold(self, results: List[TActionReturn]) -> TFoldReturn: ...
 
+    def fold_combine(self, a: TFoldReturn, b: TFoldReturn) -> TFoldReturn: ...
+
     ###
     # Built-in Instance Methods
     #
@@ -180,12 +297,59 @@ class DoK(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController
         """
         ...
 
+    def iter_many(
+        self,
+        k: int,
+        partitions: Iterable[Iterable[TChosen]],
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Iterator[Union[Iterable[TActionReturn], TFoldReturn, None]]:
+        """Calls this controller on each partition, lazily yielding each result. k and
+        the remaining arguments are passed to every call. This is faster than calling the
+        controller in a loop, since the loop is part of a generated method.
+
+        Args:
+            k (int): Number of chosen elements to operate over from each partition.
+            partitions (Iterable[Iterable[TChosen]]): partitions to call the controller on.
+
+        Returns:
+            Iterator[Union[Iterable[TActionReturn], TFoldReturn, None]]: the result of each call.
+        """
+        return get_iter_many_method(type(self), DoKImplementation)(
+            self, k, partitions, *args, **kwargs
+        )
+
+    def call_many(
+        self,
+        k: int,
+        partitions: Iterable[Iterable[TChosen]],
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> List[Union[Iterable[TActionReturn], TFoldReturn, None]]:
+        """Same as iter_many, but returns a list of the results."""
+        return list(self.iter_many(k, partitions, *args, **kwargs))
+
     def update_to(self, cls: "DoK[TChosen, TActionReturn, TFoldReturn]") -> None: ...
 
 
 class DoAll(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController):
     optimize: bool = False
     reverse_sort: bool = False
+    executor: Union[str, None] = None
+    max_workers: Union[int, None] = None
+    chunk_size: Union[int, None] = None
+    ordered: bool = True
+    fold_associative: bool = False
+    parallel_sort: bool = False
+    workers: Union[Tuple[str, ...], None] = None
+    pipeline: bool = False
+    queue_size: Union[int, None] = None
+    batch_size: Union[int, None] = None
+    list_results: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
 
     ###
     # Valid User Defined Methods:
@@ -195,16 +359,26 @@ class DoAll(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaControll
 
     def filter(self, chosen: TChosen) -> bool: ...
 
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
     def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
 
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
     def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
 
     def action(self, chosen: TChosen) -> TActionReturn: ...
 
+    def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
     def post_controller(self) -> None: ...
 
     def fold(self, results: List[TActionReturn]) -> TFoldReturn: ...
 
+    def fold_combine(self, a: TFoldReturn, b: TFoldReturn) -> TFoldReturn: ...
+
     ###
     # Built-in Instance Methods
     #
@@ -230,6 +404,29 @@ class DoAll(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaControll
         """
         ...
 
+    def iter_many(
+        self, partitions: Iterable[Iterable[TChosen]], /, *args: Any, **kwargs: Any
+    ) -> Iterator[Union[Iterable[TActionReturn], TFoldReturn, None]]:
+        """Calls this controller on each partition, lazily yielding each result. The
+        remaining arguments are passed to every call. This is faster than calling the
+        controller in a loop, since the loop is part of a generated method.
+
+        Args:
+            partitions (Iterable[Iterable[TChosen]]): partitions to call the controller on.
+
+        Returns:
+            Iterator[Union[Iterable[TActionReturn], TFoldReturn, None]]: the result of each call.
+        """
+        return get_iter_many_method(type(self), DoAllImplementation)(
+            self, partitions, *args, **kwargs
+        )
+
+    def call_many(
+        self, partitions: Iterable[Iterable[TChosen]], /, *args: Any, **kwargs: Any
+    ) -> List[Union[Iterable[TActionReturn], TFoldReturn, None]]:
+        """Same as iter_many, but returns a list of the results."""
+        return list(self.iter_many(partitions, *args, **kwargs))
+
     def update_to(
         self,
         cls: Union[
@@ -237,3 +434,186 @@ class DoAll(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaControll
             "DoOne[TChosen, TActionReturn, TFoldReturn]",
         ],
     ) -> None: ...
+
+
+class AsyncDoOne(Generic[TChosen, TActionReturn], metaclass=MetaController):
+    optimize: bool = False
+    reverse_sort: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
+
+    ###
+    # Valid User Defined Methods (pre_controller, filter, action, action_batch and
+    # post_controller may be coroutine functions):
+    #
+
+    async def pre_controller(self) -> None: ...
+
+    async def filter(self, chosen: TChosen) -> bool: ...
+
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
+    def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
+
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
+    def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
+
+    async def action(self, chosen: TChosen) -> TActionReturn: ...
+
+    async def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
+    async def post_controller(self) -> None: ...
+
+    ###
+    # Built-in Instance Methods
+    #
+
+    async def __call__(
+        self, partition: AnyIterable[TChosen], /, *args: Any, **kwargs: Any
+    ) -> Union[TActionReturn, None]:
+        """Generated call method for your controller. Coroutine controlled methods are
+        awaited. *args and **kwargs represent the position only, arguments, defaulted
+        arguments, argument unpacks, keyword only, and keyword unpacks that you have
+        defined (if any) across all your controlled methods.
+
+        Args:
+            partition (AnyIterable[TChosen]): Iterable or async iterable representing
+            the set of elements this controller will operate over.
+
+        Returns:
+            TActionReturn: If your action returns a value, that will be the return, else
+            this method will return None.
+        """
+        ...
+
+
+class AsyncDoK(Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController):
+    optimize: bool = False
+    reverse_sort: bool = False
+    max_concurrency: Union[int, None] = None
+    batch_size: Union[int, None] = None
+    list_results: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
+
+    ###
+    # Valid User Defined Methods (pre_controller, filter, action, action_batch, fold
+    # and post_controller may be coroutine functions):
+    #
+
+    async def pre_controller(self) -> None: ...
+
+    async def filter(self, chosen: TChosen) -> bool: ...
+
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
+    def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
+
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
+    def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
+
+    async def action(self, chosen: TChosen) -> TActionReturn: ...
+
+    async def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
+    async def post_controller(self) -> None: ...
+
+    async def fold(self, results: List[TActionReturn]) -> TFoldReturn: ...
+
+    ###
+    # Built-in Instance Methods
+    #
+
+    async def __call__(
+        self, k: int, partition: AnyIterable[TChosen], /, *args: Any, **kwargs: Any
+    ) -> Union[Iterable[TActionReturn], TFoldReturn, None]:
+        """Generated call method for your controller. Coroutine actions run concurrently,
+        at most max_concurrency at a time, and other coroutine controlled methods are
+        awaited. *args and **kwargs represent the position only, arguments, defaulted
+        arguments, argument unpacks, keyword only, and keyword unpacks that you have
+        defined (if any) across all your controlled methods.
+
+        Args:
+            k (int): Number of chosen elements to operate over from the partition.
+            partition (AnyIterable[TChosen]): Iterable or async iterable representing
+            the set of elements this controller will operate over.
+
+        Returns:
+            Union[Iterable[TActionReturn], TFoldReturn, None]: If action returns a value and there
+            is no fold(...) method defined, the result will be an Iterable of elements
+            returned from k number of calls to the action(...), in partition order. If
+            fold(...) is defined, this will return the result from the fold(...) method.
+            Else, this will return None.
+        """
+        ...
+
+
+class AsyncDoAll(
+    Generic[TChosen, TActionReturn, TFoldReturn], metaclass=MetaController
+):
+    optimize: bool = False
+    reverse_sort: bool = False
+    max_concurrency: Union[int, None] = None
+    batch_size: Union[int, None] = None
+    list_results: bool = False
+    filter_columns: Union[Tuple[str, ...], None] = None
+    sort_key_columns: Union[Tuple[str, ...], None] = None
+
+    ###
+    # Valid User Defined Methods (pre_controller, filter, action, action_batch, fold
+    # and post_controller may be coroutine functions):
+    #
+
+    async def pre_controller(self) -> None: ...
+
+    async def filter(self, chosen: TChosen) -> bool: ...
+
+    def filter_batch(self, chosen: List[TChosen]) -> Sequence[bool]: ...
+
+    def sort_key(self, chosen: TChosen) -> SupportsRichComparison: ...
+
+    def sort_key_batch(
+        self, chosen: List[TChosen]
+    ) -> Sequence[SupportsRichComparison]: ...
+
+    def sort_cmp(self, a: TChosen, b: TChosen) -> int: ...
+
+    async def action(self, chosen: TChosen) -> TActionReturn: ...
+
+    async def action_batch(self, chosen: List[TChosen]) -> List[TActionReturn]: ...
+
+    async def post_controller(self) -> None: ...
+
+    async def fold(self, results: List[TActionReturn]) -> TFoldReturn: ...
+
+    ###
+    # Built-in Instance Methods
+    #
+
+    async def __call__(
+        self, partition: AnyIterable[TChosen], /, *args: Any, **kwargs: Any
+    ) -> Union[Iterable[TActionReturn], TFoldReturn, None]:
+        """Generated call method for your controller. Coroutine actions run concurrently,
+        at most max_concurrency at a time, and other coroutine controlled methods are
+        awaited. *args and **kwargs represent the position only, arguments, defaulted
+        arguments, argument unpacks, keyword only, and keyword unpacks that you have
+        defined (if any) across all your controlled methods.
+
+        Args:
+            partition (AnyIterable[TChosen]): Iterable or async iterable representing
+            the set of elements this controller will operate over.
+
+        Returns:
+            Union[Iterable[TActionReturn], TFoldReturn, None]: If action returns a value and there
+            is no fold(...) method defined, the result will be an Iterable of elements
+            returned from all the calls to the action(...) method, in partition order. If
+            fold(...) is defined, this will return the result from the fold(...) method.
+            Else, this will return None.
+        """
+        ...
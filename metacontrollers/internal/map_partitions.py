@@ -0,0 +1,53 @@
+from typing import Any, List, Union
+
+from metacontrollers.internal.executors import partitions_map
+from metacontrollers.internal.interface import DoAll, DoK, DoOne
+from metacontrollers.internal.namespace import THREAD_EXECUTOR_NAME
+
+
+def map_partitions(
+    controller: Union[DoOne, DoK, DoAll],
+    /,
+    *args: Any,
+    executor: str = THREAD_EXECUTOR_NAME,
+    max_workers: Union[int, None] = None,
+    chunk_size: Union[int, None] = None,
+    ordered: bool = True,
+    **kwargs: Any,
+) -> List[Any]:
+    """
+    Parallel version of controller.call_many: calls the controller on each partition,
+    splitting the partitions into chunks across a pool of workers. Takes the same
+    arguments as call_many, i.e. (partitions, ...) or, for DoK, (k, partitions, ...).
+
+        results = map_partitions(controller, partitions, minimum, executor="processes")
+
+    Controllers called this way run sequentially within a worker, even if they have an
+    executor of their own. With "processes", the controller's process pool is used, so
+    the same rules apply as for the "processes" executor.
+
+    Args:
+        controller (Union[DoOne, DoK, DoAll]): controller instance.
+        executor (str, optional): "threads" or "processes". Defaults to "threads".
+        max_workers (Union[int, None], optional): number of workers, or None for the default. Defaults to None.
+        chunk_size (Union[int, None], optional): number of partitions handed to a worker at a time, or None to pick one. Defaults to None.
+        ordered (bool, optional): if True, results are returned in the order of the
+        partitions, otherwise in the order chunks complete. Defaults to True.
+
+    Returns:
+        List[Any]: result of the controller for each partition.
+    """
+    num_leading_args = 1 if isinstance(controller, DoK) else 0
+    if len(args) <= num_leading_args:
+        raise TypeError("map_partitions() is missing the partitions argument.")
+    return partitions_map(
+        controller,
+        args[num_leading_args],
+        args[:num_leading_args],
+        args[num_leading_args + 1 :],
+        kwargs,
+        executor,
+        max_workers,
+        chunk_size,
+        ordered,
+    )
@@ -6,6 +6,20 @@ from typing import Any, Callable, List, Tuple
 
 
 class MethodInspector:
+    # inspectors are created for every controlled method of every controller, so keep them compact
+    __slots__ = (
+        "fn",
+        "spec",
+        "_signature_dict",
+        "__is_staticmethod",
+        "__is_lambda",
+        "__has_explicit_void_return",
+        "__has_explicit_value_return",
+        "__has_value_yield",
+        "__has_value_yield_from",
+        "__error",
+    )
+
     def __init__(self, fn: Callable) -> None:
         static_override = False
         if not callable(fn):
@@ -46,8 +60,6 @@ class MethodInspector:
         self.__has_value_yield = None
         self.__has_value_yield_from = None
         self.__error = None
-        self.__decompiled_module = None
-        self.__source = None
 
     ###
     # Read Only Properties
@@ -61,6 +73,13 @@ class MethodInspector:
     def is_lambda(self) -> bool:
         return self.__is_lambda
 
+    @property
+    def is_coroutine_function(self) -> bool:
+        """
+        True for methods defined with async def, which return a coroutine to be awaited.
+        """
+        return inspect.iscoroutinefunction(getattr(self.fn, "__func__", self.fn))
+
     @property
     def has_explicit_void_return(self) -> bool:
         if self.__has_explicit_void_return is None:
@@ -199,7 +218,8 @@ class MethodInspector:
     @property
     def body_ast(self) -> List[ast.AST]:
         """
-        Returns the body ast of the method. NOTE: This excludes the signature.
+        Returns the body ast of the method. NOTE: This excludes the signature. The source is
+        parsed again on every access since inspectors do not keep the source or its AST.
 
         Returns:
             List[ast.AST]: List of AST nodes representing the body of the method.
@@ -211,9 +231,9 @@ class MethodInspector:
                 "Inspecting lambda functions is not supported yet."
             )
             # TODO: REPLACE THIS. I should handle lambdas entirely separetely, and boil them down to this class's properties
-            return [self.__decompiled_module.body[0].value.body]
+            return [self._parse_module().body[0].value.body]
         # get the module body, then the body of the function
-        return self.__decompiled_module.body[0].body
+        return self._parse_module().body[0].body
 
     def get_defaulted_args(self) -> List[Tuple[str, Any]]:
         """
@@ -250,6 +270,9 @@ class MethodInspector:
         """
         return self.args[: -len(self.get_defaulted_args()) or None]
 
+    def _parse_module(self) -> ast.Module:
+        return ast.parse(dedent(inspect.getsource(self.fn)))
+
     def _parse_return_options(self) -> None:
         """Inspection method to parse this instances' callable and determine the
         different ways it can exit:
@@ -271,8 +294,8 @@ class MethodInspector:
         self.__error = False
 
         try:
-            self.__source = inspect.getsource(self.fn)
-            self.__decompiled_module = ast.parse(dedent(self.__source))
+            # the module is only needed for this pass, so it is not stored on the inspector
+            decompiled_module = self._parse_module()
 
             class InnerReturnVisitor(ast.NodeVisitor):
                 def __init__(self):
@@ -318,9 +341,8 @@ class MethodInspector:
                             self.visit(next_node)
 
                 def visit_AsyncFunctionDef(self, node):
-                    next_node = self.get_next_node(node)
-                    if next_node is not None:
-                        self.visit(next_node)
+                    # the inspected method itself may be a coroutine function
+                    self.visit_FunctionDef(node)
 
                 def visit_Lambda(self, node):
                     next_node = self.get_next_node(node)
@@ -346,7 +368,7 @@ class MethodInspector:
 
             visitor = InnerReturnVisitor()
             visitor.visit(
-                self.__decompiled_module.body[0]
+                decompiled_module.body[0]
             )  # Only visit the top-level function
 
             self.__has_explicit_value_return = visitor.has_explicit_value_return
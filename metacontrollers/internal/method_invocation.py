@@ -87,3 +87,31 @@ class MethodInvocation:
             defaults=[],
         )
         return ast.Lambda(args=args, body=self.to_function_call(name=name))
+
+    def to_call_arguments(self, num_leading_args: int = 1) -> ast.Tuple:
+        """
+        Generates an (args, kwargs) tuple holding the arguments this method is called with,
+        excluding the leading arguments that are supplied per element (such as chosen). This
+        lets the method be invoked later as method(*leading, *args, **kwargs), for example
+        from a worker process.
+
+        Args:
+            num_leading_args (int, optional): number of per element arguments to leave out. Defaults to 1.
+
+        Returns:
+            ast.Tuple: ast representation of the (args, kwargs) tuple.
+        """
+        args, keywords = self.get_call_args_and_keywords()
+        return ast.Tuple(
+            elts=[
+                ast.Tuple(elts=args[num_leading_args:], ctx=ast.Load()),
+                ast.Dict(
+                    keys=[
+                        None if keyword.arg is None else ast.Constant(value=keyword.arg)
+                        for keyword in keywords
+                    ],
+                    values=[keyword.value for keyword in keywords],
+                ),
+            ],
+            ctx=ast.Load(),
+        )
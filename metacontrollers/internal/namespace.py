@@ -2,6 +2,7 @@
 # Arguments
 CHOSEN_ARG_NAME = "__ctrl_chosen__"
 PARTITION_ARG_NAME = "__ctrl_partition__"
+PARTITIONS_ARG_NAME = "__ctrl_partitions__"
 K_ARG_NAME = "__ctrl_k__"
 SORT_CMP_ARG_A_NAME = "__ctrl_a__"
 SORT_CMP_ARG_B_NAME = "__ctrl_b__"
@@ -12,23 +13,105 @@ CLASS_ARG_NAME = "self"
 # Methods
 PRE_CONTROLLER_METHOD_NAME = "pre_controller"
 FILTER_METHOD_NAME = "filter"
+FILTER_BATCH_METHOD_NAME = "filter_batch"
 SORT_KEY_METHOD_NAME = "sort_key"
+SORT_KEY_BATCH_METHOD_NAME = "sort_key_batch"
 SORT_CMP_METHOD_NAME = "sort_cmp"
 ACTION_METHOD_NAME = "action"
+ACTION_BATCH_METHOD_NAME = "action_batch"
 FOLD_METHOD_NAME = "fold"
+FOLD_COMBINE_METHOD_NAME = "fold_combine"
 POST_CONTROLLER_METHOD_NAME = "post_controller"
 GENERATED_CALL_METHOD_NAME = "__ctrl_call__"
+ITER_MANY_METHOD_NAME = "iter_many"
+GENERATED_ITER_MANY_METHOD_NAME = "__ctrl_iter_many__"
+# class attribute holding the cooperative call methods of a controller, by time slice
+COOPERATIVE_METHODS_NAME = "__ctrl_cooperative__"
+# class attribute holding the compiled coalesced call methods of a controller
+COALESCED_METHODS_NAME = "__ctrl_coalesced__"
+# class attribute holding the pipeline metrics of a controller
+PIPELINE_METRICS_NAME = "__ctrl_pipeline_metrics__"
+
+CONTROLLED_METHOD_NAMES = (
+    PRE_CONTROLLER_METHOD_NAME,
+    FILTER_METHOD_NAME,
+    FILTER_BATCH_METHOD_NAME,
+    SORT_KEY_METHOD_NAME,
+    SORT_KEY_BATCH_METHOD_NAME,
+    SORT_CMP_METHOD_NAME,
+    ACTION_METHOD_NAME,
+    ACTION_BATCH_METHOD_NAME,
+    FOLD_METHOD_NAME,
+    FOLD_COMBINE_METHOD_NAME,
+    POST_CONTROLLER_METHOD_NAME,
+)
+
+
+####
+# Class Options
+OPTIMIZE_OPTION_NAME = "optimize"
+REVERSE_SORT_OPTION_NAME = "reverse_sort"
+EXECUTOR_OPTION_NAME = "executor"
+MAX_WORKERS_OPTION_NAME = "max_workers"
+CHUNK_SIZE_OPTION_NAME = "chunk_size"
+ORDERED_OPTION_NAME = "ordered"
+FOLD_ASSOCIATIVE_OPTION_NAME = "fold_associative"
+PARALLEL_SORT_OPTION_NAME = "parallel_sort"
+WORKERS_OPTION_NAME = "workers"
+MAX_CONCURRENCY_OPTION_NAME = "max_concurrency"
+PIPELINE_OPTION_NAME = "pipeline"
+QUEUE_SIZE_OPTION_NAME = "queue_size"
+BATCH_SIZE_OPTION_NAME = "batch_size"
+LIST_RESULTS_OPTION_NAME = "list_results"
+FILTER_COLUMNS_OPTION_NAME = "filter_columns"
+SORT_KEY_COLUMNS_OPTION_NAME = "sort_key_columns"
+
+# options that change the generated call method, and therefore must be part of its cache key
+CONTROLLER_OPTION_NAMES = (
+    OPTIMIZE_OPTION_NAME,
+    REVERSE_SORT_OPTION_NAME,
+    EXECUTOR_OPTION_NAME,
+    MAX_WORKERS_OPTION_NAME,
+    CHUNK_SIZE_OPTION_NAME,
+    ORDERED_OPTION_NAME,
+    FOLD_ASSOCIATIVE_OPTION_NAME,
+    PARALLEL_SORT_OPTION_NAME,
+    WORKERS_OPTION_NAME,
+    MAX_CONCURRENCY_OPTION_NAME,
+    PIPELINE_OPTION_NAME,
+    QUEUE_SIZE_OPTION_NAME,
+    BATCH_SIZE_OPTION_NAME,
+    LIST_RESULTS_OPTION_NAME,
+    FILTER_COLUMNS_OPTION_NAME,
+    SORT_KEY_COLUMNS_OPTION_NAME,
+)
+
+
+####
+# Executors
+THREAD_EXECUTOR_NAME = "threads"
+PROCESS_EXECUTOR_NAME = "processes"
+INTERPRETER_EXECUTOR_NAME = "interpreters"
+DISTRIBUTED_EXECUTOR_NAME = "distributed"
 
 
 ####
 # Variable Names
 ACTION_RESULT_ASSIGNMENT_NAME = "__ctrl_result__"
+TIME_SLICER_ASSIGNMENT_NAME = "__ctrl_slicer__"
+# global of a coalesced call method that hands its chosen element to the pending batch
+BATCH_SUBMIT_NAME = "__ctrl_submit__"
+# local variable a controlled method is bound to in iter_many, e.g. "__ctrl_action__"
+HOISTED_METHOD_NAME_FORMAT = "__ctrl_{}__"
 
 RESERVED_KEYWORDS = {
     CHOSEN_ARG_NAME,
     PARTITION_ARG_NAME,
+    PARTITIONS_ARG_NAME,
     K_ARG_NAME,
     SORT_CMP_ARG_A_NAME,
     SORT_CMP_ARG_B_NAME,
     ACTION_RESULT_ASSIGNMENT_NAME,
+    TIME_SLICER_ASSIGNMENT_NAME,
+    *(HOISTED_METHOD_NAME_FORMAT.format(name) for name in CONTROLLED_METHOD_NAMES),
 }
@@ -0,0 +1,495 @@
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
+
+from metacontrollers.internal.executors import (
+    SHARED_EXECUTORS,
+    MethodCall,
+    combine_partial_folds,
+    fold_chunk,
+    get_default_max_processes,
+    get_default_max_workers,
+    iter_chunks,
+    iter_dispatched,
+    map_chunk,
+    run_worker_chunk,
+)
+from metacontrollers.internal.namespace import (
+    FOLD_COMBINE_METHOD_NAME,
+    FOLD_METHOD_NAME,
+    PIPELINE_METRICS_NAME,
+    THREAD_EXECUTOR_NAME,
+)
+
+# elements handed from one stage to the next at a time when chunk_size is not set
+DEFAULT_PIPELINE_CHUNK_SIZE = 64
+# chunks a queue between two stages holds when queue_size is not set
+DEFAULT_PIPELINE_QUEUE_SIZE = 8
+
+FILTER_STAGE_NAME = "filter"
+ACTION_STAGE_NAME = "action"
+FOLD_STAGE_NAME = "fold"
+# queue from the filter stage to the action stage (or to the fold stage without action)
+FILTERED_QUEUE_NAME = "filtered"
+# queue from the action stage to the fold stage
+RESULTS_QUEUE_NAME = "results"
+
+_lock = threading.Lock()
+
+
+class StageMetrics:
+    """
+    Totals of a pipeline stage. items counts what the stage received: the elements of
+    the partition for filter, the chosen elements for action, and the results (or the
+    partial folds of each chunk) for fold. busy_time is the time the stage spent working,
+    blocked_time the time it waited on a full output queue or an empty input queue.
+    """
+
+    __slots__ = ("items", "chunks", "busy_time", "blocked_time")
+
+    def __init__(self) -> None:
+        self.items = 0
+        self.chunks = 0
+        self.busy_time = 0.0
+        self.blocked_time = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items per second of busy time."""
+        return self.items / self.busy_time if self.busy_time > 0 else 0.0
+
+    def add(self, other: "StageMetrics") -> None:
+        self.items += other.items
+        self.chunks += other.chunks
+        self.busy_time += other.busy_time
+        self.blocked_time += other.blocked_time
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        return {
+            "items": self.items,
+            "chunks": self.chunks,
+            "busy_time": self.busy_time,
+            "blocked_time": self.blocked_time,
+            "throughput": self.throughput,
+        }
+
+
+class QueueMetrics:
+    """
+    Totals of a queue between two stages. The occupancy (number of chunks in the queue)
+    is sampled on every put; full_time is the time the producer waited on a full queue.
+    """
+
+    __slots__ = ("capacity", "puts", "occupancy_total", "max_occupancy", "full_time")
+
+    def __init__(self, capacity: int = 0) -> None:
+        self.capacity = capacity
+        self.puts = 0
+        self.occupancy_total = 0
+        self.max_occupancy = 0
+        self.full_time = 0.0
+
+    @property
+    def mean_occupancy(self) -> float:
+        return self.occupancy_total / self.puts if self.puts else 0.0
+
+    def add(self, other: "QueueMetrics") -> None:
+        self.capacity = max(self.capacity, other.capacity)
+        self.puts += other.puts
+        self.occupancy_total += other.occupancy_total
+        self.max_occupancy = max(self.max_occupancy, other.max_occupancy)
+        self.full_time += other.full_time
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        return {
+            "capacity": self.capacity,
+            "puts": self.puts,
+            "mean_occupancy": self.mean_occupancy,
+            "max_occupancy": self.max_occupancy,
+            "full_time": self.full_time,
+        }
+
+
+class PipelineMetrics:
+    """
+    Stage and queue metrics of a pipelined controller class, summed over every call
+    since it was created (or last reset). Each call records its metrics when it ends.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.calls = 0
+        self.stages: Dict[str, StageMetrics] = {}
+        self.queues: Dict[str, QueueMetrics] = {}
+
+    def record(
+        self, stages: Dict[str, StageMetrics], queues: Dict[str, QueueMetrics]
+    ) -> None:
+        with self.__lock:
+            self.calls += 1
+            for name, stage in stages.items():
+                self.stages.setdefault(name, StageMetrics()).add(stage)
+            for name, queue in queues.items():
+                self.queues.setdefault(name, QueueMetrics()).add(queue)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as plain dicts:
+
+            {"calls": 3,
+             "stages": {"filter": {"items": ..., "throughput": ...}, ...},
+             "queues": {"filtered": {"mean_occupancy": ..., ...}, ...}}
+        """
+        with self.__lock:
+            return {
+                "calls": self.calls,
+                "stages": {
+                    name: stage.as_dict() for name, stage in self.stages.items()
+                },
+                "queues": {
+                    name: queue.as_dict() for name, queue in self.queues.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.calls = 0
+            self.stages = {}
+            self.queues = {}
+
+
+def get_pipeline_metrics(cls: type) -> PipelineMetrics:
+    """
+    Returns the metrics of a controller class, creating them the first time.
+    """
+    metrics = vars(cls).get(PIPELINE_METRICS_NAME)
+    if metrics is None:
+        with _lock:
+            metrics = vars(cls).get(PIPELINE_METRICS_NAME)
+            if metrics is None:
+                metrics = PipelineMetrics()
+                setattr(cls, PIPELINE_METRICS_NAME, metrics)
+    return metrics
+
+
+class _Cancelled(Exception):
+    """Raised in a stage waiting on a queue when another stage failed."""
+
+
+# returned by StageQueue.get once the producer finished and the queue is empty
+_END = object()
+
+
+class StageQueue:
+    """
+    Bounded queue of chunks between two pipeline stages, with one producer and one
+    consumer. Cancelling it wakes both up with _Cancelled.
+    """
+
+    def __init__(self, capacity: int, metrics: QueueMetrics) -> None:
+        self.items: deque = deque()
+        self.capacity = capacity
+        self.metrics = metrics
+        self.finished = False
+        self.cancelled = False
+        self.condition = threading.Condition(threading.Lock())
+
+    def put(self, chunk: Any) -> None:
+        with self.condition:
+            if len(self.items) >= self.capacity and not self.cancelled:
+                start = perf_counter()
+                while len(self.items) >= self.capacity and not self.cancelled:
+                    self.condition.wait()
+                self.metrics.full_time += perf_counter() - start
+            if self.cancelled:
+                raise _Cancelled()
+            self.items.append(chunk)
+            occupancy = len(self.items)
+            self.metrics.puts += 1
+            self.metrics.occupancy_total += occupancy
+            if occupancy > self.metrics.max_occupancy:
+                self.metrics.max_occupancy = occupancy
+            self.condition.notify()
+
+    def get(self) -> Any:
+        with self.condition:
+            while not self.items and not self.finished and not self.cancelled:
+                self.condition.wait()
+            if self.cancelled:
+                raise _Cancelled()
+            if not self.items:
+                return _END
+            chunk = self.items.popleft()
+            self.condition.notify()
+            return chunk
+
+    def finish(self) -> None:
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def cancel(self) -> None:
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify_all()
+
+
+def iter_queue(queue: StageQueue, stage: StageMetrics) -> Iterator[Any]:
+    """
+    Yields the chunks of a queue until its producer finished, adding the time spent
+    waiting for them to the blocked time of the consuming stage.
+    """
+    while True:
+        start = perf_counter()
+        chunk = queue.get()
+        stage.blocked_time += perf_counter() - start
+        if chunk is _END:
+            return
+        yield chunk
+
+
+def put_chunk(queue: StageQueue, chunk: Any, stage: StageMetrics) -> None:
+    start = perf_counter()
+    queue.put(chunk)
+    stage.blocked_time += perf_counter() - start
+
+
+def run_filter_stage(
+    elements: Iterable[Any],
+    filter_fn: Union[Callable[[Any], bool], None],
+    chunk_size: int,
+    output: StageQueue,
+    stage: StageMetrics,
+) -> None:
+    start = perf_counter()
+    for chunk in iter_chunks(elements, chunk_size):
+        stage.items += len(chunk)
+        stage.chunks += 1
+        if filter_fn is not None:
+            chunk = [chosen for chosen in chunk if filter_fn(chosen)]
+        if chunk:
+            put_chunk(output, chunk, stage)
+    output.finish()
+    stage.busy_time = perf_counter() - start - stage.blocked_time
+
+
+def run_action_stage(
+    action_fn: Callable[[Any], Any],
+    source: StageQueue,
+    output: StageQueue,
+    stage: StageMetrics,
+) -> None:
+    start = perf_counter()
+    for chunk in iter_queue(source, stage):
+        stage.items += len(chunk)
+        stage.chunks += 1
+        put_chunk(output, list(map(action_fn, chunk)), stage)
+    output.finish()
+    stage.busy_time = perf_counter() - start - stage.blocked_time
+
+
+def run_pooled_action_stage(
+    pool: Any,
+    fn: Callable[..., Any],
+    args: tuple,
+    max_pending: int,
+    ordered: bool,
+    source: StageQueue,
+    output: StageQueue,
+    stage: StageMetrics,
+) -> None:
+    def counted(chunks: Iterator[Any]) -> Iterator[Any]:
+        for chunk in chunks:
+            stage.items += len(chunk)
+            stage.chunks += 1
+            yield chunk
+
+    start = perf_counter()
+    # time spent waiting on the workers counts as busy time
+    dispatched = iter_dispatched(
+        pool, fn, counted(iter_queue(source, stage)), ordered, max_pending, *args
+    )
+    try:
+        for result in dispatched:
+            put_chunk(output, result, stage)
+    finally:
+        dispatched.close()
+    output.finish()
+    stage.busy_time = perf_counter() - start - stage.blocked_time
+
+
+def run_stage(
+    target: Callable[..., None],
+    args: tuple,
+    queues: List[StageQueue],
+    errors: List[BaseException],
+) -> None:
+    try:
+        target(*args)
+    except _Cancelled:
+        pass
+    except BaseException as error:
+        errors.append(error)
+        for queue in queues:
+            queue.cancel()
+
+
+def pipeline_map(
+    controller: Any,
+    elements: Iterable[Any],
+    filter_fn: Union[Callable[[Any], bool], None],
+    action_fn: Union[Callable[[Any], Any], None],
+    action_call: MethodCall,
+    collect: bool,
+    executor: Union[str, None],
+    max_workers: Union[int, None],
+    chunk_size: Union[int, None],
+    queue_size: Union[int, None],
+    ordered: bool,
+    fold_call: MethodCall = None,
+    fold_combine: bool = False,
+) -> Any:
+    """
+    Runs filter, action and fold over elements as three stages that overlap, connected
+    by bounded queues of chunks. The filter stage iterates the partition on its own
+    thread; the action stage runs on its own thread, or dispatches chunks to the
+    executor's pool; the fold stage runs in the calling thread. At most queue_size
+    chunks wait between two stages (plus the chunks in flight on the pool), so a slow
+    stage makes the stages before it wait instead of buffering the partition.
+
+    Args:
+        controller (Any): controller instance (its class holds the metrics).
+        elements (Iterable[Any]): partition.
+        filter_fn (Union[Callable[[Any], bool], None]): filter, or None to not filter.
+        action_fn (Union[Callable[[Any], Any], None]): action, or None for no action stage.
+        action_call (MethodCall): (args, kwargs) to call action with in worker processes.
+        collect (bool): if False, the action results are discarded.
+        executor (Union[str, None]): executor of the action stage, or None for its thread.
+        max_workers (Union[int, None]): number of pool workers, or None for the default.
+        chunk_size (Union[int, None]): elements per chunk, or None for 64.
+        queue_size (Union[int, None]): chunks per queue, or None for 8.
+        ordered (bool): if True, results are in the order of elements, otherwise in the
+        order chunks complete on the pool.
+        fold_call (MethodCall, optional): (args, kwargs) to fold each chunk's results
+        with, or None to not fold. Defaults to None.
+        fold_combine (bool, optional): if True, partial folds are combined with the
+        controller's fold_combine, otherwise fold is called on them. Defaults to False.
+
+    Returns:
+        Any: fold result if there is a fold call, else the action results (or the
+        filtered elements without action), or None if collect is False.
+    """
+    fold = None if fold_call is None else getattr(controller, FOLD_METHOD_NAME)
+    combine = getattr(controller, FOLD_COMBINE_METHOD_NAME) if fold_combine else None
+
+    if SHARED_EXECUTORS.in_worker:
+        # waiting on the shared pool from one of its workers could deadlock it
+        if filter_fn is not None:
+            elements = filter(filter_fn, elements)
+        results = list(elements if action_fn is None else map(action_fn, elements))
+        if fold is not None:
+            args, kwargs = fold_call
+            return fold(results, *args, **kwargs)
+        return results if collect else None
+
+    chunk_size = chunk_size or DEFAULT_PIPELINE_CHUNK_SIZE
+    queue_size = queue_size or DEFAULT_PIPELINE_QUEUE_SIZE
+    stages = {FILTER_STAGE_NAME: StageMetrics()}
+    queue_metrics = {FILTERED_QUEUE_NAME: QueueMetrics(queue_size)}
+    queues = [StageQueue(queue_size, queue_metrics[FILTERED_QUEUE_NAME])]
+    errors: List[BaseException] = []
+    threads = [
+        threading.Thread(
+            target=run_stage,
+            args=(
+                run_filter_stage,
+                (elements, filter_fn, chunk_size, queues[0], stages[FILTER_STAGE_NAME]),
+                queues,
+                errors,
+            ),
+            name="metacontrollers-pipeline-filter",
+            daemon=True,
+        )
+    ]
+
+    # the workers fold each chunk with a pool, the fold stage otherwise
+    fold_in_workers = fold is not None and executor is not None
+    if action_fn is not None:
+        stages[ACTION_STAGE_NAME] = StageMetrics()
+        queue_metrics[RESULTS_QUEUE_NAME] = QueueMetrics(queue_size)
+        queues.append(StageQueue(queue_size, queue_metrics[RESULTS_QUEUE_NAME]))
+        if executor is None:
+            target = run_action_stage
+            args = (action_fn, queues[0], queues[1], stages[ACTION_STAGE_NAME])
+        else:
+            if executor == THREAD_EXECUTOR_NAME:
+                max_workers = max_workers or get_default_max_workers()
+                pool = SHARED_EXECUTORS.get_thread_pool(max_workers)
+                if fold_in_workers:
+                    fn, fn_args = fold_chunk, (action_fn, fold, fold_call)
+                else:
+                    fn, fn_args = map_chunk, (action_fn,)
+            else:
+                max_workers = max_workers or get_default_max_processes()
+                pool = SHARED_EXECUTORS.get_process_pool(controller, max_workers)
+                fn = run_worker_chunk
+                fn_args = (None, action_call, fold_call)
+            target = run_pooled_action_stage
+            args = (
+                pool,
+                fn,
+                fn_args,
+                max_workers * 2,
+                ordered,
+                queues[0],
+                queues[1],
+                stages[ACTION_STAGE_NAME],
+            )
+        threads.append(
+            threading.Thread(
+                target=run_stage,
+                args=(target, args, queues, errors),
+                name="metacontrollers-pipeline-action",
+                daemon=True,
+            )
+        )
+
+    fold_stage = stages[FOLD_STAGE_NAME] = StageMetrics()
+    results: List[Any] = []
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        for chunk in iter_queue(queues[-1], fold_stage):
+            fold_stage.chunks += 1
+            if fold_in_workers:
+                fold_stage.items += 1
+                results.append(chunk)
+            elif fold is not None:
+                fold_stage.items += len(chunk)
+                args, kwargs = fold_call
+                results.append(fold(chunk, *args, **kwargs))
+            else:
+                fold_stage.items += len(chunk)
+                if collect:
+                    results.extend(chunk)
+        if fold is not None and not errors:
+            results = combine_partial_folds(results, fold, fold_call, combine)
+    except _Cancelled:
+        pass
+    except BaseException:
+        for queue in queues:
+            queue.cancel()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+        fold_stage.busy_time = perf_counter() - start - fold_stage.blocked_time
+        get_pipeline_metrics(type(controller)).record(stages, queue_metrics)
+
+    if errors:
+        raise errors[0]
+    if fold is not None or collect:
+        return results
+    return None
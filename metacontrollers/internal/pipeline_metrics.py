@@ -0,0 +1,30 @@
+from typing import Union
+
+from metacontrollers.internal.interface import DoAll
+from metacontrollers.internal.namespace import PIPELINE_OPTION_NAME
+from metacontrollers.internal.pipeline import PipelineMetrics, get_pipeline_metrics
+
+
+def pipeline_metrics(controller: Union[DoAll, type]) -> PipelineMetrics:
+    """
+    Returns the stage throughput and queue occupancy metrics of a DoAll controller that
+    sets pipeline = True. They are shared by every instance of the class:
+
+        metrics = pipeline_metrics(controller).snapshot()
+        metrics["stages"]["action"]["throughput"]  # chosen elements per second
+
+    Args:
+        controller (Union[DoAll, type]): controller instance or class.
+
+    Returns:
+        PipelineMetrics: metrics of the controller class.
+    """
+    cls = controller if isinstance(controller, type) else type(controller)
+    if (
+        not issubclass(cls, DoAll)
+        or getattr(cls, PIPELINE_OPTION_NAME, False) is not True
+    ):
+        raise TypeError(
+            f'pipeline_metrics() takes a DoAll controller that sets {PIPELINE_OPTION_NAME} = True, but "{cls.__name__}" was given.'
+        )
+    return get_pipeline_metrics(cls)
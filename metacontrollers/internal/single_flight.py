@@ -0,0 +1,179 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, Union
+
+from metacontrollers.internal.interface import (
+    AsyncDoAll,
+    AsyncDoK,
+    AsyncDoOne,
+    Do,
+    DoAll,
+    DoK,
+    DoOne,
+)
+
+# arguments of these types are keyed by value, everything else by identity
+VALUE_KEYED_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+Fingerprint = Callable[..., Hashable]
+
+
+def _argument_key(value: Any) -> Hashable:
+    if type(value) in VALUE_KEYED_TYPES:
+        return (type(value), value)
+    return id(value)
+
+
+def default_fingerprint(*args: Any, **kwargs: Any) -> Hashable:
+    """
+    Default key of a controller call. Numbers, strings, bytes and None are keyed by value
+    (and type, so 1, 1.0 and True differ), anything else (partitions, lists, objects) by
+    identity: two calls only share a result if they pass the same partition object.
+    """
+    if kwargs:
+        return (
+            tuple(map(_argument_key, args)),
+            tuple(
+                sorted((name, _argument_key(value)) for name, value in kwargs.items())
+            ),
+        )
+    return tuple(map(_argument_key, args))
+
+
+class _Flight:
+    __slots__ = ("args", "kwargs", "result", "error", "done")
+
+    def __init__(self, args: tuple, kwargs: dict) -> None:
+        # keeps the arguments alive, so their ids are not reused while in flight
+        self.args = args
+        self.kwargs = kwargs
+        self.result: Any = None
+        self.error: Union[BaseException, None] = None
+        self.done = threading.Event()
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls of a controller from many threads:
+
+        deduplicated = SingleFlight(controller)
+        result = deduplicated(partition, *args)  # from any thread
+
+    The first call for a fingerprint runs the controller; calls with the same fingerprint
+    made while it runs wait for it and get the same result object (or exception) instead
+    of running the controller again. Once it returns, the next call runs the controller
+    again: results are not cached.
+
+    Args:
+        controller (Union[Do, DoOne, DoK, DoAll]): controller instance.
+        fingerprint (Callable[..., Hashable], optional): called with the arguments of each
+            call, returns its key. Defaults to the identity of the partition and other
+            objects, and the value of numbers, strings, bytes and None.
+    """
+
+    def __init__(
+        self,
+        controller: Union[Do, DoOne, DoK, DoAll],
+        /,
+        fingerprint: Fingerprint = default_fingerprint,
+    ) -> None:
+        if not isinstance(controller, (Do, DoOne, DoK, DoAll)):
+            raise TypeError(
+                f"SingleFlight takes a Do, DoOne, DoK or DoAll controller, but {type(controller).__name__} was given."
+            )
+        if not callable(fingerprint):
+            raise TypeError(
+                f"SingleFlight fingerprint must be callable, but {fingerprint!r} was given."
+            )
+        self.controller = controller
+        self.fingerprint = fingerprint
+        self.__lock = threading.Lock()
+        self.__flights: Dict[Hashable, _Flight] = {}
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        key = self.fingerprint(*args, **kwargs)
+        with self.__lock:
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.__flights[key] = _Flight(args, kwargs)
+
+        if leader:
+            try:
+                flight.result = self.controller(*args, **kwargs)
+            except BaseException as error:
+                flight.error = error
+            finally:
+                with self.__lock:
+                    del self.__flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls running."""
+        return len(self.__flights)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop, for AsyncDoOne, AsyncDoK and AsyncDoAll
+    controllers:
+
+        deduplicated = AsyncSingleFlight(controller)
+        result = await deduplicated(partition, *args)
+
+    The call runs in its own task: cancelling a waiting call, even the first one, does not
+    cancel it for the others.
+
+    Args:
+        controller (Union[AsyncDoOne, AsyncDoK, AsyncDoAll]): controller instance.
+        fingerprint (Callable[..., Hashable], optional): called with the arguments of each
+            call, returns its key. Defaults as for SingleFlight.
+    """
+
+    def __init__(
+        self,
+        controller: Union[AsyncDoOne, AsyncDoK, AsyncDoAll],
+        /,
+        fingerprint: Fingerprint = default_fingerprint,
+    ) -> None:
+        if not isinstance(controller, (AsyncDoOne, AsyncDoK, AsyncDoAll)):
+            raise TypeError(
+                f"AsyncSingleFlight takes an AsyncDoOne, AsyncDoK or AsyncDoAll controller, but {type(controller).__name__} was given."
+            )
+        if not callable(fingerprint):
+            raise TypeError(
+                f"AsyncSingleFlight fingerprint must be callable, but {fingerprint!r} was given."
+            )
+        self.controller = controller
+        self.fingerprint = fingerprint
+        self.__flights: Dict[Hashable, asyncio.Future] = {}
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        key = self.fingerprint(*args, **kwargs)
+        flight = self.__flights.get(key)
+        if flight is None:
+            flight = self.__flights[key] = asyncio.ensure_future(
+                self.controller(*args, **kwargs)
+            )
+            flight.add_done_callback(lambda _: self.__land(key, flight))
+        # a cancelled caller must not cancel the call of the others
+        return await asyncio.shield(flight)
+
+    def __land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self.__flights.get(key) is flight:
+            del self.__flights[key]
+        # every caller may have been cancelled: mark the exception as retrieved
+        if not flight.cancelled():
+            flight.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls running."""
+        return len(self.__flights)
@@ -0,0 +1,74 @@
+"""
+Runs a worker server for controllers that use the "distributed" executor.
+
+    METACONTROLLERS_AUTHKEY=secret python -m metacontrollers.worker --listen 0.0.0.0:6000
+
+Controllers are sent to the worker pickled, so the worker imports each controller's
+module by name; it must be importable from the worker (for example from its working
+directory or PYTHONPATH). Controllers and workers authenticate each other with the
+METACONTROLLERS_AUTHKEY environment variable, or the --authkey option.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from typing import List
+
+from metacontrollers.internal.distributed import (
+    AUTHKEY_ENV_NAME,
+    get_authkey,
+    parse_address,
+    serve,
+)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m metacontrollers.worker",
+        description="Run a worker server for distributed controllers.",
+    )
+    parser.add_argument(
+        "--listen",
+        required=True,
+        help='"host:port" to listen on; port 0 picks a free port',
+    )
+    parser.add_argument(
+        "--authkey",
+        help=f"authentication key (defaults to the {AUTHKEY_ENV_NAME} environment variable)",
+    )
+    parser.add_argument(
+        "--import",
+        dest="modules",
+        action="append",
+        default=[],
+        help="module to import before serving, so its controllers are ready (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        authkey = get_authkey(args.authkey)
+        address = parse_address(args.listen)
+    except ValueError as err:
+        parser.error(str(err))
+
+    # like `python -m`, make modules in the working directory importable
+    sys.path.insert(0, os.getcwd())
+    for module_name in args.modules:
+        importlib.import_module(module_name)
+
+    try:
+        serve(
+            address,
+            authkey,
+            lambda listening: print(
+                f"Listening on {listening[0]}:{listening[1]}", flush=True
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import AsyncDoAll, AsyncDoK, DoAll, DoK
+from metacontrollers.internal.exceptions import (
+    ArgumentError,
+    InvalidControllerMethodError,
+    InvalidControllerOptionError,
+    InvalidReturnError,
+)
+
+
+class Scaled(DoAll):
+    batch_size = 3
+
+    def __init__(self) -> None:
+        self.batches = []
+
+    def filter(self, chosen, scale) -> bool:
+        return chosen % 2 == 0
+
+    def action_batch(self, chosen, scale, *, offset=0):
+        self.batches.append(list(chosen))
+        return [element * scale + offset for element in chosen]
+
+
+class Summed(DoAll):
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action_batch(self, chosen):
+        return [element + 1 for element in chosen]
+
+    def fold(self, results):
+        return results
+
+
+class Inserted(DoAll):
+    batch_size = 2
+
+    def __init__(self) -> None:
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE rows (value INTEGER)")
+
+    def action_batch(self, chosen):
+        self.connection.executemany(
+            "INSERT INTO rows VALUES (?)", [(element,) for element in chosen]
+        )
+
+
+class Largest(DoK):
+    batch_size = 2
+
+    def __init__(self) -> None:
+        self.batches = []
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action_batch(self, chosen):
+        self.batches.append(list(chosen))
+        return [str(element) for element in chosen]
+
+    def fold(self, results):
+        return ",".join(results)
+
+
+class First(DoK):
+    def action_batch(self, chosen):
+        return [element * 2 for element in chosen]
+
+
+class Wrong(DoAll):
+    def action_batch(self, chosen):
+        return chosen[1:]
+
+
+class AsyncScaled(AsyncDoAll):
+    batch_size = 2
+
+    async def filter(self, chosen) -> bool:
+        return chosen > 0
+
+    async def action_batch(self, chosen):
+        await asyncio.sleep(0)
+        return [element * 10 for element in chosen]
+
+    def fold(self, results):
+        return sum(results)
+
+
+class AsyncFirst(AsyncDoK):
+    def action_batch(self, chosen):
+        return [element + 1 for element in chosen]
+
+
+class TestActionBatch(unittest.TestCase):
+    def test_do_all(self):
+        controller = Scaled()
+        self.assertListEqual(
+            controller(range(15), 10, offset=1),
+            [1, 21, 41, 61, 81, 101, 121, 141],
+        )
+        self.assertListEqual(controller.batches, [[0, 2, 4], [6, 8, 10], [12, 14]])
+        # an empty selection does not call action_batch
+        self.assertListEqual(controller([1, 3], 10), [])
+        self.assertEqual(len(controller.batches), 3)
+
+        # without a batch_size, every chosen element is in one batch
+        self.assertListEqual(Summed()(range(5)), [5, 4, 3, 2, 1])
+
+        controller = Inserted()
+        self.assertIsNone(controller(range(5)))
+        rows = controller.connection.execute("SELECT value FROM rows").fetchall()
+        self.assertListEqual([row[0] for row in rows], list(range(5)))
+
+    def test_do_k(self):
+        controller = Largest()
+        self.assertEqual(controller(3, range(10)), "9,8,7")
+        self.assertListEqual(controller.batches, [[9, 8], [7]])
+        self.assertListEqual(First()(3, iter(range(10))), [0, 2, 4])
+
+    def test_async(self):
+        self.assertEqual(asyncio.run(AsyncScaled()(range(-3, 5))), 100)
+        self.assertListEqual(asyncio.run(AsyncFirst()(2, range(5))), [1, 2])
+
+    def test_results_per_batch(self):
+        with self.assertRaises(InvalidReturnError):
+            Wrong()([1, 2, 3])
+
+    def test_shared_arguments(self):
+        with self.assertRaises(ArgumentError):
+
+            class Mismatched(DoAll):
+                def filter(self, chosen, limit) -> bool:
+                    return chosen < limit
+
+                def action_batch(self, chosen, maximum):
+                    return chosen
+
+        with self.assertRaises(ArgumentError):
+
+            class Unpacked(DoAll):
+                def filter(self, chosen, *values) -> bool:
+                    return True
+
+                def action_batch(self, chosen, *others):
+                    return chosen
+
+        with self.assertRaises(ArgumentError):
+
+            class KeywordUnpacked(DoK):
+                def filter(self, chosen, **options) -> bool:
+                    return True
+
+                def action_batch(self, chosen, **settings):
+                    return chosen
+
+    def test_invalid(self):
+        def action_batch(self, chosen):
+            return chosen
+
+        for options, error in (
+            ({"batch_size": 0}, InvalidControllerOptionError),
+            ({"batch_size": True}, InvalidControllerOptionError),
+            ({"action": lambda self, chosen: chosen}, InvalidControllerMethodError),
+            ({"executor": "threads"}, InvalidControllerOptionError),
+            ({"pipeline": True}, InvalidControllerOptionError),
+        ):
+            with self.subTest(options=options):
+                with self.assertRaises(error):
+                    type("T", (DoAll,), {"action_batch": action_batch, **options})
+
+        with self.assertRaises(InvalidControllerOptionError):
+
+            class T(DoK):
+                batch_size = 4
+
+                def action(self, chosen):
+                    return chosen
+
+        with self.assertRaises(InvalidReturnError):
+
+            class T(DoAll):
+                def action_batch(self, chosen):
+                    pass
+
+                def fold(self, results):
+                    return results
+
+
+if __name__ == "__main__":
+    unittest.main()
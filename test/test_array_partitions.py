@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import AsyncDoAll, AsyncDoOne, DoAll, DoK, DoOne
+from metacontrollers.internal.arrays import is_array
+from metacontrollers.internal.exceptions import (
+    InvalidControllerMethodError,
+    InvalidControllerOptionError,
+    InvalidReturnError,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Above(DoAll):
+    def filter_batch(self, chosen, threshold):
+        return chosen > threshold
+
+    def sort_key_batch(self, chosen, threshold):
+        return chosen % 7
+
+
+class ReverseByRemainder(DoAll):
+    reverse_sort = True
+    batch_size = 3
+
+    def sort_key_batch(self, chosen):
+        return chosen % 7
+
+
+class EvenByRemainder(DoK):
+    def filter_batch(self, chosen):
+        return chosen % 2 == 0
+
+    def sort_key_batch(self, chosen):
+        return chosen % 5
+
+
+class LargestRemainder(DoK):
+    reverse_sort = True
+    batch_size = 4
+
+    def sort_key_batch(self, chosen):
+        return chosen % 5
+
+    def action(self, chosen):
+        return int(chosen)
+
+
+class Multiples(DoK):
+    batch_size = 3
+
+    def __init__(self) -> None:
+        self.batches = 0
+
+    def filter_batch(self, chosen):
+        self.batches += 1
+        return chosen % 3 == 0
+
+    def fold(self, results):
+        return results
+
+
+class Closest(DoOne):
+    def sort_key_batch(self, chosen, target):
+        return abs(chosen - target)
+
+
+class Farthest(DoOne):
+    reverse_sort = True
+
+    def sort_key_batch(self, chosen, target):
+        return abs(chosen - target)
+
+
+class FirstAbove(DoOne):
+    def filter_batch(self, chosen, threshold):
+        return numpy.asarray(chosen) > threshold
+
+    def action(self, chosen, threshold):
+        return chosen * 10
+
+
+class AsyncFirstAbove(AsyncDoOne):
+    def filter_batch(self, chosen):
+        return [element > 2 for element in chosen]
+
+    async def action(self, chosen):
+        return chosen + 1
+
+
+class HighestColumn(DoK):
+    def sort_key_batch(self, chosen):
+        return -chosen[:, 1]
+
+
+class Ragged(DoAll):
+    def filter_batch(self, chosen):
+        return chosen[1:] > 0
+
+
+class MeanSquare(DoAll):
+    def __init__(self) -> None:
+        self.types = []
+
+    def filter_batch(self, chosen, threshold):
+        return chosen > threshold
+
+    def action_batch(self, chosen, threshold):
+        self.types.append(type(chosen))
+        return chosen * chosen
+
+    def fold(self, results, threshold):
+        self.types.append(type(results))
+        return results.mean() if len(results) else None
+
+
+class Squares(DoAll):
+    batch_size = 7
+
+    def action_batch(self, chosen):
+        return chosen * chosen
+
+
+class SquareList(DoAll):
+    list_results = True
+
+    def filter_batch(self, chosen):
+        return chosen % 2 == 1
+
+    def action_batch(self, chosen):
+        return chosen * chosen
+
+
+class SelectedList(DoK):
+    list_results = True
+
+    def sort_key_batch(self, chosen):
+        return -chosen
+
+
+class LargestTotal(DoK):
+    reverse_sort = True
+
+    def sort_key_batch(self, chosen):
+        return chosen
+
+    def action_batch(self, chosen):
+        return chosen * 2
+
+    def fold(self, results):
+        return results.sum()
+
+
+class AsyncSquares(AsyncDoAll):
+    batch_size = 10
+
+    async def action_batch(self, chosen):
+        return chosen * chosen
+
+
+class Shortened(DoAll):
+    def action_batch(self, chosen):
+        return chosen[1:]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestArrayPartitions(unittest.TestCase):
+    def setUp(self) -> None:
+        generator = random.Random(7)
+        self.values = [generator.randrange(50) for _ in range(60)]
+        self.array = numpy.array(self.values)
+
+    def test_is_array(self):
+        self.assertTrue(is_array(self.array))
+        self.assertFalse(is_array(self.values))
+
+    def test_do_all(self):
+        result = Above()(self.array, 20)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertListEqual(
+            result.tolist(),
+            sorted([value for value in self.values if value > 20], key=lambda x: x % 7),
+        )
+        # ties keep the partition order, also in reverse
+        self.assertListEqual(
+            ReverseByRemainder()(self.array).tolist(),
+            sorted(self.values, key=lambda x: x % 7, reverse=True),
+        )
+        self.assertListEqual(Above()(self.array[:0], 20).tolist(), [])
+
+    def test_do_k(self):
+        evens = [value for value in self.values if value % 2 == 0]
+        multiples = [value for value in self.values if value % 3 == 0]
+        for k in range(len(self.values) + 2):
+            with self.subTest(k=k):
+                self.assertListEqual(
+                    EvenByRemainder()(k, self.array).tolist(),
+                    heapq.nsmallest(k, evens, key=lambda x: x % 5),
+                )
+                self.assertListEqual(
+                    LargestRemainder()(k, self.array),
+                    heapq.nlargest(k, self.values, key=lambda x: x % 5),
+                )
+                self.assertListEqual(Multiples()(k, self.array).tolist(), multiples[:k])
+
+        # stops filtering once k elements were kept
+        controller = Multiples()
+        controller(1, self.array)
+        self.assertEqual(controller.batches, 1)
+
+    def test_do_one(self):
+        self.assertEqual(
+            Closest()(self.array, 25),
+            min(self.values, key=lambda x: abs(x - 25)),
+        )
+        self.assertEqual(
+            Farthest()(self.array, 25),
+            max(self.values, key=lambda x: abs(x - 25)),
+        )
+        self.assertEqual(
+            FirstAbove()(self.array, 40),
+            next(value for value in self.values if value > 40) * 10,
+        )
+        self.assertIsNone(FirstAbove()(self.array, 100))
+        self.assertIsNone(Closest()(self.array[:0], 25))
+
+        # lists are still accepted
+        self.assertEqual(FirstAbove()(numpy.arange(10).tolist(), 4), 50)
+        self.assertEqual(asyncio.run(AsyncFirstAbove()(range(10))), 4)
+
+    def test_rows(self):
+        rows = numpy.arange(12).reshape(6, 2)
+        result = HighestColumn()(2, rows)
+        self.assertListEqual(result.tolist(), [[10, 11], [8, 9]])
+
+    def test_values_per_element(self):
+        with self.assertRaises(InvalidReturnError):
+            Ragged()(self.array)
+
+    def test_action_batch(self):
+        controller = MeanSquare()
+        squares = [value * value for value in self.values if value > 20]
+        self.assertAlmostEqual(controller(self.array, 20), sum(squares) / len(squares))
+        # action_batch and fold get the whole selection as arrays, in one call each
+        self.assertListEqual(controller.types, [numpy.ndarray, numpy.ndarray])
+        self.assertIsNone(controller(self.array, 100))
+
+        result = Squares()(self.array)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertListEqual(result.tolist(), [value * value for value in self.values])
+        self.assertEqual(
+            LargestTotal()(3, self.array), sum(sorted(self.values)[-3:]) * 2
+        )
+
+        result = asyncio.run(AsyncSquares()(self.array))
+        self.assertListEqual(result.tolist(), [value * value for value in self.values])
+
+        with self.assertRaises(InvalidReturnError):
+            Shortened()(self.array)
+
+    def test_list_results(self):
+        result = SquareList()(numpy.arange(6.0))
+        self.assertListEqual(result, [1.0, 9.0, 25.0])
+        self.assertIs(type(result[0]), float)
+        result = SelectedList()(2, self.array)
+        self.assertListEqual(result, sorted(self.values)[-2:][::-1])
+        self.assertIs(type(result[0]), int)
+        self.assertListEqual(SquareList()(numpy.arange(0.0)), [])
+
+        with self.assertRaises(InvalidControllerOptionError):
+
+            class T(DoAll):
+                list_results = True
+
+                def action(self, chosen):
+                    return chosen
+
+    def test_invalid(self):
+        with self.assertRaises(InvalidControllerMethodError):
+
+            class T(DoOne):
+                def filter(self, chosen) -> bool:
+                    return True
+
+                def filter_batch(self, chosen):
+                    return chosen
+
+        with self.assertRaises(InvalidControllerMethodError):
+
+            class T(DoOne):
+                def sort_key(self, chosen):
+                    return chosen
+
+                def sort_key_batch(self, chosen):
+                    return chosen
+
+        with self.assertRaises(InvalidControllerMethodError):
+
+            class T(AsyncDoOne):
+                async def sort_key_batch(self, chosen):
+                    return chosen
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,394 @@
+import asyncio
+import inspect
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import AsyncDoAll, AsyncDoK, AsyncDoOne, DoAll
+from metacontrollers.internal.async_executors import (
+    STREAM_SELECT_CHUNK_SIZE,
+    async_map,
+)
+from metacontrollers.internal.exceptions import (
+    InvalidControllerMethodError,
+    InvalidControllerOptionError,
+)
+
+SERVER_DELAY = 0.02
+
+
+async def handle_echo(reader, writer):
+    # a local service that takes a while to answer each request
+    line = await reader.readline()
+    await asyncio.sleep(SERVER_DELAY)
+    writer.write(line)
+    await writer.drain()
+    writer.close()
+
+
+async def request(port, value):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{value}\n".encode())
+    await writer.drain()
+    answer = int(await reader.readline())
+    writer.close()
+    return answer
+
+
+class Echo(AsyncDoAll):
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def pre_controller(self) -> None:
+        self.calls.append("pre")
+
+    def filter(self, chosen, port, minimum=0) -> bool:
+        return chosen >= minimum
+
+    async def action(self, chosen, port):
+        return await request(port, chosen)
+
+    async def fold(self, results):
+        await asyncio.sleep(0)
+        return results
+
+    def post_controller(self) -> None:
+        self.calls.append("post")
+
+
+class SequentialEcho(AsyncDoAll):
+    max_concurrency = 1
+
+    async def action(self, chosen, port):
+        return await request(port, chosen)
+
+
+class ConcurrentEcho(AsyncDoAll):
+    max_concurrency = 10
+
+    async def action(self, chosen, port):
+        return await request(port, chosen)
+
+
+class Delayed(AsyncDoAll):
+    max_concurrency = 3
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+    async def action(self, chosen):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        # later elements finish first
+        await asyncio.sleep(0.001 * (10 - chosen))
+        self.running -= 1
+        return chosen
+
+
+class Recorded(AsyncDoAll):
+    def __init__(self) -> None:
+        self.seen = []
+
+    async def action(self, chosen):
+        await asyncio.sleep(0)
+        self.seen.append(chosen)
+
+
+class Failing(AsyncDoAll):
+    max_concurrency = 2
+
+    def __init__(self) -> None:
+        self.cancelled = 0
+
+    async def action(self, chosen):
+        if chosen == 3:
+            raise ValueError(chosen)
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return chosen
+
+
+class Mixed(AsyncDoAll):
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen):
+        return chosen * 2
+
+
+class Top(AsyncDoK):
+    max_concurrency = 2
+    reverse_sort = True
+
+    def sort_key(self, chosen):
+        return chosen
+
+    async def action(self, chosen, *, offset=0):
+        await asyncio.sleep(0.001 * chosen)
+        return chosen + offset
+
+    def fold(self, results):
+        return results
+
+
+class First(AsyncDoOne):
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def pre_controller(self) -> None:
+        self.calls.append("pre")
+
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+    async def action(self, chosen, scale):
+        await asyncio.sleep(0)
+        return chosen * scale
+
+    async def post_controller(self) -> None:
+        self.calls.append("post")
+
+
+class Stream:
+    """
+    Async iterable partition that counts how many elements were pulled from it.
+    """
+
+    def __init__(self, elements) -> None:
+        self.elements = elements
+        self.pulled = 0
+
+    async def __aiter__(self):
+        for element in self.elements:
+            await asyncio.sleep(0)
+            self.pulled += 1
+            yield element
+
+
+class StreamAll(AsyncDoAll):
+    async def filter(self, chosen) -> bool:
+        await asyncio.sleep(0)
+        return chosen % 3 != 0
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen):
+        return chosen * 2
+
+    def fold(self, results):
+        return sum(results)
+
+
+class StreamCollect(AsyncDoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+
+class StreamRecorded(AsyncDoAll):
+    def __init__(self) -> None:
+        self.seen = []
+
+    def action(self, chosen):
+        self.seen.append(chosen)
+
+
+class StreamTop(AsyncDoK):
+    reverse_sort = True
+
+    def sort_key(self, chosen):
+        return chosen[0]
+
+    def action(self, chosen):
+        return chosen
+
+
+class StreamBottom(AsyncDoK):
+    def sort_cmp(self, a, b):
+        return a[0] - b[0]
+
+    def action(self, chosen):
+        return chosen
+
+
+class StreamFirstK(AsyncDoK):
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+    async def action(self, chosen):
+        return chosen
+
+
+class StreamFirst(AsyncDoOne):
+    async def filter(self, chosen) -> bool:
+        return chosen > 2
+
+    def action(self, chosen):
+        return chosen
+
+
+class TestAsyncControllers(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await asyncio.start_server(handle_echo, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_call_method_is_a_coroutine_function(self):
+        for cls in (Echo, Top, First):
+            with self.subTest(cls=cls):
+                self.assertTrue(inspect.iscoroutinefunction(cls.__call__))
+
+    async def test_do_all(self):
+        controller = Echo()
+        self.assertListEqual(
+            await controller(range(10), self.port, 4), list(range(4, 10))
+        )
+        self.assertListEqual(controller.calls, ["pre", "post"])
+        self.assertListEqual(await Echo()([], self.port), [])
+
+    async def test_results_in_partition_order(self):
+        controller = Delayed()
+        self.assertListEqual(await controller(iter(range(10))), list(range(10)))
+        self.assertEqual(controller.peak, 3)
+
+    async def test_no_return_value(self):
+        controller = Recorded()
+        self.assertIsNone(await controller(range(5)))
+        self.assertListEqual(sorted(controller.seen), list(range(5)))
+
+    async def test_failure_cancels_pending_actions(self):
+        controller = Failing()
+        with self.assertRaises(ValueError):
+            await controller([0, 3, 1, 2])
+        # the action still waiting on 0 is cancelled, and 1 and 2 are never started
+        self.assertEqual(controller.cancelled, 1)
+
+    async def test_sync_methods(self):
+        self.assertListEqual(await Mixed()([1, 3, 2]), [6, 4, 2])
+
+    async def test_do_k(self):
+        self.assertListEqual(await Top()(3, [5, 1, 9, 4, 7], offset=1), [10, 8, 6])
+        self.assertListEqual(await Top()(0, [5, 1]), [])
+
+    async def test_do_one(self):
+        controller = First()
+        self.assertEqual(await controller([3, 4, 6], 10), 40)
+        self.assertIsNone(await controller([1, 3], 10))
+        self.assertListEqual(controller.calls, ["pre", "post"] * 2)
+
+    async def test_throughput_over_sequential(self):
+        partition = list(range(20))
+        start = time.perf_counter()
+        self.assertListEqual(await SequentialEcho()(partition, self.port), partition)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.assertListEqual(await ConcurrentEcho()(partition, self.port), partition)
+        concurrent = time.perf_counter() - start
+
+        # sequential awaiting waits for the server delay once per element
+        self.assertGreaterEqual(sequential, SERVER_DELAY * len(partition))
+        self.assertLess(concurrent, sequential / 2)
+
+
+class TestAsyncIterablePartitions(unittest.IsolatedAsyncioTestCase):
+    async def test_do_all(self):
+        partition = list(range(10))
+        expected = sum(chosen * 2 for chosen in partition if chosen % 3 != 0)
+        self.assertEqual(await StreamAll()(Stream(partition)), expected)
+        self.assertListEqual(await StreamCollect()(Stream(partition)), [0, 2, 4, 6, 8])
+        controller = StreamRecorded()
+        self.assertIsNone(await controller(Stream(partition)))
+        self.assertListEqual(controller.seen, partition)
+
+    async def test_async_actions(self):
+        controller = Delayed()
+        self.assertListEqual(await controller(Stream(range(10))), list(range(10)))
+        self.assertEqual(controller.peak, 3)
+        self.assertListEqual(await Top()(2, Stream([5, 1, 9, 4])), [9, 5])
+
+    async def test_top_k_matches_a_full_sort(self):
+        # many ties across several chunks, tagged with their position in the stream
+        size = 3 * STREAM_SELECT_CHUNK_SIZE + 5
+        partition = [(i * 7919 % 97, i) for i in range(size)]
+        for k in (0, 1, 10, STREAM_SELECT_CHUNK_SIZE + 1, len(partition) + 1):
+            with self.subTest(k=k):
+                self.assertListEqual(
+                    await StreamTop()(k, Stream(partition)),
+                    sorted(partition, key=lambda chosen: chosen[0], reverse=True)[:k],
+                )
+                self.assertListEqual(
+                    await StreamBottom()(k, Stream(partition)),
+                    sorted(partition, key=lambda chosen: chosen[0])[:k],
+                )
+
+    async def test_stops_early_without_sort(self):
+        stream = Stream(range(100))
+        self.assertEqual(await StreamFirst()(stream), 3)
+        self.assertEqual(stream.pulled, 4)
+        self.assertIsNone(await StreamFirst()(Stream([1, 2])))
+
+        stream = Stream(range(100))
+        self.assertListEqual(await StreamFirstK()(3, stream), [0, 2, 4])
+        self.assertEqual(stream.pulled, 5)
+
+    async def test_async_map_stream_keeps_order(self):
+        async def delayed(chosen):
+            await asyncio.sleep(0.001 * (10 - chosen))
+            return chosen
+
+        for max_concurrency in (None, 1, 4):
+            with self.subTest(max_concurrency=max_concurrency):
+                self.assertListEqual(
+                    await async_map(delayed, Stream(range(10)), max_concurrency),
+                    list(range(10)),
+                )
+
+
+class TestAsyncValidation(unittest.TestCase):
+    def test_invalid_options(self):
+        async def action(self, chosen):
+            return chosen
+
+        async def sort_key(self, chosen):
+            return chosen
+
+        async def sort_cmp(self, a, b):
+            return a - b
+
+        for base, attrs, error in (
+            (AsyncDoAll, {"max_concurrency": 0}, InvalidControllerOptionError),
+            (AsyncDoAll, {"max_concurrency": 1.5}, InvalidControllerOptionError),
+            (AsyncDoK, {"max_concurrency": True}, InvalidControllerOptionError),
+            (AsyncDoAll, {"executor": "threads"}, InvalidControllerOptionError),
+            (AsyncDoOne, {"executor": "processes"}, InvalidControllerOptionError),
+            (AsyncDoAll, {"sort_cmp": sort_cmp}, InvalidControllerMethodError),
+            (AsyncDoK, {"sort_key": sort_key}, InvalidControllerMethodError),
+            (AsyncDoOne, {"sort_key": sort_key}, InvalidControllerMethodError),
+        ):
+            with self.subTest(base=base, attrs=attrs):
+                with self.assertRaises(error):
+                    type("T", (base,), {"action": action, **attrs})
+
+    def test_max_concurrency_requires_async(self):
+        with self.assertRaises(InvalidControllerOptionError):
+
+            class T(DoAll):
+                max_concurrency = 2
+
+                def action(self, chosen):
+                    return chosen
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+import metacontrollers
+from metacontrollers import DoAll, DoK, DoOne
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.namespace import GENERATED_CALL_METHOD_NAME
+
+
+def make_do_one(offset):
+    class T(DoOne):
+        def action(self, chosen, scale=offset):
+            return chosen * scale
+
+    return T
+
+
+class TestBulkCompile(unittest.TestCase):
+    def test_deferred_compilation(self):
+        with metacontrollers.deferred_compilation():
+
+            class A(DoAll):
+                def filter(self, chosen, minimum) -> bool:
+                    return chosen >= minimum
+
+            class B(DoK):
+                def sort_key(self, chosen):
+                    return -chosen
+
+            class C(DoOne):
+                def action(self, chosen, *, offset=1):
+                    return chosen + offset
+
+            self.assertEqual(DEFERRED_COMPILATION.num_pending, 3)
+
+        self.assertEqual(DEFERRED_COMPILATION.num_pending, 0)
+        for cls in (A, B, C):
+            self.assertEqual(cls.__call__.__name__, GENERATED_CALL_METHOD_NAME)
+            self.assertFalse(hasattr(cls.__call__, "__ctrl_pending__"))
+
+        self.assertListEqual(A()([1, 2, 3], 2), [2, 3])
+        self.assertListEqual(B()(2, [1, 3, 2]), [3, 2])
+        self.assertEqual(C()([5]), 6)
+        self.assertEqual(C()([5], offset=2), 7)
+
+    def test_call_inside_block_compiles_pending(self):
+        with metacontrollers.deferred_compilation():
+
+            class A(DoAll):
+                def action(self, chosen):
+                    return chosen + 1
+
+            class B(DoOne):
+                def action(self, chosen):
+                    return chosen - 1
+
+            self.assertListEqual(A()([1, 2]), [2, 3])
+            self.assertEqual(DEFERRED_COMPILATION.num_pending, 0)
+            self.assertEqual(B()([1]), 0)
+
+    def test_compile_all(self):
+        self.assertEqual(metacontrollers.compile_all(), 0)
+        with metacontrollers.deferred_compilation():
+
+            class A(DoAll):
+                def action(self, chosen, value):
+                    return value
+
+            self.assertEqual(metacontrollers.compile_all(), 1)
+        self.assertListEqual(A()([1, 2], 0), [0, 0])
+
+    def test_factories(self):
+        with metacontrollers.deferred_compilation():
+            first = make_do_one(2)
+            second = make_do_one(3)
+        third = make_do_one(4)
+        self.assertIs(first.__call__.__code__, third.__call__.__code__)
+        self.assertEqual(first()([5]), 10)
+        self.assertEqual(second()([5]), 15)
+        self.assertEqual(third()([5]), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+import metacontrollers
+from metacontrollers import DoAll, DoK, DoOne, map_partitions
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.namespace import HOISTED_METHOD_NAME_FORMAT
+
+PARTITIONS = [[5, 1, 4], [], [2], [9, 3, 7, 8], [6, 0]]
+
+
+class Largest(DoOne):
+    def __init__(self) -> None:
+        self.calls = []
+
+    def pre_controller(self) -> None:
+        self.calls.append("pre")
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen >= minimum
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+    def post_controller(self) -> None:
+        self.calls.append("post")
+
+
+class Top(DoK):
+    reverse_sort = True
+
+    def sort_key(self, chosen, scale=1):
+        return chosen * scale
+
+    def fold(self, results):
+        return sum(results)
+
+
+class Scaled(DoAll):
+    optimize = True
+
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+    def action(self, chosen, scale):
+        return chosen * scale
+
+
+class Counted(DoAll):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def action(self, chosen):
+        self.count += 1
+
+
+class WorkerPid(DoOne):
+    def action(self, chosen):
+        return (chosen, os.getpid())
+
+
+class TestCallMany(unittest.TestCase):
+    def test_do_one(self):
+        controller = Largest()
+        expected = [Largest()(partition, 2, offset=10) for partition in PARTITIONS]
+        self.assertListEqual(controller.call_many(PARTITIONS, 2, offset=10), expected)
+        self.assertListEqual(controller.calls, ["pre", "post"] * len(PARTITIONS))
+        self.assertListEqual(controller.call_many([], 2), [])
+
+    def test_do_k(self):
+        for k in (0, 1, 3):
+            with self.subTest(k=k):
+                self.assertListEqual(
+                    Top().call_many(k, iter(PARTITIONS), scale=-1),
+                    [Top()(k, partition, scale=-1) for partition in PARTITIONS],
+                )
+
+    def test_do_all(self):
+        self.assertListEqual(
+            Scaled().call_many(PARTITIONS, 3),
+            [Scaled()(partition, 3) for partition in PARTITIONS],
+        )
+        controller = Counted()
+        self.assertListEqual(controller.call_many(PARTITIONS), [None] * 5)
+        self.assertEqual(controller.count, 10)
+
+    def test_iter_many_is_lazy(self):
+        controller = Largest()
+        results = controller.iter_many(iter(PARTITIONS), 0)
+        self.assertListEqual(controller.calls, [])
+        self.assertEqual(next(results), 5)
+        self.assertListEqual(controller.calls, ["pre", "post"])
+        self.assertListEqual(list(results), [None, 2, 9, 6])
+
+    def test_generated_once_per_class(self):
+        Largest().call_many(PARTITIONS, 0)
+        iter_many = vars(Largest)["iter_many"]
+        Largest().call_many(PARTITIONS, 0)
+        self.assertIs(vars(Largest)["iter_many"], iter_many)
+        # bound methods are looked up once, outside the loop over partitions
+        code = iter_many.__code__
+        for name in ("pre_controller", "filter", "sort_key", "action"):
+            self.assertIn(
+                HOISTED_METHOD_NAME_FORMAT.format(name),
+                code.co_varnames + code.co_cellvars,
+            )
+
+    def test_deferred_controller(self):
+        with metacontrollers.deferred_compilation():
+
+            class T(DoAll):
+                def action(self, chosen, *, offset=1):
+                    return chosen + offset
+
+            self.assertListEqual(T().call_many([[1], [2, 3]]), [[2], [3, 4]])
+            # generating iter_many does not defer another call method
+            self.assertEqual(DEFERRED_COMPILATION.num_pending, 0)
+        self.assertListEqual(T().call_many([[1]], offset=5), [[6]])
+
+
+class TestMapPartitions(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        metacontrollers.shutdown_executors()
+
+    def test_threads(self):
+        partitions = [list(range(index % 7)) for index in range(100)]
+        for chunk_size in (None, 1, 8):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertListEqual(
+                    map_partitions(
+                        Largest(), partitions, 1, offset=2, chunk_size=chunk_size
+                    ),
+                    [Largest()(partition, 1, offset=2) for partition in partitions],
+                )
+                self.assertListEqual(
+                    map_partitions(Top(), 2, partitions, max_workers=3),
+                    Top().call_many(2, partitions),
+                )
+
+    def test_unordered(self):
+        partitions = [[index] for index in range(50)]
+        self.assertListEqual(
+            sorted(map_partitions(Scaled(), partitions, 1, ordered=False)),
+            sorted(Scaled().call_many(partitions, 1)),
+        )
+
+    def test_processes(self):
+        results = map_partitions(
+            WorkerPid(),
+            [[index] for index in range(20)],
+            executor="processes",
+            max_workers=2,
+        )
+        self.assertListEqual([chosen for chosen, _ in results], list(range(20)))
+        self.assertNotIn(os.getpid(), {pid for _, pid in results})
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            map_partitions(Top(), 2)
+        with self.assertRaises(ValueError):
+            map_partitions(Largest(), PARTITIONS, 0, executor="fibers")
+
+
+if __name__ == "__main__":
+    unittest.main()
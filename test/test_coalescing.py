@@ -0,0 +1,256 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import (
+    AsyncCoalescer,
+    AsyncDoOne,
+    Coalescer,
+    DoAll,
+    DoOne,
+)
+from metacontrollers.internal.exceptions import (
+    InvalidControllerMethodError,
+    InvalidReturnError,
+)
+
+
+class Lookup(DoOne):
+    def __init__(self) -> None:
+        self.batches = []
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def pre_controller(self, scale) -> None:
+        with self.lock:
+            self.calls.append("pre")
+
+    def filter(self, chosen, scale) -> bool:
+        return chosen > 0
+
+    def action_batch(self, chosen):
+        self.batches.append(list(chosen))
+        return [element * 10 for element in chosen]
+
+    def post_controller(self, scale) -> None:
+        with self.lock:
+            self.calls.append("post")
+
+
+class Store(DoOne):
+    def __init__(self) -> None:
+        self.stored = []
+
+    def action_batch(self, chosen):
+        self.stored.extend(chosen)
+
+
+class Plain(DoOne):
+    def action(self, chosen, *, scale=1):
+        if chosen < 0:
+            raise ValueError(chosen)
+        return chosen * scale
+
+
+class Broken(DoOne):
+    def action_batch(self, chosen):
+        return chosen[:-1]
+
+
+class Failing(DoOne):
+    def action_batch(self, chosen):
+        raise KeyError("batch")
+
+
+class AsyncLookup(AsyncDoOne):
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def action_batch(self, chosen):
+        self.batches.append(len(chosen))
+        await asyncio.sleep(0.001)
+        return [element + 1 for element in chosen]
+
+
+class AsyncPlain(AsyncDoOne):
+    async def action(self, chosen):
+        return chosen
+
+
+class Scaled(DoOne):
+    def __init__(self) -> None:
+        self.batches = []
+
+    def action_batch(self, chosen, scale, *, offset=0):
+        self.batches.append(list(chosen))
+        return [element * scale + offset for element in chosen]
+
+
+class AsyncScaled(AsyncDoOne):
+    async def action_batch(self, chosen, scale):
+        return [element * scale for element in chosen]
+
+
+def run_threads(fn, num_threads):
+    results = [None] * num_threads
+    barrier = threading.Barrier(num_threads)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = fn(index)
+        except Exception as error:
+            results[index] = error
+
+    threads = [
+        threading.Thread(target=worker, args=(index,)) for index in range(num_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestActionBatch(unittest.TestCase):
+    def test_regular_call_is_a_batch_of_one(self):
+        controller = Lookup()
+        self.assertEqual(controller([0, 3, 4], 2), 30)
+        self.assertIsNone(controller([0], 2))
+        self.assertListEqual(controller.batches, [[3]])
+        self.assertListEqual(controller.calls, ["pre", "post"] * 2)
+
+        controller = Store()
+        self.assertIsNone(controller([5]))
+        self.assertListEqual(controller.stored, [5])
+
+    def test_additional_arguments(self):
+        controller = Scaled()
+        self.assertEqual(controller([4], 3), 12)
+        self.assertEqual(controller([4], 3, offset=1), 13)
+        self.assertListEqual(controller.batches, [[4], [4]])
+
+    def test_invalid_action_batch(self):
+        with self.assertRaises(AttributeError):
+
+            class T(DoOne):
+                def action_batch(self):
+                    return []
+
+
+class TestCoalescer(unittest.TestCase):
+    def test_batches_chosen_elements(self):
+        controller = Lookup()
+        coalesced = Coalescer(controller, max_batch_size=8, max_delay=0.05)
+        results = run_threads(lambda index: coalesced([0, index + 1], 1), 20)
+        self.assertListEqual(results, [10 * (index + 1) for index in range(20)])
+        self.assertLess(len(controller.batches), 20)
+        self.assertTrue(all(len(batch) <= 8 for batch in controller.batches))
+        self.assertEqual(sum(map(len, controller.batches)), 20)
+        # every call still runs its own pre and post controller
+        self.assertEqual(controller.calls.count("pre"), 20)
+        self.assertEqual(controller.calls.count("post"), 20)
+
+    def test_action_batch_with_arguments(self):
+        # the calls of a batch may pass different arguments, so whole calls are batched
+        controller = Scaled()
+        coalesced = Coalescer(controller, max_batch_size=8, max_delay=0.05)
+        results = run_threads(lambda index: coalesced([index], index % 3), 20)
+        self.assertListEqual(results, [index * (index % 3) for index in range(20)])
+        self.assertTrue(all(len(batch) == 1 for batch in controller.batches))
+
+    def test_whole_calls(self):
+        coalesced = Coalescer(Plain(), max_delay=0.01)
+        results = run_threads(lambda index: coalesced([index - 2], scale=index), 10)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertListEqual(
+            results[2:], [(index - 2) * index for index in range(2, 10)]
+        )
+
+        # the same argument objects go through iter_many
+        scale = 3
+        coalesced = Coalescer(Plain(), max_delay=0.01)
+        results = run_threads(lambda index: coalesced([index - 1], scale=scale), 6)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertListEqual(results[1:], [index * 3 for index in range(5)])
+
+    def test_batch_errors(self):
+        coalesced = Coalescer(Failing(), max_delay=0.01)
+        results = run_threads(lambda index: coalesced([index]), 4)
+        self.assertTrue(all(isinstance(result, KeyError) for result in results))
+        with self.assertRaises(InvalidReturnError):
+            Coalescer(Broken())([1])
+
+    def test_max_delay(self):
+        coalesced = Coalescer(Lookup(), max_delay=0.02)
+        start = time.perf_counter()
+        self.assertEqual(coalesced([1], 1), 10)
+        elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(elapsed, 0.02)
+        self.assertLess(elapsed, 0.5)
+
+    def test_invalid_arguments(self):
+        for args in ((Lookup(), 0), (Lookup(), 1.5), (Lookup(), 4, -1)):
+            with self.subTest(args=args):
+                with self.assertRaises(ValueError):
+                    Coalescer(*args)
+
+        class All(DoAll):
+            def action(self, chosen):
+                return chosen
+
+        with self.assertRaises(TypeError):
+            Coalescer(All())
+        with self.assertRaises(TypeError):
+            Coalescer(AsyncLookup())
+
+
+class TestAsyncCoalescer(unittest.IsolatedAsyncioTestCase):
+    async def test_async_controller(self):
+        controller = AsyncLookup()
+        coalesced = AsyncCoalescer(controller, max_batch_size=16)
+        results = await asyncio.gather(*(coalesced([index]) for index in range(40)))
+        self.assertListEqual(results, [index + 1 for index in range(40)])
+        self.assertListEqual(controller.batches, [16, 16, 8])
+
+    async def test_sync_controller(self):
+        controller = Lookup()
+        coalesced = AsyncCoalescer(controller)
+        results = await asyncio.gather(*(coalesced([index], 1) for index in range(5)))
+        self.assertListEqual(results, [None, 10, 20, 30, 40])
+        self.assertListEqual(controller.batches, [[1, 2, 3, 4]])
+
+        coalesced = AsyncCoalescer(Plain())
+        results = await asyncio.gather(
+            *(coalesced([index - 1], scale=2) for index in range(4)),
+            return_exceptions=True,
+        )
+        self.assertIsInstance(results[0], ValueError)
+        self.assertListEqual(results[1:], [0, 2, 4])
+
+    async def test_cancelled_caller(self):
+        controller = AsyncLookup()
+        coalesced = AsyncCoalescer(controller, max_delay=0.01)
+        first = asyncio.ensure_future(coalesced([1]))
+        second = asyncio.ensure_future(coalesced([2]))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 3)
+        self.assertListEqual(controller.batches, [2])
+
+    async def test_requires_action_batch(self):
+        for controller in (AsyncPlain(), AsyncScaled()):
+            with self.subTest(controller=type(controller).__name__):
+                with self.assertRaises(InvalidControllerMethodError):
+                    AsyncCoalescer(controller)
+        self.assertEqual(await AsyncScaled()([2], 3), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import sys
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import AsyncDoAll, DoAll, DoK, DoOne
+from metacontrollers.internal.columnar import Columns
+from metacontrollers.internal.exceptions import (
+    InvalidControllerOptionError,
+    InvalidReturnError,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def get_columns():
+    return {
+        "name": ["a", "b", "c", "d", "e", "f"],
+        "price": array("d", [5.0, 1.0, 3.0, 2.0, 4.0, 6.0]),
+        "quantity": array("i", [1, 5, 2, 3, 4, 1]),
+    }
+
+
+def get_rows(columns):
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+class Cheapest(DoAll):
+    filter_columns = ("price",)
+    sort_key_columns = ("price", "quantity")
+
+    def __init__(self) -> None:
+        self.read = []
+
+    def filter_batch(self, chosen, limit):
+        self.read.append(sorted(chosen))
+        return [price < limit for price in chosen["price"]]
+
+    def sort_key_batch(self, chosen, limit):
+        self.read.append(sorted(chosen))
+        return [
+            price * quantity
+            for price, quantity in zip(chosen["price"], chosen["quantity"])
+        ]
+
+
+class Names(DoK):
+    batch_size = 4
+    sort_key_columns = ("price",)
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+    def sort_key_batch(self, chosen):
+        return chosen["price"]
+
+    def action(self, chosen):
+        self.rows += 1
+        return chosen["name"]
+
+
+class FirstLarge(DoK):
+    batch_size = 2
+    filter_columns = ("quantity",)
+
+    def __init__(self) -> None:
+        self.batches = 0
+
+    def filter_batch(self, chosen):
+        self.batches += 1
+        return [quantity > 1 for quantity in chosen["quantity"]]
+
+    def action_batch(self, chosen):
+        return [row["name"] for row in chosen]
+
+
+class MostExpensive(DoOne):
+    reverse_sort = True
+    sort_key_columns = ("price",)
+
+    def sort_key_batch(self, chosen):
+        return chosen["price"]
+
+
+class AsyncLarge(AsyncDoAll):
+    filter_columns = ("quantity",)
+
+    def filter_batch(self, chosen):
+        return [quantity > 2 for quantity in chosen["quantity"]]
+
+    async def action(self, chosen):
+        return chosen["name"]
+
+
+class Rows(DoAll):
+    filter_columns = ("price",)
+
+    def filter_batch(self, chosen):
+        return [True] * len(chosen["price"])
+
+    def sort_key_batch(self, chosen):
+        return [-row["quantity"] for row in chosen]
+
+
+class Short(DoAll):
+    filter_columns = ("price",)
+
+    def filter_batch(self, chosen):
+        return [True]
+
+
+class TestColumnar(unittest.TestCase):
+    def test_do_all(self):
+        columns = get_columns()
+        controller = Cheapest()
+        self.assertListEqual(
+            [row["name"] for row in controller(columns, 4.5)], ["b", "c", "d", "e"]
+        )
+        # filter_batch and sort_key_batch only get the columns they declare
+        self.assertListEqual(controller.read, [["price"], ["price", "quantity"]])
+
+        # a partition of rows gives the same result
+        self.assertListEqual(
+            Cheapest()(get_rows(columns), 4.5), Cheapest()(columns, 4.5)
+        )
+        self.assertListEqual(Cheapest()({"price": [], "quantity": []}, 4.5), [])
+
+        # methods that do not declare columns get the rows
+        self.assertListEqual(
+            [row["name"] for row in Rows()(columns)], ["b", "e", "d", "c", "a", "f"]
+        )
+
+    def test_do_k(self):
+        controller = Names()
+        self.assertListEqual(controller(3, get_columns()), ["b", "d", "c"])
+        # rows are only built for the chosen elements
+        self.assertEqual(controller.rows, 3)
+
+        controller = FirstLarge()
+        self.assertListEqual(controller(2, get_columns()), ["b", "c"])
+        self.assertEqual(controller.batches, 2)
+
+    def test_do_one(self):
+        self.assertEqual(MostExpensive()(get_columns())["name"], "f")
+        self.assertIsNone(MostExpensive()({"price": []}))
+
+    def test_async(self):
+        self.assertListEqual(asyncio.run(AsyncLarge()(get_columns())), ["b", "d", "e"])
+
+    def test_columns(self):
+        columns = Columns(get_columns())
+        self.assertEqual(len(columns), 6)
+        selection = columns.select([4, 1])
+        self.assertListEqual(
+            list(selection),
+            [
+                {"name": "e", "price": 4.0, "quantity": 4},
+                {"name": "b", "price": 1.0, "quantity": 5},
+            ],
+        )
+        self.assertEqual(selection[1]["name"], "b")
+        self.assertDictEqual(
+            selection.get_columns(["name"], 0, 1),
+            {"name": ["e"]},
+        )
+        with self.assertRaises(ValueError):
+            Columns({"price": [1.0, 2.0], "quantity": [1]})
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        columns = {
+            name: numpy.asarray(column) for name, column in get_columns().items()
+        }
+        self.assertListEqual(Names()(3, columns), ["b", "d", "c"])
+
+        records = numpy.array(
+            list(zip(get_columns()["price"], get_columns()["quantity"])),
+            dtype=[("price", "f8"), ("quantity", "i4")],
+        )
+        result = Cheapest()(records, 4.5)
+        self.assertListEqual(
+            [record["price"] for record in result], [1.0, 3.0, 2.0, 4.0]
+        )
+        self.assertEqual(MostExpensive()(records)["price"], 6.0)
+
+    def test_values_per_batch(self):
+        with self.assertRaises(InvalidReturnError):
+            Short()(get_columns())
+
+    def test_invalid(self):
+        def filter_batch(self, chosen):
+            return chosen
+
+        for attrs in (
+            {"filter_batch": filter_batch, "filter_columns": "price"},
+            {"filter_batch": filter_batch, "filter_columns": ()},
+            {"filter_batch": filter_batch, "sort_key_columns": ("price",)},
+            {"action": lambda self, chosen: chosen, "filter_columns": ("price",)},
+        ):
+            with self.subTest(attrs=sorted(attrs)):
+                with self.assertRaises(InvalidControllerOptionError):
+                    type("T", (DoAll,), attrs)
+
+        with self.assertRaises(InvalidControllerOptionError):
+
+            class T(DoOne):
+                filter_columns = ("price",)
+
+                def action(self, chosen):
+                    return chosen
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import DoAll, DoK, cooperative, deferred_compilation
+from metacontrollers.internal.async_executors import COOPERATIVE_SORT_CHUNK_SIZE
+from metacontrollers.internal.exceptions import InvalidControllerOptionError
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class Full(DoAll):
+    def __init__(self) -> None:
+        self.calls = []
+
+    def pre_controller(self) -> None:
+        self.calls.append("pre")
+
+    def filter(self, chosen, minimum=0) -> bool:
+        self.calls.append("filter")
+        return chosen >= minimum
+
+    def sort_key(self, chosen):
+        return chosen % 7
+
+    def action(self, chosen, *, scale=1):
+        self.calls.append("action")
+        return (chosen % 7, chosen * scale)
+
+    def fold(self, results):
+        self.calls.append("fold")
+        return results
+
+    def post_controller(self) -> None:
+        self.calls.append("post")
+
+
+class Compared(DoAll):
+    reverse_sort = True
+
+    def sort_cmp(self, a, b):
+        return (a % 5) - (b % 5)
+
+
+class Filtered(DoAll):
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+
+class Counted(DoAll):
+    def fold(self, elements):
+        return sum(1 for _ in elements)
+
+
+class Recorded(DoAll):
+    def __init__(self) -> None:
+        self.seen = []
+
+    def action(self, chosen):
+        self.seen.append(chosen)
+
+
+class Slow(DoAll):
+    def action(self, chosen):
+        busy(0.0002)
+        return chosen
+
+
+class Threaded(DoAll):
+    executor = "threads"
+
+    def action(self, chosen):
+        return chosen
+
+
+class Top(DoK):
+    def action(self, chosen):
+        return chosen
+
+
+class Stream:
+    def __init__(self, elements) -> None:
+        self.elements = elements
+
+    async def __aiter__(self):
+        for element in self.elements:
+            yield element
+
+
+class TestCooperative(unittest.IsolatedAsyncioTestCase):
+    async def test_same_result_as_a_regular_call(self):
+        partition = list(range(50))
+        for controller_cls, args, kwargs in (
+            (Full, (partition, 10), {"scale": 3}),
+            (Full, (partition,), {}),
+            (Compared, (partition,), {}),
+            (Filtered, (partition,), {}),
+            (Counted, (partition,), {}),
+            (Recorded, (partition,), {}),
+        ):
+            with self.subTest(controller=controller_cls.__name__):
+                expected_controller = controller_cls()
+                controller = controller_cls()
+                self.assertEqual(
+                    await cooperative(controller)(*args, **kwargs),
+                    expected_controller(*args, **kwargs),
+                )
+                self.assertEqual(vars(controller), vars(expected_controller))
+
+    async def test_stage_order(self):
+        controller = Full()
+        await cooperative(controller, 0.0001)(range(3), 1)
+        self.assertListEqual(
+            controller.calls,
+            ["pre", "filter", "filter", "filter", "action", "action", "fold", "post"],
+        )
+
+    async def test_large_sort_matches_sorted(self):
+        partition = list(range(3 * COOPERATIVE_SORT_CHUNK_SIZE + 17))
+        self.assertEqual(
+            await cooperative(Full(), 0.0001)(partition),
+            Full()(partition),
+        )
+        self.assertEqual(
+            await cooperative(Compared(), 0.0001)(partition),
+            Compared()(partition),
+        )
+
+    async def test_async_iterable_partition(self):
+        self.assertListEqual(
+            await cooperative(Filtered())(Stream(range(10))), [0, 2, 4, 6, 8]
+        )
+
+    async def test_yields_to_the_event_loop(self):
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        # about 100 ms of work
+        results = await cooperative(Slow(), 0.005)(range(500))
+        task.cancel()
+        self.assertListEqual(results, list(range(500)))
+        self.assertGreater(len(gaps), 10)
+        self.assertLess(max(gaps), 0.05)
+
+    async def test_method_is_cached(self):
+        self.assertIs(cooperative(Full()).__func__, cooperative(Full()).__func__)
+        self.assertIsNot(
+            cooperative(Full(), 0.01).__func__, cooperative(Full()).__func__
+        )
+
+    async def test_deferred_compilation(self):
+        with deferred_compilation():
+
+            class Deferred(DoAll):
+                def action(self, chosen):
+                    return chosen + 1
+
+            self.assertListEqual(await cooperative(Deferred())([1, 2]), [2, 3])
+        # the class keeps its own synchronous call method
+        self.assertListEqual(Deferred()([1, 2]), [2, 3])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            cooperative(Top())
+        for time_slice in (0, -1, None, True):
+            with self.subTest(time_slice=time_slice):
+                with self.assertRaises(ValueError):
+                    cooperative(Full(), time_slice)
+        with self.assertRaises(InvalidControllerOptionError):
+            cooperative(Threaded())
+
+
+if __name__ == "__main__":
+    unittest.main()
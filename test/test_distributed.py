@@ -0,0 +1,212 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import DoAll, DoK
+from metacontrollers.internal.distributed import AUTHKEY_ENV_NAME
+from metacontrollers.internal.exceptions import (
+    InvalidControllerOptionError,
+    WorkerUnavailableError,
+)
+
+AUTHKEY = "metacontrollers-test"
+CRASH_ENV_NAME = "METACONTROLLERS_TEST_CRASH"
+
+
+def get_free_address() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+# worker servers import this module to unpickle the controllers, which picks new
+# addresses there; only the addresses picked by the test process are used
+WORKERS = (get_free_address(), get_free_address())
+CRASHING_WORKER = get_free_address()
+UNUSED_WORKER = get_free_address()
+
+
+class Score(DoAll):
+    executor = "distributed"
+    workers = WORKERS
+    chunk_size = 4
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, *, offset=0):
+        return chosen * 2 + offset
+
+
+class RetriedScore(DoAll):
+    executor = "distributed"
+    workers = (CRASHING_WORKER, UNUSED_WORKER) + WORKERS
+    chunk_size = 3
+
+    def action(self, chosen):
+        if os.environ.get(CRASH_ENV_NAME):
+            os._exit(1)
+        return chosen * 2
+
+
+class Unordered(DoAll):
+    executor = "distributed"
+    workers = WORKERS
+    chunk_size = 5
+    ordered = False
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen):
+        return chosen + 1
+
+
+class WorkerPids(DoAll):
+    executor = "distributed"
+    workers = WORKERS
+    chunk_size = 2
+    fold_associative = True
+
+    def action(self, chosen):
+        time.sleep(0.005)  # keep both workers busy
+        return {os.getpid()}
+
+    def fold(self, results):
+        return set().union(*results)
+
+
+class Failing(DoAll):
+    executor = "distributed"
+    workers = WORKERS
+
+    def action(self, chosen):
+        if chosen == 3:
+            raise ValueError(chosen)
+        return chosen
+
+
+class Unreachable(DoAll):
+    executor = "distributed"
+    workers = (UNUSED_WORKER,)
+
+    def action(self, chosen):
+        return chosen
+
+
+def start_worker(address: str, **env: str) -> subprocess.Popen:
+    root = os.path.join(os.path.dirname(__file__), "..")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "metacontrollers.worker", "--listen", address],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={
+            **os.environ,
+            "PYTHONPATH": os.path.abspath(root),
+            AUTHKEY_ENV_NAME: AUTHKEY,
+            **env,
+        },
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Listening on"):
+        process.kill()
+        raise RuntimeError(f"Worker {address} did not start: {line!r}")
+    return process
+
+
+class TestDistributed(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.previous_authkey = os.environ.get(AUTHKEY_ENV_NAME)
+        os.environ[AUTHKEY_ENV_NAME] = AUTHKEY
+        cls.workers = [start_worker(address) for address in WORKERS]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for worker in cls.workers:
+            worker.kill()
+            worker.wait()
+            worker.stdout.close()
+        if cls.previous_authkey is None:
+            del os.environ[AUTHKEY_ENV_NAME]
+        else:
+            os.environ[AUTHKEY_ENV_NAME] = cls.previous_authkey
+
+    def test_filter_and_action(self):
+        self.assertListEqual(
+            Score()(range(30), 5, offset=1), [x * 2 + 1 for x in range(5, 30)]
+        )
+        self.assertListEqual(Score()(iter([4, 1, 6])), [8, 2, 12])
+        self.assertListEqual(Score()([]), [])
+
+    def test_unordered(self):
+        self.assertListEqual(sorted(Unordered()(range(40))), list(range(1, 41)))
+
+    def test_runs_on_every_worker(self):
+        pids = WorkerPids()(range(40))
+        self.assertNotIn(os.getpid(), pids)
+        self.assertSetEqual(pids, {worker.pid for worker in self.workers})
+
+    def test_remote_exception(self):
+        with self.assertRaises(ValueError):
+            Failing()(range(10))
+
+    def test_failed_worker_is_retried(self):
+        crashing = start_worker(CRASHING_WORKER, **{CRASH_ENV_NAME: "1"})
+        try:
+            # the crashing worker dies on its first chunk and the unused address refuses
+            # connections; their chunks are retried on the healthy workers
+            self.assertListEqual(RetriedScore()(range(50)), [x * 2 for x in range(50)])
+            self.assertEqual(crashing.wait(timeout=10), 1)
+        finally:
+            crashing.kill()
+            crashing.wait()
+            crashing.stdout.close()
+
+    def test_no_workers_available(self):
+        with self.assertRaises(WorkerUnavailableError):
+            Unreachable()(range(5))
+
+    def test_missing_authkey(self):
+        os.environ.pop(AUTHKEY_ENV_NAME)
+        try:
+            with self.assertRaises(ValueError):
+                Score()(range(5))
+        finally:
+            os.environ[AUTHKEY_ENV_NAME] = AUTHKEY
+
+    def test_invalid_options(self):
+        def action(self, chosen):
+            return chosen
+
+        def sort_key(self, chosen):
+            return chosen
+
+        for base, options in (
+            (DoAll, {"executor": "processes", "workers": WORKERS}),
+            (DoAll, {"executor": "distributed", "workers": ()}),
+            (DoAll, {"executor": "distributed", "workers": ["localhost:1"]}),
+            (DoAll, {"executor": "distributed", "workers": ("localhost",)}),
+            (
+                DoAll,
+                {
+                    "executor": "distributed",
+                    "parallel_sort": True,
+                    "sort_key": sort_key,
+                },
+            ),
+            (DoK, {"executor": "distributed", "workers": WORKERS}),
+        ):
+            with self.subTest(base=base, options=options):
+                with self.assertRaises(InvalidControllerOptionError):
+                    type("T", (base,), {"action": action, **options})
+
+
+if __name__ == "__main__":
+    unittest.main()
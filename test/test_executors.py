@@ -0,0 +1,345 @@
+import os
+import sys
+import threading
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import DoAll, DoK
+from metacontrollers.internal.exceptions import (
+    InvalidControllerMethodError,
+    InvalidControllerOptionError,
+)
+from metacontrollers.internal.executors import (
+    SHARED_EXECUTORS,
+    compact_keys,
+    thread_map,
+)
+
+
+class TestThreadMap(unittest.TestCase):
+    def test_ordered(self):
+        for chunk_size in (1, 3, 100):
+            self.assertListEqual(
+                thread_map(lambda x: x * 2, range(50), 4, chunk_size, True),
+                [x * 2 for x in range(50)],
+            )
+
+    def test_unordered(self):
+        results = thread_map(lambda x: x * 2, range(50), 4, 3, False)
+        self.assertListEqual(sorted(results), [x * 2 for x in range(50)])
+
+    def test_empty(self):
+        self.assertListEqual(thread_map(lambda x: x, [], None, 1, True), [])
+
+    def test_exception(self):
+        def fn(x):
+            if x == 7:
+                raise KeyError(x)
+            return x
+
+        with self.assertRaises(KeyError):
+            thread_map(fn, range(20), 2, 1, True)
+        with self.assertRaises(KeyError):
+            thread_map(fn, range(20), 2, 1, False)
+
+
+class TestCompactKeys(unittest.TestCase):
+    def test_numeric_keys(self):
+        self.assertEqual(compact_keys([3, -1, 2]), array("q", [3, -1, 2]))
+        self.assertEqual(compact_keys([0.5, 1.0]), array("d", [0.5, 1.0]))
+
+    def test_other_keys(self):
+        for keys in ([], [1, 2.0], [True, False], ["a", "b"], [(1, 2)], [2**70]):
+            with self.subTest(keys=keys):
+                self.assertIs(compact_keys(keys), keys)
+
+
+def identity_action(self, chosen):
+    return chosen
+
+
+class TestThreadedControllers(unittest.TestCase):
+    def test_actions_run_concurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        class T(DoAll):
+            executor = "threads"
+            max_workers = 4
+
+            def action(self, chosen):
+                # only passes if all four actions are running at the same time
+                barrier.wait()
+                return chosen
+
+        self.assertListEqual(T()([1, 2, 3, 4]), [1, 2, 3, 4])
+
+    def test_fold_receives_partition_order(test_self):
+        class T(DoAll):
+            executor = "threads"
+            max_workers = 4
+            chunk_size = 2
+
+            def __init__(self) -> None:
+                self.calls = []
+
+            def pre_controller(self) -> None:
+                self.calls.append("pre")
+
+            def filter(self, chosen, minimum=0) -> bool:
+                return chosen >= minimum
+
+            def sort_key(self, chosen):
+                return -chosen
+
+            def action(self, chosen, *, scale=1):
+                return chosen * scale
+
+            def fold(self, results):
+                self.calls.append("fold")
+                return results
+
+            def post_controller(self) -> None:
+                self.calls.append("post")
+
+        inst = T()
+        test_self.assertListEqual(inst(range(10), 5, scale=10), [90, 80, 70, 60, 50])
+        test_self.assertListEqual(inst.calls, ["pre", "fold", "post"])
+
+    def test_unordered_results(self):
+        class T(DoAll):
+            executor = "threads"
+            ordered = False
+
+            def action(self, chosen):
+                return chosen + 1
+
+        self.assertListEqual(sorted(T()(range(100))), list(range(1, 101)))
+
+    def test_action_without_return(self):
+        seen = []
+        lock = threading.Lock()
+
+        class T(DoK):
+            executor = "threads"
+
+            def sort_key(self, chosen):
+                return chosen
+
+            def action(self, chosen, offset):
+                with lock:
+                    seen.append(chosen + offset)
+
+        self.assertIsNone(T()(3, [5, 1, 4, 2, 3], 10))
+        self.assertListEqual(sorted(seen), [11, 12, 13])
+
+    def test_do_k_without_sort(self):
+        class T(DoK):
+            executor = "threads"
+            chunk_size = 2
+
+            def action(self, chosen):
+                return chosen * 2
+
+        self.assertListEqual(T()(3, iter(range(10))), [0, 2, 4])
+
+    def test_nested_controllers(self):
+        class Inner(DoAll):
+            executor = "threads"
+            max_workers = 2
+
+            def action(self, chosen):
+                return chosen + 1
+
+        class Outer(DoAll):
+            executor = "threads"
+            max_workers = 2
+
+            def action(self, chosen):
+                return sum(Inner()(range(chosen)))
+
+        # would deadlock if the inner controller waited on the outer controller's threads
+        self.assertListEqual(Outer()(range(6)), [0, 1, 3, 6, 10, 15])
+        self.assertFalse(SHARED_EXECUTORS.in_worker)
+
+    def test_partial_folds(self):
+        class T(DoK):
+            executor = "threads"
+            max_workers = 4
+            chunk_size = 2
+            fold_associative = True
+
+            def sort_key(self, chosen):
+                return chosen
+
+            def action(self, chosen):
+                return [chosen]
+
+            def fold(self, results, separator=None):
+                return [item for result in results for item in result]
+
+        # concatenation is associative but not commutative, so partials must stay in order
+        self.assertListEqual(T()(7, range(20, 0, -1)), [1, 2, 3, 4, 5, 6, 7])
+
+    def test_fold_combine(self):
+        class T(DoAll):
+            executor = "threads"
+            chunk_size = 3
+
+            def action(self, chosen):
+                return str(chosen)
+
+            def fold(self, results, *, prefix=""):
+                return prefix + "".join(results)
+
+            def fold_combine(self, a, b):
+                return f"({a}{b})"
+
+        self.assertEqual(T()(range(7)), "((012345)6)")
+        self.assertEqual(T()(range(7), prefix="-"), "((-012-345)-6)")
+        self.assertEqual(T()([]), "")
+
+    def test_fold_combine_requires_fold(self):
+        with self.assertRaises(InvalidControllerMethodError):
+
+            class T(DoAll):
+                executor = "threads"
+
+                def action(self, chosen):
+                    return chosen
+
+                def fold_combine(self, a, b):
+                    return a + b
+
+    def test_parallel_select_matches_sequential(self):
+        # many equal keys, so the result depends on how ties are broken
+        elements = [(index * 7919 % 13, index) for index in range(500)]
+
+        for reverse in (False, True):
+
+            class Sequential(DoK):
+                reverse_sort = reverse
+
+                def filter(self, chosen, minimum) -> bool:
+                    return chosen[0] >= minimum
+
+                def sort_key(self, chosen, *, scale=1):
+                    return chosen[0] * scale
+
+            class Parallel(DoK):
+                executor = "threads"
+                reverse_sort = reverse
+                max_workers = 4
+                chunk_size = 16
+
+                def filter(self, chosen, minimum) -> bool:
+                    return chosen[0] >= minimum
+
+                def sort_key(self, chosen, *, scale=1):
+                    return chosen[0] * scale
+
+            class SequentialCmp(DoK):
+                reverse_sort = reverse
+
+                def sort_cmp(self, a, b):
+                    return a[0] - b[0]
+
+            class ParallelCmp(DoK):
+                executor = "threads"
+                reverse_sort = reverse
+                chunk_size = 50
+
+                def sort_cmp(self, a, b):
+                    return a[0] - b[0]
+
+            self.assertIn("thread_select", Parallel.__call__.__globals__)
+            for k in (1, 10, 100, 1000):
+                with self.subTest(reverse_sort=reverse, k=k):
+                    self.assertListEqual(
+                        Parallel()(k, elements, 3, scale=-1),
+                        Sequential()(k, elements, 3, scale=-1),
+                    )
+                    self.assertListEqual(
+                        ParallelCmp()(k, iter(elements)),
+                        SequentialCmp()(k, elements),
+                    )
+
+    def test_parallel_sort_matches_sequential(self):
+        elements = [(index * 7919 % 13, index) for index in range(500)]
+
+        for reverse in (False, True):
+
+            class Sequential(DoAll):
+                reverse_sort = reverse
+
+                def filter(self, chosen, minimum) -> bool:
+                    return chosen[1] >= minimum
+
+                def sort_key(self, chosen, *, scale=1):
+                    return chosen[0] * scale
+
+                def action(self, chosen):
+                    return chosen[1]
+
+            class Parallel(DoAll):
+                executor = "threads"
+                reverse_sort = reverse
+                max_workers = 4
+                chunk_size = 16
+                parallel_sort = True
+
+                def filter(self, chosen, minimum) -> bool:
+                    return chosen[1] >= minimum
+
+                def sort_key(self, chosen, *, scale=1):
+                    return chosen[0] * scale
+
+                def action(self, chosen):
+                    return chosen[1]
+
+            self.assertIn("thread_sort", Parallel.__call__.__globals__)
+            for scale in (1, -1, 0.5):
+                with self.subTest(reverse_sort=reverse, scale=scale):
+                    self.assertListEqual(
+                        Parallel()(iter(elements), 3, scale=scale),
+                        Sequential()(elements, 3, scale=scale),
+                    )
+
+    def test_options_are_part_of_cache_key(self):
+        class Sequential(DoAll):
+            def action(self, chosen):
+                return chosen
+
+        class Threaded(DoAll):
+            executor = "threads"
+
+            def action(self, chosen):
+                return chosen
+
+        self.assertNotIn("thread_map", Sequential.__call__.__globals__)
+        self.assertIn("thread_map", Threaded.__call__.__globals__)
+
+    def test_invalid_options(self):
+        for options in (
+            {"executor": "fibers"},
+            {"executor": "threads", "max_workers": 0},
+            {"executor": "threads", "chunk_size": 0},
+            {"executor": "threads", "chunk_size": 1.5},
+            {"executor": "threads", "ordered": "yes"},
+            {"executor": "threads", "fold_associative": 1},
+            {"executor": "threads", "parallel_sort": 1},
+            {"parallel_sort": True, "sort_key": identity_action},
+            {"executor": "threads", "parallel_sort": True},
+        ):
+            with self.subTest(options=options):
+                with self.assertRaises(InvalidControllerOptionError):
+                    type(
+                        "T",
+                        (DoAll,),
+                        {"action": identity_action, **options},
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
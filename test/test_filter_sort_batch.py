@@ -0,0 +1,255 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import AsyncDoAll, AsyncDoK, DoAll, DoK
+from metacontrollers.internal.batching import select_batches, sort_batches
+from metacontrollers.internal.exceptions import (
+    ArgumentError,
+    InvalidControllerMethodError,
+    InvalidControllerOptionError,
+    InvalidReturnError,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Values:
+    """Array-like result of a batch method, which is only read through tolist."""
+
+    def __init__(self, values) -> None:
+        self.values = values
+
+    def tolist(self):
+        return list(self.values)
+
+    def __iter__(self):
+        raise AssertionError("batch values should not be iterated element by element")
+
+
+class Above(DoAll):
+    batch_size = 4
+
+    def __init__(self) -> None:
+        self.batches = []
+
+    def filter_batch(self, chosen, threshold):
+        self.batches.append(list(chosen))
+        return Values(element > threshold for element in chosen)
+
+    def sort_key_batch(self, chosen, threshold):
+        return Values(-element for element in chosen)
+
+
+class ByRemainder(DoAll):
+    def sort_key_batch(self, chosen, *, modulo=3):
+        return [element % modulo for element in chosen]
+
+
+class ReverseByRemainder(DoAll):
+    reverse_sort = True
+
+    def sort_key_batch(self, chosen, *, modulo=3):
+        return [element % modulo for element in chosen]
+
+
+class Even(DoK):
+    batch_size = 3
+
+    def __init__(self) -> None:
+        self.batches = 0
+
+    def filter_batch(self, chosen):
+        self.batches += 1
+        return [element % 2 == 0 for element in chosen]
+
+    def action(self, chosen):
+        return chosen * 10
+
+
+class Closest(DoK):
+    batch_size = 5
+
+    def sort_key_batch(self, chosen, target):
+        return [abs(element - target) for element in chosen]
+
+    def fold(self, results, target):
+        return results
+
+
+class Farthest(DoK):
+    reverse_sort = True
+
+    def filter_batch(self, chosen, target):
+        return [element != target for element in chosen]
+
+    def sort_key_batch(self, chosen, target):
+        return [abs(element - target) for element in chosen]
+
+
+class Short(DoAll):
+    def filter_batch(self, chosen):
+        return [True]
+
+
+class AsyncSorted(AsyncDoAll):
+    async def filter(self, chosen) -> bool:
+        return chosen > 2
+
+    def sort_key_batch(self, chosen):
+        return [-element for element in chosen]
+
+
+class AsyncFirst(AsyncDoK):
+    batch_size = 2
+
+    def filter_batch(self, chosen):
+        return [element > 2 for element in chosen]
+
+
+async def count(n: int):
+    for i in range(n):
+        yield i
+
+
+class TestFilterSortBatch(unittest.TestCase):
+    def test_do_all(self):
+        controller = Above()
+        self.assertListEqual(controller(range(10), 5), [9, 8, 7, 6])
+        self.assertListEqual(controller.batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertListEqual(controller([], 5), [])
+
+        # ties keep the partition order, also in reverse
+        partition = list(range(10))
+        self.assertListEqual(
+            ByRemainder()(partition), sorted(partition, key=lambda x: x % 3)
+        )
+        self.assertListEqual(
+            ReverseByRemainder()(partition, modulo=4),
+            sorted(partition, key=lambda x: x % 4, reverse=True),
+        )
+
+    def test_do_k(self):
+        controller = Even()
+        self.assertListEqual(controller(2, iter(range(100))), [0, 20])
+        # stops filtering once k elements were kept
+        self.assertEqual(controller.batches, 1)
+        self.assertListEqual(Even()(0, range(10)), [])
+
+        self.assertListEqual(Closest()(3, range(20), 7), [7, 6, 8])
+        self.assertListEqual(Farthest()(2, range(10), 7), [0, 1])
+
+    def test_sort_and_select_by_position(self):
+        # elements are never compared, only their keys, and ties keep their order
+        elements = [{"id": i} for i in range(7)]
+
+        def keys(batch):
+            return [element["id"] % 3 for element in batch]
+
+        for batch_size in (None, 2):
+            for reverse in (False, True):
+                expected = sorted(
+                    elements, key=lambda element: element["id"] % 3, reverse=reverse
+                )
+                self.assertListEqual(
+                    sort_batches(keys, elements, batch_size, reverse), expected
+                )
+                self.assertListEqual(
+                    select_batches(keys, 4, iter(elements), batch_size, reverse),
+                    expected[:4],
+                )
+        self.assertListEqual(
+            [element["id"] for element in sort_batches(keys, elements, 3, False)],
+            [0, 3, 6, 1, 4, 2, 5],
+        )
+
+    def test_async(self):
+        self.assertListEqual(asyncio.run(AsyncSorted()(count(6))), [5, 4, 3])
+        self.assertListEqual(asyncio.run(AsyncFirst()(2, count(10))), [3, 4])
+
+    def test_values_per_batch(self):
+        with self.assertRaises(InvalidReturnError):
+            Short()([1, 2])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_results(self):
+        class Scores(DoK):
+            batch_size = 64
+
+            def filter_batch(self, chosen):
+                return numpy.asarray(chosen) % 5 != 0
+
+            def sort_key_batch(self, chosen):
+                return numpy.asarray(chosen, dtype=float) * -0.5
+
+        result = Scores()(3, range(1000))
+        self.assertListEqual(result, [999, 998, 997])
+        self.assertIs(type(result[0]), int)
+
+    def test_shared_arguments(self):
+        with self.assertRaises(ArgumentError):
+
+            class Mismatched(DoAll):
+                def filter_batch(self, chosen, limit):
+                    return chosen
+
+                def sort_key_batch(self, chosen, maximum):
+                    return chosen
+
+        with self.assertRaises(ArgumentError):
+
+            class Unpacked(DoK):
+                def sort_key_batch(self, chosen, **options):
+                    return chosen
+
+                def action(self, chosen, **settings):
+                    return chosen
+
+    def test_invalid(self):
+        def filter_batch(self, chosen):
+            return [True] * len(chosen)
+
+        def sort_key_batch(self, chosen):
+            return chosen
+
+        for attrs, error in (
+            (
+                {"filter_batch": filter_batch, "filter": lambda self, chosen: True},
+                InvalidControllerMethodError,
+            ),
+            (
+                {"sort_key_batch": sort_key_batch, "sort_key": lambda self, x: x},
+                InvalidControllerMethodError,
+            ),
+            (
+                {"sort_key_batch": sort_key_batch, "sort_cmp": lambda self, a, b: 0},
+                InvalidControllerMethodError,
+            ),
+            (
+                {"filter_batch": filter_batch, "executor": "threads"},
+                InvalidControllerOptionError,
+            ),
+            (
+                {"sort_key_batch": sort_key_batch, "pipeline": True},
+                InvalidControllerOptionError,
+            ),
+        ):
+            with self.subTest(attrs=sorted(attrs)):
+                with self.assertRaises(error):
+                    type("T", (DoAll,), attrs)
+
+        with self.assertRaises(InvalidControllerMethodError):
+
+            class T(AsyncDoAll):
+                async def filter_batch(self, chosen):
+                    return [True] * len(chosen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import warnings
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers.freeze import freeze_module
+from metacontrollers.internal.frozen import FROZEN_CONTROLLERS
+from metacontrollers.internal.generation_cache import CODE_CACHE, GENERATION_CACHE
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CONTROLLERS_SOURCE = textwrap.dedent("""
+    from metacontrollers import Do, DoAll, DoK, DoOne
+
+
+    class Evens(DoAll):
+        def filter(self, chosen, minimum=0) -> bool:
+            return chosen % 2 == 0 and chosen >= minimum
+
+        def action(self, chosen, *, scale=10):
+            return chosen * scale
+
+
+    class Largest(DoK):
+        reverse_sort = True
+
+        def sort_key(self, chosen):
+            return chosen
+
+        def fold(self, results):
+            return sum(results)
+
+
+    class First(DoOne):
+        def action(self, chosen):
+            return chosen + BODY_OFFSET
+
+
+    class Constant(Do):
+        def action(self):
+            return "constant"
+
+
+    BODY_OFFSET = 1
+    """)
+
+
+@unittest.skipIf(sys.version_info < (3, 9), "freezing requires ast.unparse")
+class TestFreeze(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.package = f"frozen_pkg_{id(self)}"
+        os.makedirs(os.path.join(self.directory.name, self.package))
+        with open(
+            os.path.join(self.directory.name, self.package, "__init__.py"), "w"
+        ) as f:
+            f.write("")
+        self.write_controllers(CONTROLLERS_SOURCE)
+        sys.path.insert(0, self.directory.name)
+
+    def tearDown(self):
+        sys.path.remove(self.directory.name)
+        self.forget_modules()
+        self.directory.cleanup()
+
+    @property
+    def module_name(self):
+        return f"{self.package}.controllers"
+
+    def write_controllers(self, source):
+        path = os.path.join(self.directory.name, self.package, "controllers.py")
+        with open(path, "w") as f:
+            f.write(source)
+
+    def write_frozen(self, source):
+        path = os.path.join(self.directory.name, self.package, "_controllers_frozen.py")
+        with open(path, "w") as f:
+            f.write(source)
+
+    def forget_modules(self):
+        for name in list(sys.modules):
+            if name.startswith(self.package):
+                del sys.modules[name]
+        FROZEN_CONTROLLERS.clear()
+        GENERATION_CACHE.clear()
+        importlib.invalidate_caches()
+
+    def check_results(self, module):
+        self.assertListEqual(module.Evens()([1, 2, 3, 4]), [20, 40])
+        self.assertListEqual(module.Evens()([1, 2, 3, 4], 3, scale=1), [4])
+        self.assertEqual(module.Largest()(2, [1, 5, 3]), 8)
+        self.assertEqual(module.First()([4, 5]), 5)
+        self.assertEqual(module.Constant()(), "constant")
+
+    def test_frozen_module_is_attached(self):
+        self.write_frozen(freeze_module(self.module_name))
+        self.forget_modules()
+
+        num_codes = len(CODE_CACHE)
+        module = importlib.import_module(self.module_name)
+        self.assertEqual(len(CODE_CACHE), num_codes)
+        for cls in (module.Evens, module.Largest, module.First, module.Constant):
+            self.assertEqual(
+                cls.__call__.__globals__["__name__"],
+                f"{self.package}._controllers_frozen",
+            )
+        self.check_results(module)
+
+    def test_stale_frozen_module_is_regenerated(self):
+        self.write_frozen(freeze_module(self.module_name))
+        self.write_controllers(
+            CONTROLLERS_SOURCE.replace("chosen % 2 == 0", "chosen % 2 < 1")
+        )
+        self.forget_modules()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            module = importlib.import_module(self.module_name)
+        self.assertTrue(any("stale" in str(warning.message) for warning in caught))
+        self.assertEqual(
+            module.Evens.__call__.__globals__["__name__"], self.module_name
+        )
+        self.assertEqual(
+            module.Largest.__call__.__globals__["__name__"],
+            f"{self.package}._controllers_frozen",
+        )
+        self.check_results(module)
+
+    def test_command_line(self):
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join([REPO_ROOT, self.directory.name])
+        subprocess.run(
+            [sys.executable, "-m", "metacontrollers.freeze", self.module_name],
+            cwd=self.directory.name,
+            env=environment,
+            check=True,
+            capture_output=True,
+        )
+        path = os.path.join(self.directory.name, self.package, "_controllers_frozen.py")
+        self.assertTrue(os.path.exists(path))
+        self.forget_modules()
+        self.check_results(importlib.import_module(self.module_name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import ast
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import DoAll, DoK, DoOne
+from metacontrollers.internal.generation_cache import CODE_CACHE, CodeCache
+from metacontrollers.internal.interface import GENERATION_CACHE
+
+
+def make_do_all(offset, reverse=False):
+    class T(DoAll):
+        reverse_sort = reverse
+
+        def filter(self, chosen, minimum=offset) -> bool:
+            return chosen >= minimum
+
+        def sort_key(self, chosen):
+            return chosen
+
+        def action(self, chosen, *, scale=offset + 1):
+            return chosen * scale
+
+    return T
+
+
+def make_do_one(offset):
+    class T(DoOne):
+        def action(self, chosen):
+            return chosen + offset
+
+    return T
+
+
+def make_do_k(offset):
+    class T(DoK):
+        @staticmethod
+        def sort_key(chosen):
+            return -chosen
+
+        def fold(self, results, extra=offset):
+            return sum(results) + extra
+
+    return T
+
+
+class TestGenerationCache(unittest.TestCase):
+    def test_factory_classes_share_code(self):
+        first = make_do_all(1)
+        size = len(GENERATION_CACHE)
+        second = make_do_all(2)
+        self.assertEqual(len(GENERATION_CACHE), size)
+        self.assertIs(first.__call__.__code__, second.__call__.__code__)
+        self.assertIsNot(first.__call__, second.__call__)
+
+    def test_defaults_are_rebound(self):
+        first = make_do_all(1)()
+        second = make_do_all(3)()
+        elements = [5, 0, 3, 1, 4, 2]
+        self.assertListEqual(first(elements), [2, 4, 6, 8, 10])
+        self.assertListEqual(second(elements), [12, 16, 20])
+        self.assertListEqual(second(elements, 0, scale=1), [0, 1, 2, 3, 4, 5])
+
+    def test_options_are_part_of_the_key(self):
+        ascending = make_do_all(0)
+        descending = make_do_all(0, reverse=True)
+        self.assertIsNot(ascending.__call__.__code__, descending.__call__.__code__)
+        self.assertListEqual(descending()([1, 3, 2]), [3, 2, 1])
+        self.assertListEqual(ascending()([1, 3, 2]), [1, 2, 3])
+
+    def test_closures_are_preserved(self):
+        first = make_do_one(10)()
+        second = make_do_one(20)()
+        self.assertEqual(first([1, 2]), 11)
+        self.assertEqual(second([1, 2]), 21)
+
+    def test_staticmethods(self):
+        first = make_do_k(0)()
+        second = make_do_k(100)()
+        self.assertEqual(first(2, [1, 5, 3]), 8)
+        self.assertEqual(second(2, [1, 5, 3]), 108)
+
+    def test_uncacheable_methods(self):
+        class Callable:
+            def __call__(self, chosen):
+                return chosen
+
+        key = GENERATION_CACHE.get_key(None, DoAll, {"action": Callable()})
+        self.assertIsNone(key)
+
+
+class TestCodeDeduplication(unittest.TestCase):
+    def test_structurally_equal_controllers_share_code(self):
+        class Evens(DoAll):
+            def filter(self, chosen) -> bool:
+                return chosen % 2 == 0
+
+            def action(self, chosen):
+                return chosen * 10
+
+        size = len(CODE_CACHE)
+
+        class Odds(DoAll):
+            def filter(self, chosen) -> bool:
+                return chosen % 2 == 1
+
+            def action(self, chosen):
+                return -chosen
+
+        self.assertEqual(len(CODE_CACHE), size)
+        self.assertIs(Evens.__call__.__code__, Odds.__call__.__code__)
+        self.assertListEqual(Evens()([1, 2, 3, 4]), [20, 40])
+        self.assertListEqual(Odds()([1, 2, 3, 4]), [-1, -3])
+
+    def test_different_shapes_do_not_share_code(self):
+        class WithArg(DoAll):
+            def action(self, chosen, offset):
+                return chosen + offset
+
+        class WithoutArg(DoAll):
+            def action(self, chosen):
+                return chosen
+
+        self.assertIsNot(WithArg.__call__.__code__, WithoutArg.__call__.__code__)
+        self.assertListEqual(WithArg()([1, 2], 1), [2, 3])
+        self.assertListEqual(WithoutArg()([1, 2]), [1, 2])
+
+    def test_defaults_are_per_class(self):
+        class First(DoOne):
+            def action(self, chosen, *, offset=1):
+                return chosen + offset
+
+        class Second(DoOne):
+            def action(self, chosen, *, offset=2):
+                return chosen - offset
+
+        self.assertIs(First.__call__.__code__, Second.__call__.__code__)
+        self.assertEqual(First()([10]), 11)
+        self.assertEqual(Second()([10]), 8)
+        self.assertEqual(Second()([10], offset=5), 5)
+
+    def test_code_cache_is_bounded(self):
+        cache = CodeCache(max_size=2)
+        modules = [ast.parse(f"def f(x):\n    return x + {i}") for i in range(3)]
+        codes = cache.compile_many(modules + modules[:1], "f")
+        self.assertEqual(len(cache), 2)
+        self.assertIs(codes[0], codes[3])
+        self.assertEqual(len(CodeCache.get_shape(modules[0])), 32)
+
+        # the least recently used shape was dropped and is compiled again
+        self.assertIsNot(cache.get_or_compile(modules[0], "f"), codes[0])
+        self.assertIs(cache.get_or_compile(modules[2], "f"), codes[2])
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -220,6 +220,34 @@ class TestMethodReturns(unittest.TestCase):
         self.assertFalse(fn.has_value_yield)
         self.assertFalse(fn.has_value_yield_from)
 
+    def test_coroutine_value_return(self):
+        async def return_coroutine_value(x):
+            async def inner():
+                pass
+
+            await inner()
+            return x
+
+        fn = MethodInspector(return_coroutine_value)
+        self.assertTrue(fn.is_coroutine_function)
+        self.assertFalse(fn.has_parse_error)
+        self.assertTrue(fn.has_explicit_value_return)
+        self.assertTrue(fn.returns_a_value)
+
+    def test_coroutine_no_return(self):
+        async def no_return_coroutine():
+            async def inner():
+                return True
+
+            await inner()
+
+        fn = MethodInspector(no_return_coroutine)
+        self.assertTrue(fn.is_coroutine_function)
+        self.assertFalse(fn.has_parse_error)
+        self.assertFalse(fn.has_explicit_value_return)
+        self.assertFalse(fn.returns_a_value)
+        self.assertFalse(MethodInspector(lambda: 1).is_coroutine_function)
+
     def test_return_in_loop_no_after(self):
         def return_in_loop_no_after(lst):
             for item in lst:
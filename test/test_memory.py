@@ -0,0 +1,202 @@
+import ast
+import gc
+import importlib
+import os
+import sys
+import tempfile
+import tracemalloc
+import weakref
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import DoAll, DoK
+from metacontrollers.internal.method_inspector import MethodInspector
+
+
+class Payload:
+    pass
+
+
+class PlainBase:
+    pass
+
+
+def make_controller(offset, base=DoAll):
+    class T(base):
+        def filter(self, chosen, minimum=offset) -> bool:
+            return chosen >= minimum
+
+        def action(self, chosen):
+            return chosen + offset
+
+    return T
+
+
+DISTINCT_CONTROLLER_SOURCE = """
+def make_{i}(base):
+    class T(base):
+        def filter(self, chosen, limit_{i}=0) -> bool:
+            return chosen >= limit_{i} + {i}
+
+        def action(self, chosen):
+            return chosen * {i}
+
+    return T
+"""
+
+
+def import_distinct_factories(directory, count):
+    """
+    Writes and imports a module of count class factories whose controlled methods
+    differ in their bodies and argument names, so that no two of their classes share a
+    layout or a call method shape.
+    """
+    module_name = "distinct_controllers"
+    with open(os.path.join(directory, f"{module_name}.py"), "w") as file:
+        file.writelines(DISTINCT_CONTROLLER_SOURCE.format(i=i) for i in range(count))
+    sys.path.insert(0, directory)
+    try:
+        importlib.invalidate_caches()
+        module = importlib.import_module(module_name)
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop(module_name, None)
+    return [getattr(module, f"make_{i}") for i in range(count)]
+
+
+def get_allocated_bytes(after, before):
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def measure_retained_bytes(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        classes = [factory(i) for i in range(count)]
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del classes
+    return get_allocated_bytes(after, before)
+
+
+class TestRetainedMemory(unittest.TestCase):
+    def test_factory_locals_are_not_captured(self):
+        def factory():
+            payload = Payload()
+
+            class T(DoK):
+                def sort_key(self, chosen):
+                    return chosen
+
+            return T, weakref.ref(payload)
+
+        cls, payload_ref = factory()
+        gc.collect()
+        self.assertIsNone(payload_ref())
+        self.assertListEqual(cls()(2, [3, 1, 2]), [1, 2])
+
+    def test_module_globals_are_not_modified(self):
+        module_globals = dict(globals())
+
+        def factory():
+            unique_local_value = 1
+
+            class T(DoK):
+                def sort_key(self, chosen, scale=unique_local_value):
+                    return chosen * scale
+
+            return T
+
+        factory()
+        self.assertDictEqual(globals(), module_globals)
+
+    def test_call_method_namespace(self):
+        cls = make_controller(0)
+        namespace = cls.__call__.__globals__
+        self.assertEqual(cls.__call__.__module__, __name__)
+        self.assertLessEqual(set(namespace), {"__builtins__", "__name__"})
+        self.assertIs(namespace, make_controller(1).__call__.__globals__)
+
+    def test_inspectors_do_not_keep_source(self):
+        def action(self, chosen):
+            return chosen
+
+        inspector = MethodInspector(action)
+        self.assertTrue(inspector.returns_a_value)
+        self.assertFalse(hasattr(inspector, "__dict__"))
+        values = [
+            getattr(
+                inspector, f"_MethodInspector{slot}" if slot.startswith("__") else slot
+            )
+            for slot in MethodInspector.__slots__
+        ]
+        self.assertFalse(any(isinstance(value, (str, ast.AST)) for value in values))
+
+    def test_per_class_retained_memory(self):
+        # warm up the generation cache so only per-class costs are measured
+        make_controller(0)
+        make_controller(0, PlainBase)
+
+        count = 500
+        controller_bytes = measure_retained_bytes(make_controller, count) / count
+        plain_bytes = (
+            measure_retained_bytes(lambda i: make_controller(i, PlainBase), count)
+            / count
+        )
+        call_method = make_controller(0).__call__
+        call_method_bytes = sys.getsizeof(call_method) + sys.getsizeof(
+            call_method.__defaults__
+        )
+
+        # a controller should only cost its call method on top of an equivalent plain class
+        self.assertLess(controller_bytes - plain_bytes, 1024)
+        self.assertLess(call_method_bytes, 512)
+
+    def test_distinct_controllers_retained_memory(self):
+        # more classes than the 256 layouts and shapes the caches keep
+        count = 300
+        with tempfile.TemporaryDirectory() as directory:
+            factories = import_distinct_factories(directory, 3 * count)
+
+            def create(start, base=DoAll):
+                return [factories[i](base) for i in range(start, start + count)]
+
+            # before Python 3.11, the first call of a factory leaves a frame cached on its
+            # code object; make those before tracing
+            for factory in factories:
+                factory(PlainBase)
+
+            # trace while the caches fill up, so that the entries they evict are counted
+            gc.collect()
+            tracemalloc.start()
+            try:
+                create(0)
+                gc.collect()
+                before = tracemalloc.take_snapshot()
+                controllers = create(count)
+                gc.collect()
+                alive = tracemalloc.take_snapshot()
+                plain_classes = create(2 * count, PlainBase)
+                gc.collect()
+                plain = tracemalloc.take_snapshot()
+                del controllers, plain_classes
+                gc.collect()
+                released = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+
+        # a live class costs its call method and, since no two classes share a shape,
+        # its own code object
+        controller_bytes = get_allocated_bytes(alive, before) / count
+        plain_bytes = get_allocated_bytes(plain, alive) / count
+        self.assertLess(controller_bytes - plain_bytes, 2048)
+        # the caches are bounded, so released classes leave (almost) nothing behind
+        self.assertLess(get_allocated_bytes(released, before) / count, 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,360 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+import metacontrollers
+from metacontrollers import AsyncDoAll, DoAll, pipeline_metrics
+from metacontrollers.internal.exceptions import InvalidControllerOptionError
+
+
+class Score(DoAll):
+    pipeline = True
+    chunk_size = 7
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, minimum=0, *, scale=1):
+        return chosen * scale
+
+    def fold(self, results, minimum=0):
+        return results
+
+
+class ThreadScore(DoAll):
+    pipeline = True
+    executor = "threads"
+    max_workers = 3
+    chunk_size = 7
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, minimum=0, *, scale=1):
+        return chosen * scale
+
+
+class UnorderedScore(DoAll):
+    pipeline = True
+    executor = "threads"
+    ordered = False
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, minimum=0, *, scale=1):
+        return chosen * scale
+
+
+class ProcessScore(DoAll):
+    pipeline = True
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 5
+
+    def filter(self, chosen) -> bool:
+        return chosen % 3 != 0
+
+    def action(self, chosen, *, scale=1):
+        return chosen * scale
+
+
+class ProcessTotal(DoAll):
+    pipeline = True
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 5
+    fold_associative = True
+
+    def action(self, chosen):
+        return chosen * 2
+
+    def fold(self, results):
+        return sum(results)
+
+
+class Total(DoAll):
+    pipeline = True
+    chunk_size = 4
+
+    def action(self, chosen):
+        return chosen + 1
+
+    def fold(self, results):
+        return sum(results)
+
+    def fold_combine(self, a, b):
+        return a + b
+
+
+class Associative(DoAll):
+    pipeline = True
+    executor = "threads"
+    chunk_size = 4
+    fold_associative = True
+
+    def action(self, chosen):
+        return [chosen]
+
+    def fold(self, results):
+        return [element for result in results for element in result]
+
+
+class Even(DoAll):
+    pipeline = True
+
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+
+class Counted(DoAll):
+    pipeline = True
+
+    def fold(self, elements):
+        return len(elements)
+
+
+class Recorded(DoAll):
+    pipeline = True
+    executor = "threads"
+
+    def __init__(self) -> None:
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def action(self, chosen):
+        with self.lock:
+            self.seen.append(chosen)
+
+
+class Timed(DoAll):
+    pipeline = True
+    chunk_size = 1
+
+    def __init__(self) -> None:
+        self.filtered = []
+        self.actions = []
+
+    def filter(self, chosen) -> bool:
+        time.sleep(0.002)
+        self.filtered.append(time.perf_counter())
+        return True
+
+    def action(self, chosen):
+        self.actions.append(time.perf_counter())
+        return chosen
+
+
+class Gated(DoAll):
+    pipeline = True
+    chunk_size = 1
+    queue_size = 2
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def action(self, chosen):
+        self.release.wait()
+        return chosen
+
+
+class Failing(DoAll):
+    pipeline = True
+    executor = "threads"
+    chunk_size = 2
+
+    def filter(self, chosen) -> bool:
+        if chosen == "filter":
+            raise KeyError(chosen)
+        return True
+
+    def action(self, chosen):
+        if chosen == "action":
+            raise ValueError(chosen)
+        return chosen
+
+    def fold(self, results):
+        if "fold" in results:
+            raise TypeError("fold")
+        return results
+
+
+class Metered(DoAll):
+    pipeline = True
+    chunk_size = 10
+    queue_size = 3
+
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+    def action(self, chosen):
+        return chosen
+
+
+class Plain(DoAll):
+    def action(self, chosen):
+        return chosen
+
+
+class TestPipeline(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        metacontrollers.shutdown_executors()
+
+    def test_same_results_as_a_regular_call(self):
+        partition = list(range(100))
+        expected = [x * 3 for x in range(10, 100)]
+        for controller in (Score(), ThreadScore()):
+            with self.subTest(controller=type(controller).__name__):
+                self.assertListEqual(controller(partition, 10, scale=3), expected)
+                self.assertListEqual(controller([]), [])
+        self.assertListEqual(sorted(UnorderedScore()(partition, 10, scale=3)), expected)
+        self.assertEqual(Total()(range(10)), 55)
+        self.assertEqual(Total()([]), 0)
+        self.assertListEqual(Associative()(range(10)), list(range(10)))
+        self.assertListEqual(Even()(iter(range(10))), [0, 2, 4, 6, 8])
+        self.assertEqual(Counted()(range(10)), 10)
+
+        controller = Recorded()
+        self.assertIsNone(controller(range(20)))
+        self.assertListEqual(sorted(controller.seen), list(range(20)))
+
+    def test_processes(self):
+        self.assertListEqual(
+            ProcessScore()(range(20), scale=2),
+            [x * 2 for x in range(20) if x % 3 != 0],
+        )
+        self.assertEqual(ProcessTotal()(range(100)), 9900)
+
+    def test_call_many(self):
+        self.assertListEqual(
+            Score().call_many([range(3), range(5)], 2), [[2], [2, 3, 4]]
+        )
+
+    def test_stages_overlap(self):
+        controller = Timed()
+        self.assertListEqual(controller(range(20)), list(range(20)))
+        # the first action ran while the partition was still being filtered
+        self.assertLess(controller.actions[0], controller.filtered[-1])
+
+    def test_backpressure(self):
+        consumed = []
+
+        def partition():
+            for i in range(1000):
+                consumed.append(i)
+                yield i
+
+        controller = Gated()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(controller(partition())))
+        thread.start()
+        time.sleep(0.1)
+        # one chunk in the action, queue_size queued, one waiting to be queued
+        self.assertLessEqual(len(consumed), 5)
+        controller.release.set()
+        thread.join()
+        self.assertListEqual(result[0], list(range(1000)))
+
+    def test_errors(self):
+        for partition, error in (
+            (["a", "filter", "b"], KeyError),
+            (["a", "b", "c", "action"], ValueError),
+            (["fold", "a"], TypeError),
+        ):
+            with self.subTest(error=error.__name__):
+                with self.assertRaises(error):
+                    Failing()(partition * 50)
+        self.assertListEqual(Failing()(["a", "b", "c"]), ["a", "b", "c"])
+        # every stage thread stopped
+        self.assertFalse(
+            [
+                thread
+                for thread in threading.enumerate()
+                if thread.name.startswith("metacontrollers-pipeline")
+            ]
+        )
+
+    def test_metrics(self):
+        metrics = pipeline_metrics(Metered)
+        metrics.reset()
+        controller = Metered()
+        controller(range(100))
+        controller(range(50))
+        self.assertIs(pipeline_metrics(controller), metrics)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["calls"], 2)
+        stages = snapshot["stages"]
+        self.assertEqual(stages["filter"]["items"], 150)
+        self.assertEqual(stages["filter"]["chunks"], 15)
+        self.assertEqual(stages["action"]["items"], 75)
+        self.assertEqual(stages["fold"]["items"], 75)
+        for stage in stages.values():
+            self.assertGreater(stage["throughput"], 0)
+            self.assertGreaterEqual(stage["blocked_time"], 0)
+        queues = snapshot["queues"]
+        self.assertEqual(queues["filtered"]["capacity"], 3)
+        self.assertEqual(queues["filtered"]["puts"], 15)
+        self.assertEqual(queues["results"]["puts"], 15)
+        for queue in queues.values():
+            self.assertLessEqual(queue["max_occupancy"], 3)
+            self.assertGreaterEqual(queue["mean_occupancy"], 1)
+
+        metrics.reset()
+        self.assertDictEqual(
+            metrics.snapshot(), {"calls": 0, "stages": {}, "queues": {}}
+        )
+        with self.assertRaises(TypeError):
+            pipeline_metrics(Plain())
+
+    def test_concurrent_metrics(self):
+        metrics = pipeline_metrics(Metered)
+        metrics.reset()
+        controller = Metered()
+        threads = [
+            threading.Thread(target=controller, args=(range(100),)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # every call adds its own metrics to the totals of the class
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["calls"], 8)
+        self.assertEqual(snapshot["stages"]["filter"]["items"], 800)
+        self.assertEqual(snapshot["queues"]["filtered"]["puts"], 80)
+        metrics.reset()
+
+    def test_invalid_options(self):
+        for options in (
+            {"pipeline": 1},
+            {"queue_size": 4},
+            {"pipeline": True, "queue_size": 0},
+            {"pipeline": True, "sort_key": lambda self, chosen: chosen},
+            {"pipeline": True, "executor": "distributed"},
+        ):
+            with self.subTest(options=options):
+                with self.assertRaises(InvalidControllerOptionError):
+                    type(
+                        "T",
+                        (DoAll,),
+                        {"action": lambda self, chosen: chosen, **options},
+                    )
+
+        with self.assertRaises(InvalidControllerOptionError):
+
+            class T(AsyncDoAll):
+                pipeline = True
+
+                def action(self, chosen):
+                    return chosen
+
+
+if __name__ == "__main__":
+    unittest.main()
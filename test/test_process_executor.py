@@ -0,0 +1,363 @@
+import os
+import pickle
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import metacontrollers
+from metacontrollers import DoAll, DoK
+from metacontrollers.internal.exceptions import InvalidControllerOptionError
+from metacontrollers.internal.executors import (
+    SHARED_EXECUTORS,
+    InterpreterPoolExecutor,
+)
+
+
+class Score(DoAll):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 3
+
+    def __init__(self, weight) -> None:
+        self.weight = weight
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def action(self, chosen, *, offset=0):
+        return chosen * self.weight + offset
+
+    def fold(self, results):
+        return results
+
+
+class WorkerPids(DoAll):
+    executor = "processes"
+    max_workers = 2
+
+    def action(self, chosen):
+        return os.getpid()
+
+
+class SortedScore(DoAll):
+    executor = "processes"
+    max_workers = 2
+
+    def filter(self, chosen) -> bool:
+        return chosen % 2 == 0
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen):
+        return chosen * 10
+
+
+class FilterOnly(DoAll):
+    executor = "processes"
+    max_workers = 2
+
+    def filter(self, chosen, *args) -> bool:
+        return chosen not in args
+
+
+class TopScores(DoK):
+    executor = "processes"
+    max_workers = 2
+    reverse_sort = True
+
+    def sort_key(self, chosen):
+        return chosen
+
+    def action(self, chosen):
+        return chosen + 0.5
+
+
+class SequentialTop(DoK):
+    reverse_sort = True
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen[1] >= minimum
+
+    def sort_key(self, chosen, *, scale=1):
+        return chosen[0] * scale
+
+    def action(self, chosen):
+        return chosen[1]
+
+
+class ParallelTop(DoK):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 40
+    reverse_sort = True
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen[1] >= minimum
+
+    def sort_key(self, chosen, *, scale=1):
+        return chosen[0] * scale
+
+    def action(self, chosen):
+        return chosen[1]
+
+
+class ParallelCmp(DoK):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 40
+
+    def sort_cmp(self, a, b, offset=0):
+        return (a[0] + offset) - (b[0] + offset)
+
+
+class ParallelSorted(DoAll):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 64
+    parallel_sort = True
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen[1] >= minimum
+
+    def sort_key(self, chosen, *, scale=1):
+        return chosen[0] * scale
+
+
+class ParallelSortedDesc(DoAll):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 64
+    parallel_sort = True
+    reverse_sort = True
+
+    def filter(self, chosen, minimum) -> bool:
+        return chosen[1] >= minimum
+
+    def sort_key(self, chosen, *, scale=1):
+        return chosen[0] * scale
+
+    def action(self, chosen):
+        return chosen[1]
+
+
+class LogFirst(DoK):
+    executor = "processes"
+    max_workers = 2
+
+    def filter(self, chosen, path) -> bool:
+        return chosen > 0
+
+    def action(self, chosen, path):
+        with open(path, "a") as file:
+            file.write(f"{chosen}\n")
+
+
+class LogSmallest(DoK):
+    executor = "processes"
+    max_workers = 2
+
+    def sort_key(self, chosen, path):
+        return chosen
+
+    def action(self, chosen, path):
+        with open(path, "a") as file:
+            file.write(f"{chosen}\n")
+
+
+class InterpreterScore(DoK):
+    executor = "interpreters"
+    max_workers = 2
+    chunk_size = 8
+
+    def filter(self, chosen, minimum=0) -> bool:
+        return chosen >= minimum
+
+    def sort_key(self, chosen):
+        return -chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen * 2 + offset
+
+    def fold(self, results):
+        return results
+
+
+class Failing(DoAll):
+    executor = "processes"
+    max_workers = 2
+
+    def action(self, chosen):
+        if chosen == 3:
+            raise ValueError(chosen)
+        return chosen
+
+
+class Histogram(DoAll):
+    executor = "processes"
+    max_workers = 2
+    chunk_size = 4
+
+    def filter(self, chosen) -> bool:
+        return chosen >= 0
+
+    def action(self, chosen):
+        return chosen % 3
+
+    def fold(self, results):
+        counts = {}
+        for result in results:
+            counts[result] = counts.get(result, 0) + 1
+        return (os.getpid(), counts)
+
+    def fold_combine(self, a, b):
+        counts = dict(a[1])
+        for key, value in b[1].items():
+            counts[key] = counts.get(key, 0) + value
+        return (os.getpid(), counts)
+
+
+class Total(DoAll):
+    executor = "processes"
+    max_workers = 2
+    fold_associative = True
+
+    def action(self, chosen):
+        return chosen * 2
+
+    def fold(self, results, start=0):
+        return sum(results, start)
+
+
+class Locked(DoAll):
+    executor = "processes"
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+
+    def action(self, chosen):
+        return chosen
+
+
+class TestProcessExecutor(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        metacontrollers.shutdown_executors()
+
+    def test_filter_and_action(self):
+        self.assertListEqual(
+            Score(2)(range(20), 5, offset=1), [x * 2 + 1 for x in range(5, 20)]
+        )
+        self.assertListEqual(Score(3)([4, 1, 6]), [12, 3, 18])
+
+    def test_actions_run_in_workers(self):
+        pids = set(WorkerPids()(range(8)))
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_sorted_order_is_kept(self):
+        self.assertListEqual(SortedScore()(range(10)), [80, 60, 40, 20, 0])
+
+    def test_filter_only(self):
+        self.assertListEqual(FilterOnly()(range(6), 1, 4), [0, 2, 3, 5])
+
+    def test_do_k(self):
+        self.assertListEqual(TopScores()(3, [5, 1, 9, 7, 3]), [9.5, 7.5, 5.5])
+
+    def test_do_k_void_action(self):
+        # every chosen element is acted on exactly once
+        for controller, expected in (
+            (LogFirst(), [5, 1, 4]),
+            (LogSmallest(), [1, 2, 3]),
+        ):
+            with self.subTest(controller=type(controller).__name__):
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, "log")
+                    self.assertIsNone(controller(3, [5, 1, 4, 2, 3], path))
+                    with open(path) as file:
+                        logged = [int(line) for line in file]
+                self.assertListEqual(sorted(logged), sorted(expected))
+
+    def test_partial_folds(self):
+        pid, counts = Histogram()(range(-5, 30))
+        self.assertEqual(pid, os.getpid())
+        self.assertDictEqual(counts, {0: 10, 1: 10, 2: 10})
+
+    def test_associative_fold(self):
+        self.assertEqual(Total()(range(100)), 9900)
+        self.assertEqual(Total()([]), 0)
+
+    def test_parallel_select(self):
+        elements = [(index * 7919 % 13, index) for index in range(500)]
+        for k in (1, 10, 100, 1000):
+            with self.subTest(k=k):
+                self.assertListEqual(
+                    ParallelTop()(k, elements, 5, scale=2),
+                    SequentialTop()(k, elements, 5, scale=2),
+                )
+                self.assertListEqual(
+                    ParallelCmp()(k, elements),
+                    sorted(elements, key=lambda chosen: chosen[0])[:k],
+                )
+
+    def test_parallel_sort(self):
+        elements = [(index * 7919 % 13, index) for index in range(500)]
+        self.assertIn("process_sort", ParallelSorted.__call__.__globals__)
+        for scale in (1, 0.5):
+            with self.subTest(scale=scale):
+                # many equal keys, so the order of ties must match the sequential sort
+                self.assertListEqual(
+                    ParallelSorted()(elements, 5, scale=scale),
+                    sorted(
+                        [chosen for chosen in elements if chosen[1] >= 5],
+                        key=lambda chosen: chosen[0] * scale,
+                    ),
+                )
+                self.assertListEqual(
+                    ParallelSortedDesc()(iter(elements), 5, scale=scale),
+                    [
+                        chosen[1]
+                        for chosen in sorted(
+                            elements[5:],
+                            key=lambda chosen: chosen[0] * scale,
+                            reverse=True,
+                        )
+                    ],
+                )
+        self.assertListEqual(ParallelSorted()([], 0), [])
+
+    def test_interpreters(self):
+        controller = InterpreterScore()
+        self.assertListEqual(controller(3, range(40), 5, offset=1), [79, 77, 75])
+        pool = SHARED_EXECUTORS.get_process_pool(controller, 2)
+        if InterpreterPoolExecutor is None:
+            # falls back to processes
+            self.assertIsInstance(pool, ProcessPoolExecutor)
+        else:
+            self.assertIsInstance(pool, InterpreterPoolExecutor)
+
+    def test_worker_exception(self):
+        with self.assertRaises(ValueError):
+            Failing()(range(6))
+
+    def test_unpicklable_controller(self):
+        with self.assertRaises(pickle.PicklingError):
+            Locked()([1, 2])
+
+    def test_local_controller(self):
+        for name in ("processes", "interpreters"):
+            with self.subTest(executor=name):
+                with self.assertRaises(InvalidControllerOptionError):
+
+                    class Local(DoAll):
+                        executor = name
+
+                        def action(self, chosen):
+                            return chosen
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+from metacontrollers import (
+    AsyncDoAll,
+    AsyncSingleFlight,
+    Do,
+    DoAll,
+    SingleFlight,
+)
+from metacontrollers.internal.single_flight import default_fingerprint
+
+
+class Gated(DoAll):
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+
+    def pre_controller(self, scale=1) -> None:
+        self.calls += 1
+        self.release.wait()
+
+    def action(self, chosen, scale=1):
+        if chosen < 0:
+            raise ValueError(chosen)
+        return chosen * scale
+
+
+class Counter(Do):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def action(self, name):
+        self.calls += 1
+        return name.upper()
+
+
+class AsyncGated(AsyncDoAll):
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = None
+
+    async def pre_controller(self) -> None:
+        self.calls += 1
+        await self.release.wait()
+
+    async def action(self, chosen):
+        if chosen < 0:
+            raise ValueError(chosen)
+        return chosen + 1
+
+
+def counted(fingerprint):
+    """Fingerprint that counts the calls that computed their key."""
+
+    def wrapper(*args, **kwargs):
+        with lock:
+            wrapper.count += 1
+        return fingerprint(*args, **kwargs)
+
+    lock = threading.Lock()
+    wrapper.count = 0
+    return wrapper
+
+
+def wait_for_callers(fingerprint, num_callers):
+    while fingerprint.count < num_callers:
+        time.sleep(0.001)
+    # leaves them time to join the flight after computing their key
+    time.sleep(0.05)
+
+
+def start_callers(fn, num_threads):
+    results = [None] * num_threads
+
+    def worker(index):
+        try:
+            results[index] = fn()
+        except Exception as error:
+            results[index] = error
+
+    threads = [
+        threading.Thread(target=worker, args=(index,)) for index in range(num_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestDefaultFingerprint(unittest.TestCase):
+    def test_keys(self):
+        partition = [1, 2]
+        self.assertEqual(
+            default_fingerprint(partition, 1, name="a"),
+            default_fingerprint(partition, 1, name="a"),
+        )
+        # partitions by identity
+        self.assertNotEqual(default_fingerprint([1, 2]), default_fingerprint(partition))
+        # numbers by type and value
+        for a, b in ((1, 1.0), (1, True), (0, None), ("1", b"1")):
+            with self.subTest(a=a, b=b):
+                self.assertNotEqual(
+                    default_fingerprint(partition, a), default_fingerprint(partition, b)
+                )
+        self.assertEqual(
+            default_fingerprint(partition, a=1, b=2),
+            default_fingerprint(partition, b=2, a=1),
+        )
+        self.assertNotEqual(
+            default_fingerprint(partition, 1), default_fingerprint(partition, a=1)
+        )
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_identical_calls_run_once(self):
+        controller = Gated()
+        fingerprint = counted(default_fingerprint)
+        deduplicated = SingleFlight(controller, fingerprint)
+        partition = [1, 2, 3]
+        threads, results = start_callers(lambda: deduplicated(partition, 2), 8)
+        wait_for_callers(fingerprint, 8)
+        self.assertEqual(deduplicated.in_flight, 1)
+        controller.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(controller.calls, 1)
+        self.assertListEqual(results, [[2, 4, 6]] * 8)
+        # every caller gets the same result object
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(deduplicated.in_flight, 0)
+
+        # results are not cached once the call returned
+        self.assertListEqual(deduplicated(partition, 2), [2, 4, 6])
+        self.assertEqual(controller.calls, 2)
+
+    def test_different_calls_run_separately(self):
+        controller = Gated()
+        controller.release.set()
+        deduplicated = SingleFlight(controller)
+        partition = [1, 2]
+        self.assertListEqual(deduplicated(partition, 2), [2, 4])
+        self.assertListEqual(deduplicated(partition, scale=3), [3, 6])
+        self.assertListEqual(deduplicated([1, 2], 2), [2, 4])
+        self.assertEqual(controller.calls, 3)
+
+        controller = Counter()
+        deduplicated = SingleFlight(controller)
+        self.assertEqual(deduplicated("a"), "A")
+        self.assertEqual(deduplicated("b"), "B")
+        self.assertEqual(controller.calls, 2)
+
+    def test_exception_is_shared(self):
+        controller = Gated()
+        fingerprint = counted(default_fingerprint)
+        deduplicated = SingleFlight(controller, fingerprint)
+        partition = [1, -1]
+        threads, results = start_callers(lambda: deduplicated(partition), 4)
+        wait_for_callers(fingerprint, 4)
+        controller.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(controller.calls, 1)
+        self.assertEqual(deduplicated.in_flight, 0)
+
+    def test_custom_fingerprint(self):
+        controller = Gated()
+        fingerprint = counted(lambda partition, *args: tuple(partition))
+        deduplicated = SingleFlight(controller, fingerprint=fingerprint)
+        threads, results = start_callers(lambda: deduplicated([1, 2]), 4)
+        wait_for_callers(fingerprint, 4)
+        controller.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(controller.calls, 1)
+        self.assertListEqual(results, [[1, 2]] * 4)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            SingleFlight(AsyncGated())
+        with self.assertRaises(TypeError):
+            SingleFlight(Counter(), fingerprint=1)
+        with self.assertRaises(TypeError):
+            AsyncSingleFlight(Counter())
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_calls_run_once(self):
+        controller = AsyncGated()
+        controller.release = asyncio.Event()
+        deduplicated = AsyncSingleFlight(controller)
+        partition = [1, 2]
+        tasks = [asyncio.ensure_future(deduplicated(partition)) for _ in range(5)]
+        other = asyncio.ensure_future(deduplicated([1, 2]))
+        await asyncio.sleep(0)
+        self.assertEqual(deduplicated.in_flight, 2)
+        controller.release.set()
+        results = await asyncio.gather(*tasks, other)
+        self.assertListEqual(results, [[2, 3]] * 6)
+        self.assertEqual(controller.calls, 2)
+        self.assertEqual(deduplicated.in_flight, 0)
+
+    async def test_exception_and_cancellation(self):
+        controller = AsyncGated()
+        controller.release = asyncio.Event()
+        deduplicated = AsyncSingleFlight(controller)
+        partition = [-1]
+        first = asyncio.ensure_future(deduplicated(partition))
+        second = asyncio.ensure_future(deduplicated(partition))
+        await asyncio.sleep(0)
+        # cancelling the first caller does not cancel the call
+        first.cancel()
+        controller.release.set()
+        with self.assertRaises(ValueError):
+            await second
+        self.assertTrue(first.cancelled())
+        self.assertEqual(controller.calls, 1)
+        self.assertEqual(deduplicated.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import unittest
+
+import metacontrollers
+from metacontrollers import DoAll, DoK, DoOne
+from metacontrollers.internal.bulk_compile import DEFERRED_COMPILATION
+from metacontrollers.internal.generation_cache import GENERATION_CACHE
+
+
+def make_controller(offset):
+    class T(DoAll):
+        def filter(self, chosen, minimum=0) -> bool:
+            return chosen >= minimum
+
+        def sort_key(self, chosen):
+            return -chosen
+
+        def action(self, chosen, scale=offset):
+            return chosen * scale
+
+    return T
+
+
+class Pick(DoOne):
+    def filter(self, chosen, parity) -> bool:
+        return chosen % 2 == parity
+
+    def sort_key(self, chosen):
+        return chosen
+
+    def action(self, chosen, *, offset=0):
+        return chosen + offset
+
+
+class Top(DoK):
+    def sort_key(self, chosen):
+        return -chosen
+
+    def fold(self, results):
+        return sum(results)
+
+
+class TestThreadSafety(unittest.TestCase):
+    NUM_THREADS = 16
+
+    def run_in_threads(self, fn, num_calls=64):
+        barrier = threading.Barrier(self.NUM_THREADS, timeout=10)
+
+        def start(index):
+            if index < self.NUM_THREADS:
+                barrier.wait()
+            return fn(index)
+
+        with ThreadPoolExecutor(max_workers=self.NUM_THREADS) as pool:
+            return list(pool.map(start, range(num_calls)))
+
+    def test_concurrent_calls_on_one_instance(self):
+        pick = Pick()
+        top = Top()
+        elements = list(range(100))
+
+        def call(index):
+            return (
+                pick(elements, index % 2, offset=index),
+                top(index % 10 + 1, elements),
+            )
+
+        results = self.run_in_threads(call, num_calls=256)
+        for index, (picked, total) in enumerate(results):
+            k = index % 10 + 1
+            self.assertEqual(picked, index % 2 + index)
+            self.assertEqual(total, sum(range(100 - k, 100)))
+
+    def test_concurrent_class_creation(self):
+        GENERATION_CACHE.clear()
+
+        def create(index):
+            cls = make_controller(index)
+            return cls, cls()(range(5), 2)
+
+        results = self.run_in_threads(create)
+        for index, (cls, result) in enumerate(results):
+            self.assertListEqual(result, [4 * index, 3 * index, 2 * index])
+        # every class shares the code object of a single generation
+        self.assertEqual(len({cls.__call__.__code__ for cls, _ in results}), 1)
+
+    def test_deferral_is_per_thread(self):
+        GENERATION_CACHE.clear()
+        created = []
+
+        def create_outside_block():
+            created.append(make_controller(2))
+
+        with metacontrollers.deferred_compilation():
+            deferred = make_controller(3)
+            thread = threading.Thread(target=create_outside_block)
+            thread.start()
+            thread.join()
+            self.assertTrue(hasattr(deferred.__call__, "__ctrl_pending__"))
+            self.assertFalse(hasattr(created[0].__call__, "__ctrl_pending__"))
+
+        self.assertListEqual(created[0]()([1, 2]), [4, 2])
+        self.assertListEqual(deferred()([1, 2]), [6, 3])
+
+    def test_concurrent_first_calls_of_deferred_controllers(self):
+        GENERATION_CACHE.clear()
+        with metacontrollers.deferred_compilation():
+            classes = [make_controller(index) for index in range(8)]
+
+            results = self.run_in_threads(lambda index: classes[index % 8]()([1, 2]))
+            self.assertEqual(DEFERRED_COMPILATION.num_pending, 0)
+
+        for index, result in enumerate(results):
+            self.assertListEqual(result, [2 * (index % 8), index % 8])
+
+
+if __name__ == "__main__":
+    unittest.main()